@@ -0,0 +1,105 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Measure the per-RPC overhead of BaseClient for small and large requests.
+
+The stub serializes the request and returns immediately, so the time measured is that of
+ applying the request processors (including protecting the caller's request from them) and of
+ serializing the request.  The previous behavior, deep-copying the request before applying the
+ processors, is measured for comparison.
+
+Example:
+    python base_client_overhead.py --json results.json
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+
+from bosdyn.api.data_acquisition_store_pb2 import StoreDataRequest
+from bosdyn.api.robot_command_pb2 import RobotCommandRequest
+from bosdyn.client.common import BaseClient
+from bosdyn.client.processors import AddRequestHeader
+
+
+class _SerializingStub(object):
+
+    def __init__(self):
+        self.nbytes = 0
+
+    def rpc_method(self, request, **kwargs):
+        self.nbytes += len(request.SerializeToString())
+        return request
+
+
+_SerializingStub.rpc_method._method = b'SerializingStub.rpc_method'
+
+
+class _DeepCopyClient(BaseClient):
+    """BaseClient which deep-copies every request before applying the processors, as it used to."""
+
+    @contextlib.contextmanager
+    def _processed_request(self, request, copy_request=True):
+        yield self._apply_request_processors(request, copy_request=copy_request)
+
+
+def _make_client(client_class):
+    stub = _SerializingStub()
+    client = client_class(lambda channel: stub)
+    client.channel = 'benchmark'
+    client.request_processors.append(AddRequestHeader(lambda: 'benchmark'))
+    return client
+
+
+def measure(client, request, min_seconds):
+    """Return the mean time of client.call(), in microseconds."""
+    num_calls = 0
+    start = time.perf_counter()
+    while True:
+        for _ in range(10):
+            client.call(client._stub.rpc_method, request)
+        num_calls += 10
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / num_calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--megabytes', type=float, default=4,
+                        help='Size of the data in the large request')
+    parser.add_argument('--seconds', type=float, default=1, help='Time to measure each case')
+    parser.add_argument('--json', help='Write the results to this file')
+    options = parser.parse_args()
+
+    requests = {
+        'robot_command': RobotCommandRequest(),
+        'store_data': StoreDataRequest(data=b'\x01' * int(options.megabytes * 1e6)),
+    }
+    clients = {'deepcopy': _make_client(_DeepCopyClient), 'base_client': _make_client(BaseClient)}
+
+    results = []
+    print('{:14} {:>10} {:>14} {:>14}'.format('request', 'bytes', 'deepcopy us', 'base_client us'))
+    for name, request in requests.items():
+        result = {'request': name, 'nbytes': request.ByteSize()}
+        for client_name, client in clients.items():
+            result[client_name + '_usec'] = measure(client, request, options.seconds)
+        results.append(result)
+        print('{:14} {:>10} {:>14.1f} {:>14.1f}'.format(name, result['nbytes'],
+                                                        result['deepcopy_usec'],
+                                                        result['base_client_usec']))
+
+    if options.json:
+        with open(options.json, 'w') as outfile:
+            json.dump(results, outfile, indent=2)
+    return True
+
+
+if __name__ == '__main__':
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,159 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Measure the throughput of ImageClient calls over a single channel and over channel pools.
+
+A local stand-in for the robot's image service returns images of a given size after a given
+ delay.  Like a robot, it serves a limited number of concurrent rpcs per connection; the others
+ wait for their turn (grpc's own max_concurrent_streams server option refuses the extra streams
+ instead of queueing them).  Many threads call get_image_from_sources() through one ImageClient,
+ whose channel is either a single channel or a ChannelPool of several connections.
+
+Example:
+    python channel_pool_throughput.py --threads 32 --pool-sizes 1 2 4 --json results.json
+"""
+import argparse
+import concurrent.futures
+import json
+import sys
+import threading
+import time
+
+import grpc
+
+import bosdyn.api.image_pb2 as image_pb2
+import bosdyn.api.image_service_pb2_grpc as image_service_pb2_grpc
+from bosdyn.client.channel_pool import (LOCAL_SUBCHANNEL_POOL_OPTION, POLICIES, ROUND_ROBIN,
+                                        ChannelPool)
+from bosdyn.client.image import ImageClient
+
+
+class _StandInImageServicer(image_service_pb2_grpc.ImageServiceServicer):
+
+    def __init__(self, delay, image_bytes, max_concurrent_rpcs):
+        self._delay = delay
+        self._data = b'\0' * image_bytes
+        self._max_concurrent_rpcs = max_concurrent_rpcs
+        self._lock = threading.Lock()
+        # Peer address, i.e. connection -> Semaphore limiting its concurrent rpcs.
+        self._slots_by_peer = {}
+
+    def GetImage(self, request, context):
+        if self._max_concurrent_rpcs:
+            with self._lock:
+                slots = self._slots_by_peer.setdefault(
+                    context.peer(), threading.Semaphore(self._max_concurrent_rpcs))
+            with slots:
+                time.sleep(self._delay)
+        else:
+            time.sleep(self._delay)
+        response = image_pb2.GetImageResponse()
+        response.header.error.code = response.header.error.CODE_OK
+        for image_request in request.image_requests:
+            image_response = response.image_responses.add(status=image_pb2.ImageResponse.STATUS_OK)
+            image_response.source.name = image_request.image_source_name
+            image_response.shot.image.data = self._data
+        return response
+
+
+def start_server(delay, image_bytes, max_concurrent_rpcs, max_workers):
+    """Start the stand-in image service on a free local port, and return (server, port)."""
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=max_workers),
+                         options=[('grpc.max_send_message_length', -1)])
+    image_service_pb2_grpc.add_ImageServiceServicer_to_server(
+        _StandInImageServicer(delay, image_bytes, max_concurrent_rpcs), server)
+    port = server.add_insecure_port('localhost:0')
+    server.start()
+    return server, port
+
+
+def make_channel(port, pool_size, policy):
+    options = [('grpc.max_receive_message_length', -1)]
+    if pool_size == 1:
+        return grpc.insecure_channel('localhost:{}'.format(port), options=options)
+    return ChannelPool([
+        grpc.insecure_channel('localhost:{}'.format(port),
+                              options=options + [LOCAL_SUBCHANNEL_POOL_OPTION])
+        for _ in range(pool_size)
+    ], policy=policy)
+
+
+def measure(channel, num_threads, seconds):
+    """Return the number of calls per second made by num_threads threads sharing one client."""
+    client = ImageClient()
+    client.channel = channel
+    # Connect before measuring.
+    client.get_image_from_sources(['camera'])
+    stop = threading.Event()
+    counts = [0] * num_threads
+
+    def run(index):
+        while not stop.is_set():
+            client.get_image_from_sources(['camera'])
+            counts[index] += 1
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(num_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=32, help='Number of calling threads')
+    parser.add_argument('--pool-sizes', type=int, nargs='+', default=[1, 2, 4],
+                        help='Numbers of channels to compare')
+    parser.add_argument('--policy', choices=POLICIES, default=ROUND_ROBIN,
+                        help='Channel selection policy of the pools')
+    parser.add_argument('--delay', type=float, default=0.02,
+                        help='Time in seconds the service takes to respond')
+    parser.add_argument('--image-kilobytes', type=float, default=64,
+                        help='Size of the image in each response')
+    parser.add_argument(
+        '--max-concurrent-rpcs', type=int, default=8,
+        help='Maximum number of concurrent rpcs per connection of the service, '
+        'or 0 for no limit')
+    parser.add_argument('--seconds', type=float, default=3, help='Time to measure each case')
+    parser.add_argument('--json', help='Write the results to this file')
+    options = parser.parse_args()
+
+    server, port = start_server(options.delay, int(options.image_kilobytes * 1024),
+                                options.max_concurrent_rpcs, max_workers=4 * options.threads)
+    results = []
+    try:
+        for pool_size in options.pool_sizes:
+            channel = make_channel(port, pool_size, options.policy)
+            calls_per_sec = measure(channel, options.threads, options.seconds)
+            channel.close()
+            results.append({
+                'pool_size': pool_size,
+                'calls_per_sec': calls_per_sec,
+                'megabytes_per_sec': calls_per_sec * options.image_kilobytes / 1024,
+            })
+    finally:
+        server.stop(None)
+
+    baseline = results[0]['calls_per_sec']
+    print('{:>9} {:>12} {:>10} {:>8}'.format('channels', 'calls/s', 'MB/s', 'speedup'))
+    for result in results:
+        print('{pool_size:>9} {calls_per_sec:>12.1f} {megabytes_per_sec:>10.1f}'.format(**result),
+              '{:>7.2f}x'.format(result['calls_per_sec'] / baseline))
+
+    if options.json:
+        with open(options.json, 'w') as json_file:
+            json.dump({'options': vars(options), 'results': results}, json_file, indent=2)
+    return True
+
+
+if __name__ == '__main__':
+    if not main():
+        sys.exit(1)
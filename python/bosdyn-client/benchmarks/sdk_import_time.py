@@ -0,0 +1,106 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Measure the time to import bosdyn.client and create a standard Sdk.
+
+Each run is a new python process started with "-X importtime", which reports the time taken by the
+ import of each module.  The standard Sdk only imports the module of a service client on the first
+ ensure_client() for it; --ensure-all-clients also creates a client of every default service, as
+ the Sdk used to import all of them.
+
+Example:
+    python sdk_import_time.py --runs 10 --json results.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+_STATEMENTS = """
+import time
+start = time.perf_counter()
+import bosdyn.client
+sdk = bosdyn.client.create_standard_sdk('import-time')
+if {ensure_all_clients}:
+    for lazy_client in bosdyn.client.sdk._DEFAULT_SERVICE_CLIENTS:
+        lazy_client.load()
+print(time.perf_counter() - start)
+"""
+
+
+def parse_importtime(stderr):
+    """Return {module name: (self, cumulative) import time in seconds} from -X importtime output."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            # Header line.
+            continue
+        times[name.strip()] = (int(self_us) * 1e-6, int(cumulative_us) * 1e-6)
+    return times
+
+
+def run_once(ensure_all_clients):
+    """Return (wall time, {module name: (self, cumulative)}) of one process."""
+    process = subprocess.run([
+        sys.executable, '-X', 'importtime', '-c',
+        _STATEMENTS.format(ensure_all_clients=ensure_all_clients)
+    ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    return float(process.stdout.strip().splitlines()[-1]), parse_importtime(process.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help='Number of processes to measure')
+    parser.add_argument('--ensure-all-clients', action='store_true',
+                        help='Also import the module of every default service client')
+    parser.add_argument('--top', type=int, default=15,
+                        help='Number of modules with the largest self import time to show')
+    parser.add_argument('--json', help='Write the results to this file')
+    options = parser.parse_args()
+
+    wall_times = []
+    runs = []
+    for _ in range(options.runs):
+        wall_time, times = run_once(options.ensure_all_clients)
+        wall_times.append(wall_time)
+        runs.append(times)
+
+    # Median self time of each module over the runs.
+    self_times = {
+        name: statistics.median(times[name][0] for times in runs if name in times)
+        for name in runs[0]
+    }
+    bosdyn_modules = [name for name in runs[0] if name.startswith('bosdyn.')]
+    results = {
+        'wall_time_median': statistics.median(wall_times),
+        'wall_time_min': min(wall_times),
+        'num_modules': len(runs[0]),
+        'num_bosdyn_modules': len(bosdyn_modules),
+        'top_modules': sorted(self_times.items(), key=lambda item: -item[1])[:options.top],
+    }
+
+    print('import and create_standard_sdk: median {:.1f} ms, min {:.1f} ms'.format(
+        results['wall_time_median'] * 1e3, results['wall_time_min'] * 1e3))
+    print('{} modules imported, {} of them bosdyn modules'.format(results['num_modules'],
+                                                                  results['num_bosdyn_modules']))
+    print('{:>10}  {}'.format('self (ms)', 'module'))
+    for name, self_time in results['top_modules']:
+        print('{:>10.2f}  {}'.format(self_time * 1e3, name))
+
+    if options.json:
+        with open(options.json, 'w') as json_file:
+            json.dump({'options': vars(options), 'results': results}, json_file, indent=2)
+    return True
+
+
+if __name__ == '__main__':
+    if not main():
+        sys.exit(1)
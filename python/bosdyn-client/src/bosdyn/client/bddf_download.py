@@ -5,6 +5,7 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Code for downloading robot data in bddf format."""
+import collections
 import logging
 import re
 import ssl
@@ -12,9 +13,16 @@ import sys
 from urllib.parse import urlencode
 from urllib.request import Request, urlopen
 
+from bosdyn.bddf import (PROTOBUF_CONTENT_TYPE, BddfDataset, DataError, DataReader,
+                         StreamDataReader)
+from bosdyn.bddf.block_index import NSEC_PER_SEC
+from bosdyn.bddf.stream_data_reader import CHECKSUM_INLINE
+from bosdyn.client.parallel_download import (DEFAULT_MAX_CONNECTIONS, DEFAULT_MAX_RETRIES,
+                                             DEFAULT_RETRY_DELAY_SEC, PIECE_DONE,
+                                             ParallelDownloader)
 from bosdyn.client.time_sync import (NotEstablishedError, TimeSyncClient, TimeSyncEndpoint,
                                      robot_time_range_from_nanoseconds, timespec_to_robot_timespan)
-from bosdyn.util import TIME_FORMAT_DESC
+from bosdyn.util import TIME_FORMAT_DESC, now_nsec
 
 LOGGER = logging.getLogger()
 
@@ -23,6 +31,23 @@ REQUEST_TIMEOUT = 20  # Seconds.
 
 DEFAULT_OUTPUT = "./download.bddf"
 
+# Default duration of the time span of each piece of a parallel download.
+DEFAULT_PIECE_SEC = 60
+
+# Bytes parsed at a time when streaming.  Kept small so messages are returned soon after they
+#  arrive, rather than after a full REQUEST_CHUNK_SIZE has been received.
+STREAM_READAHEAD_BYTES = 64 * 1024
+
+# A message parsed from a bddf stream.
+#  series_descriptor:  SeriesDescriptor of the series containing the message
+#  data_descriptor:    DataDescriptor of the message
+#  timestamp_nsec:     timestamp of the message (int)
+#  data:               message data (bytes)
+#  message:            deserialized protobuf message, if its type was requested, otherwise None
+StreamedMessage = collections.namedtuple(
+    'StreamedMessage',
+    ['series_descriptor', 'data_descriptor', 'timestamp_nsec', 'data', 'message'])
+
 
 def _print_help_timespan():
     print("""\
@@ -64,9 +89,53 @@ def _request_timespan_from_nanoseconds(start_nsec, end_nsec, time_sync_endpoint)
         robot_time_range_from_nanoseconds(start_nsec, end_nsec, time_sync_endpoint))
 
 
+def _time_sync_endpoint(robot, robot_time):
+    """Return a TimeSyncEndpoint for converting host times to robot time, or None."""
+    if robot_time:
+        return None
+    # Establish time sync with robot to obtain skew.
+    time_sync_client = robot.ensure_client(TimeSyncClient.default_service_name)
+    time_sync_endpoint = TimeSyncEndpoint(time_sync_client)
+    if not time_sync_endpoint.establish_timesync():
+        raise NotEstablishedError("time sync not established")
+    return time_sync_endpoint
+
+
+def _filter_params(channel, message_type, grpc_service):
+    """Return the optional query parameters for limiting the messages."""
+    get_params = {}
+    if channel:
+        get_params['channel'] = channel
+    if message_type:
+        get_params['type'] = message_type
+    if grpc_service:
+        get_params['grpc_service'] = grpc_service
+    return get_params
+
+
+def _bddf_request(  # pylint: disable=too-many-arguments
+        robot, hostname, start_nsec, end_nsec, timespan_spec, robot_time, channel, message_type,
+        grpc_service):
+    """Return the url, query parameters and Request for downloading bddf data from the robot."""
+    time_sync_endpoint = _time_sync_endpoint(robot, robot_time)
+
+    # Now assemble the query to obtain a bddf file.
+
+    # Get the parameters for limiting the timespan of the response.
+    if start_nsec or end_nsec:
+        get_params = _request_timespan_from_nanoseconds(start_nsec, end_nsec, time_sync_endpoint)
+    else:
+        get_params = _request_timespan_from_spec(timespan_spec, time_sync_endpoint)
+    get_params.update(_filter_params(channel, message_type, grpc_service))
+
+    url = _bddf_url(hostname) + '?{}'.format(urlencode(get_params))
+    return url, get_params, Request(url, headers=_http_headers(robot))
+
+
 def download_data(  # pylint: disable=too-many-arguments,too-many-locals
         robot, hostname, start_nsec=None, end_nsec=None, timespan_spec=None, output_filename=None,
-        robot_time=False, channel=None, message_type=None, grpc_service=None, show_progress=False):
+        robot_time=False, channel=None, message_type=None, grpc_service=None, show_progress=False,
+        message_callback=None, protobuf_types=None):
     """
     Download data from robot in bddf format
 
@@ -80,37 +149,17 @@ def download_data(  # pylint: disable=too-many-arguments,too-many-locals
       channel:        if set, limit data to download to a specific channel
       message_type:   if set, limit data by specified message-type
       grpc_service:   if set, limit GRPC log data by name of service
+      message_callback:  if set, the data is parsed while it is downloaded, and this is called
+                          with a StreamedMessage for each message as it arrives
+      protobuf_types:    protobuf classes to deserialize for message_callback (see stream_messages)
 
     Returns:
       output filename, or None on error
     """
-    time_sync_endpoint = None
-    if not robot_time:
-        # Establish time sync with robot to obtain skew.
-        time_sync_client = robot.ensure_client(TimeSyncClient.default_service_name)
-        time_sync_endpoint = TimeSyncEndpoint(time_sync_client)
-        if not time_sync_endpoint.establish_timesync():
-            raise NotEstablishedError("time sync not established")
-
-    # Now assemble the query to obtain a bddf file.
-
-    # Get the parameters for limiting the timespan of the response.
-    if start_nsec or end_nsec:
-        get_params = _request_timespan_from_nanoseconds(start_nsec, end_nsec, time_sync_endpoint)
-    else:
-        get_params = _request_timespan_from_spec(timespan_spec, time_sync_endpoint)
-
-    # Optional parameters for limiting the messages
-    if channel:
-        get_params['channel'] = channel
-    if message_type:
-        get_params['type'] = message_type
-    if grpc_service:
-        get_params['grpc_service'] = grpc_service
+    url, get_params, request = _bddf_request(robot, hostname, start_nsec, end_nsec, timespan_spec,
+                                             robot_time, channel, message_type, grpc_service)
 
     # Request the data.
-    url = _bddf_url(hostname) + '?{}'.format(urlencode(get_params))
-    request = Request(url, headers=_http_headers(robot))
     context = ssl._create_unverified_context()  # pylint: disable=protected-access
     with urlopen(request, context=context, timeout=REQUEST_TIMEOUT) as resp:
         if resp.status != 200:
@@ -119,19 +168,290 @@ def download_data(  # pylint: disable=too-many-arguments,too-many-locals
 
         outfile = output_filename if output_filename else _output_filename(resp)
         with open(outfile, 'wb') as fid:
-            while True:
-                chunk = resp.read(REQUEST_CHUNK_SIZE)
-                if len(chunk) == 0:
-                    break
-                if show_progress:
-                    print('.', end='', flush=True)
-                fid.write(chunk)
+            if message_callback:
+                for message in stream_messages(resp, fid, protobuf_types,
+                                               show_progress=show_progress):
+                    message_callback(message)
+            else:
+                while True:
+                    chunk = resp.read(REQUEST_CHUNK_SIZE)
+                    if len(chunk) == 0:
+                        break
+                    if show_progress:
+                        print('.', end='', flush=True)
+                    fid.write(chunk)
         if show_progress:
             print()
 
     return outfile
 
 
+def stream_data(  # pylint: disable=too-many-arguments,too-many-locals
+        robot, hostname, start_nsec=None, end_nsec=None, timespan_spec=None, output_filename=None,
+        robot_time=False, channel=None, message_type=None, grpc_service=None, protobuf_types=None,
+        checksum_mode=CHECKSUM_INLINE):
+    """Download data from robot in bddf format, generating messages as they arrive.
+
+    Messages are parsed from the response as it is received, so they are available while the
+     download is still in progress, without reading the file again afterwards.
+
+    Args:
+      robot:            API robot object
+      hostname:         hostname/ip-address of robot
+      start_nsec:       start time of log
+      end_nsec:         end time of log
+      timespan_spec:    if start_time, end_time are None, string representing the timespan
+      output_filename:  if set, also write the downloaded bddf file here
+      robot_time:       if True, timespan is in robot_clock, if False, in host clock
+      channel:          if set, limit data to download to a specific channel
+      message_type:     if set, limit data by specified message-type
+      grpc_service:     if set, limit GRPC log data by name of service
+      protobuf_types:   protobuf classes to deserialize (see stream_messages)
+      checksum_mode:    how the checksum of the data is verified (see StreamDataReader)
+
+    Yields: StreamedMessage
+
+    Raises bosdyn.bddf.DataError on an error response or badly formatted data,
+           EOFError if the response ends early.
+    """
+    url, get_params, request = _bddf_request(robot, hostname, start_nsec, end_nsec, timespan_spec,
+                                             robot_time, channel, message_type, grpc_service)
+    context = ssl._create_unverified_context()  # pylint: disable=protected-access
+    with urlopen(request, context=context, timeout=REQUEST_TIMEOUT) as resp:
+        if resp.status != 200:
+            raise DataError("{} {} response: {}".format(url, get_params, resp.status))
+        if not output_filename:
+            yield from stream_messages(resp, None, protobuf_types, checksum_mode=checksum_mode)
+            return
+        with open(output_filename, 'wb') as fid:
+            yield from stream_messages(resp, fid, protobuf_types, checksum_mode=checksum_mode)
+
+
+def download_data_parallel(  # pylint: disable=too-many-arguments,too-many-locals
+        robot, hostname, output_dir, start_nsec=None, end_nsec=None, timespan_spec=None,
+        robot_time=False, channel=None, message_type=None, grpc_service=None,
+        piece_sec=DEFAULT_PIECE_SEC, max_connections=DEFAULT_MAX_CONNECTIONS,
+        max_retries=DEFAULT_MAX_RETRIES, show_progress=False):
+    """Download data from robot in bddf format, as several time spans fetched in parallel.
+
+    The pieces are written to output_dir, along with a manifest, so that an interrupted download
+     can be resumed by calling this again with the same arguments.
+
+    Args:
+      robot:            API robot object
+      hostname:         hostname/ip-address of robot
+      output_dir:       directory in which to write the pieces of the download
+      start_nsec:       start time of log
+      end_nsec:         end time of log (default: now)
+      timespan_spec:    if start_time, end_time are None, string representing the timespan
+      robot_time:       if True, timespan is in robot_clock, if False, in host clock
+      channel:          if set, limit data to download to a specific channel
+      message_type:     if set, limit data by specified message-type
+      grpc_service:     if set, limit GRPC log data by name of service
+      piece_sec:        duration of the time span of each piece, in seconds
+      max_connections:  maximum number of pieces downloaded at the same time
+      max_retries:      number of times a failed piece is retried
+      show_progress:    if True, print a '.' as each piece is downloaded
+
+    Returns:
+      BddfDataset reading all the downloaded pieces as one dataset.
+
+    Raises DownloadError if some pieces could not be downloaded.
+    """
+    time_sync_endpoint = _time_sync_endpoint(robot, robot_time)
+    if start_nsec or end_nsec:
+        time_range = robot_time_range_from_nanoseconds(start_nsec, end_nsec, time_sync_endpoint)
+    else:
+        time_range = timespec_to_robot_timespan(timespan_spec, time_sync_endpoint)
+    # pylint: disable=no-member
+    if not time_range.HasField('start'):
+        raise ValueError("A start time is needed to split the download")
+    if not time_range.HasField('end'):
+        time_range.end.CopyFrom(
+            robot_time_range_from_nanoseconds(None, now_nsec(), time_sync_endpoint).end)
+    return download_bddf_pieces(_bddf_url(hostname), _http_headers(robot),
+                                time_range.start.ToNanoseconds(), time_range.end.ToNanoseconds(),
+                                output_dir, _filter_params(channel, message_type, grpc_service),
+                                piece_sec=piece_sec, max_connections=max_connections,
+                                max_retries=max_retries, show_progress=show_progress)
+
+
+def download_bddf_pieces(  # pylint: disable=too-many-arguments
+        url, headers, start_nsec, end_nsec, output_dir, get_params=None,
+        piece_sec=DEFAULT_PIECE_SEC, max_connections=DEFAULT_MAX_CONNECTIONS,
+        max_retries=DEFAULT_MAX_RETRIES, retry_delay_sec=DEFAULT_RETRY_DELAY_SEC,
+        show_progress=False):
+    """Download bddf data from a url in pieces, fetched in parallel, and resumable.
+
+    Args:
+      url:              url of the bddf REST endpoint
+      headers:          HTTP headers of each request (e.g., for authorization)
+      start_nsec:       start time of the data, in robot time
+      end_nsec:         end time of the data, in robot time
+      output_dir:       directory in which to write the pieces of the download
+      get_params:       additional query parameters (e.g., for limiting the messages)
+      piece_sec:        duration of the time span of each piece, in seconds
+      max_connections:  maximum number of pieces downloaded at the same time
+      max_retries:      number of times a failed piece is retried
+      retry_delay_sec:  delay before the first retry of a piece
+      show_progress:    if True, print a '.' as each piece is downloaded
+
+    Returns:
+      BddfDataset reading all the downloaded pieces as one dataset.
+
+    Raises DownloadError if some pieces could not be downloaded.
+    """
+    get_params = dict(get_params or {})
+
+    def _make_request(piece_start_nsec, piece_end_nsec):
+        # The API takes whole seconds, and pieces are split on whole seconds.
+        params = dict(get_params, from_sec=str(piece_start_nsec // NSEC_PER_SEC),
+                      to_sec=str(-(-piece_end_nsec // NSEC_PER_SEC)))
+        return Request(url + '?{}'.format(urlencode(params)), headers=headers)
+
+    downloader = ParallelDownloader(_make_request, output_dir, suffix='.bddf',
+                                    max_connections=max_connections, max_retries=max_retries,
+                                    retry_delay_sec=retry_delay_sec, validate=_validate_bddf)
+    if show_progress:
+        downloader.on_piece_done = lambda _piece: print('.', end='', flush=True)
+    pieces = downloader.download(start_nsec, end_nsec, piece_sec * NSEC_PER_SEC, NSEC_PER_SEC, key={
+        'url': url,
+        'params': get_params
+    })
+    if show_progress:
+        print()
+    # The requested whole seconds of consecutive pieces overlap, so each piece only contributes
+    # the messages of its own time span.  The first and last keep those of the whole seconds.
+    done = [piece for piece in pieces if piece.status == PIECE_DONE]
+    time_ranges = [(None if piece is pieces[0] else piece.start_nsec,
+                    None if piece is pieces[-1] else piece.end_nsec) for piece in done]
+    return BddfDataset([piece.filename for piece in done], time_ranges=time_ranges)
+
+
+def _validate_bddf(filename):
+    """Raise an exception if the file is not a complete bddf file."""
+    with DataReader(filename=filename):
+        pass
+
+
+class _TeeStream:
+    """Binary stream which reads from another stream, and copies the data read to a file."""
+
+    def __init__(self, stream, outfile=None, show_progress=False):
+        self._stream = stream
+        self._outfile = outfile
+        self._show_progress = show_progress
+        self._nbytes = 0
+
+    def readinto(self, buffer):
+        """Read into the writable buffer, returning the number of bytes read."""
+        readinto = getattr(self._stream, 'readinto', None)
+        if readinto is not None:
+            nbytes = readinto(buffer) or 0
+        else:
+            nbytes = self._read_into(self._stream.read, buffer)
+        if nbytes:
+            self._copy(buffer[:nbytes])
+        return nbytes
+
+    def readinto1(self, buffer):
+        """Read at most one chunk of the bytes available into the writable buffer.
+
+        Unlike readinto(), this does not wait for the whole buffer to be filled, so messages can
+         be parsed while the rest of the stream is still arriving.
+        """
+        readinto1 = getattr(self._stream, 'readinto1', None)
+        if readinto1 is not None:
+            nbytes = readinto1(buffer) or 0
+        else:
+            nbytes = self._read_into(self._read1_function(), buffer)
+        if nbytes:
+            self._copy(buffer[:nbytes])
+        return nbytes
+
+    def read1(self, size=-1):
+        """Read and return at most one chunk of the bytes available."""
+        data = self._read1_function()(size)
+        if data:
+            self._copy(data)
+        return data
+
+    def _read1_function(self):
+        # Streams without read1(), like raw and HTTP response streams, return partial reads anyway.
+        return getattr(self._stream, 'read1', None) or self._stream.read
+
+    @staticmethod
+    def _read_into(read, buffer):
+        data = read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def drain(self):
+        """Read and copy the rest of the stream."""
+        while True:
+            chunk = self._stream.read(REQUEST_CHUNK_SIZE)
+            if not chunk:
+                return
+            self._copy(chunk)
+
+    def _copy(self, data):
+        if self._outfile:
+            self._outfile.write(data)
+        nbytes = self._nbytes + len(data)
+        if self._show_progress:
+            num_dots = nbytes // REQUEST_CHUNK_SIZE - self._nbytes // REQUEST_CHUNK_SIZE
+            if num_dots:
+                print('.' * num_dots, end='', flush=True)
+        self._nbytes = nbytes
+
+    def close(self):
+        """The underlying stream is owned by the caller, so this does nothing."""
+
+
+def stream_messages(  # pylint: disable=too-many-arguments
+        stream, outfile=None, protobuf_types=None, readahead_bytes=STREAM_READAHEAD_BYTES,
+        checksum_mode=CHECKSUM_INLINE, show_progress=False):
+    """Parse bddf data from a binary stream (e.g., an HTTP response), generating each message.
+
+    Args:
+      stream:           binary file-like object with read() or readinto().
+      outfile:          if set, binary file to which all data read from the stream is copied.
+      protobuf_types:   protobuf classes to deserialize.  Messages in series with type_name
+                         matching the full name of one of these are returned with the
+                         deserialized message.
+      readahead_bytes:  number of bytes to read from the stream at a time.
+      checksum_mode:    how the checksum of the data is verified (see StreamDataReader).
+      show_progress:    if True, print a '.' for every REQUEST_CHUNK_SIZE bytes received.
+
+    Yields: StreamedMessage
+
+    Raises bosdyn.bddf.DataError if the data is badly formatted,
+           EOFError if the stream ends before the end of the bddf data.
+    """
+    type_name_to_class = {
+        protobuf_type.DESCRIPTOR.full_name: protobuf_type for protobuf_type in protobuf_types or ()
+    }
+    tee = _TeeStream(stream, outfile, show_progress)
+    reader = StreamDataReader(tee, readahead_bytes=readahead_bytes, checksum_mode=checksum_mode)
+    while True:
+        try:
+            desc, series_descriptor, data = reader.read_data_block()
+        except EOFError:
+            if reader.checksum is None:
+                raise  # The stream ended before the end of the bddf data.
+            break
+        message = None
+        message_type = series_descriptor.message_type
+        if type_name_to_class and message_type.content_type == PROTOBUF_CONTENT_TYPE:
+            protobuf_type = type_name_to_class.get(message_type.type_name)
+            if protobuf_type is not None:
+                message = protobuf_type.FromString(data)
+        yield StreamedMessage(series_descriptor, desc, desc.timestamp.ToNanoseconds(), data,
+                              message)
+    # Copy the rest of the file end, which the reader does not need.
+    tee.drain()
+
+
 def _output_filename(response):
     """Get output filename either from http response, or default value."""
     content = response.headers['Content-Disposition']
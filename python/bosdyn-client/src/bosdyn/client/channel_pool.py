@@ -0,0 +1,175 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Pool of grpc channels to one authority, spreading the rpcs over several connections."""
+
+import itertools
+import threading
+
+import grpc
+
+# Channel option giving each channel its own connection, rather than sharing one between channels
+#  with the same target and options.
+LOCAL_SUBCHANNEL_POOL_OPTION = ('grpc.use_local_subchannel_pool', 1)
+
+# Selection policies of a ChannelPool.
+ROUND_ROBIN = 'round_robin'
+LEAST_LOADED = 'least_loaded'
+POLICIES = (ROUND_ROBIN, LEAST_LOADED)
+
+
+class ChannelPool(grpc.Channel):
+    """grpc.Channel which sends each rpc on one of several channels.
+
+    All of the rpcs of a single channel are multiplexed over one HTTP/2 connection, which limits
+    the number of concurrent streams and the throughput of a multi-threaded process.  The channels
+    of a pool should each have their own connection, by creating them with
+    LOCAL_SUBCHANNEL_POOL_OPTION.
+
+    The channel of each rpc is selected when it starts, either in turn (ROUND_ROBIN) or as the
+    channel with the fewest rpcs in progress (LEAST_LOADED).
+    """
+
+    def __init__(self, channels, policy=ROUND_ROBIN):
+        """
+        Args:
+            channels: list of the grpc.Channels of the pool.
+            policy: ROUND_ROBIN or LEAST_LOADED.
+        """
+        if not channels:
+            raise ValueError('A channel pool needs at least one channel.')
+        if policy not in POLICIES:
+            raise ValueError('Unknown channel pool policy "{}"'.format(policy))
+        self.channels = list(channels)
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._next_index = itertools.cycle(range(len(self.channels)))
+        self._in_flight = [0] * len(self.channels)
+
+    def __len__(self):
+        return len(self.channels)
+
+    def in_flight(self):
+        """Return the number of rpcs in progress on each channel."""
+        with self._lock:
+            return list(self._in_flight)
+
+    def _acquire(self):
+        """Select the channel of an rpc, and count the rpc as in progress on it."""
+        with self._lock:
+            if self.policy == LEAST_LOADED:
+                index = min(range(len(self._in_flight)), key=self._in_flight.__getitem__)
+            else:
+                index = next(self._next_index)
+            self._in_flight[index] += 1
+        return index
+
+    def _release(self, index):
+        with self._lock:
+            self._in_flight[index] -= 1
+
+    def subscribe(self, callback, try_to_connect=False):
+        for channel in self.channels:
+            channel.subscribe(callback, try_to_connect=try_to_connect)
+
+    def unsubscribe(self, callback):
+        for channel in self.channels:
+            channel.unsubscribe(callback)
+
+    def unary_unary(self, method, *args, **kwargs):
+        return _PooledUnaryUnaryMultiCallable(
+            self, method,
+            [channel.unary_unary(method, *args, **kwargs) for channel in self.channels])
+
+    def unary_stream(self, method, *args, **kwargs):
+        return _PooledUnaryStreamMultiCallable(
+            self, method,
+            [channel.unary_stream(method, *args, **kwargs) for channel in self.channels])
+
+    def stream_unary(self, method, *args, **kwargs):
+        return _PooledStreamUnaryMultiCallable(
+            self, method,
+            [channel.stream_unary(method, *args, **kwargs) for channel in self.channels])
+
+    def stream_stream(self, method, *args, **kwargs):
+        return _PooledStreamStreamMultiCallable(
+            self, method,
+            [channel.stream_stream(method, *args, **kwargs) for channel in self.channels])
+
+    def close(self):
+        for channel in self.channels:
+            channel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class _PooledMultiCallable(object):
+    """Common part of the multicallables of a ChannelPool, one per channel of the pool."""
+
+    def __init__(self, pool, method, multicallables):
+        self._pool = pool
+        # Full name of the rpc method, as in the multicallables of grpc.
+        self._method = method if isinstance(method, bytes) else method.encode()
+        self._multicallables = multicallables
+
+    def _blocking(self, name, *args, **kwargs):
+        index = self._pool._acquire()
+        try:
+            return getattr(self._multicallables[index], name)(*args, **kwargs)
+        finally:
+            self._pool._release(index)
+
+    def _nonblocking(self, name, *args, **kwargs):
+        """Start an rpc returning a grpc.Future, which is released from its channel when done."""
+        index = self._pool._acquire()
+        try:
+            call = getattr(self._multicallables[index], name)(*args, **kwargs)
+        except BaseException:
+            self._pool._release(index)
+            raise
+        call.add_done_callback(lambda _call: self._pool._release(index))
+        return call
+
+
+class _PooledUnaryUnaryMultiCallable(_PooledMultiCallable, grpc.UnaryUnaryMultiCallable):
+
+    def __call__(self, *args, **kwargs):
+        return self._blocking('__call__', *args, **kwargs)
+
+    def with_call(self, *args, **kwargs):
+        return self._blocking('with_call', *args, **kwargs)
+
+    def future(self, *args, **kwargs):
+        return self._nonblocking('future', *args, **kwargs)
+
+
+class _PooledUnaryStreamMultiCallable(_PooledMultiCallable, grpc.UnaryStreamMultiCallable):
+
+    def __call__(self, *args, **kwargs):
+        return self._nonblocking('__call__', *args, **kwargs)
+
+
+class _PooledStreamUnaryMultiCallable(_PooledMultiCallable, grpc.StreamUnaryMultiCallable):
+
+    def __call__(self, *args, **kwargs):
+        return self._blocking('__call__', *args, **kwargs)
+
+    def with_call(self, *args, **kwargs):
+        return self._blocking('with_call', *args, **kwargs)
+
+    def future(self, *args, **kwargs):
+        return self._nonblocking('future', *args, **kwargs)
+
+
+class _PooledStreamStreamMultiCallable(_PooledMultiCallable, grpc.StreamStreamMultiCallable):
+
+    def __call__(self, *args, **kwargs):
+        return self._nonblocking('__call__', *args, **kwargs)
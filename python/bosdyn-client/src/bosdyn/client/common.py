@@ -5,14 +5,18 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Contains elements common to all service clients."""
-import concurrent
+import asyncio
+import concurrent.futures
+import contextlib
 import copy
 import functools
 import logging
 import socket
+import threading
 import types
 
 import grpc
+import grpc.aio
 from deprecated.sphinx import deprecated
 
 from bosdyn.api.header_pb2 import CommonError
@@ -21,7 +25,9 @@ from bosdyn.deprecated import moved_to
 from .channel import TransportError, translate_exception
 from .data_chunk import chunk_message, parse_from_chunks
 from .exceptions import (CustomParamError, Error, InternalServerError, InvalidRequestError,
-                         LeaseUseError, LicenseError, ResponseError, UnsetStatusError)
+                         LeaseUseError, LicenseError, ResponseError, TimedOutError,
+                         UnsetStatusError)
+from .executor import default_executor
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -310,17 +316,204 @@ def process_kwargs(func):
     return processor
 
 
+# _RequestFieldSnapshots of the requests which are being processed in place, by id(request).
+_BORROWED_REQUESTS = {}
+# Guards _BORROWED_REQUESTS, and the copies of requests which may be processed in place.
+_BORROW_LOCK = threading.Lock()
+
+# (message descriptor, mutated field names) -> [(name, is_repeated, is_message)] for the fields
+#  of the message which are listed.
+_MUTATED_FIELDS = {}
+
+
+class _RequestFieldSnapshot(object):
+    """Saves the fields of a request which request processors write, so they can be restored.
+
+    This lets the processors modify the caller's request in place, instead of a deep copy of it.
+    Only the (small) fields the processors declare in their 'mutated_fields' attribute are
+     copied, not the rest of the request, which may be a multi-megabyte payload.
+    """
+
+    def __init__(self, request, fields):
+        self._request = request
+        self._saved = []
+        for name, is_repeated, is_message in fields:
+            value = getattr(request, name)
+            if is_repeated:
+                saved = [_copy_message(item) for item in value] if is_message else list(value)
+            elif is_message:
+                saved = _copy_message(value) if request.HasField(name) else None
+            else:
+                saved = value
+            self._saved.append((name, is_repeated, is_message, saved))
+
+    @classmethod
+    def borrow(cls, request, processors):
+        """Return a snapshot of the fields the processors write, or None if a copy is needed.
+
+        A copy is needed if any processor does not declare the fields it writes, or if the
+         request is already being processed by another call (e.g., in another thread).
+        """
+        field_names = ()
+        for proc in processors:
+            mutated_fields = getattr(proc, 'mutated_fields', None)
+            if mutated_fields is None:
+                return None
+            field_names += tuple(mutated_fields)
+        descriptor = getattr(request, 'DESCRIPTOR', None)
+        if descriptor is None:
+            return None
+        fields = _MUTATED_FIELDS.get((descriptor, field_names))
+        if fields is None:
+            fields = _MUTATED_FIELDS[(descriptor, field_names)] = _message_fields(
+                descriptor, field_names)
+        with _BORROW_LOCK:
+            if id(request) in _BORROWED_REQUESTS:
+                return None
+            snapshot = _BORROWED_REQUESTS[id(request)] = cls(request, fields)
+        return snapshot
+
+    @staticmethod
+    def clean_copy(request):
+        """Return a deep copy of request, without the changes of a call processing it in place.
+
+        The fields which that call's processors write are reset on the copy to their saved
+         values, so the processors of the caller see the request as it was passed to them.
+        """
+        with _BORROW_LOCK:
+            copied = copy.deepcopy(request)
+            snapshot = _BORROWED_REQUESTS.get(id(request))
+        if snapshot is not None:
+            snapshot._restore_fields(copied)
+        return copied
+
+    def restore(self):
+        """Restore the saved fields of the request, and allow it to be borrowed again."""
+        try:
+            self._restore_fields(self._request)
+        finally:
+            with _BORROW_LOCK:
+                _BORROWED_REQUESTS.pop(id(self._request), None)
+
+    def _restore_fields(self, request):
+        for name, is_repeated, is_message, saved in self._saved:
+            if is_repeated:
+                del getattr(request, name)[:]
+                getattr(request, name).extend(saved)
+            elif not is_message:
+                setattr(request, name, saved)
+            elif saved is None:
+                request.ClearField(name)
+            else:
+                getattr(request, name).CopyFrom(saved)
+
+
+def _message_fields(descriptor, field_names):
+    """Return [(name, is_repeated, is_message)] for the named fields which the message has."""
+    fields = []
+    for name in dict.fromkeys(field_names):
+        field = descriptor.fields_by_name.get(name)
+        if field is not None:
+            fields.append((name, _is_repeated_field(field), field.message_type is not None))
+    return fields
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+async def _count_requests_aio(rpc, request_iterator):
+    """Async generator counting the sizes of the requests of request_iterator in rpc."""
+    async for request in request_iterator:
+        rpc.add_request(request)
+        yield request
+
+
+def _count_responses(rpc, response_iterator):
+    """Generator counting the sizes of the responses of response_iterator in rpc."""
+    for response in response_iterator:
+        rpc.add_response(response)
+        yield response
+
+
+def _shared_rpc_timed_out(timeout, error=None):
+    return TimedOutError(error,
+                         'The shared rpc did not complete within {} seconds.'.format(timeout))
+
+
+def _copied_response_future(future, timeout=None):
+    """Return a Future completed with a copy of the result of future, or with its exception.
+
+    If future is not done after timeout seconds, the copy fails with TimedOutError instead.
+    """
+    copied = concurrent.futures.Future()
+    lock = threading.Lock()
+    timer = None
+
+    def complete(error, response=None):
+        with lock:
+            if copied.done():
+                return
+            if error is not None:
+                copied.set_exception(error)
+            else:
+                copied.set_result(response)
+        if timer is not None:
+            timer.cancel()
+
+    def on_done(fut):
+        error = fut.exception()
+        complete(error, None if error is not None else _copy_message(fut.result()))
+
+    if timeout is not None:
+        timer = threading.Timer(timeout, lambda: complete(_shared_rpc_timed_out(timeout)))
+        timer.daemon = True
+        timer.start()
+    future.add_done_callback(on_done)
+    return copied
+
+
+def _method_short_name(rpc_method):
+    method_name = getattr(rpc_method, '_method', None)
+    if not method_name:
+        return None
+    return method_name.decode().rsplit(BaseClient._SPLIT_METHOD, 1)[-1]
+
+
+def _copy_message(message):
+    copied = type(message)()
+    copied.CopyFrom(message)
+    return copied
+
+
+def _is_repeated_field(field):
+    # FieldDescriptor.label is not available in newer versions of protobuf.
+    if hasattr(field, 'is_repeated'):
+        return field.is_repeated
+    return field.label == field.LABEL_REPEATED
+
+
 class BaseClient(object):
     """Helper base class for all clients to Boston Dynamics services."""
 
     _SPLIT_SERVICE = '.'
     _SPLIT_METHOD = '/'
 
+    # Names of the rpcs whose responses may be kept in the response_cache, and the time in seconds
+    #  for which they are kept.
+    cached_response_ttls = {}
+
     def __init__(self, stub_creation_func, name=None):
         self._service_type_short = getattr(self.__class__, 'service_type',
                                            'BaseClient').split(BaseClient._SPLIT_SERVICE)[-1]
 
         self._channel = None
+        self._aio_channel = None
+        self._aio_channel_loop = None
+        self._aio_stub_instance = None
         self._logger = None
         self._name = name
         self._stub = None
@@ -332,6 +525,17 @@ class BaseClient(object):
         self.lease_wallet = None
         self.client_name = None
         self.executor = None
+        # Callable returning the grpc.aio channel, used if aio_channel is unset.  It is called again
+        # when the client is used from another event loop.  The client does not close the channels
+        # it returns; those of Robot.ensure_client() are closed by Robot.shutdown_aio().
+        self.aio_channel_factory = None
+        # Size in bytes above which responses reassembled from data chunks are buffered in a
+        # temporary file rather than in memory.  None to always reassemble them in memory.
+        self.chunk_spill_threshold = None
+        # RpcMetrics recording the latency, payload sizes and errors of the calls, or None.
+        self.rpc_metrics = None
+        # ResponseCache of the rpcs listed in cached_response_ttls, or None not to cache them.
+        self.response_cache = None
 
     @staticmethod
     @deprecated(reason='Forces serialization even if the logging is not happening.  Do not use.',
@@ -356,6 +560,34 @@ class BaseClient(object):
         self._channel = channel
         self._stub = self._stub_creation_func(channel)
 
+    @property
+    def aio_channel(self):
+        """The grpc.aio channel used by the "_aio" methods.
+
+        If it was not set, it is created with aio_channel_factory in the running event loop, and
+        created again if it is used from another event loop.
+        """
+        if self.aio_channel_factory is not None:
+            loop = _running_loop()
+            if self._aio_channel is None or (self._aio_channel_loop is not None and
+                                             self._aio_channel_loop is not loop):
+                self.aio_channel = self.aio_channel_factory()
+                self._aio_channel_loop = loop
+        if self._aio_channel is None:
+            raise Error('Client aio channel is unset!')
+        return self._aio_channel
+
+    @aio_channel.setter
+    def aio_channel(self, channel):
+        self._aio_channel = channel
+        self._aio_channel_loop = None
+        self._aio_stub_instance = None if channel is None else self._stub_creation_func(channel)
+
+    @property
+    def _aio_stub(self):
+        self.aio_channel  # pylint: disable=pointless-statement
+        return self._aio_stub_instance
+
     def update_from(self, other):
         """Adopt key objects like processors, logger, and wallet from other."""
         self.request_processors = other.request_processors + self.request_processors
@@ -364,6 +596,7 @@ class BaseClient(object):
         self.lease_wallet = other.lease_wallet
         self.client_name = other.client_name
         self.executor = other.executor
+        self.rpc_metrics = other.rpc_metrics
 
     def update_request_iterator(self, request_iterator, logger, rpc_method, is_blocking,
                                 copy_request=True):
@@ -378,7 +611,8 @@ class BaseClient(object):
     def update_response_iterator(self, response_iterator, logger, rpc_method, is_blocking):
         try:
             for response in response_iterator:
-                response = self._apply_response_processors(copy.deepcopy(response))
+                # Each streamed response is a new message, so the processors can modify it.
+                response = self._apply_response_processors(response)
                 if is_blocking:
                     logger.debug('blocking response: %s\n%s', rpc_method._method, response)
                 else:
@@ -401,24 +635,74 @@ class BaseClient(object):
         value_from_response and error_from_response should not raise their own exceptions!
         Additionally, value_from_response and error_from_response that are not common handlers
         must accept streaming responses if it is a grpc streaming response.
+
+        If response_cache is set, the responses of the rpcs in cached_response_ttls are taken from
+        it, or shared with identical calls in progress.
         """
+        if self.response_cache is not None:
+            cached_rpc = self._cached_rpc(rpc_method, request)
+            if cached_rpc is not None:
+                send = functools.partial(self._call_measured, rpc_method, request, None, None,
+                                         assemble_type, copy_request, **kwargs)
+                return self._call_cached(cached_rpc, send, value_from_response, error_from_response,
+                                         kwargs.get('timeout', DEFAULT_RPC_TIMEOUT))
+        return self._call_measured(rpc_method, request, value_from_response, error_from_response,
+                                   assemble_type, copy_request, **kwargs)
+
+    def _call_measured(self, rpc_method, request, value_from_response, error_from_response,
+                       assemble_type, copy_request, **kwargs):
+        is_streaming_request = isinstance(rpc_method, grpc.StreamUnaryMultiCallable) or isinstance(
+            rpc_method, grpc.StreamStreamMultiCallable)
+        rpc = self._rpc_started(rpc_method)
+        if rpc is None:
+            return self._call(rpc, rpc_method, request, value_from_response, error_from_response,
+                              assemble_type, copy_request, is_streaming_request, **kwargs)
+        try:
+            result = self._call(rpc, rpc_method, request, value_from_response, error_from_response,
+                                assemble_type, copy_request, is_streaming_request, **kwargs)
+        except Exception as exc:
+            rpc.finished(exc)
+            raise
+        rpc.finished()
+        return result
+
+    def _call(self, rpc, rpc_method, request, value_from_response, error_from_response,
+              assemble_type, copy_request, is_streaming_request, **kwargs):
         logger = self._get_logger(rpc_method)
-        if isinstance(rpc_method, grpc.StreamUnaryMultiCallable) or isinstance(
-                rpc_method, grpc.StreamStreamMultiCallable):
+        if is_streaming_request:
             # The incoming request is a streaming request.
             request = self.update_request_iterator(request, logger, rpc_method, is_blocking=True,
                                                    copy_request=copy_request)
+            if rpc is not None:
+                request = rpc.requests(request)
+            processed_request = contextlib.nullcontext(request)
         else:
-            request = self._apply_request_processors(request, copy_request=copy_request)
-            logger.debug('blocking request: %s\n%s', rpc_method._method, request)
+            processed_request = self._processed_request(request, copy_request)
 
-        try:
-            timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
-            response = rpc_method(request, timeout=timeout, **kwargs)
-        except TransportError as e:
-            # Use the "raise from None" pattern to reset the exception's context, which produces
-            # confusing stack traces.
-            raise translate_exception(e) from None
+        with processed_request as request:
+            if not is_streaming_request:
+                logger.debug('blocking request: %s\n%s', rpc_method._method, request)
+                if rpc is not None:
+                    rpc.add_request(request)
+            try:
+                timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
+                if isinstance(rpc_method, grpc.UnaryUnaryMultiCallable):
+                    # The request is serialized before future() returns, so the caller's request
+                    # is restored while the rpc is still in progress.
+                    response = rpc_method.future(request, timeout=timeout, **kwargs)
+                else:
+                    # Calls with streamed responses return once the request is serialized.
+                    response = rpc_method(request, timeout=timeout, **kwargs)
+            except TransportError as e:
+                # Use the "raise from None" pattern to reset the exception's context, which
+                # produces confusing stack traces.
+                raise translate_exception(e) from None
+
+        if isinstance(rpc_method, grpc.UnaryUnaryMultiCallable):
+            try:
+                response = response.result()
+            except TransportError as e:
+                raise translate_exception(e) from None
 
         if isinstance(rpc_method, grpc.UnaryStreamMultiCallable) or isinstance(
                 rpc_method, grpc.StreamStreamMultiCallable):
@@ -431,19 +715,25 @@ class BaseClient(object):
                 # We cannot explicitly check for them until the RPC deadline has been exceeded.
                 # To make due, we attempt to parse the response and catch transport errors raised while iterating through the responses.
                 try:
-                    parse_from_chunks(response, msg)
+                    parse_from_chunks(response, msg, self.chunk_spill_threshold)
                 except TransportError as e:
                     raise translate_exception(e) from None
 
+                if rpc is not None:
+                    rpc.add_response(msg)
                 msg = self._apply_response_processors(msg)
                 logger.debug('response: %s\n%s', rpc_method._method, msg)
                 return self.handle_response(msg, error_from_response, value_from_response)
             else:
-                responses = self.update_response_iterator(response, logger, rpc_method,
-                                                          is_blocking=True)
-                return self.handle_response_streaming(list(responses), error_from_response,
+                responses = list(
+                    self.update_response_iterator(response, logger, rpc_method, is_blocking=True))
+                if rpc is not None:
+                    rpc.add_response(responses)
+                return self.handle_response_streaming(responses, error_from_response,
                                                       value_from_response)
         else:
+            if rpc is not None:
+                rpc.add_response(response)
             response = self._apply_response_processors(response)
             logger.debug('response: %s\n%s', rpc_method._method, response)
             return self.handle_response(response, error_from_response, value_from_response)
@@ -479,17 +769,43 @@ class BaseClient(object):
 
         call_async does not accept streaming rpcs, see 'call_async_streaming'.
         """
-        request = self._apply_request_processors(request, copy_request=copy_request)
+        cached_rpc = None
+        if self.response_cache is not None:
+            cached_rpc = self._cached_rpc(rpc_method, request)
+            if cached_rpc is not None:
+                cache_key, ttl = cached_rpc
+                cache_future, is_owner = self.response_cache.begin(cache_key)
+                if not is_owner:
+                    # The errors of the shared rpc are already translated, as for streaming calls.
+                    waiting_future = _copied_response_future(
+                        cache_future, kwargs.get('timeout', DEFAULT_RPC_TIMEOUT))
+                    return FutureWrapper(waiting_future, value_from_response, error_from_response,
+                                         is_streaming=True)
+
         logger = self._get_logger(rpc_method)
-        logger.debug('async request: %s\n%s', rpc_method._method, request)
         timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
-        response_future = rpc_method.future(request, timeout=timeout, **kwargs)
+        rpc = self._rpc_started(rpc_method)
+        try:
+            with self._processed_request(request, copy_request) as request:
+                logger.debug('async request: %s\n%s', rpc_method._method, request)
+                if rpc is not None:
+                    rpc.add_request(request)
+                # The request is serialized before future() returns.
+                response_future = rpc_method.future(request, timeout=timeout, **kwargs)
+        except BaseException as exc:
+            if rpc is not None:
+                rpc.finished(exc)
+            if cached_rpc is not None:
+                self.response_cache.abort(cache_key, cache_future, exc)
+            raise
 
         def on_finish(fut):
             try:
                 result = fut.result()
             except Exception as exc:  # pylint: disable=broad-except
                 logger.debug('async exception: %s\n%s\n', rpc_method._method, exc)
+                if rpc is not None:
+                    rpc.finished(exc)
             else:
                 try:
                     self._apply_response_processors(result)
@@ -497,8 +813,21 @@ class BaseClient(object):
                     logger.exception("Error applying response processors.")
                 else:
                     logger.debug('async response: %s\n%s', rpc_method._method, result)
+                if rpc is not None:
+                    rpc.add_response(result)
+                    rpc.finished(None if error_from_response is
+                                 None else error_from_response(result))
+
+        def on_finish_cached(fut):
+            error = fut.exception()
+            if error is not None:
+                self.response_cache.abort(cache_key, cache_future, translate_exception(error))
+            else:
+                self._finish_cached(cache_key, ttl, cache_future, fut.result(), error_from_response)
 
         response_future.add_done_callback(on_finish)
+        if cached_rpc is not None:
+            response_future.add_done_callback(on_finish_cached)
         return FutureWrapper(response_future, value_from_response, error_from_response)
 
     @process_kwargs
@@ -510,21 +839,320 @@ class BaseClient(object):
         value_from_response and error_from_response should not raise their own exceptions.
 
         A version of 'call_async' for streaming rpcs. True async streaming calls are not supported by
-        python grpc. Instead, this call creates a thread that runs the synchronous 'call' function.
+        python grpc. Instead, this call runs the synchronous 'call' function in self.executor, by
+        default the bounded executor shared by the process.  See 'call_streaming_future' to receive
+        the responses of a streaming rpc as they arrive.
         """
         request = self._apply_request_processors(request, copy_request=copy_request)
         if self.executor is None:
-            self.executor = concurrent.futures.ThreadPoolExecutor()
+            self.executor = default_executor()
 
         future = self.executor.submit(self.call, rpc_method, request, assemble_type=assemble_type,
                                       copy_request=copy_request, **kwargs)
         return FutureWrapper(future, value_from_response, error_from_response, is_streaming=True)
 
+    @process_kwargs
+    def call_streaming_future(self, rpc_method, request, value_from_response=None,
+                              error_from_response=None, copy_request=True, **kwargs):
+        """Returns a StreamingFuture for rpc_method(request, kwargs), an rpc with streamed responses.
+
+        The responses can be iterated as they are received, rather than after the whole stream
+        has been received and kept in memory.  No thread is used while the stream is in progress.
+        """
+        logger = self._get_logger(rpc_method)
+        rpc = self._rpc_started(rpc_method)
+        try:
+            if isinstance(rpc_method, grpc.StreamStreamMultiCallable):
+                request = self.update_request_iterator(request, logger, rpc_method,
+                                                       is_blocking=False, copy_request=copy_request)
+                if rpc is not None:
+                    request = rpc.requests(request)
+            else:
+                request = self._apply_request_processors(request, copy_request=copy_request)
+                logger.debug('async request: %s\n%s', rpc_method._method, request)
+                if rpc is not None:
+                    rpc.add_request(request)
+            timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
+            try:
+                response_iterator = rpc_method(request, timeout=timeout, **kwargs)
+            except TransportError as e:
+                raise translate_exception(e) from None
+        except BaseException as exc:
+            if rpc is not None:
+                rpc.finished(exc)
+            raise
+
+        responses = response_iterator
+        if rpc is not None:
+            responses = _count_responses(rpc, responses)
+
+            def on_finish(call):
+                rpc.finished(None if call.code() == grpc.StatusCode.OK else call)
+
+            # The call is done when the stream ends, fails or is cancelled, even if its responses
+            # are never iterated.
+            response_iterator.add_done_callback(on_finish)
+        return StreamingFuture(
+            response_iterator,
+            self.update_response_iterator(responses, logger, rpc_method, is_blocking=False),
+            value_from_response, error_from_response)
+
+    @process_kwargs
+    async def call_aio(self, rpc_method, request, value_from_response=None,
+                       error_from_response=None, assemble_type=None, copy_request=True, **kwargs):
+        """Returns result of awaiting rpc_method(request, kwargs) after running processors.
+
+        The asyncio version of 'call', for methods of the grpc.aio stub (self._aio_stub).  Streaming
+        requests may be given as iterators or async iterators, and the responses of streaming rpcs
+        are handled as in 'call'.
+        """
+        if self.response_cache is not None:
+            cached_rpc = self._cached_rpc(rpc_method, request)
+            if cached_rpc is not None:
+                cache_key, ttl = cached_rpc
+                cache_future, is_owner = self.response_cache.begin(cache_key)
+                if not is_owner:
+                    timeout = kwargs.get('timeout', DEFAULT_RPC_TIMEOUT)
+                    try:
+                        # The shield keeps the timeout from cancelling the shared future.
+                        response = await asyncio.wait_for(
+                            asyncio.shield(asyncio.wrap_future(cache_future)), timeout)
+                    except asyncio.TimeoutError as e:
+                        raise _shared_rpc_timed_out(timeout, e) from None
+                    response = _copy_message(response)
+                    return self.handle_response(response, error_from_response, value_from_response)
+                try:
+                    response = await self._call_aio_measured(rpc_method, request, None, None,
+                                                             assemble_type, copy_request, **kwargs)
+                except BaseException as exc:
+                    self.response_cache.abort(cache_key, cache_future, exc)
+                    raise
+                self._finish_cached(cache_key, ttl, cache_future, response, error_from_response)
+                return self.handle_response(response, error_from_response, value_from_response)
+        return await self._call_aio_measured(rpc_method, request, value_from_response,
+                                             error_from_response, assemble_type, copy_request,
+                                             **kwargs)
+
+    async def _call_aio_measured(self, rpc_method, request, value_from_response,
+                                 error_from_response, assemble_type, copy_request, **kwargs):
+        is_streaming_request = isinstance(
+            rpc_method, (grpc.aio.StreamUnaryMultiCallable, grpc.aio.StreamStreamMultiCallable))
+        rpc = self._rpc_started(rpc_method)
+        if rpc is None:
+            return await self._call_aio(rpc, rpc_method, request, value_from_response,
+                                        error_from_response, assemble_type, copy_request,
+                                        is_streaming_request, **kwargs)
+        try:
+            result = await self._call_aio(rpc, rpc_method, request, value_from_response,
+                                          error_from_response, assemble_type, copy_request,
+                                          is_streaming_request, **kwargs)
+        except Exception as exc:
+            rpc.finished(exc)
+            raise
+        rpc.finished()
+        return result
+
+    async def _call_aio(self, rpc, rpc_method, request, value_from_response, error_from_response,
+                        assemble_type, copy_request, is_streaming_request, **kwargs):
+        logger = self._get_logger(rpc_method)
+        is_streaming_response = isinstance(
+            rpc_method, (grpc.aio.UnaryStreamMultiCallable, grpc.aio.StreamStreamMultiCallable))
+        if is_streaming_request:
+            request = self._update_request_iterator_aio(request, logger, rpc_method, copy_request)
+            if rpc is not None:
+                request = _count_requests_aio(rpc, request)
+        else:
+            # grpc.aio serializes the request after the call is started, while other coroutines
+            # run, so the processors are applied to a copy rather than to the caller's request.
+            request = self._apply_request_processors(request, copy_request=copy_request)
+            logger.debug('aio request: %s\n%s', rpc_method._method, request)
+            if rpc is not None:
+                rpc.add_request(request)
+
+        try:
+            timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
+            rpc_call = rpc_method(request, timeout=timeout, **kwargs)
+            if is_streaming_response:
+                response = [streamed_response async for streamed_response in rpc_call]
+            else:
+                response = await rpc_call
+        except TransportError as e:
+            raise translate_exception(e) from None
+
+        if is_streaming_response:
+            if assemble_type is not None:
+                # Assemble the data chunks into a message before passing to non-streaming handlers.
+                msg = assemble_type()
+                parse_from_chunks(response, msg, self.chunk_spill_threshold)
+                if rpc is not None:
+                    rpc.add_response(msg)
+                msg = self._apply_response_processors(msg)
+                logger.debug('aio response: %s\n%s', rpc_method._method, msg)
+                return self.handle_response(msg, error_from_response, value_from_response)
+            if rpc is not None:
+                rpc.add_response(response)
+            responses = [self._apply_response_processors(resp) for resp in response]
+            for resp in responses:
+                logger.debug('aio response: %s\n%s', rpc_method._method, resp)
+            return self.handle_response_streaming(responses, error_from_response,
+                                                  value_from_response)
+        if rpc is not None:
+            rpc.add_response(response)
+        response = self._apply_response_processors(response)
+        logger.debug('aio response: %s\n%s', rpc_method._method, response)
+        return self.handle_response(response, error_from_response, value_from_response)
+
+    @process_kwargs
+    async def call_aio_streaming(self, rpc_method, request, value_from_response=None,
+                                 error_from_response=None, copy_request=True, **kwargs):
+        """Async generator of the results of a streaming rpc, as the responses are received.
+
+        Unlike 'call_aio', value_from_response and error_from_response are applied to each
+        response rather than to the list of all of them, and there is no timeout unless one is
+        given, since streams may be long-lived.  No thread is used per call.
+        """
+        logger = self._get_logger(rpc_method)
+        is_streaming_request = isinstance(
+            rpc_method, (grpc.aio.StreamUnaryMultiCallable, grpc.aio.StreamStreamMultiCallable))
+        is_streaming_response = isinstance(
+            rpc_method, (grpc.aio.UnaryStreamMultiCallable, grpc.aio.StreamStreamMultiCallable))
+        rpc = self._rpc_started(rpc_method)
+        error = None
+        try:
+            if is_streaming_request:
+                request = self._update_request_iterator_aio(request, logger, rpc_method,
+                                                            copy_request)
+                if rpc is not None:
+                    request = _count_requests_aio(rpc, request)
+            else:
+                # The request is in use until the stream ends, so it is processed as a copy.
+                request = self._apply_request_processors(request, copy_request=copy_request)
+                if rpc is not None:
+                    rpc.add_request(request)
+
+            timeout = kwargs.pop('timeout', None)
+            rpc_call = rpc_method(request, timeout=timeout, **kwargs)
+            try:
+                if is_streaming_response:
+                    async for response in rpc_call:
+                        if rpc is not None:
+                            rpc.add_response(response)
+                        response = self._apply_response_processors(response)
+                        logger.debug('aio response: %s\n%s', rpc_method._method, response)
+                        yield self.handle_response(response, error_from_response,
+                                                   value_from_response)
+                else:
+                    response = await rpc_call
+                    if rpc is not None:
+                        rpc.add_response(response)
+                    response = self._apply_response_processors(response)
+                    logger.debug('aio response: %s\n%s', rpc_method._method, response)
+                    yield self.handle_response(response, error_from_response, value_from_response)
+            except TransportError as e:
+                raise translate_exception(e) from None
+            finally:
+                # Stop the rpc if the caller stopped iterating early.
+                rpc_call.cancel()
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            # A stream the caller stopped iterating early is not an error.
+            if rpc is not None:
+                rpc.finished(error)
+
+    async def _update_request_iterator_aio(self, request_iterator, logger, rpc_method,
+                                           copy_request=True):
+        """Async generator applying the request processors to an iterator or async iterator."""
+
+        def process(request):
+            request = self._apply_request_processors(request, copy_request=copy_request)
+            logger.debug('aio request: %s\n%s', rpc_method._method, request)
+            return request
+
+        if hasattr(request_iterator, '__aiter__'):
+            async for request in request_iterator:
+                yield process(request)
+        else:
+            for request in request_iterator:
+                yield process(request)
+
+    def _cached_rpc(self, rpc_method, request):
+        """Return the (cache key, time to live) of a call whose response may be cached, or None.
+
+        The key holds the full method name and the channel of the client, so that a cache shared
+        by clients of different services or robots keeps their responses apart.  Robot shares the
+        channel of an authority between its clients.
+        """
+        ttl = self.cached_response_ttls.get(_method_short_name(rpc_method))
+        if ttl is None or request is None:
+            return None
+        channel = self._channel if self._channel is not None else self.aio_channel_factory
+        return (rpc_method._method.decode(), channel,
+                request.SerializeToString(deterministic=True)), ttl
+
+    def _call_cached(self, cached_rpc, send, value_from_response, error_from_response, timeout):
+        """Handle the response of the cache, or of send() if this call must send the rpc.
+
+        A call waiting for the rpc of another raises TimedOutError after timeout seconds.
+        """
+        cache_key, ttl = cached_rpc
+        cache_future, is_owner = self.response_cache.begin(cache_key)
+        if is_owner:
+            try:
+                response = send()
+            except BaseException as exc:
+                self.response_cache.abort(cache_key, cache_future, exc)
+                raise
+            self._finish_cached(cache_key, ttl, cache_future, response, error_from_response)
+        else:
+            try:
+                response = _copy_message(cache_future.result(timeout))
+            except concurrent.futures.TimeoutError as e:
+                raise _shared_rpc_timed_out(timeout, e) from None
+        return self.handle_response(response, error_from_response, value_from_response)
+
+    def _finish_cached(self, cache_key, ttl, cache_future, response, error_from_response):
+        """Share a response with the waiting calls, and cache it unless it is an error."""
+        if error_from_response is not None and error_from_response(response) is not None:
+            ttl = None
+        self.response_cache.finish(cache_key, cache_future, _copy_message(response), ttl)
+
+    def _rpc_started(self, rpc_method):
+        """Return the ActiveRpc recording the call in rpc_metrics, or None if it is unset."""
+        if self.rpc_metrics is None:
+            return None
+        return self.rpc_metrics.rpc_started(getattr(rpc_method, '_method', b''))
+
+    @contextlib.contextmanager
+    def _processed_request(self, request, copy_request=True):
+        """Context manager returning the request to send, with the request processors applied.
+
+        If copy_request is True, the caller's request must not be left modified.  Rather than
+         deep-copying it, the fields which the processors write (their 'mutated_fields') are saved,
+         the processors modify the request in place, and the saved fields are restored on exit.
+         A deep copy is still made if any processor does not declare its mutated_fields, or if the
+         request is in use by another call.
+
+        Exit as soon as the request is serialized, as synchronous grpc calls and futures are when
+         they return, so that the caller's request is not left modified while the rpc is in
+         progress.  grpc.aio serializes requests later, so it must not be used for them.
+        """
+        snapshot = None
+        if copy_request and request is not None:
+            snapshot = _RequestFieldSnapshot.borrow(request, self.request_processors)
+            copy_request = snapshot is None
+        try:
+            yield self._apply_request_processors(request, copy_request=copy_request)
+        finally:
+            if snapshot is not None:
+                snapshot.restore()
+
     def _apply_request_processors(self, request, copy_request=True):
         if request is None:
             return
         if copy_request:
-            request = copy.deepcopy(request)
+            request = _RequestFieldSnapshot.clean_copy(request)
         for proc in self.request_processors:
             proc.mutate(request)
         return request
@@ -607,6 +1235,133 @@ class FutureWrapper():
         return translate_exception(error)
 
 
+class StreamingFuture():
+    """Future for an rpc with streamed responses, which can be iterated as they are received.
+
+    Iterating yields each response once the response processors and error_from_response (called
+    with a list of that response) have been applied to it.  result() instead waits for the rest of
+    the stream and returns value_from_response of the list of responses, as with
+    'call_async_streaming'.  The stream can only be consumed once: after iterating, result() and
+    exception() raise an Error.
+    """
+
+    def __init__(self, rpc_call, responses, value_from_response, error_from_response):
+        self.original_future = rpc_call
+        self._responses = responses
+        self._value_from_response = value_from_response
+        self._error_from_response = error_from_response
+        self._lock = threading.Lock()
+        self._consumed = False
+        self._consumed_all = False
+        self._result = None
+        self._exception = None
+        self._timed_out = False
+
+    def __repr__(self):
+        return self.original_future.__repr__()
+
+    def __iter__(self):
+        self._consume()
+        try:
+            for response in self._responses:
+                if self._error_from_response is not None:
+                    error = self._error_from_response([response])
+                    if error is not None:
+                        self.original_future.cancel()
+                        raise error
+                yield response
+        except TransportError as e:
+            raise translate_exception(e) from None
+
+    def cancel(self):
+        return self.original_future.cancel()
+
+    def cancelled(self):
+        return self.original_future.cancelled()
+
+    def running(self):
+        return self.original_future.running()
+
+    def done(self):
+        """Whether the rpc is complete.  Responses may remain to be iterated."""
+        return self.original_future.done()
+
+    def add_done_callback(self, cb):
+        """Add callback executed on StreamingFuture when the rpc is complete."""
+        self.original_future.add_done_callback(lambda not_used_original_future: cb(self))
+
+    def result(self, timeout=None):
+        """Get value_from_response of the list of all the responses.
+
+        The responses are received by the calling thread.  If they have not all been received
+        after timeout seconds, the rpc is cancelled and TimedOutError is raised.  Raises any error
+        in the stream, including those found by error_from_response.
+        """
+        error = self.exception(timeout=timeout)
+        if error is not None:
+            raise error
+        return self._result
+
+    def exception(self, timeout=None):
+        """Get the error in the stream, or None, after receiving all of the responses.
+
+        Raises TimedOutError if the responses have not all been received after timeout seconds,
+        in which case the rpc is cancelled.
+        """
+        if not self._lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise TimedOutError(None, 'The streaming rpc did not complete within the timeout.')
+        try:
+            if not self._consumed:
+                self._consume_all(timeout)
+            elif not self._consumed_all:
+                raise Error('The responses of the streaming rpc were already iterated.')
+        finally:
+            self._lock.release()
+        if self._timed_out:
+            raise self._exception
+        return self._exception
+
+    def _consume(self):
+        with self._lock:
+            if self._consumed:
+                raise Error('The responses of a streaming rpc can only be consumed once.')
+            self._consumed = True
+
+    def _consume_all(self, timeout):
+        self._consumed = True
+        self._consumed_all = True
+        timed_out = threading.Event()
+        timer = None
+        if timeout is not None:
+
+            def expire():
+                timed_out.set()
+                self.original_future.cancel()
+
+            timer = threading.Timer(timeout, expire)
+            timer.daemon = True
+            timer.start()
+        try:
+            responses = list(self._responses)
+            if self._error_from_response is not None:
+                self._exception = self._error_from_response(responses)
+            if self._exception is None:
+                self._result = responses if self._value_from_response is None else \
+                    self._value_from_response(responses)
+        except TransportError as e:
+            if timed_out.is_set():
+                self._timed_out = True
+                self._exception = TimedOutError(
+                    e, 'The streaming rpc did not complete within {} seconds.'.format(timeout))
+            else:
+                self._exception = translate_exception(e)
+        except Exception as e:  # pylint: disable=broad-except
+            self._exception = e
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+
 def get_self_ip(robot_hostname):
     """ Get the IP address of the ethernet or WiFi interface used to talk to the robot."""
     s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -108,6 +108,16 @@ class DataAcquisitionClient(BaseClient):
         return self.call_async(self._stub.AcquireData, request, value_from_response=get_request_id,
                                error_from_response=acquire_data_error, copy_request=False, **kwargs)
 
+    async def acquire_data_aio(self, acquisition_requests, action_name, group_name,
+                               data_timestamp=None, metadata=None, **kwargs):
+        """asyncio version of acquire_data() RPC."""
+        request = self.make_acquire_data_request(acquisition_requests, action_name, group_name,
+                                                 data_timestamp, metadata)
+        return await self.call_aio(self._aio_stub.AcquireData, request,
+                                   value_from_response=get_request_id,
+                                   error_from_response=acquire_data_error, copy_request=False,
+                                   **kwargs)
+
     def acquire_data_from_request(self, request, **kwargs):
         """Alternate version of acquire_data() that takes an AcquireDataRequest directly.
 
@@ -122,6 +132,11 @@ class DataAcquisitionClient(BaseClient):
         return self.call_async(self._stub.AcquireData, request,
                                error_from_response=acquire_data_error, **kwargs)
 
+    async def acquire_data_from_request_aio(self, request, **kwargs):
+        """asyncio version of acquire_data_from_request()."""
+        return await self.call_aio(self._aio_stub.AcquireData, request,
+                                   error_from_response=acquire_data_error, **kwargs)
+
     def get_status(self, request_id, **kwargs):
         """Check the status of a data acquisition based on the request id.
 
@@ -146,6 +161,13 @@ class DataAcquisitionClient(BaseClient):
         return self.call_async(self._stub.GetStatus, request, error_from_response=_get_status_error,
                                copy_request=False, **kwargs)
 
+    async def get_status_aio(self, request_id, **kwargs):
+        """asyncio version of get_status() RPC."""
+        request = data_acquisition.GetStatusRequest(request_id=request_id)
+        return await self.call_aio(self._aio_stub.GetStatus, request,
+                                   error_from_response=_get_status_error, copy_request=False,
+                                   **kwargs)
+
     def get_service_info(self, **kwargs):
         """Get information from a Data Acquisition service to list its capabilities - which data,
         metadata,or processing the Data Acquisition service will perform.
@@ -169,6 +191,14 @@ class DataAcquisitionClient(BaseClient):
                                error_from_response=common_header_errors, copy_request=False,
                                **kwargs)
 
+    async def get_service_info_aio(self, **kwargs):
+        """asyncio version of get_service_info() RPC."""
+        request = data_acquisition.GetServiceInfoRequest()
+        return await self.call_aio(self._aio_stub.GetServiceInfo, request,
+                                   value_from_response=_get_service_info_capabilities,
+                                   error_from_response=common_header_errors, copy_request=False,
+                                   **kwargs)
+
     def cancel_acquisition(self, request_id, **kwargs):
         """Cancel a data acquisition based on the request id.
 
@@ -195,6 +225,13 @@ class DataAcquisitionClient(BaseClient):
                                error_from_response=_cancel_acquisition_error, copy_request=False,
                                **kwargs)
 
+    async def cancel_acquisition_aio(self, request_id, **kwargs):
+        """asyncio version of cancel_acquisition() RPC."""
+        request = data_acquisition.CancelAcquisitionRequest(request_id=request_id)
+        return await self.call_aio(self._aio_stub.CancelAcquisition, request,
+                                   error_from_response=_cancel_acquisition_error,
+                                   copy_request=False, **kwargs)
+
     def get_live_data(self, request):
         """Call the GetLiveData RPC of the plugin service."""
         return self.call(self._stub.GetLiveData, request, error_from_response=_get_live_data_error,
@@ -205,6 +242,11 @@ class DataAcquisitionClient(BaseClient):
         return self.call_async(self._stub.GetLiveData, request,
                                error_from_response=_get_live_data_error, copy_request=True)
 
+    async def get_live_data_aio(self, request):
+        """asyncio version of get_live_data() RPC."""
+        return await self.call_aio(self._aio_stub.GetLiveData, request,
+                                   error_from_response=_get_live_data_error, copy_request=True)
+
 
 _ACQUIRE_DATA_STATUS_TO_ERROR = collections.defaultdict(lambda:
                                                         (DataAcquisitionResponseError, None))
@@ -19,6 +19,8 @@ import bosdyn.client
 import bosdyn.client.util
 from bosdyn.api import data_acquisition_pb2, data_acquisition_store_pb2
 from bosdyn.client.exceptions import ResponseError
+from bosdyn.client.parallel_download import (DEFAULT_MAX_CONNECTIONS, DEFAULT_MAX_RETRIES,
+                                             PIECE_DONE, ParallelDownloader)
 
 # Logger for all the debug information from the tests.
 _LOGGER = logging.getLogger()
@@ -326,3 +328,53 @@ def download_data_REST(query_params, hostname, token, destination_folder='.',
 
     # Data downloaded and saved to local disc successfully.
     return True
+
+
+def download_data_REST_parallel(query_params, hostname, token, destination_folder='.',
+                                additional_params=None, piece_sec=60,
+                                max_connections=DEFAULT_MAX_CONNECTIONS,
+                                max_retries=DEFAULT_MAX_RETRIES):
+    """Retrieve all data for a time-range query from the DataBuffer REST API, in parallel.
+
+    The time range is split into pieces of piece_sec seconds, which are downloaded concurrently
+    into separate zip files.  Progress is recorded in a manifest in the download folder, so an
+    interrupted download is resumed when this is called again with the same arguments.
+
+    Args:
+        query_params(bosdyn.api.DataQueryParams): Query parameters to use to retrieve metadata from
+            the DataStore service. Must be time-based query parameters only.
+        hostname(string): Hostname to specify in URL where the DataBuffer service is running.
+        token(string): User token to specify in https GET request for authentication.
+        destination_folder(string): Folder where to download the data.
+        additional_params(dict): Additional GET parameters to append to the URL.
+        piece_sec(float): Duration of the time range of each piece, in seconds.
+        max_connections(int): Maximum number of pieces downloaded at the same time.
+        max_retries(int): Number of times a failed piece is retried.
+
+    Returns:
+        List of paths of the downloaded zip files, in time order.
+
+    Raises:
+        DownloadError: Some pieces could not be downloaded.
+    """
+    if not query_params.HasField('time_range'):
+        raise ValueError("A time_range query is needed to split the download")
+    url = 'https://{}/v1/data-buffer/daq-data/'.format(hostname)
+    absolute_path = Path(destination_folder).absolute()
+    folder = Path(absolute_path.parent, clean_filename(absolute_path.name), 'REST')
+    headers = {"Authorization": "Bearer {}".format(token)}
+    get_params = dict(additional_params or {})
+
+    def _make_request(start_nsec, end_nsec):
+        params = dict(get_params, from_nsec=start_nsec, to_nsec=end_nsec)
+        return Request(url + '?{}'.format(urlencode(params)), headers=headers)
+
+    downloader = ParallelDownloader(_make_request, str(folder), suffix='.zip',
+                                    max_connections=max_connections, max_retries=max_retries)
+    pieces = downloader.download(query_params.time_range.from_timestamp.ToNanoseconds(),
+                                 query_params.time_range.to_timestamp.ToNanoseconds(),
+                                 int(piece_sec * 1e9), key={
+                                     'url': url,
+                                     'params': get_params
+                                 })
+    return [Path(piece.filename) for piece in pieces if piece.status == PIECE_DONE]
@@ -4,8 +4,17 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+import mmap
+import tempfile
+
 from bosdyn.api import data_chunk_pb2
 
+from .exceptions import Error
+
+
+class DataChunkError(Error):
+    """The data chunks do not add up to the total size they declare."""
+
 
 def split_serialized(serialized: bytes, data_chunk_byte_size: int):
     """Split a byte string into appropriately-sized chunks."""
@@ -34,9 +43,20 @@ def chunk_message(message, data_chunk_byte_size: int):
     return chunk_serialized(message.SerializeToString(), data_chunk_byte_size)
 
 
-def parse_from_chunks(iterable_chunks, out_msg):
-    """Parse out a message from chunks."""
-    return out_msg.ParseFromString(serialized_from_chunks(iterable_chunks))
+def parse_from_chunks(iterable_chunks, out_msg, spill_threshold=None):
+    """Parse out a message from chunks.
+
+    Args:
+        spill_threshold: size in bytes above which the message is reassembled in a temporary file
+            rather than in memory, or None to always reassemble in memory.
+    """
+    reassembler = ChunkReassembler(spill_threshold)
+    try:
+        for chunk in iterable_chunks:
+            reassembler.add(chunk)
+        return reassembler.parse(out_msg)
+    finally:
+        reassembler.close()
 
 
 def serialized_from_messages(iterable_messages):
@@ -52,3 +72,99 @@ def serialized_from_chunks(iterable_chunks):
 def serialized_from_strings(iterable_strings):
     """Concatenate bytes together."""
     return b''.join(iterable_strings)
+
+
+class ChunkReassembler(object):
+    """Reassemble DataChunks into a single buffer sized from their total_size.
+
+    The data of each chunk is copied once into a preallocated bytearray, which is parsed without
+    another copy.  Messages larger than spill_threshold are written to a temporary file instead,
+    and parsed from a memory map of it.  Chunks which overflow total_size, or disagree on it, raise
+    a DataChunkError as soon as they are added.
+
+    Chunks without a total_size, from older services, are appended to a growing buffer.
+    """
+
+    def __init__(self, spill_threshold=None):
+        """
+        Args:
+            spill_threshold: size in bytes above which the message is reassembled in a temporary
+                file rather than in memory, or None to always reassemble in memory.
+        """
+        self.spill_threshold = spill_threshold
+        self._total_size = None
+        self._size = 0
+        self._buffer = None
+        self._file = None
+
+    @property
+    def total_size(self):
+        """The size declared by the chunks, or None before the first chunk."""
+        return self._total_size
+
+    @property
+    def size(self):
+        """The number of bytes received so far."""
+        return self._size
+
+    @property
+    def spilled(self):
+        """Whether the message is being reassembled in a temporary file."""
+        return self._file is not None
+
+    def add(self, chunk):
+        """Copy the data of a DataChunk after that of the previous chunks."""
+        data = chunk.data
+        if self._total_size is None:
+            self._start(chunk.total_size)
+        elif chunk.total_size != self._total_size:
+            raise DataChunkError('Chunk declares a total size of {} bytes, not {}.'.format(
+                chunk.total_size, self._total_size))
+        end = self._size + len(data)
+        if self._total_size and end > self._total_size:
+            raise DataChunkError('Chunks hold more than their total size of {} bytes.'.format(
+                self._total_size))
+        if self._file is not None:
+            self._file.write(data)
+        elif self._total_size:
+            self._buffer[self._size:end] = data
+        else:
+            self._buffer += data
+        self._size = end
+
+    def parse(self, out_msg):
+        """Parse out_msg from the reassembled chunks, and release the buffer.
+
+        Raises DataChunkError if fewer bytes than the total size were received.
+        """
+        if self._total_size and self._size != self._total_size:
+            raise DataChunkError('Received {} of the {} bytes of the chunks.'.format(
+                self._size, self._total_size))
+        try:
+            if self._file is not None:
+                self._file.flush()
+                with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    view = memoryview(mapped)
+                    try:
+                        return out_msg.ParseFromString(view)
+                    finally:
+                        view.release()
+            return out_msg.ParseFromString(self._buffer if self._buffer is not None else b'')
+        finally:
+            self.close()
+
+    def close(self):
+        """Release the buffer or temporary file."""
+        self._buffer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _start(self, total_size):
+        self._total_size = total_size
+        if self.spill_threshold is not None and total_size > self.spill_threshold:
+            self._file = tempfile.TemporaryFile()
+        elif total_size:
+            self._buffer = bytearray(total_size)
+        else:
+            self._buffer = bytearray()
@@ -41,6 +41,8 @@ class DirectoryClient(BaseClient):
     default_service_name = 'directory'
     # gRPC service proto definition implemented by this service
     service_type = 'bosdyn.api.DirectoryService'
+    # Services register with the directory at times, so the listing is kept for less time.
+    cached_response_ttls = {'ListServiceEntries': 10.0}
 
     def __init__(self):
         super(DirectoryClient, self).__init__(directory_service_pb2_grpc.DirectoryServiceStub)
@@ -0,0 +1,134 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Bounded thread pool shared by the clients of a process for asynchronous streaming calls."""
+
+import collections
+import concurrent.futures
+import threading
+
+from .exceptions import Error
+
+# Maximum number of tasks queued or running in the default executor.
+DEFAULT_MAX_PENDING = 256
+
+# Maximum number of threads of the default executor.
+DEFAULT_MAX_WORKERS = 16
+
+# Snapshot of the state of a BoundedExecutor.
+#  queued and running are the current number of tasks waiting for a thread and being run,
+#   max_queued the largest number of tasks that have waited at the same time.
+#  submitted, completed and rejected count the tasks since the executor was created.
+ExecutorStats = collections.namedtuple('ExecutorStats', [
+    'max_workers', 'max_pending', 'queued', 'running', 'max_queued', 'submitted', 'completed',
+    'rejected'
+])
+
+
+class ExecutorFullError(Error):
+    """The executor already has its maximum number of pending tasks."""
+
+
+class BoundedExecutor(concurrent.futures.ThreadPoolExecutor):
+    """ThreadPoolExecutor which limits the number of pending tasks, and reports its queue depth.
+
+    submit() waits while max_pending tasks are queued or running, so that a burst of calls does not
+     grow the queue without bound.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 submit_timeout=None, thread_name_prefix='bosdyn-client'):
+        """
+        Args:
+         max_workers:     maximum number of threads.
+         max_pending:     maximum number of tasks queued or running.
+         submit_timeout:  maximum time in seconds for submit() to wait for room in the queue, or
+                           None to wait indefinitely.
+         thread_name_prefix: prefix of the names of the threads.
+        """
+        super(BoundedExecutor, self).__init__(max_workers=max_workers,
+                                              thread_name_prefix=thread_name_prefix)
+        if max_pending < max_workers:
+            raise ValueError('max_pending ({}) is less than max_workers ({})'.format(
+                max_pending, max_workers))
+        self.submit_timeout = submit_timeout
+        self._max_pending = max_pending
+        self._pending_slots = threading.BoundedSemaphore(max_pending)
+        self._stats_lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._max_queued = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+
+    @property
+    def max_pending(self):
+        """The maximum number of tasks queued or running."""
+        return self._max_pending
+
+    def stats(self):
+        """Return the ExecutorStats of the executor."""
+        with self._stats_lock:
+            return ExecutorStats(self._max_workers, self._max_pending, self._queued, self._running,
+                                 self._max_queued, self._submitted, self._completed, self._rejected)
+
+    def submit(self, fn, *args, **kwargs):  # pylint: disable=arguments-differ
+        """Schedule fn(*args, **kwargs), waiting for room in the queue if needed.
+
+        Raises ExecutorFullError if there is still no room after submit_timeout.
+        """
+        if not self._pending_slots.acquire(timeout=self.submit_timeout):
+            with self._stats_lock:
+                self._rejected += 1
+            raise ExecutorFullError('{} tasks are already pending'.format(self._max_pending))
+        with self._stats_lock:
+            self._queued += 1
+            self._submitted += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        started = threading.Event()
+        try:
+            future = super(BoundedExecutor, self).submit(self._run, started, fn, args, kwargs)
+        except BaseException:
+            self._on_done(started, None)
+            raise
+        future.add_done_callback(lambda _future: self._on_done(started, _future))
+        return future
+
+    def _run(self, started, fn, args, kwargs):
+        with self._stats_lock:
+            self._queued -= 1
+            self._running += 1
+            started.set()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._stats_lock:
+                self._running -= 1
+                self._completed += 1
+
+    def _on_done(self, started, _future):
+        if not started.is_set():
+            # Cancelled, or not submitted, before it started.
+            with self._stats_lock:
+                self._queued -= 1
+        self._pending_slots.release()
+
+
+_DEFAULT_EXECUTOR = None
+_DEFAULT_EXECUTOR_LOCK = threading.Lock()
+
+
+def default_executor():
+    """Return the BoundedExecutor shared by the process, creating it on first use.
+
+    Threads are only started when tasks are submitted.
+    """
+    global _DEFAULT_EXECUTOR  # pylint: disable=global-statement
+    with _DEFAULT_EXECUTOR_LOCK:
+        if _DEFAULT_EXECUTOR is None:
+            _DEFAULT_EXECUTOR = BoundedExecutor()
+        return _DEFAULT_EXECUTOR
@@ -19,6 +19,7 @@ from bosdyn.client.common import (BaseClient, common_header_errors, common_lease
                                   error_factory, error_pair, handle_common_header_errors,
                                   handle_lease_use_result_errors, handle_license_errors_if_present,
                                   handle_unset_status_error)
+from bosdyn.client.data_chunk import parse_from_chunks
 from bosdyn.client.exceptions import Error, InvalidRequestError, ResponseError, UnimplementedError
 from bosdyn.client.lease import add_lease_wallet_processors
 
@@ -73,6 +74,19 @@ class GraphNavClient(BaseClient):
         return self.call_async(self._stub.SetLocalization, req, _get_response,
                                _set_localization_error, copy_request=False, **kwargs)
 
+    async def set_localization_aio_full_response(
+            self, initial_guess_localization, ko_tform_body=None, max_distance=None, max_yaw=None,
+            fiducial_init=graph_nav_pb2.SetLocalizationRequest.FIDUCIAL_INIT_NEAREST,
+            use_fiducial_id=None, refine_fiducial_result_with_icp=False, do_ambiguity_check=False,
+            refine_with_visual_features=False, verify_visual_features_quality=False, **kwargs):
+        """asyncio version of set_localization_full_response()"""
+        req = self._build_set_localization_request(
+            initial_guess_localization, ko_tform_body, max_distance, max_yaw, fiducial_init,
+            use_fiducial_id, refine_fiducial_result_with_icp, do_ambiguity_check,
+            refine_with_visual_features, verify_visual_features_quality)
+        return await self.call_aio(self._aio_stub.SetLocalization, req, _get_response,
+                                   _set_localization_error, copy_request=False, **kwargs)
+
     def set_localization(
             self, initial_guess_localization, ko_tform_body=None, max_distance=None, max_yaw=None,
             fiducial_init=graph_nav_pb2.SetLocalizationRequest.FIDUCIAL_INIT_NEAREST,
@@ -122,6 +136,19 @@ class GraphNavClient(BaseClient):
         return self.call_async(self._stub.SetLocalization, req, _localization_from_response,
                                _set_localization_error, copy_request=False, **kwargs)
 
+    async def set_localization_aio(
+            self, initial_guess_localization, ko_tform_body=None, max_distance=None, max_yaw=None,
+            fiducial_init=graph_nav_pb2.SetLocalizationRequest.FIDUCIAL_INIT_NEAREST,
+            use_fiducial_id=None, refine_fiducial_result_with_icp=False, do_ambiguity_check=False,
+            refine_with_visual_features=False, verify_visual_features_quality=False, **kwargs):
+        """asyncio version of set_localization()"""
+        req = self._build_set_localization_request(
+            initial_guess_localization, ko_tform_body, max_distance, max_yaw, fiducial_init,
+            use_fiducial_id, refine_fiducial_result_with_icp, do_ambiguity_check,
+            refine_with_visual_features, verify_visual_features_quality)
+        return await self.call_aio(self._aio_stub.SetLocalization, req, _localization_from_response,
+                                   _set_localization_error, copy_request=False, **kwargs)
+
     def get_localization_state(
             self,
             request_live_point_cloud=False,
@@ -164,6 +191,21 @@ class GraphNavClient(BaseClient):
         return self.call_async(self._stub.GetLocalizationState, req, None, common_header_errors,
                                copy_request=False, **kwargs)
 
+    async def get_localization_state_aio(
+            self, request_live_point_cloud=False, request_live_images=False,
+            request_live_terrain_maps=False, request_live_world_objects=False,
+            request_live_robot_state=False, waypoint_id=None, request_gps_state=False, **kwargs):
+        """asyncio version of get_localization_state()."""
+        req = self._build_get_localization_state_request(
+            request_live_point_cloud=request_live_point_cloud,
+            request_live_images=request_live_images,
+            request_live_terrain_maps=request_live_terrain_maps,
+            request_live_world_objects=request_live_world_objects,
+            request_live_robot_state=request_live_robot_state, waypoint_id=waypoint_id,
+            request_gps_state=request_gps_state)
+        return await self.call_aio(self._aio_stub.GetLocalizationState, req, None,
+                                   common_header_errors, copy_request=False, **kwargs)
+
     def navigate_route(self, route, cmd_duration, route_follow_params=None, travel_params=None,
                        leases=None, timesync_endpoint=None, command_id=None,
                        destination_waypoint_tform_body_goal=None, **kwargs):
@@ -224,6 +266,22 @@ class GraphNavClient(BaseClient):
                                _command_id_from_navigate_route_response, _navigate_route_error,
                                copy_request=False, **kwargs)
 
+    async def navigate_route_aio(self, route, cmd_duration, route_follow_params=None,
+                                 travel_params=None, leases=None, timesync_endpoint=None,
+                                 command_id=None, destination_waypoint_tform_body_goal=None,
+                                 **kwargs):
+        """asyncio version of navigate_route()"""
+        used_endpoint = timesync_endpoint or self._timesync_endpoint
+        if not used_endpoint:
+            raise GraphNavServiceResponseError(response=None, error_message='No timesync endpoint!')
+        request = self._build_navigate_route_request(route, route_follow_params, travel_params,
+                                                     cmd_duration, leases, used_endpoint,
+                                                     command_id,
+                                                     destination_waypoint_tform_body_goal)
+        return await self.call_aio(self._aio_stub.NavigateRoute, request,
+                                   _command_id_from_navigate_route_response, _navigate_route_error,
+                                   copy_request=False, **kwargs)
+
     def navigate_route_full(self, route, route_follow_params, cmd_duration, travel_params=None,
                             leases=None, timesync_endpoint=None, command_id=None,
                             destination_waypoint_tform_body_goal=None, **kwargs):
@@ -267,6 +325,28 @@ class GraphNavClient(BaseClient):
                                error_from_response=_navigate_route_error, copy_request=False,
                                **kwargs)
 
+    async def navigate_route_full_aio(self, route, cmd_duration, route_follow_params=None,
+                                      travel_params=None, leases=None, timesync_endpoint=None,
+                                      command_id=None, destination_waypoint_tform_body_goal=None,
+                                      **kwargs):
+        """asyncio version of navigate_route_full()."""
+        used_endpoint = timesync_endpoint or self._timesync_endpoint
+        if not used_endpoint:
+            raise GraphNavServiceResponseError(response=None, error_message='No timesync endpoint!')
+        request = self._build_navigate_route_request(
+            route,
+            route_follow_params,
+            travel_params,
+            cmd_duration,
+            leases,
+            used_endpoint,
+            command_id,
+            destination_waypoint_tform_body_goal,
+        )
+        return await self.call_aio(self._aio_stub.NavigateRoute, request,
+                                   error_from_response=_navigate_route_error, copy_request=False,
+                                   **kwargs)
+
     def navigate_to(self, destination_waypoint_id, cmd_duration, route_params=None,
                     travel_params=None, leases=None, timesync_endpoint=None, command_id=None,
                     destination_waypoint_tform_body_goal=None, route_blocked_behavior=None,
@@ -326,6 +406,23 @@ class GraphNavClient(BaseClient):
                                value_from_response=_command_id_from_navigate_route_response,
                                error_from_response=_navigate_to_error, copy_request=False, **kwargs)
 
+    async def navigate_to_aio(self, destination_waypoint_id, cmd_duration, route_params=None,
+                              travel_params=None, leases=None, timesync_endpoint=None,
+                              command_id=None, destination_waypoint_tform_body_goal=None,
+                              route_blocked_behavior=None, **kwargs):
+        """asyncio version of navigate_to()."""
+        used_endpoint = timesync_endpoint or self._timesync_endpoint
+        if not used_endpoint:
+            raise GraphNavServiceResponseError(response=None, error_message='No timesync endpoint!')
+        request = self._build_navigate_to_request(destination_waypoint_id, travel_params,
+                                                  route_params, cmd_duration, leases, used_endpoint,
+                                                  command_id, destination_waypoint_tform_body_goal,
+                                                  route_blocked_behavior)
+        return await self.call_aio(self._aio_stub.NavigateTo, request,
+                                   value_from_response=_command_id_from_navigate_route_response,
+                                   error_from_response=_navigate_to_error, copy_request=False,
+                                   **kwargs)
+
     def navigate_to_full(self, destination_waypoint_id, cmd_duration, route_params=None,
                          travel_params=None, leases=None, timesync_endpoint=None, command_id=None,
                          destination_waypoint_tform_body_goal=None, route_blocked_behavior=None,
@@ -356,6 +453,22 @@ class GraphNavClient(BaseClient):
         return self.call_async(self._stub.NavigateTo, request,
                                error_from_response=_navigate_to_error, copy_request=False, **kwargs)
 
+    async def navigate_to_full_aio(self, destination_waypoint_id, cmd_duration, route_params=None,
+                                   travel_params=None, leases=None, timesync_endpoint=None,
+                                   command_id=None, destination_waypoint_tform_body_goal=None,
+                                   route_blocked_behavior=None, **kwargs):
+        """asyncio version of navigate_to_full()."""
+        used_endpoint = timesync_endpoint or self._timesync_endpoint
+        if not used_endpoint:
+            raise GraphNavServiceResponseError(response=None, error_message='No timesync endpoint!')
+        request = self._build_navigate_to_request(destination_waypoint_id, travel_params,
+                                                  route_params, cmd_duration, leases, used_endpoint,
+                                                  command_id, destination_waypoint_tform_body_goal,
+                                                  route_blocked_behavior)
+        return await self.call_aio(self._aio_stub.NavigateTo, request,
+                                   error_from_response=_navigate_to_error, copy_request=False,
+                                   **kwargs)
+
     def navigate_to_anchor(self, seed_tform_goal, cmd_duration, route_params=None,
                            travel_params=None, leases=None, timesync_endpoint=None,
                            goal_waypoint_rt_seed_ewrt_seed_tolerance=None, command_id=None,
@@ -418,6 +531,22 @@ class GraphNavClient(BaseClient):
                                error_from_response=_navigate_to_anchor_error, copy_request=False,
                                **kwargs)
 
+    async def navigate_to_anchor_aio(self, seed_tform_goal, cmd_duration, route_params=None,
+                                     travel_params=None, leases=None, timesync_endpoint=None,
+                                     goal_waypoint_rt_seed_ewrt_seed_tolerance=None,
+                                     command_id=None, gps_navigation_params=None, **kwargs):
+        """asyncio version of navigate_to_anchor()."""
+        used_endpoint = timesync_endpoint or self._timesync_endpoint
+        if not used_endpoint:
+            raise GraphNavServiceResponseError(response=None, error_message='No timesync endpoint!')
+        request = self._build_navigate_to_anchor_request(
+            seed_tform_goal, travel_params, route_params, cmd_duration, leases, used_endpoint,
+            command_id, goal_waypoint_rt_seed_ewrt_seed_tolerance, gps_navigation_params)
+        return await self.call_aio(self._aio_stub.NavigateToAnchor, request,
+                                   value_from_response=_command_id_from_navigate_route_response,
+                                   error_from_response=_navigate_to_anchor_error,
+                                   copy_request=False, **kwargs)
+
     def navigate_to_anchor_full_async(self, seed_tform_goal, cmd_duration, route_params=None,
                                       travel_params=None, leases=None, timesync_endpoint=None,
                                       goal_waypoint_rt_seed_ewrt_seed_tolerance=None,
@@ -433,6 +562,21 @@ class GraphNavClient(BaseClient):
                                error_from_response=_navigate_to_anchor_error, copy_request=False,
                                **kwargs)
 
+    async def navigate_to_anchor_full_aio(self, seed_tform_goal, cmd_duration, route_params=None,
+                                          travel_params=None, leases=None, timesync_endpoint=None,
+                                          goal_waypoint_rt_seed_ewrt_seed_tolerance=None,
+                                          command_id=None, gps_navigation_params=None, **kwargs):
+        """asyncio version of navigate_to_anchor() that returns the full response."""
+        used_endpoint = timesync_endpoint or self._timesync_endpoint
+        if not used_endpoint:
+            raise GraphNavServiceResponseError(response=None, error_message='No timesync endpoint!')
+        request = self._build_navigate_to_anchor_request(
+            seed_tform_goal, travel_params, route_params, cmd_duration, leases, used_endpoint,
+            command_id, goal_waypoint_rt_seed_ewrt_seed_tolerance, gps_navigation_params)
+        return await self.call_aio(self._aio_stub.NavigateToAnchor, request,
+                                   error_from_response=_navigate_to_anchor_error,
+                                   copy_request=False, **kwargs)
+
     def navigation_feedback(self, command_id=0, **kwargs):
         """Returns the feedback corresponding to the active route follow command.
 
@@ -456,6 +600,14 @@ class GraphNavClient(BaseClient):
                                error_from_response=_navigate_feedback_error, copy_request=False,
                                **kwargs)
 
+    async def navigation_feedback_aio(self, command_id=0, **kwargs):
+        """asyncio version of navigation_feedback()."""
+        request = self._build_navigate_feedback_request(command_id)
+        return await self.call_aio(self._aio_stub.NavigationFeedback, request,
+                                   value_from_response=_get_response,
+                                   error_from_response=_navigate_feedback_error, copy_request=False,
+                                   **kwargs)
+
     def clear_graph(self, lease=None, **kwargs):
         """Clears the local graph structure. Also erases any snapshots currently in RAM.
 
@@ -476,6 +628,14 @@ class GraphNavClient(BaseClient):
                                error_from_response=handle_common_header_errors(common_lease_errors),
                                copy_request=False, **kwargs)
 
+    async def clear_graph_aio(self, lease=None, **kwargs):
+        """asyncio version of clear_graph()."""
+        request = self._build_clear_graph_request(lease)
+        return await self.call_aio(
+            self._aio_stub.ClearGraph, request, value_from_response=None,
+            error_from_response=handle_common_header_errors(common_lease_errors),
+            copy_request=False, **kwargs)
+
     def upload_graph(self, lease=None, graph=None, generate_new_anchoring=False, **kwargs):
         """Uploads a graph to the server and appends to the existing graph.
 
@@ -521,6 +681,31 @@ class GraphNavClient(BaseClient):
                                error_from_response=_upload_graph_error, copy_request=False,
                                **kwargs)
 
+    async def upload_graph_aio(self, lease=None, graph=None, generate_new_anchoring=False,
+                               **kwargs):
+        """asyncio version of upload_graph()."""
+        request = self._build_upload_graph_request(lease, graph, generate_new_anchoring)
+        # Use streaming to upload the graph, if applicable.
+        if self._use_streaming_graph_upload:
+            # Need to manually apply request processors since this will be serialized and chunked.
+            self._apply_request_processors(request, copy_request=False)
+            serialized = request.SerializeToString()
+            try:
+                return await self.call_aio(
+                    self._aio_stub.UploadGraphStreaming,
+                    GraphNavClient._data_chunk_iterator_upload_graph(serialized,
+                                                                     self._data_chunk_size),
+                    value_from_response=_get_response, error_from_response=_upload_graph_error,
+                    **kwargs)
+            except UnimplementedError:
+                # Recreate the request so that we clear any state that might have happened during our attempt to stream.
+                request = self._build_upload_graph_request(lease, graph, generate_new_anchoring)
+                # Continue to regular UploadGraph.
+        return await self.call_aio(self._aio_stub.UploadGraph, request,
+                                   value_from_response=_get_response,
+                                   error_from_response=_upload_graph_error, copy_request=False,
+                                   **kwargs)
+
     def upload_waypoint_snapshot(self, waypoint_snapshot, lease=None, **kwargs):
         """Uploads large waypoint snapshot as a stream for a particular waypoint.
 
@@ -541,6 +726,16 @@ class GraphNavClient(BaseClient):
                 serialized, lease, self._data_chunk_size), value_from_response=None,
             error_from_response=_upload_waypoint_snapshot_error, **kwargs)
 
+    async def upload_waypoint_snapshot_aio(self, waypoint_snapshot, lease=None, **kwargs):
+        """asyncio version of upload_waypoint_snapshot()."""
+        lease = lease or lease_pb2.Lease()
+        serialized = waypoint_snapshot.SerializeToString()
+        await self.call_aio(
+            self._aio_stub.UploadWaypointSnapshot,
+            GraphNavClient._data_chunk_iterator_upload_waypoint_snapshot(
+                serialized, lease, self._data_chunk_size), value_from_response=None,
+            error_from_response=_upload_waypoint_snapshot_error, **kwargs)
+
     def upload_edge_snapshot(self, edge_snapshot, lease=None, **kwargs):
         """Uploads large edge snapshot as a stream for a particular edge.
 
@@ -562,6 +757,17 @@ class GraphNavClient(BaseClient):
             value_from_response=None,
             error_from_response=handle_common_header_errors(common_lease_errors), **kwargs)
 
+    async def upload_edge_snapshot_aio(self, edge_snapshot, lease=None, **kwargs):
+        """asyncio version of upload_edge_snapshot()."""
+        lease = lease or lease_pb2.Lease()
+        serialized = edge_snapshot.SerializeToString()
+        await self.call_aio(
+            self._aio_stub.UploadEdgeSnapshot,
+            GraphNavClient._data_chunk_iterator_upload_edge_snapshot(serialized, lease,
+                                                                     self._data_chunk_size),
+            value_from_response=None,
+            error_from_response=handle_common_header_errors(common_lease_errors), **kwargs)
+
     def download_graph(self, **kwargs):
         """Downloads the graph from the server.
 
@@ -592,6 +798,23 @@ class GraphNavClient(BaseClient):
                                error_from_response=common_header_errors, copy_request=False,
                                **kwargs)
 
+    async def download_graph_aio(self, **kwargs):
+        """asyncio version of download_graph()."""
+        request = self._build_download_graph_request()
+        # Use streaming to download the graph, if applicable.
+        if self._use_streaming_graph_upload:
+            try:
+                return await self.call_aio(self._aio_stub.DownloadGraphStreaming, request,
+                                           value_from_response=_get_streamed_download_graph,
+                                           error_from_response=_download_graph_stream_errors,
+                                           copy_request=False, **kwargs)
+            except UnimplementedError:
+                pass  # Continue to regular DownloadGraph.
+        return await self.call_aio(self._aio_stub.DownloadGraph, request,
+                                   value_from_response=_get_graph,
+                                   error_from_response=common_header_errors, copy_request=False,
+                                   **kwargs)
+
     def download_waypoint_snapshot(
             self,
             waypoint_snapshot_id,
@@ -619,6 +842,35 @@ class GraphNavClient(BaseClient):
                          error_from_response=_download_waypoint_snapshot_stream_errors,
                          copy_request=False, **kwargs)
 
+    def download_waypoint_snapshot_async(self, waypoint_snapshot_id, download_images=False,
+                                         do_not_download_point_cloud=False, **kwargs):
+        """Async version of download_waypoint_snapshot().
+
+        Returns:
+            A StreamingFuture.  Its result() is the WaypointSnapshot, or the
+            DownloadWaypointSnapshotResponse chunks can be iterated as they are received, e.g. to
+            write them to a file without keeping the whole snapshot in memory.
+        """
+        request = self._build_download_waypoint_snapshot_request(waypoint_snapshot_id,
+                                                                 download_images,
+                                                                 do_not_download_point_cloud)
+        return self.call_streaming_future(
+            self._stub.DownloadWaypointSnapshot, request,
+            value_from_response=_get_streamed_waypoint_snapshot,
+            error_from_response=_download_waypoint_snapshot_stream_errors, copy_request=False,
+            **kwargs)
+
+    async def download_waypoint_snapshot_aio(self, waypoint_snapshot_id, download_images=False,
+                                             do_not_download_point_cloud=False, **kwargs):
+        """asyncio version of download_waypoint_snapshot()."""
+        request = self._build_download_waypoint_snapshot_request(waypoint_snapshot_id,
+                                                                 download_images,
+                                                                 do_not_download_point_cloud)
+        return await self.call_aio(self._aio_stub.DownloadWaypointSnapshot, request,
+                                   value_from_response=_get_streamed_waypoint_snapshot,
+                                   error_from_response=_download_waypoint_snapshot_stream_errors,
+                                   copy_request=False, **kwargs)
+
 
     def download_edge_snapshot(self, edge_snapshot_id, **kwargs):
         """Downloads a specific edge snapshot with streaming from the server.
@@ -637,6 +889,27 @@ class GraphNavClient(BaseClient):
                          error_from_response=_download_edge_snapshot_stream_errors,
                          copy_request=False, **kwargs)
 
+    def download_edge_snapshot_async(self, edge_snapshot_id, **kwargs):
+        """Async version of download_edge_snapshot().
+
+        Returns:
+            A StreamingFuture.  Its result() is the EdgeSnapshot, or the
+            DownloadEdgeSnapshotResponse chunks can be iterated as they are received.
+        """
+        request = self._build_download_edge_snapshot_request(edge_snapshot_id)
+        return self.call_streaming_future(self._stub.DownloadEdgeSnapshot, request,
+                                          value_from_response=_get_streamed_edge_snapshot,
+                                          error_from_response=_download_edge_snapshot_stream_errors,
+                                          copy_request=False, **kwargs)
+
+    async def download_edge_snapshot_aio(self, edge_snapshot_id, **kwargs):
+        """asyncio version of download_edge_snapshot()."""
+        request = self._build_download_edge_snapshot_request(edge_snapshot_id)
+        return await self.call_aio(self._aio_stub.DownloadEdgeSnapshot, request,
+                                   value_from_response=_get_streamed_edge_snapshot,
+                                   error_from_response=_download_edge_snapshot_stream_errors,
+                                   copy_request=False, **kwargs)
+
 
     def _write_bytes(self, filepath, filename, data):
         """Write data to a file."""
@@ -1082,11 +1355,8 @@ def _get_graph(response):
 
 def _get_streamed_data(response, data_type):
     """Given a list of streamed responses, return an instance of the given data type that is parsed from those responses."""
-    data = bytes()
-    for resp in response:
-        data += resp.chunk.data
     proto_instance = data_type()
-    proto_instance.ParseFromString(data)
+    parse_from_chunks((resp.chunk for resp in response), proto_instance)
     return proto_instance
 
 
@@ -543,6 +543,12 @@ class LeaseClient(common.BaseClient):
         return self.call_async(self._stub.AcquireLease, req, self._handle_acquire_success,
                                self._handle_acquire_errors, copy_request=False, **kwargs)
 
+    async def acquire_aio(self, resource=_RESOURCE_BODY, **kwargs):
+        """asyncio version of acquire() function."""
+        req = self._make_acquire_request(resource)
+        return await self.call_aio(self._aio_stub.AcquireLease, req, self._handle_acquire_success,
+                                   self._handle_acquire_errors, copy_request=False, **kwargs)
+
     def take(self, resource=_RESOURCE_BODY, **kwargs):
         """Take the lease for the given resource.
 
@@ -567,6 +573,12 @@ class LeaseClient(common.BaseClient):
         return self.call_async(self._stub.TakeLease, req, self._handle_acquire_success,
                                self._handle_take_errors, copy_request=False, **kwargs)
 
+    async def take_aio(self, resource=_RESOURCE_BODY, **kwargs):
+        """asyncio version of take() function."""
+        req = self._make_take_request(resource)
+        return await self.call_aio(self._aio_stub.TakeLease, req, self._handle_acquire_success,
+                                   self._handle_take_errors, copy_request=False, **kwargs)
+
     def return_lease(self, lease, **kwargs):
         """Return an acquired lease.
 
@@ -593,6 +605,14 @@ class LeaseClient(common.BaseClient):
         return self.call(self._stub.ReturnLease, req, None, self._handle_return_errors,
                          copy_request=False, **kwargs)
 
+    async def return_lease_aio(self, lease, **kwargs):
+        """asyncio version of return_lease() function."""
+        if self.lease_wallet:
+            self.lease_wallet.remove(lease)
+        req = self._make_return_request(lease)
+        return await self.call_aio(self._aio_stub.ReturnLease, req, None,
+                                   self._handle_return_errors, copy_request=False, **kwargs)
+
     def retain_lease(self, lease, **kwargs):
         """Retain the lease.
 
@@ -613,6 +633,12 @@ class LeaseClient(common.BaseClient):
         return self.call_async(self._stub.RetainLease, req, None, common.common_lease_errors,
                                copy_request=False, **kwargs)
 
+    async def retain_lease_aio(self, lease, **kwargs):
+        """asyncio version of retain_lease() function."""
+        req = self._make_retain_request(lease)
+        return await self.call_aio(self._aio_stub.RetainLease, req, None,
+                                   common.common_lease_errors, copy_request=False, **kwargs)
+
 
     def list_leases(self, include_full_lease_info=False, **kwargs):
         """Get a list of the leases.
@@ -639,6 +665,12 @@ class LeaseClient(common.BaseClient):
         return self.call_async(self._stub.ListLeases, req, self._list_leases_success,
                                common.common_header_errors, copy_request=False, **kwargs)
 
+    async def list_leases_aio(self, include_full_lease_info=False, **kwargs):
+        """asyncio version of list_leases() function."""
+        req = self._make_list_leases_request(include_full_lease_info)
+        return await self.call_aio(self._aio_stub.ListLeases, req, self._list_leases_success,
+                                   common.common_header_errors, copy_request=False, **kwargs)
+
     def list_leases_full(self, include_full_lease_info=False, **kwargs):
         """Get a list of the leases.
 
@@ -664,6 +696,12 @@ class LeaseClient(common.BaseClient):
         return self.call_async(self._stub.ListLeases, req, None, common.common_header_errors,
                                copy_request=False, **kwargs)
 
+    async def list_leases_full_aio(self, include_full_lease_info=False, **kwargs):
+        """asyncio version of list_leases_full() function."""
+        req = self._make_list_leases_request(include_full_lease_info)
+        return await self.call_aio(self._aio_stub.ListLeases, req, None,
+                                   common.common_header_errors, copy_request=False, **kwargs)
+
     @staticmethod
     def _make_acquire_request(resource):
         """Return AcquireLeaseRequest message with the given resource."""
@@ -745,6 +783,9 @@ class LeaseWalletRequestProcessor(object):
             self.resource_list = resource_list
         self.logger = logging.getLogger()
 
+    # Fields of the request written by mutate().
+    mutated_fields = ('lease', 'leases')
+
     def mutate(self, request, resource_list=DEFAULT_RESOURCES):
         """Add the leases for the necessary resources if no leases have been specified yet."""
         multiple_leases, skip_mutation = self.get_lease_state(request)
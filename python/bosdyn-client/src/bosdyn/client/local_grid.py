@@ -17,6 +17,8 @@ class LocalGridClient(BaseClient):
     default_service_name = 'local-grid-service'
     # gRPC service proto definition implemented by this service
     service_type = 'bosdyn.api.LocalGridService'
+    # The local grid types rarely change.
+    cached_response_ttls = {'GetLocalGridTypes': 60.0}
 
     def __init__(self):
         super(LocalGridClient, self).__init__(local_grid_service_pb2_grpc.LocalGridServiceStub)
@@ -37,6 +37,8 @@ class NetworkComputeBridgeClient(BaseClient):
 
     default_service_name = 'network-compute-bridge'
     service_type = 'bosdyn.api.NetworkComputeBridge'
+    # The available models rarely change.
+    cached_response_ttls = {'ListAvailableModels': 60.0}
 
     def __init__(self):
         super(NetworkComputeBridgeClient,
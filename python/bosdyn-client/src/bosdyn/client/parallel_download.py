@@ -0,0 +1,310 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Download a time span of data from a robot REST API in pieces, in parallel.
+
+The time span is split into sub-spans ("pieces"), which are fetched concurrently over a bounded
+ number of connections.  Each piece is retried independently if it fails.  The state of every
+ piece is recorded in a manifest file in the output directory, so an interrupted download can be
+ resumed by running it again with the same arguments: pieces which were completed are not
+ downloaded again.
+"""
+
+import http.client
+import json
+import logging
+import os
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+_LOGGER = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = 'manifest.json'
+DEFAULT_MAX_CONNECTIONS = 4
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_DELAY_SEC = 1.0
+REQUEST_TIMEOUT = 20  # Seconds.
+
+PIECE_PENDING = 'pending'
+PIECE_DONE = 'done'
+PIECE_EMPTY = 'empty'  # The server had no data for the time span of the piece.
+
+_COPY_CHUNK_SIZE = 1024**2
+_MANIFEST_VERSION = 1
+
+# HTTP status codes for which a request is retried, besides 5xx server errors.
+_RETRIABLE_HTTP_CODES = (408, 429)
+
+
+class DownloadError(Exception):
+    """Some pieces of a download could not be retrieved."""
+
+
+def split_time_span(start_nsec, end_nsec, piece_nsec, align_nsec=1):
+    """Split the time span [start_nsec, end_nsec) into consecutive sub-spans.
+
+    Args:
+     start_nsec:  start of the time span.
+     end_nsec:    end of the time span.
+     piece_nsec:  maximum duration of each sub-span.
+     align_nsec:  boundaries between sub-spans are multiples of this (e.g., 1e9 for an API which
+                   only accepts whole seconds).
+
+    Returns: list of (start_nsec, end_nsec)
+    """
+    if end_nsec <= start_nsec:
+        raise ValueError("Empty time span [{}, {})".format(start_nsec, end_nsec))
+    piece_nsec = max(align_nsec, piece_nsec - piece_nsec % align_nsec)
+    spans = []
+    piece_start = start_nsec
+    while piece_start < end_nsec:
+        piece_end = min(end_nsec, (piece_start // align_nsec) * align_nsec + piece_nsec)
+        spans.append((piece_start, piece_end))
+        piece_start = piece_end
+    return spans
+
+
+class DownloadPiece:  # pylint: disable=too-few-public-methods
+    """The state of one piece of a download."""
+
+    def __init__(self, index, start_nsec, end_nsec, filename, status=PIECE_PENDING, nbytes=0,
+                 attempts=0):
+        self.index = index
+        self.start_nsec = start_nsec
+        self.end_nsec = end_nsec
+        self.filename = filename  # Path of the downloaded data.
+        self.status = status
+        self.nbytes = nbytes  # Size of the downloaded data.
+        self.attempts = attempts  # Number of failed attempts to download the piece.
+
+    def to_json(self):
+        """Return a dict representing the piece, for the manifest."""
+        return {
+            'index': self.index,
+            'start_nsec': self.start_nsec,
+            'end_nsec': self.end_nsec,
+            'filename': os.path.basename(self.filename),
+            'status': self.status,
+            'nbytes': self.nbytes,
+            'attempts': self.attempts,
+        }
+
+    @classmethod
+    def from_json(cls, value, directory):
+        """Create a piece from a dict read from the manifest in the given directory."""
+        return cls(value['index'], value['start_nsec'], value['end_nsec'],
+                   os.path.join(directory, value['filename']), value['status'], value['nbytes'],
+                   value['attempts'])
+
+    def is_complete(self):
+        """Returns True if the piece has been downloaded and its data is still on disk."""
+        if self.status == PIECE_EMPTY:
+            return True
+        return (self.status == PIECE_DONE and os.path.exists(self.filename) and
+                os.path.getsize(self.filename) == self.nbytes)
+
+
+class DownloadManifest:
+    """Records the state of each piece of a download in a JSON file."""
+
+    def __init__(self, path, key, pieces):
+        """
+        Args:
+         path:    path of the manifest file.
+         key:     dict identifying the download (e.g., the query), so the manifest of a different
+                   download is not used to resume this one.
+         pieces:  list of DownloadPiece.
+        """
+        self.path = path
+        self.key = key
+        self.pieces = pieces
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load_or_create(cls, path, key, spans, filename_fn):
+        """Load the manifest at path if it matches the download, or create a new one.
+
+        Args:
+         path:         path of the manifest file.
+         key:          dict identifying the download.
+         spans:        list of (start_nsec, end_nsec) of the pieces of the download.
+         filename_fn:  function returning the path of the data of a piece, given its index.
+        """
+        directory = os.path.dirname(path)
+        try:
+            with open(path) as infile:
+                value = json.load(infile)
+            if value.get('version') == _MANIFEST_VERSION and value.get('key') == key:
+                pieces = [DownloadPiece.from_json(piece, directory) for piece in value['pieces']]
+                if [(piece.start_nsec, piece.end_nsec) for piece in pieces] == spans:
+                    return cls(path, key, pieces)
+            _LOGGER.info("Ignoring manifest %s of a different download", path)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            _LOGGER.warning("Ignoring unreadable manifest %s: %s", path, err)
+        pieces = [
+            DownloadPiece(index, start_nsec, end_nsec, filename_fn(index))
+            for index, (start_nsec, end_nsec) in enumerate(spans)
+        ]
+        return cls(path, key, pieces)
+
+    def save(self):
+        """Write the manifest, replacing the previous one atomically."""
+        with self._lock:
+            value = {
+                'version': _MANIFEST_VERSION,
+                'key': self.key,
+                'pieces': [piece.to_json() for piece in self.pieces],
+            }
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as outfile:
+                json.dump(value, outfile, indent=1)
+            os.replace(tmp_path, self.path)
+
+
+class ParallelDownloader:  # pylint: disable=too-many-instance-attributes
+    """Downloads a time span of data in pieces, over a bounded number of parallel connections."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, make_request, directory, suffix='', max_connections=DEFAULT_MAX_CONNECTIONS,
+            max_retries=DEFAULT_MAX_RETRIES, retry_delay_sec=DEFAULT_RETRY_DELAY_SEC,
+            timeout=REQUEST_TIMEOUT, validate=None, ssl_context=None):
+        """
+        Args:
+         make_request:     function make_request(start_nsec, end_nsec) returning the
+                            urllib.request.Request for the data in that time span.
+         directory:        directory in which the pieces and the manifest are written.
+         suffix:           file name suffix of each piece (e.g., '.bddf').
+         max_connections:  maximum number of pieces downloaded at the same time.
+         max_retries:      number of times a failed piece is retried before giving up.
+         retry_delay_sec:  delay before the first retry of a piece, doubled on each retry.
+         timeout:          timeout of each request, in seconds.
+         validate:         optional function validate(path) called on the downloaded data of
+                            each piece, which raises an exception if the data is not valid.
+         ssl_context:      SSLContext for https requests (default: unverified, as the robot
+                            uses a self-signed certificate).
+        """
+        self._make_request = make_request
+        self._directory = directory
+        self._suffix = suffix
+        self._max_connections = max(1, max_connections)
+        self._max_retries = max_retries
+        self._retry_delay_sec = retry_delay_sec
+        self._timeout = timeout
+        self._validate = validate
+        # pylint: disable=protected-access
+        self._ssl_context = ssl_context or ssl._create_unverified_context()
+        self._manifest = None
+        self.on_piece_done = None  # Optional callback on_piece_done(piece).
+
+    @property
+    def manifest(self):
+        """The DownloadManifest of the last download, or None."""
+        return self._manifest
+
+    def piece_filename(self, index):
+        """Return the path of the data of the piece with the given index."""
+        return os.path.join(self._directory, 'piece-{:05d}{}'.format(index, self._suffix))
+
+    def download(self, start_nsec, end_nsec, piece_nsec, align_nsec=1, key=None):
+        """Download the data in [start_nsec, end_nsec), resuming a previous download if possible.
+
+        Args:
+         start_nsec:  start of the time span.
+         end_nsec:    end of the time span.
+         piece_nsec:  maximum duration of the time span of each piece.
+         align_nsec:  boundaries between pieces are multiples of this.
+         key:         optional JSON-serializable dict identifying the query, stored in the
+                       manifest.
+
+        Returns: list of DownloadPiece, in time order.
+
+        Raises DownloadError if any piece could not be downloaded.  The pieces which were
+         downloaded are kept, so calling download() again only downloads the missing pieces.
+        """
+        os.makedirs(self._directory, exist_ok=True)
+        spans = split_time_span(start_nsec, end_nsec, piece_nsec, align_nsec)
+        manifest_key = dict(key or {}, piece_nsec=piece_nsec, align_nsec=align_nsec)
+        self._manifest = DownloadManifest.load_or_create(
+            os.path.join(self._directory, MANIFEST_FILENAME), manifest_key, spans,
+            self.piece_filename)
+        self._manifest.save()
+        todo = [piece for piece in self._manifest.pieces if not piece.is_complete()]
+        _LOGGER.debug("Downloading %d of %d pieces", len(todo), len(self._manifest.pieces))
+
+        errors = []
+        if todo:
+            with ThreadPoolExecutor(max_workers=min(self._max_connections, len(todo)),
+                                    thread_name_prefix='download') as executor:
+                for piece, error in zip(todo, executor.map(self._download_piece, todo)):
+                    if error is not None:
+                        errors.append('piece {} [{}, {}): {}'.format(piece.index, piece.start_nsec,
+                                                                     piece.end_nsec, error))
+        if errors:
+            raise DownloadError("Failed to download {} of {} pieces: {}".format(
+                len(errors), len(self._manifest.pieces), '; '.join(errors)))
+        return self._manifest.pieces
+
+    def _download_piece(self, piece):
+        """Download one piece, with retries.  Returns None on success, or the last error."""
+        while True:
+            try:
+                self._fetch(piece)
+            except (OSError, http.client.HTTPException, DownloadError, ValueError) as err:
+                if isinstance(err, HTTPError) and not _is_retriable(err):
+                    return err
+                piece.attempts += 1
+                self._manifest.save()
+                if piece.attempts > self._max_retries:
+                    return err
+                delay = self._retry_delay_sec * 2**(piece.attempts - 1)
+                _LOGGER.warning("Download of piece %d failed (%s), retrying in %.1f seconds",
+                                piece.index, err, delay)
+                time.sleep(delay)
+                continue
+            self._manifest.save()
+            if self.on_piece_done:
+                self.on_piece_done(piece)
+            return None
+
+    def _fetch(self, piece):
+        request = self._make_request(piece.start_nsec, piece.end_nsec)
+        tmp_path = piece.filename + '.part'
+        with urlopen(request, context=self._ssl_context, timeout=self._timeout) as resp:
+            if resp.status == 204:
+                piece.status = PIECE_EMPTY
+                piece.nbytes = 0
+                return
+            if resp.status != 200:
+                raise DownloadError("HTTP status {}".format(resp.status))
+            content_length = resp.headers.get('Content-Length')
+            nbytes = 0
+            with open(tmp_path, 'wb') as outfile:
+                while True:
+                    chunk = resp.read(_COPY_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    outfile.write(chunk)
+                    nbytes += len(chunk)
+        if content_length is not None and nbytes != int(content_length):
+            raise DownloadError("Received {} of {} bytes".format(nbytes, content_length))
+        if self._validate:
+            try:
+                self._validate(tmp_path)
+            except Exception as err:  # pylint: disable=broad-except
+                raise DownloadError("Invalid data: {}".format(err)) from err
+        os.replace(tmp_path, piece.filename)
+        piece.status = PIECE_DONE
+        piece.nbytes = nbytes
+
+
+def _is_retriable(http_error):
+    return http_error.code >= 500 or http_error.code in _RETRIABLE_HTTP_CODES
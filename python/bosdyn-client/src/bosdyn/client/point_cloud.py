@@ -79,6 +79,8 @@ class PointCloudClient(BaseClient):
 
     default_service_name = 'point-cloud'
     service_type = 'bosdyn.api.PointCloudService'
+    # The point cloud sources rarely change.
+    cached_response_ttls = {'ListPointCloudSources': 60.0}
 
     def __init__(self):
         super(PointCloudClient, self).__init__(point_cloud_service.PointCloudServiceStub)
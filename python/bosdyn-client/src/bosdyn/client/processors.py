@@ -13,6 +13,9 @@ from bosdyn.util import now_nsec, set_timestamp_from_nsec  # bosdyn-core
 class AddRequestHeader(object):
     """Sets header fields common to all bosdyn.api requests."""
 
+    # Fields of the request written by mutate().
+    mutated_fields = ('header',)
+
     def __init__(self, client_name_func):
         """Constructor, takes function to access the client name to insert into request headers."""
         self.get_client_name = client_name_func
@@ -32,4 +35,4 @@ class AddRequestHeader(object):
         try:
             request.header.CopyFrom(header)
         except AttributeError:
-            pass
\ No newline at end of file
+            pass
@@ -0,0 +1,124 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Cache of the responses of rpcs whose results rarely change."""
+
+import collections
+import concurrent.futures
+import threading
+import time
+
+# Maximum number of responses kept by default.
+DEFAULT_MAX_ENTRIES = 128
+
+_Entry = collections.namedtuple('_Entry', ['future', 'expiration'])
+
+
+class ResponseCache(object):
+    """Thread-safe LRU cache of rpc responses which expire after a time to live.
+
+    Clients list the rpcs which may be cached, with their time to live in seconds, in their
+    cached_response_ttls class attribute.  Set the response_cache of a client to use a cache:
+
+        client.response_cache = ResponseCache()
+
+    Concurrent calls with identical requests share a single rpc ("single-flight"): the first call
+    sends it, and the others wait for its response.  Only responses without errors are cached.
+
+    Keys are (full method name, channel, serialized request) tuples, as made by the client.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, clock=time.monotonic):
+        """
+        Args:
+            max_entries: maximum number of cached responses.  The least recently used are evicted.
+            clock: function returning the current time in seconds.
+        """
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> _Entry, in order of use.  The future of an rpc in progress has no expiration.
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self._lock:
+            return sum(1 for entry in self._entries.values() if entry.expiration is not None)
+
+    def begin(self, key):
+        """Look up the response for key.
+
+        Returns:
+            A (future, is_owner) pair.  If is_owner is False, the future holds the cached response
+            or will hold that of the rpc in progress.  Otherwise the caller must send the rpc, and
+            report its outcome with finish() or abort().
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expiration is None or entry.expiration > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.future, False
+                del self._entries[key]
+            self.misses += 1
+            future = concurrent.futures.Future()
+            self._entries[key] = _Entry(future, None)
+            return future, True
+
+    def finish(self, key, future, response, ttl=None):
+        """Complete the future returned by begin() with response.
+
+        Args:
+            ttl: time to live of the response in seconds, or None not to cache it.
+        """
+        with self._lock:
+            if self._entries.get(key, _Entry(None, None)).future is future:
+                if ttl is None:
+                    del self._entries[key]
+                else:
+                    self._entries[key] = _Entry(future, self._clock() + ttl)
+                    self._evict()
+        future.set_result(response)
+
+    def abort(self, key, future, error):
+        """Complete the future returned by begin() with error, which is not cached."""
+        with self._lock:
+            if self._entries.get(key, _Entry(None, None)).future is future:
+                del self._entries[key]
+        future.set_exception(error)
+
+    def invalidate(self, method=None):
+        """Drop the cached responses of the rpc named method, or all of them.
+
+        method may be the full method name, e.g. '/bosdyn.api.ImageService/ListImageSources', or
+        the name of the rpc alone, e.g. 'ListImageSources', to drop those of every service.
+
+        Rpcs in progress still complete their waiting calls, but their responses are not cached.
+        """
+        with self._lock:
+            if method is None:
+                self._entries.clear()
+            else:
+                suffix = '/' + method
+                for key in list(self._entries):
+                    if key[0] == method or key[0].endswith(suffix):
+                        del self._entries[key]
+
+    def _evict(self):
+        now = self._clock()
+        cached = []
+        for key, entry in list(self._entries.items()):
+            if entry.expiration is None:
+                continue
+            if entry.expiration <= now:
+                del self._entries[key]
+            else:
+                cached.append(key)
+        # The least recently used are first.
+        for key in cached[:max(0, len(cached) - self.max_entries)]:
+            del self._entries[key]
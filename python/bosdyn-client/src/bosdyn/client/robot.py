@@ -5,9 +5,12 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Settings common to a user's access to one robot."""
+import asyncio
 import copy
+import functools
 import logging
 import time
+import weakref
 from typing import Optional
 
 import bosdyn.api.data_buffer_pb2 as data_buffer_protos
@@ -16,6 +19,7 @@ from bosdyn.util import now_sec, timestamp_to_sec
 
 from .auth import AuthClient
 from .channel import DEFAULT_MAX_MESSAGE_LENGTH
+from .channel_pool import LOCAL_SUBCHANNEL_POOL_OPTION, ROUND_ROBIN, ChannelPool
 from .data_buffer import DataBufferClient
 from .data_buffer import log_event as pkg_log_event
 from .directory import DirectoryClient
@@ -35,6 +39,7 @@ from .robot_command import RobotCommandClient
 from .robot_id import RobotIdClient
 from .robot_state import RobotStateClient
 from .robot_state import has_arm as pkg_has_arm
+from .rpc_metrics import RpcMetrics
 from .time_sync import TimeSyncClient, TimeSyncError, TimeSyncThread
 from .token_cache import TokenCache
 from .token_manager import TokenManager
@@ -114,11 +119,18 @@ class Robot(object):
         self._current_user = None
         self.service_clients_by_name = {}
         self.channels_by_authority = {}
+        # grpc.aio channels of the event loop which last used them.
+        self.aio_channels_by_authority = {}
+        self._aio_channels_loop = None
+        # grpc.aio channels of every event loop, {loop -> {authority -> channel}}.
+        self._aio_channels_by_loop = weakref.WeakKeyDictionary()
         self.authorities_by_name = {}
         self._robot_id = None
         self._hardware_config = None
         self._has_arm = None
         self._secure_channel_port = _DEFAULT_SECURE_CHANNEL_PORT
+        # RpcMetrics of the clients, set by enable_rpc_metrics().
+        self.rpc_metrics = None
 
 
         # Things usually updated from an Sdk object.
@@ -140,6 +152,13 @@ class Robot(object):
         self.max_send_message_length = DEFAULT_MAX_MESSAGE_LENGTH
         self.max_receive_message_length = DEFAULT_MAX_MESSAGE_LENGTH
 
+        # Number of channels, each with its own connection, created per authority by
+        # ensure_secure_channel(), and the ChannelPool policy selecting one of them for each rpc.
+        # channel_pool_sizes overrides channel_pool_size for some authorities.
+        self.channel_pool_size = 1
+        self.channel_pool_sizes = {}
+        self.channel_pool_policy = ROUND_ROBIN
+
     def _shutdown(self):
         """Shut down background threads for tokens and time sync."""
         if self._time_sync_thread:
@@ -242,6 +261,12 @@ class Robot(object):
         if channel is None:
             channel = self.ensure_channel(service_name, options=options,
                                           service_endpoint=service_endpoint)
+            # The grpc.aio channel is created by the first "_aio" call, in its event loop.  The
+            # authority is known by now, so that call does not sync with the directory, which is
+            # a blocking rpc.
+            authority = self._authority_for_service(service_name)
+            client.aio_channel_factory = functools.partial(self.ensure_secure_channel_aio,
+                                                           authority, options=options)
 
         client.channel = channel
         client.update_from(self)
@@ -253,6 +278,54 @@ class Robot(object):
         for channel_from_auth in self.channels_by_authority.values():
             channel_from_auth.close()
 
+    async def shutdown_aio(self):
+        """Close the grpc.aio channels created in the running event loop.
+
+        grpc.aio channels can only be closed from the event loop they were created in, so call
+        this in every event loop in which the "_aio" methods of the clients were used, before the
+        loop ends (e.g., at the end of the coroutine passed to asyncio.run()).  Channels of loops
+        which end without it are not closed, only released once the loop is garbage collected.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is self._aio_channels_loop:
+            self.aio_channels_by_authority = {}
+            self._aio_channels_loop = None
+        channels = self._aio_channels_by_loop.pop(loop, {})
+        channels_from_auth = list(channels.values())
+        channels.clear()
+        for channel_from_auth in channels_from_auth:
+            await channel_from_auth.close()
+
+    def enable_rpc_metrics(self, rpc_metrics=None):
+        """Record the latency, payload sizes and errors of the rpcs of the clients of this robot.
+
+        Args:
+            rpc_metrics: RpcMetrics to record to, shared with other robots for example.  By default
+                          a new one is created, unless metrics are already enabled.
+
+        Returns:
+            The RpcMetrics, which can also be exported with a DataBufferRpcMetricsExporter.
+        """
+        self.rpc_metrics = rpc_metrics or self.rpc_metrics or RpcMetrics()
+        for client in self.service_clients_by_name.values():
+            client.rpc_metrics = self.rpc_metrics
+        return self.rpc_metrics
+
+    def disable_rpc_metrics(self):
+        """Stop recording rpc metrics in the clients of this robot."""
+        self.rpc_metrics = None
+        for client in self.service_clients_by_name.values():
+            client.rpc_metrics = None
+
+    def rpc_metrics_snapshot(self):
+        """Return a dict of (service, method) to the RpcMethodMetrics of each method called.
+
+        The dict is empty unless enable_rpc_metrics() was called.
+        """
+        if self.rpc_metrics is None:
+            return {}
+        return self.rpc_metrics.snapshot()
+
     def get_cached_robot_id(self, timeout=None):
         """Return the RobotId proto for this robot, querying it from the robot if not yet cached.
 
@@ -290,23 +363,7 @@ class Robot(object):
             UnregisteredServiceNameError: service_name is unknown.
         """
 
-        # If a specific channel was not set, look up the authority so we can get a channel.
-        # Get the authority from either
-        #   1. The bootstrap authority for this client_class, if available
-        #   2. The authority of a registered service with matching service_name in DirectoryService
-        authority = Robot._bootstrap_service_authorities.get(service_name)
-
-        # Attempt to get authority from the robot Directory Service by name
-        if not authority:
-            authority = self.authorities_by_name.get(service_name)
-            if not authority:
-                self.sync_with_directory()
-                authority = self.authorities_by_name.get(service_name)
-
-        # If authority still not known, then the service name has not been registered.
-        if not authority:
-            raise UnregisteredServiceNameError(service_name)
-
+        authority = self._authority_for_service(service_name)
         return self.ensure_secure_channel(authority, options=options)
 
     def ensure_secure_channel(self, authority, options=[]):
@@ -323,14 +380,95 @@ class Robot(object):
         # Channel doesn't exist, so create it.
         creds = bosdyn.client.channel.create_secure_channel_creds(self.cert,
                                                                   lambda: self.user_token)
-        channel = bosdyn.client.channel.create_secure_channel(self.address,
-                                                              self._secure_channel_port, creds,
-                                                              authority, options=options)
-        self.logger.debug('Created channel to %s at port %i with authority %s', self.address,
-                          self._secure_channel_port, authority)
+        pool_size = self.channel_pool_sizes.get(authority, self.channel_pool_size)
+        if pool_size > 1:
+            channel = ChannelPool([
+                bosdyn.client.channel.create_secure_channel(
+                    self.address, self._secure_channel_port, creds, authority,
+                    options=options + [LOCAL_SUBCHANNEL_POOL_OPTION]) for _ in range(pool_size)
+            ], policy=self.channel_pool_policy)
+        else:
+            channel = bosdyn.client.channel.create_secure_channel(self.address,
+                                                                  self._secure_channel_port, creds,
+                                                                  authority, options=options)
+        self.logger.debug('Created %i channel(s) to %s at port %i with authority %s', pool_size,
+                          self.address, self._secure_channel_port, authority)
         self.channels_by_authority[authority] = channel
         return channel
 
+    def ensure_channel_aio(self, service_name, options=[]):
+        """Get the grpc.aio channel to access the given service, creating it if it doesn't exist.
+
+        grpc.aio channels are used by the "_aio" methods of the clients.  They are bound to the
+         asyncio event loop running when they are created, so this must be called from a
+         coroutine, and new channels are created if it is called from another event loop.
+        If the authority of the service is not known yet, this syncs with the directory with a
+         blocking rpc, which blocks the event loop.  Clients from ensure_client() do not need this.
+
+        Args:
+            service_name: Name of the service in the directory.
+        Returns:
+            Existing grpc.aio channel if found, or newly created channel if not found.
+        Raises:
+            RpcError: There was a problem communicating with the robot.
+            UnregisteredServiceNameError: service_name is unknown.
+        """
+        authority = self._authority_for_service(service_name)
+        return self.ensure_secure_channel_aio(authority, options=options)
+
+    def ensure_secure_channel_aio(self, authority, options=[]):
+        """Get the grpc.aio channel to access the given authority, creating it if it doesn't
+        exist."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._aio_channels_loop:
+            # Channels are bound to the event loop they were created in.  Those of other loops are
+            # kept, to be closed by shutdown_aio() in their loop.
+            self.aio_channels_by_authority = self._aio_channels_by_loop.setdefault(loop, {})
+            self._aio_channels_loop = loop
+        if authority in self.aio_channels_by_authority:
+            return self.aio_channels_by_authority[authority]
+
+        options = list(options)
+        if 'grpc.max_receive_message_length' not in [option[0] for option in options]:
+            options.append(('grpc.max_receive_message_length', self.max_receive_message_length))
+        if 'grpc.max_send_message_length' not in [option[0] for option in options]:
+            options.append(('grpc.max_send_message_length', self.max_send_message_length))
+
+        creds = bosdyn.client.channel.create_secure_channel_creds(self.cert,
+                                                                  lambda: self.user_token)
+        channel = bosdyn.client.channel.create_secure_channel_aio(self.address,
+                                                                  self._secure_channel_port, creds,
+                                                                  authority, options=options)
+        self.logger.debug('Created aio channel to %s at port %i with authority %s', self.address,
+                          self._secure_channel_port, authority)
+        self.aio_channels_by_authority[authority] = channel
+        return channel
+
+    def _authority_for_service(self, service_name):
+        """Return the authority of the given service.
+
+        Raises:
+            RpcError: There was a problem communicating with the robot.
+            UnregisteredServiceNameError: service_name is unknown.
+        """
+        # Get the authority from either
+        #   1. The bootstrap authority for this client_class, if available
+        #   2. The authority of a registered service with matching service_name in DirectoryService
+        authority = Robot._bootstrap_service_authorities.get(service_name)
+
+        # Attempt to get authority from the robot Directory Service by name
+        if not authority:
+            authority = self.authorities_by_name.get(service_name)
+            if not authority:
+                self.sync_with_directory()
+                authority = self.authorities_by_name.get(service_name)
+
+        # If authority still not known, then the service name has not been registered.
+        if not authority:
+            raise UnregisteredServiceNameError(service_name)
+
+        return authority
+
 
     def authenticate(
             self,
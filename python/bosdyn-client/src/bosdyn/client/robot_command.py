@@ -372,6 +372,15 @@ class RobotCommandClient(BaseClient):
         return self.call_async(self._stub.RobotCommand, req, _robot_command_value,
                                _robot_command_error, copy_request=False, **kwargs)
 
+    async def robot_command_aio(self, command, end_time_secs=None, timesync_endpoint=None,
+                                lease=None, **kwargs):
+        """asyncio version of robot_command()."""
+        req = self._get_robot_command_request(lease, command)
+        # Update req.command instead of command so that we don't modify an input to this function.
+        self._update_command_timestamps(req.command, end_time_secs, timesync_endpoint)
+        return await self.call_aio(self._aio_stub.RobotCommand, req, _robot_command_value,
+                                   _robot_command_error, copy_request=False, **kwargs)
+
     def robot_command_feedback(self, robot_command_id, **kwargs):
         """Get feedback from a previously issued command.
 
@@ -400,6 +409,12 @@ class RobotCommandClient(BaseClient):
         return self.call_async(self._stub.RobotCommandFeedback, req, None,
                                _robot_command_feedback_error, copy_request=False, **kwargs)
 
+    async def robot_command_feedback_aio(self, robot_command_id, **kwargs):
+        """asyncio version of robot_command_feedback()."""
+        req = self._get_robot_command_feedback_request(robot_command_id)
+        return await self.call_aio(self._aio_stub.RobotCommandFeedback, req, None,
+                                   _robot_command_feedback_error, copy_request=False, **kwargs)
+
 
     def clear_behavior_fault(self, behavior_fault_id, lease=None, **kwargs):
         """Clear a behavior fault on the robot.
@@ -441,6 +456,13 @@ class RobotCommandClient(BaseClient):
         return self.call_async(self._stub.ClearBehaviorFault, req, _clear_behavior_fault_value,
                                _clear_behavior_fault_error, copy_request=False, **kwargs)
 
+    async def clear_behavior_fault_aio(self, behavior_fault_id, lease=None, **kwargs):
+        """asyncio version of clear_behavior_fault()."""
+        req = self._get_clear_behavior_fault_request(lease, behavior_fault_id)
+        return await self.call_aio(self._aio_stub.ClearBehaviorFault, req,
+                                   _clear_behavior_fault_value, _clear_behavior_fault_error,
+                                   copy_request=False, **kwargs)
+
     def _get_robot_command_request(self, lease, command):
         """Create RobotCommandRequest message from the given information.
 
@@ -14,6 +14,8 @@ class RobotStateClient(BaseClient):
     """Client for the RobotState service."""
     default_service_name = 'robot-state'
     service_type = 'bosdyn.api.RobotStateService'
+    # The hardware configuration does not change while the robot is running.
+    cached_response_ttls = {'GetRobotHardwareConfiguration': 600.0}
 
     def __init__(self):
         super(RobotStateClient, self).__init__(robot_state_service_pb2_grpc.RobotStateServiceStub)
@@ -37,6 +39,12 @@ class RobotStateClient(BaseClient):
         return self.call_async(self._stub.GetRobotState, req, _get_robot_state_value,
                                common_header_errors, copy_request=False, **kwargs)
 
+    async def get_robot_state_aio(self, **kwargs):
+        """asyncio version of get_robot_state()"""
+        req = self._get_robot_state_request()
+        return await self.call_aio(self._aio_stub.GetRobotState, req, _get_robot_state_value,
+                                   common_header_errors, copy_request=False, **kwargs)
+
     def get_robot_metrics(self, **kwargs):
         """Obtain robot metrics, such as distance traveled or time powered on.
 
@@ -56,6 +64,12 @@ class RobotStateClient(BaseClient):
         return self.call_async(self._stub.GetRobotMetrics, req, _get_robot_metrics_value,
                                common_header_errors, copy_request=False, **kwargs)
 
+    async def get_robot_metrics_aio(self, **kwargs):
+        """asyncio version of get_robot_metrics()"""
+        req = self._get_robot_metrics_request()
+        return await self.call_aio(self._aio_stub.GetRobotMetrics, req, _get_robot_metrics_value,
+                                   common_header_errors, copy_request=False, **kwargs)
+
     def get_robot_hardware_configuration(self, **kwargs):
         """Obtain current hardware configuration of robot.
 
@@ -77,6 +91,13 @@ class RobotStateClient(BaseClient):
                                _get_robot_hardware_configuration_value, common_header_errors,
                                copy_request=False, **kwargs)
 
+    async def get_robot_hardware_configuration_aio(self, **kwargs):
+        """asyncio version of get_robot_hardware_configuration()"""
+        req = self._get_robot_hardware_configuration_request()
+        return await self.call_aio(self._aio_stub.GetRobotHardwareConfiguration, req,
+                                   _get_robot_hardware_configuration_value, common_header_errors,
+                                   copy_request=False, **kwargs)
+
     def get_robot_link_model(self, link_name, **kwargs):
         """Obtain link model OBJ for a specific link.
 
@@ -99,6 +120,13 @@ class RobotStateClient(BaseClient):
         return self.call_async(self._stub.GetRobotLinkModel, req, _get_robot_link_model_value,
                                common_header_errors, copy_request=False, **kwargs)
 
+    async def get_robot_link_model_aio(self, link_name, **kwargs):
+        """asyncio version of get_robot_link_model()"""
+        req = self._get_robot_link_model_request(link_name)
+        return await self.call_aio(self._aio_stub.GetRobotLinkModel, req,
+                                   _get_robot_link_model_value, common_header_errors,
+                                   copy_request=False, **kwargs)
+
     def get_hardware_config_with_link_info(self):
         """Convenience function which first requests a robot's hardware configuration followed by
         requests to get link models for all robot links.
@@ -146,6 +174,12 @@ class RobotStateStreamingClient(BaseClient):
         req = self._get_robot_state_stream_request()
         return self._stub.GetRobotStateStream(req)
 
+    def get_robot_state_stream_aio(self, **kwargs):
+        """Returns an async iterator providing current state updates of the robot, from grpc.aio."""
+        req = self._get_robot_state_stream_request()
+        return self.call_aio_streaming(self._aio_stub.GetRobotStateStream, req, copy_request=False,
+                                       **kwargs)
+
     @staticmethod
     def _get_robot_state_stream_request():
         return robot_state_pb2.RobotStateStreamRequest()
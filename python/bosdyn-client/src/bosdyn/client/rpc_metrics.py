@@ -0,0 +1,288 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Latency, payload size, and error metrics of the rpcs made by clients, per rpc method."""
+
+import bisect
+import collections
+import struct
+import threading
+import time
+
+import bosdyn.api.data_buffer_pb2 as data_buffer_protos
+
+# Upper bounds, in seconds, of the buckets of the latency histograms.  A last bucket counts the
+#  latencies above the largest bound.
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0,
+                           10.0)
+
+
+class RpcMethodMetrics(
+        collections.namedtuple('RpcMethodMetrics', [
+            'service', 'method', 'calls', 'errors', 'in_flight', 'request_bytes', 'response_bytes',
+            'latency_sum', 'latency_max', 'latency_buckets', 'latency_counts'
+        ])):
+    """Snapshot of the metrics of one rpc method.
+
+    calls and errors count the completed calls, and the calls among them which raised.
+    request_bytes and response_bytes are the serialized sizes of all the messages sent and received.
+    latency_counts[i] is the number of calls which took at most latency_buckets[i] seconds, and more
+     than the previous bound.  Its last element counts the calls above the largest bound.
+    """
+    __slots__ = ()
+
+    @property
+    def latency_mean(self):
+        """Mean latency of the completed calls in seconds, or 0 if there are none."""
+        return self.latency_sum / self.calls if self.calls else 0.0
+
+    def latency_quantile(self, quantile):
+        """Estimate a latency quantile from the histogram, as the upper bound of its bucket.
+
+        Args:
+            quantile: quantile between 0 and 1, e.g. 0.99.
+
+        Returns:
+            The latency in seconds, at most latency_max, or 0 if there are no completed calls.
+        """
+        if not self.calls:
+            return 0.0
+        rank = quantile * self.calls
+        cumulative = 0
+        for bound, count in zip(self.latency_buckets, self.latency_counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, self.latency_max)
+        return self.latency_max
+
+
+class _MethodStats(object):
+    __slots__ = ('calls', 'errors', 'in_flight', 'request_bytes', 'response_bytes', 'latency_sum',
+                 'latency_max', 'latency_counts')
+
+    def __init__(self, num_buckets):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.latency_counts = [0] * (num_buckets + 1)
+
+
+class ActiveRpc(object):
+    """An rpc in progress, returned by RpcMetrics.rpc_started()."""
+
+    __slots__ = ('_metrics', '_stats', '_start', '_request_bytes', '_response_bytes', '_finished')
+
+    def __init__(self, metrics, stats):
+        self._metrics = metrics
+        self._stats = stats
+        self._start = time.perf_counter()
+        self._request_bytes = 0
+        self._response_bytes = 0
+        self._finished = False
+
+    def add_request(self, request):
+        """Count the size of a request message."""
+        if self._metrics.measure_sizes and request is not None:
+            self._request_bytes += request.ByteSize()
+
+    def add_response(self, response):
+        """Count the size of a response message, or of a list of streamed response messages.
+
+        Streamed responses may still be read after the rpc finished, in which case their sizes
+        are added to the metrics directly.
+        """
+        if not self._metrics.measure_sizes or response is None:
+            return
+        if isinstance(response, list):
+            response_bytes = sum(resp.ByteSize() for resp in response)
+        else:
+            response_bytes = response.ByteSize()
+        if self._finished:
+            self._metrics._add_response_bytes(self._stats, response_bytes)
+        else:
+            self._response_bytes += response_bytes
+
+    def requests(self, request_iterator):
+        """Yield the requests of request_iterator, counting their sizes."""
+        for request in request_iterator:
+            self.add_request(request)
+            yield request
+
+    def finished(self, error=None):
+        """Record the end of the rpc, and whether it raised error."""
+        latency = time.perf_counter() - self._start
+        is_error = error is not None
+        self._finished = True
+        self._metrics._record(self._stats, latency, self._request_bytes, self._response_bytes,
+                              is_error)
+
+
+class RpcMetrics(object):
+    """Thread-safe collection of the metrics of the rpcs of clients, by service and method.
+
+    Assign it to the rpc_metrics attribute of clients, e.g. with Robot.enable_rpc_metrics(), and
+    read it with snapshot().
+    """
+
+    def __init__(self, latency_buckets=DEFAULT_LATENCY_BUCKETS, measure_sizes=True):
+        """
+        Args:
+            latency_buckets: increasing upper bounds in seconds of the buckets of the latency
+                              histograms.
+            measure_sizes: whether to compute the serialized sizes of requests and responses.
+        """
+        self.latency_buckets = tuple(latency_buckets)
+        self.measure_sizes = measure_sizes
+        self._lock = threading.Lock()
+        # (service, method) -> _MethodStats
+        self._stats_by_method = {}
+        # Full method name, as given to rpc_started() -> (service, method)
+        self._names = {}
+
+    def rpc_started(self, full_method, request=None):
+        """Record the start of an rpc.
+
+        Args:
+            full_method: full name of the rpc method,
+                          e.g. '/bosdyn.api.RobotStateService/GetRobotState'.
+            request: request message, or None for a streamed request.
+
+        Returns:
+            ActiveRpc, on which finished() must be called when the rpc completes.
+        """
+        key = self._names.get(full_method)
+        if key is None:
+            key = _split_method_name(full_method)
+            self._names[full_method] = key
+        with self._lock:
+            stats = self._stats_by_method.get(key)
+            if stats is None:
+                stats = _MethodStats(len(self.latency_buckets))
+                self._stats_by_method[key] = stats
+            stats.in_flight += 1
+        rpc = ActiveRpc(self, stats)
+        rpc.add_request(request)
+        return rpc
+
+    def snapshot(self):
+        """Return a dict of (service, method) to the RpcMethodMetrics of each method called."""
+        with self._lock:
+            return {
+                key:
+                    RpcMethodMetrics(key[0], key[1], stats.calls, stats.errors, stats.in_flight,
+                                     stats.request_bytes, stats.response_bytes, stats.latency_sum,
+                                     stats.latency_max, self.latency_buckets,
+                                     tuple(stats.latency_counts))
+                for key, stats in self._stats_by_method.items()
+            }
+
+    def reset(self):
+        """Clear the metrics of completed calls."""
+        with self._lock:
+            for stats in self._stats_by_method.values():
+                in_flight = stats.in_flight
+                stats.__init__(len(self.latency_buckets))
+                stats.in_flight = in_flight
+
+    def _add_response_bytes(self, stats, response_bytes):
+        with self._lock:
+            stats.response_bytes += response_bytes
+
+    def _record(self, stats, latency, request_bytes, response_bytes, is_error):
+        bucket = bisect.bisect_left(self.latency_buckets, latency)
+        with self._lock:
+            stats.in_flight -= 1
+            stats.calls += 1
+            if is_error:
+                stats.errors += 1
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            stats.latency_sum += latency
+            stats.latency_max = max(stats.latency_max, latency)
+            stats.latency_counts[bucket] += 1
+
+
+def _split_method_name(full_method):
+    if isinstance(full_method, bytes):
+        full_method = full_method.decode()
+    service, _, method = str(full_method).lstrip('/').rpartition('/')
+    return service, method
+
+
+class DataBufferRpcMetricsExporter(object):
+    """Records the RpcMetrics of a process as signal ticks in the robot's data buffer.
+
+    Each rpc method has its own signal schema, named schema_prefix + 'service/method', with the
+    variables in VARIABLES.  Call export() periodically to chart the metrics.
+    """
+
+    VARIABLES = (
+        ('calls', data_buffer_protos.SignalSchema.Variable.TYPE_UINT64),
+        ('errors', data_buffer_protos.SignalSchema.Variable.TYPE_UINT64),
+        ('in_flight', data_buffer_protos.SignalSchema.Variable.TYPE_INT64),
+        ('request_bytes', data_buffer_protos.SignalSchema.Variable.TYPE_UINT64),
+        ('response_bytes', data_buffer_protos.SignalSchema.Variable.TYPE_UINT64),
+        ('latency_mean', data_buffer_protos.SignalSchema.Variable.TYPE_FLOAT64),
+        ('latency_p50', data_buffer_protos.SignalSchema.Variable.TYPE_FLOAT64),
+        ('latency_p99', data_buffer_protos.SignalSchema.Variable.TYPE_FLOAT64),
+        ('latency_max', data_buffer_protos.SignalSchema.Variable.TYPE_FLOAT64),
+    )
+    # Little-endian encoding of the VARIABLES, as expected by SignalTick.ENCODING_RAW.
+    _TICK_STRUCT = struct.Struct('<QQqQQdddd')
+
+    def __init__(self, data_buffer_client, rpc_metrics, source='bosdyn-client',
+                 schema_prefix='rpc_metrics/'):
+        """
+        Args:
+            data_buffer_client: DataBufferClient used to record the ticks.
+            rpc_metrics: RpcMetrics to export.
+            source: source name of the ticks.
+            schema_prefix: prefix of the names of the signal schemas.
+        """
+        self.data_buffer_client = data_buffer_client
+        self.rpc_metrics = rpc_metrics
+        self.source = source
+        self.schema_prefix = schema_prefix
+        # (service, method) -> schema id
+        self._schema_ids = {}
+        self._sequence_id = 0
+
+    def export(self, **kwargs):
+        """Record a tick of the current metrics of each rpc method, registering schemas as needed.
+
+        Returns:
+            The number of ticks recorded.
+
+        Raises:
+            RpcError: Problem communicating with the robot.
+        """
+        snapshot = self.rpc_metrics.snapshot()
+        for key, metrics in sorted(snapshot.items()):
+            schema_id = self._schema_ids.get(key)
+            if schema_id is None:
+                schema_id = self._register_schema(key, **kwargs)
+            data = self._TICK_STRUCT.pack(metrics.calls, metrics.errors, metrics.in_flight,
+                                          metrics.request_bytes, metrics.response_bytes,
+                                          metrics.latency_mean, metrics.latency_quantile(0.5),
+                                          metrics.latency_quantile(0.99), metrics.latency_max)
+            self.data_buffer_client.add_signal_tick(data, schema_id, sequence_id=self._sequence_id,
+                                                    source=self.source, **kwargs)
+        self._sequence_id += 1
+        return len(snapshot)
+
+    def _register_schema(self, key, **kwargs):
+        variables = [
+            data_buffer_protos.SignalSchema.Variable(name=name, type=var_type)
+            for name, var_type in self.VARIABLES
+        ]
+        schema_id = self.data_buffer_client.register_signal_schema(
+            variables, '{}{}/{}'.format(self.schema_prefix, *key), **kwargs)
+        self._schema_ids[key] = schema_id
+        return schema_id
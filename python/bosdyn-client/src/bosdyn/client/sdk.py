@@ -8,63 +8,21 @@
 
 import datetime
 import glob
+import importlib
 import importlib.resources
+import importlib.util
 import logging
 import os
 import platform
 from enum import Enum
 
-import jwt
 from deprecated.sphinx import deprecated
 
-from .arm_surface_contact import ArmSurfaceContactClient
-from .auth import AuthClient
-from .auto_return import AutoReturnClient
-from .autowalk import AutowalkClient
 from .channel import DEFAULT_MAX_MESSAGE_LENGTH
-from .data_acquisition import DataAcquisitionClient
-from .data_acquisition_store import DataAcquisitionStoreClient
-from .data_buffer import DataBufferClient
-from .data_service import DataServiceClient
-from .directory import DirectoryClient
-from .directory_registration import DirectoryRegistrationClient
-from .docking import DockingClient
-from .door import DoorClient
-from .estop import EstopClient
 from .exceptions import Error
-from .fault import FaultClient
-from .gps.aggregator_client import AggregatorClient
-from .gps.registration_client import RegistrationClient
-from .graph_nav import GraphNavClient
-from .gripper_camera_param import GripperCameraParamClient
-from .image import ImageClient
-from .inverse_kinematics import InverseKinematicsClient
-from .ir_enable_disable import IREnableDisableServiceClient
-from .keepalive import KeepaliveClient
-from .lease import LeaseClient
-from .license import LicenseClient
-from .local_grid import LocalGridClient
-from .log_status import LogStatusClient
-from .manipulation_api_client import ManipulationApiClient
-from .map_processing import MapProcessingServiceClient
-from .metrics_logging import MetricsLoggingClient
-from .network_compute_bridge_client import NetworkComputeBridgeClient
-from .payload import PayloadClient
-from .payload_registration import PayloadRegistrationClient
-from .point_cloud import PointCloudClient
-from .power import PowerClient
+from .executor import default_executor
 from .processors import AddRequestHeader
-from .ray_cast import RayCastClient
-from .recording import GraphNavRecordingServiceClient
 from .robot import Robot
-from .robot_command import RobotCommandClient
-from .robot_id import RobotIdClient
-from .robot_state import RobotStateClient
-from .spot_check import SpotCheckClient
-from .time_sync import TimeSyncClient
-from .world_object import WorldObjectClient
-
-from .audio_visual import AudioVisualClient  # isort:skip
 
 
 class SdkError(Error):
@@ -87,10 +45,10 @@ BOSDYN_RESOURCE_ROOT = os.environ.get('BOSDYN_RESOURCE_ROOT',
 
 def generate_client_name(prefix=''):
     """Returns a descriptive client name for API clients with an optional prefix."""
-    import bosdyn.client.__main__
+    # Find the module without running it, which would import the whole command line.
+    main_spec = importlib.util.find_spec('bosdyn.client.__main__')
     try:
-        process_info = '{}-{}'.format(os.path.basename(bosdyn.client.__main__.__file__),
-                                      os.getpid())
+        process_info = '{}-{}'.format(os.path.basename(main_spec.origin), os.getpid())
     except AttributeError:
         process_info = '{}'.format(os.getpid())
     machine_name = platform.node()
@@ -106,52 +64,130 @@ def generate_client_name(prefix=''):
     return '{}{}:{}'.format(prefix, machine_name or user_name, process_info)
 
 
+class LazyServiceClient(object):
+    """Creation function of a service client, which imports the module of the client on first use.
+
+    Registering it with Sdk.register_service_client() makes the service known without importing
+    the client and its protos, which are only imported by the first Robot.ensure_client() for it:
+
+        sdk.register_service_client(
+            LazyServiceClient('bosdyn.client.image', 'ImageClient', 'image',
+                              'bosdyn.api.ImageService'))
+
+    Args:
+        module_name: Full name of the module of the client, e.g. 'bosdyn.client.image'.
+        class_name: Name of the client class in the module.
+        default_service_name: default_service_name of the client class.
+        service_type: service_type of the client class.
+    """
+
+    def __init__(self, module_name, class_name, default_service_name, service_type):
+        self.module_name = module_name
+        self.class_name = class_name
+        self.default_service_name = default_service_name
+        self.service_type = service_type
+
+    def load(self):
+        """Import the module of the client, and return the client class."""
+        return getattr(importlib.import_module(self.module_name), self.class_name)
+
+    def __call__(self):
+        return self.load()()
+
+    def __repr__(self):
+        return 'LazyServiceClient({}.{})'.format(self.module_name, self.class_name)
+
+
+# Service clients registered by create_standard_sdk().
 _DEFAULT_SERVICE_CLIENTS = [
-    AggregatorClient,
-    ArmSurfaceContactClient,
-    AuthClient,
-    AutoReturnClient,
-    AutowalkClient,
-    AudioVisualClient,
-    DataAcquisitionClient,
-    DataAcquisitionStoreClient,
-    DataBufferClient,
-    DataServiceClient,
-    DirectoryClient,
-    DirectoryRegistrationClient,
-    DockingClient,
-    DoorClient,
-    EstopClient,
-    FaultClient,
-    GraphNavClient,
-    GraphNavRecordingServiceClient,
-    GripperCameraParamClient,
-    ImageClient,
-    IREnableDisableServiceClient,
-    LeaseClient,
-    KeepaliveClient,
-    LicenseClient,
-    LogStatusClient,
-    LocalGridClient,
-    ManipulationApiClient,
-    MapProcessingServiceClient,
-    NetworkComputeBridgeClient,
-    PayloadClient,
-    PayloadRegistrationClient,
-    PointCloudClient,
-    PowerClient,
-    RayCastClient,
-    RegistrationClient,
-    RobotCommandClient,
-    RobotIdClient,
-    RobotStateClient,
-    SpotCheckClient,
-    InverseKinematicsClient,
-    TimeSyncClient,
-    WorldObjectClient,
+    LazyServiceClient('bosdyn.client.gps.aggregator_client', 'AggregatorClient', 'gps-aggregator',
+                      'bosdyn.api.gps.AggregatorService'),
+    LazyServiceClient('bosdyn.client.arm_surface_contact', 'ArmSurfaceContactClient',
+                      'arm-surface-contact', 'bosdyn.api.ArmSurfaceContactService'),
+    LazyServiceClient('bosdyn.client.auth', 'AuthClient', 'auth', 'bosdyn.api.AuthService'),
+    LazyServiceClient('bosdyn.client.auto_return', 'AutoReturnClient', 'auto-return',
+                      'bosdyn.api.auto_return.AutoReturnService'),
+    LazyServiceClient('bosdyn.client.autowalk', 'AutowalkClient', 'autowalk-service',
+                      'bosdyn.api.autowalk.AutowalkService'),
+    LazyServiceClient('bosdyn.client.audio_visual', 'AudioVisualClient', 'audio-visual',
+                      'bosdyn.api.AudioVisualService'),
+    LazyServiceClient('bosdyn.client.data_acquisition', 'DataAcquisitionClient', 'data-acquisition',
+                      'bosdyn.api.DataAcquisitionService'),
+    LazyServiceClient('bosdyn.client.data_acquisition_store', 'DataAcquisitionStoreClient',
+                      'data-acquisition-store', 'bosdyn.api.DataAcquisitionStoreService'),
+    LazyServiceClient('bosdyn.client.data_buffer', 'DataBufferClient', 'data-buffer',
+                      'bosdyn.api.DataBufferService'),
+    LazyServiceClient('bosdyn.client.data_service', 'DataServiceClient', 'data',
+                      'bosdyn.api.DataService'),
+    LazyServiceClient('bosdyn.client.directory', 'DirectoryClient', 'directory',
+                      'bosdyn.api.DirectoryService'),
+    LazyServiceClient('bosdyn.client.directory_registration', 'DirectoryRegistrationClient',
+                      'directory-registration', 'bosdyn.api.DirectoryRegistrationService'),
+    LazyServiceClient('bosdyn.client.docking', 'DockingClient', 'docking',
+                      'bosdyn.api.docking.DockingService'),
+    LazyServiceClient('bosdyn.client.door', 'DoorClient', 'door', 'bosdyn.api.spot.DoorService'),
+    LazyServiceClient('bosdyn.client.estop', 'EstopClient', 'estop', 'bosdyn.api.EstopService'),
+    LazyServiceClient('bosdyn.client.fault', 'FaultClient', 'fault', 'bosdyn.api.FaultService'),
+    LazyServiceClient('bosdyn.client.graph_nav', 'GraphNavClient', 'graph-nav-service',
+                      'bosdyn.api.graph_nav.GraphNavService'),
+    LazyServiceClient('bosdyn.client.recording', 'GraphNavRecordingServiceClient',
+                      'recording-service', 'bosdyn.api.graph_nav.GraphNavRecordingService'),
+    LazyServiceClient('bosdyn.client.gripper_camera_param', 'GripperCameraParamClient',
+                      'gripper-camera-param', 'bosdyn.api.GripperCameraParamService'),
+    LazyServiceClient('bosdyn.client.image', 'ImageClient', 'image', 'bosdyn.api.ImageService'),
+    LazyServiceClient('bosdyn.client.ir_enable_disable', 'IREnableDisableServiceClient',
+                      'ir-enable-disable-service', 'bosdyn.api.IREnableDisableService'),
+    LazyServiceClient('bosdyn.client.lease', 'LeaseClient', 'lease', 'bosdyn.api.LeaseService'),
+    LazyServiceClient('bosdyn.client.keepalive', 'KeepaliveClient', 'keepalive',
+                      'bosdyn.api.keepalive.KeepaliveService'),
+    LazyServiceClient('bosdyn.client.license', 'LicenseClient', 'license',
+                      'bosdyn.api.LicenseService'),
+    LazyServiceClient('bosdyn.client.log_status', 'LogStatusClient', 'log-status',
+                      'bosdyn.api.log_status.LogStatusService'),
+    LazyServiceClient('bosdyn.client.local_grid', 'LocalGridClient', 'local-grid-service',
+                      'bosdyn.api.LocalGridService'),
+    LazyServiceClient('bosdyn.client.manipulation_api_client', 'ManipulationApiClient',
+                      'manipulation', 'bosdyn.api.ManipulationApiService'),
+    LazyServiceClient('bosdyn.client.map_processing', 'MapProcessingServiceClient',
+                      'map-processing-service', 'bosdyn.api.graph_nav.MapProcessingService'),
+    LazyServiceClient('bosdyn.client.network_compute_bridge_client', 'NetworkComputeBridgeClient',
+                      'network-compute-bridge', 'bosdyn.api.NetworkComputeBridge'),
+    LazyServiceClient('bosdyn.client.payload', 'PayloadClient', 'payload',
+                      'bosdyn.api.PayloadService'),
+    LazyServiceClient('bosdyn.client.payload_registration', 'PayloadRegistrationClient',
+                      'payload-registration', 'bosdyn.api.PayloadRegistrationService'),
+    LazyServiceClient('bosdyn.client.point_cloud', 'PointCloudClient', 'point-cloud',
+                      'bosdyn.api.PointCloudService'),
+    LazyServiceClient('bosdyn.client.power', 'PowerClient', 'power', 'bosdyn.api.PowerService'),
+    LazyServiceClient('bosdyn.client.ray_cast', 'RayCastClient', 'ray-cast',
+                      'bosdyn.api.RayCastService'),
+    LazyServiceClient('bosdyn.client.gps.registration_client', 'RegistrationClient',
+                      'gps-registration', 'bosdyn.api.gps.RegistrationService'),
+    LazyServiceClient('bosdyn.client.robot_command', 'RobotCommandClient', 'robot-command',
+                      'bosdyn.api.RobotCommandService'),
+    LazyServiceClient('bosdyn.client.robot_id', 'RobotIdClient', 'robot-id',
+                      'bosdyn.api.RobotIdService'),
+    LazyServiceClient('bosdyn.client.robot_state', 'RobotStateClient', 'robot-state',
+                      'bosdyn.api.RobotStateService'),
+    LazyServiceClient('bosdyn.client.spot_check', 'SpotCheckClient', 'spot-check',
+                      'bosdyn.api.spot.SpotCheckService'),
+    LazyServiceClient('bosdyn.client.inverse_kinematics', 'InverseKinematicsClient',
+                      'inverse-kinematics', 'bosdyn.api.spot.InverseKinematicsService'),
+    LazyServiceClient('bosdyn.client.time_sync', 'TimeSyncClient', 'time-sync',
+                      'bosdyn.api.TimeSyncService'),
+    LazyServiceClient('bosdyn.client.world_object', 'WorldObjectClient', 'world-objects',
+                      'bosdyn.api.WorldObjectService'),
 ]
 
 
+def __getattr__(name):
+    # The default service client classes used to be imported by this module.
+    for lazy_client in _DEFAULT_SERVICE_CLIENTS:
+        if lazy_client.class_name == name:
+            return lazy_client.load()
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
 def create_standard_sdk(client_name_prefix, service_clients=None, cert_resource_glob=None):
     """Return an Sdk with the most common configuration.
 
@@ -170,9 +206,7 @@ def create_standard_sdk(client_name_prefix, service_clients=None, cert_resource_
     sdk.load_robot_cert(cert_resource_glob)
     sdk.request_processors.append(AddRequestHeader(lambda: client_name))
 
-    all_service_clients = _DEFAULT_SERVICE_CLIENTS
-    if service_clients:
-        all_service_clients += service_clients
+    all_service_clients = _DEFAULT_SERVICE_CLIENTS + list(service_clients or [])
     for client in all_service_clients:
         sdk.register_service_client(client)
     return sdk
@@ -206,8 +240,9 @@ class Sdk(object):
         self.max_send_message_length = DEFAULT_MAX_MESSAGE_LENGTH
         self.max_receive_message_length = DEFAULT_MAX_MESSAGE_LENGTH
 
-        # ThreadPoolExecutor instance for asynchronous streaming calls.
-        self.executor = None
+        # Executor for asynchronous streaming calls, shared with the robots and clients.  By
+        # default, the bounded executor shared by the process, see bosdyn.client.executor.
+        self.executor = default_executor()
 
 
     def create_robot(
@@ -322,6 +357,8 @@ def decode_token(token):
     Raises:
         UnableToLoadAppTokenError: If the token cannot be read.
     """
+    # Only imported by this deprecated function, to keep it out of the import of the Sdk.
+    import jwt
     try:
         values = jwt.decode(token, options={"verify_signature": False})
         return values
@@ -7,8 +7,10 @@
 """Common unit test helpers for bosdyn.client tests."""
 
 import concurrent
+import functools
 
 import grpc
+import grpc.aio
 
 import bosdyn.api.header_pb2 as HeaderProto
 
@@ -19,7 +21,8 @@ def setup_client_and_service(client, service, service_adder):
     The service should have already been instantiated. It will be
     attached to a server listening on an ephemeral port and started.
 
-    The client will have a networking channel which points to that service.
+    The client will have a networking channel which points to that service, and will create
+    a grpc.aio channel to it for its "_aio" methods.
 
     Args:
         * client: The common.BaseClient derived client to use in a test.
@@ -35,6 +38,9 @@ def setup_client_and_service(client, service, service_adder):
     server.start()
     channel = grpc.insecure_channel('127.0.0.1:{}'.format(port))
     client.channel = channel
+    # The grpc.aio channel is created on first use, in the event loop of the test.
+    client.aio_channel_factory = functools.partial(grpc.aio.insecure_channel,
+                                                   '127.0.0.1:{}'.format(port))
     return server
 
 
@@ -4,9 +4,22 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+import asyncio
+import threading
 from functools import partial
 
-from bosdyn.client.common import BaseClient
+import grpc
+import pytest
+
+import bosdyn.api.image_pb2 as image_protos
+import bosdyn.api.image_service_pb2_grpc as image_service
+import bosdyn.client.image
+from bosdyn.api.data_acquisition_store_pb2 import StoreDataRequest
+from bosdyn.client.common import BaseClient, StreamingFuture
+from bosdyn.client.exceptions import TimedOutError
+from bosdyn.client.processors import AddRequestHeader
+
+from . import helpers
 
 
 def method_wrapper(func):
@@ -103,3 +116,180 @@ def test_base_client():
     response = client.call_async_streaming(client._stub.rpc_method, None,
                                            value_from_response=value_from_response, **kwargs)
     assert isinstance(response.result(), Response)
+
+
+class RecordingStub():
+    """Stub which records the requests it is called with, serialized when they are sent."""
+
+    def __init__(self, request_type):
+        self.request_type = request_type
+        self.sent = []
+
+        def rpc_method(request, **kwargs):
+            self.sent.append(self.request_type.FromString(request.SerializeToString()))
+            return Response()
+
+        rpc_method._method = b"RecordingStub.rpc_method"
+        self.rpc_method = rpc_method
+
+
+class UndeclaredHeaderProcessor():
+    """Request processor which does not declare the fields it writes."""
+
+    def mutate(self, request):
+        request.header.client_name = 'undeclared'
+
+
+def test_processors_do_not_modify_request():
+    stub = RecordingStub(StoreDataRequest)
+    client = BaseClient(lambda channel: stub)
+    client.channel = "test"
+    client.request_processors.append(AddRequestHeader(lambda: 'test-client'))
+
+    request = StoreDataRequest(data=b'x' * 1024, file_extension='.bin')
+    client.call(client._stub.rpc_method, request)
+    assert stub.sent[-1].header.client_name == 'test-client'
+    assert stub.sent[-1].data == request.data
+    assert not request.HasField('header')
+
+    # A header set by the caller is kept, and restored after the call.
+    request.header.client_name = 'caller'
+    client.call(client._stub.rpc_method, request)
+    assert stub.sent[-1].header.client_name == 'test-client'
+    assert stub.sent[-1].header.HasField('request_timestamp')
+    assert request.header.client_name == 'caller'
+    assert not request.header.HasField('request_timestamp')
+
+    # Processors which do not declare their mutated_fields are applied to a copy.
+    client.request_processors.append(UndeclaredHeaderProcessor())
+    request.ClearField('header')
+    client.call(client._stub.rpc_method, request)
+    assert stub.sent[-1].header.client_name == 'undeclared'
+    assert not request.HasField('header')
+
+    # Without copy_request, the processors modify the caller's request.
+    client.call(client._stub.rpc_method, request, copy_request=False)
+    assert request.header.client_name == 'undeclared'
+
+
+class FirstCallProcessor():
+    """Request processor which numbers the requests without a client name, like the lease one."""
+    mutated_fields = ('header',)
+
+    def __init__(self):
+        self.num_calls = 0
+        self._lock = threading.Lock()
+
+    def mutate(self, request):
+        if not request.header.client_name:
+            with self._lock:
+                self.num_calls += 1
+                request.header.client_name = 'call-%d' % self.num_calls
+
+
+def test_concurrent_calls_with_one_request():
+    stub = RecordingStub(StoreDataRequest)
+    # Each call waits in the stub for the other, so the request is processed by both at once.
+    barrier = threading.Barrier(2, timeout=5)
+    record = stub.rpc_method
+
+    def rpc_method(request, **kwargs):
+        response = record(request, **kwargs)
+        barrier.wait()
+        return response
+
+    rpc_method._method = record._method
+    stub.rpc_method = rpc_method
+    client = BaseClient(lambda channel: stub)
+    client.channel = "test"
+    client.request_processors.append(FirstCallProcessor())
+
+    request = StoreDataRequest(data=b'x' * 1024)
+    threads = [
+        threading.Thread(target=client.call, args=(client._stub.rpc_method, request))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(sent.header.client_name for sent in stub.sent) == ['call-1', 'call-2']
+    assert not request.HasField('header')
+
+
+class BlockingImageServicer(image_service.ImageServiceServicer):
+    """Image servicer whose ListImageSources waits until it is released."""
+
+    def __init__(self):
+        super(BlockingImageServicer, self).__init__()
+        self.received = threading.Event()
+        self.release = threading.Event()
+
+    def ListImageSources(self, request, context):
+        self.received.set()
+        self.release.wait(5)
+        return image_protos.ListImageSourcesResponse()
+
+
+def test_request_restored_during_rpc():
+    client = bosdyn.client.image.ImageClient()
+    service = BlockingImageServicer()
+    server = helpers.setup_client_and_service(client, service,
+                                              image_service.add_ImageServiceServicer_to_server)
+    client.request_processors.append(AddRequestHeader(lambda: 'test-client'))
+    request = image_protos.ListImageSourcesRequest()
+
+    def check_in_flight():
+        # The caller's request is not modified while the rpc is in progress.
+        assert service.received.wait(5)
+        assert not request.HasField('header')
+        service.received.clear()
+        service.release.set()
+
+    thread = threading.Thread(target=client.call, args=(client._stub.ListImageSources, request))
+    thread.start()
+    check_in_flight()
+    thread.join()
+
+    async def call_aio():
+        service.release.clear()
+        task = asyncio.ensure_future(client.call_aio(client._aio_stub.ListImageSources, request))
+        while not service.received.is_set():
+            await asyncio.sleep(0.01)
+        check_in_flight()
+        await task
+
+    asyncio.run(call_aio())
+    assert not request.HasField('header')
+
+
+class StalledStream():
+    """Stand-in for a streaming call that sends one response and then waits to be cancelled."""
+
+    def __init__(self):
+        self.cancelled_event = threading.Event()
+
+    def cancel(self):
+        self.cancelled_event.set()
+        return True
+
+    def __iter__(self):
+        yield 1
+        self.cancelled_event.wait(5)
+        raise grpc.RpcError()
+
+
+def test_streaming_future_timeout():
+    call = StalledStream()
+    future = StreamingFuture(call, iter(call), None, None)
+    with pytest.raises(TimedOutError):
+        future.result(timeout=0.05)
+    assert call.cancelled_event.is_set()
+    with pytest.raises(TimedOutError):
+        future.exception(timeout=0.05)
+
+    # A stream that completes in time is not cancelled.
+    call = StalledStream()
+    future = StreamingFuture(call, iter([1, 2]), None, None)
+    assert future.result(timeout=5) == [1, 2]
+    assert not call.cancelled_event.is_set()
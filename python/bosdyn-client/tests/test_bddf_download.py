@@ -0,0 +1,111 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Test code for bosdyn.client.bddf_download"""
+
+import io
+import os
+import threading
+
+import pytest
+
+from bosdyn.api.data_buffer_pb2 import OperatorComment
+from bosdyn.bddf import DataWriter, ProtobufSeriesWriter
+from bosdyn.client.bddf_download import stream_messages
+
+
+class _ChunkedResponse:
+    """Non-seekable stream returning at most chunk_size bytes per read, like an HTTP response."""
+
+    def __init__(self, data, chunk_size):
+        self._data = data
+        self._chunk_size = chunk_size
+        self.offset = 0
+
+    def read(self, nbytes=-1):
+        if nbytes < 0:
+            nbytes = len(self._data)
+        data = self._data[self.offset:self.offset + min(nbytes, self._chunk_size)]
+        self.offset += len(data)
+        return data
+
+
+def _make_bddf(num_messages):
+    outfile = io.BytesIO()
+    outfile.close = lambda: None  # Keep the data after the DataWriter closes the file.
+    with DataWriter(outfile) as data_writer:
+        comment_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+        text_index = data_writer.add_message_series('bosdyn/test', {'channel': 'text'},
+                                                    'text/plain', 'text')
+        for idx in range(num_messages):
+            comment_writer.write(1000 + idx, OperatorComment(message='comment %d' % idx))
+            data_writer.write_data(text_index, 1000 + idx, b'text %d' % idx)
+    return outfile.getvalue()
+
+
+def test_stream_messages():
+    """Test that messages are parsed from a stream while it is being read, and copied to a file."""
+    data = _make_bddf(200)
+    response = _ChunkedResponse(data, 1000)
+    tee_file = io.BytesIO()
+    comments = []
+    texts = []
+    max_offset_at_first_message = None
+    for message in stream_messages(response, tee_file, [OperatorComment], readahead_bytes=4096):
+        if max_offset_at_first_message is None:
+            max_offset_at_first_message = response.offset
+        if message.message is not None:
+            assert message.series_descriptor.message_type.type_name == 'bosdyn.api.OperatorComment'
+            comments.append((message.timestamp_nsec, message.message.message))
+        else:
+            texts.append((message.timestamp_nsec, message.data))
+
+    # The first message is returned before the whole stream has been read.
+    assert max_offset_at_first_message < len(data) // 2
+    assert comments == [(1000 + idx, 'comment %d' % idx) for idx in range(200)]
+    assert texts == [(1000 + idx, b'text %d' % idx) for idx in range(200)]
+    # Everything read, including the end of the file, is copied.
+    assert tee_file.getvalue() == data
+
+
+def test_stream_messages_truncated():
+    """Test that a stream which ends early raises EOFError."""
+    data = _make_bddf(20)
+    messages = []
+    with pytest.raises(EOFError):
+        for message in stream_messages(_ChunkedResponse(data[:len(data) // 2], 100)):
+            messages.append(message)
+    assert messages
+    assert all(message.message is None for message in messages)
+
+
+def test_stream_messages_trickling():
+    """Test that messages are returned as they arrive, without waiting for a full read buffer."""
+    data = _make_bddf(200)
+    read_fd, write_fd = os.pipe()
+    received = threading.Event()
+    writer_timed_out = []
+
+    def write():
+        with open(write_fd, 'wb') as pipe:
+            pipe.write(data[:len(data) // 4])
+            pipe.flush()
+            # The rest is only sent once the first message is received.
+            writer_timed_out.append(not received.wait(5))
+            pipe.write(data[len(data) // 4:])
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    tee_file = io.BytesIO()
+    num_messages = 0
+    with open(read_fd, 'rb') as pipe:
+        for _ in stream_messages(pipe, tee_file, readahead_bytes=len(data)):
+            received.set()
+            num_messages += 1
+    thread.join()
+    assert writer_timed_out == [False]
+    assert num_messages == 400
+    assert tee_file.getvalue() == data
@@ -0,0 +1,120 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the channel_pool module."""
+import concurrent.futures
+import threading
+
+import grpc
+import pytest
+
+import bosdyn.api.image_pb2 as image_protos
+import bosdyn.api.image_service_pb2_grpc as image_service
+import bosdyn.client.image
+from bosdyn.api.graph_nav import graph_nav_pb2, graph_nav_service_pb2_grpc
+from bosdyn.client.channel_pool import LEAST_LOADED, LOCAL_SUBCHANNEL_POOL_OPTION, ChannelPool
+from bosdyn.client.graph_nav import GraphNavClient
+
+from . import helpers
+
+
+class MockImageServicer(image_service.ImageServiceServicer):
+
+    def __init__(self):
+        super(MockImageServicer, self).__init__()
+        self.peers = set()
+        self.release = threading.Event()
+        self.release.set()
+
+    def ListImageSources(self, request, context):
+        self.peers.add(context.peer())
+        self.release.wait()
+        resp = image_protos.ListImageSourcesResponse()
+        helpers.add_common_header(resp, request)
+        resp.image_sources.add(name='source')
+        return resp
+
+
+STATUS_OK = graph_nav_pb2.DownloadWaypointSnapshotResponse.STATUS_OK
+
+
+class MockGraphNavServicer(graph_nav_service_pb2_grpc.GraphNavServiceServicer):
+
+    def DownloadWaypointSnapshot(self, request, context):
+        for _ in range(3):
+            resp = graph_nav_pb2.DownloadWaypointSnapshotResponse(status=STATUS_OK)
+            resp.header.error.code = resp.header.error.CODE_OK
+            yield resp
+
+
+def _start_server(service, service_adder):
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=10))
+    service_adder(service, server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    return server, port
+
+
+def _make_pool(port, size, policy=LEAST_LOADED):
+    return ChannelPool([
+        grpc.insecure_channel('127.0.0.1:{}'.format(port), options=[LOCAL_SUBCHANNEL_POOL_OPTION])
+        for _ in range(size)
+    ], policy=policy)
+
+
+def test_round_robin():
+    service = MockImageServicer()
+    server, port = _start_server(service, image_service.add_ImageServiceServicer_to_server)
+    pool = _make_pool(port, 3, policy='round_robin')
+    client = bosdyn.client.image.ImageClient()
+    client.channel = pool
+    for _ in range(6):
+        assert len(client.list_image_sources()) == 1
+    assert len(client.list_image_sources_async().result()) == 1
+    # Each channel has its own connection.
+    assert len(service.peers) == 3
+    assert pool.in_flight() == [0, 0, 0]
+    pool.close()
+    server.stop(None)
+
+
+def test_least_loaded():
+    service = MockImageServicer()
+    server, port = _start_server(service, image_service.add_ImageServiceServicer_to_server)
+    pool = _make_pool(port, 2)
+    client = bosdyn.client.image.ImageClient()
+    client.channel = pool
+
+    service.release.clear()
+    futures = [client.list_image_sources_async() for _ in range(4)]
+    assert pool.in_flight() == [2, 2]
+    service.release.set()
+    for future in futures:
+        assert len(future.result()) == 1
+    assert pool.in_flight() == [0, 0]
+    pool.close()
+    server.stop(None)
+
+
+def test_streaming():
+    server, port = _start_server(MockGraphNavServicer(),
+                                 graph_nav_service_pb2_grpc.add_GraphNavServiceServicer_to_server)
+    pool = _make_pool(port, 2)
+    client = GraphNavClient()
+    client.channel = pool
+    for _ in range(3):
+        client.download_waypoint_snapshot('snapshot')
+        assert len(list(client.download_waypoint_snapshot_async('snapshot'))) == 3
+    assert pool.in_flight() == [0, 0]
+    pool.close()
+    server.stop(None)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        ChannelPool([])
+    with pytest.raises(ValueError):
+        ChannelPool([grpc.insecure_channel('127.0.0.1:1')], policy='random')
@@ -4,6 +4,9 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+import pytest
+
+from bosdyn.api import data_chunk_pb2
 from bosdyn.api.graph_nav import map_pb2
 from bosdyn.client import data_chunk
 
@@ -45,3 +48,54 @@ def test_messages():
     data_chunk.parse_from_chunks(data_chunk.chunk_message(message, 100), out)
 
     assert out == message
+
+
+@pytest.mark.parametrize('spill_threshold', [None, 0, 100 * 1000])
+def test_reassembler(spill_threshold):
+    """Test reassembling a message in memory and in a temporary file."""
+    message = map_pb2.WaypointSnapshot()
+    message.id = 'id'
+    message.robot_id.nickname = 'A' * 1000
+
+    reassembler = data_chunk.ChunkReassembler(spill_threshold)
+    for chunk in data_chunk.chunk_message(message, 100):
+        reassembler.add(chunk)
+    assert reassembler.size == reassembler.total_size == message.ByteSize()
+    assert reassembler.spilled == (spill_threshold == 0)
+
+    out = map_pb2.WaypointSnapshot()
+    reassembler.parse(out)
+    assert out == message
+    assert not reassembler.spilled
+
+
+def test_reassembler_size_mismatch():
+    """Test that chunks which do not add up to their total size are rejected."""
+    chunks = list(data_chunk.chunk_serialized(b'x' * 250, 100))
+
+    reassembler = data_chunk.ChunkReassembler()
+    reassembler.add(chunks[0])
+    with pytest.raises(data_chunk.DataChunkError):
+        reassembler.add(data_chunk_pb2.DataChunk(total_size=300, data=b'x' * 100))
+
+    reassembler = data_chunk.ChunkReassembler()
+    for chunk in chunks:
+        reassembler.add(chunk)
+    with pytest.raises(data_chunk.DataChunkError):
+        reassembler.add(chunks[-1])
+
+    with pytest.raises(data_chunk.DataChunkError):
+        data_chunk.parse_from_chunks(chunks[:-1], map_pb2.WaypointSnapshot())
+
+
+def test_reassembler_without_total_size():
+    """Test chunks which do not declare their total size."""
+    message = map_pb2.WaypointSnapshot(id='id')
+    serialized = message.SerializeToString()
+    chunks = [
+        data_chunk_pb2.DataChunk(data=data) for data in data_chunk.split_serialized(serialized, 3)
+    ]
+
+    out = map_pb2.WaypointSnapshot()
+    data_chunk.parse_from_chunks(chunks, out, spill_threshold=0)
+    assert out == message
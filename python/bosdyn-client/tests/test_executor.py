@@ -0,0 +1,71 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the executor module."""
+import threading
+
+import pytest
+
+from bosdyn.client.executor import BoundedExecutor, ExecutorFullError, default_executor
+
+
+def test_bounded_executor():
+    executor = BoundedExecutor(max_workers=1, max_pending=2, submit_timeout=0.1)
+    release = threading.Event()
+    running = threading.Event()
+
+    def blocking():
+        running.set()
+        release.wait()
+        return 1
+
+    first = executor.submit(blocking)
+    second = executor.submit(blocking)
+    assert running.wait(5)
+    stats = executor.stats()
+    assert stats.running == 1
+    assert stats.queued == 1
+    assert stats.max_queued >= 1
+
+    with pytest.raises(ExecutorFullError):
+        executor.submit(blocking)
+    assert executor.stats().rejected == 1
+
+    release.set()
+    assert first.result(5) == 1
+    assert second.result(5) == 1
+    assert executor.submit(lambda: 2).result(5) == 2
+    executor.shutdown()
+
+    stats = executor.stats()
+    assert stats.queued == 0
+    assert stats.running == 0
+    assert stats.submitted == 3
+    assert stats.completed == 3
+
+
+def test_cancelled_task():
+    executor = BoundedExecutor(max_workers=1, max_pending=2, submit_timeout=0)
+    release = threading.Event()
+    first = executor.submit(release.wait)
+    second = executor.submit(release.wait)
+    assert second.cancel()
+    # The slot of the cancelled task is available again.
+    third = executor.submit(lambda: 3)
+    release.set()
+    assert third.result(5) == 3
+    assert first.result(5)
+    executor.shutdown()
+    assert executor.stats().queued == 0
+
+
+def test_invalid_max_pending():
+    with pytest.raises(ValueError):
+        BoundedExecutor(max_workers=4, max_pending=2)
+
+
+def test_default_executor():
+    assert default_executor() is default_executor()
@@ -5,17 +5,21 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Unit tests for the graph_nav module."""
+import asyncio
 import concurrent
 
 import grpc
+import grpc.aio
 import pytest
 
 import bosdyn.client.graph_nav
 from bosdyn.api import header_pb2, lease_pb2, license_pb2, time_sync_pb2
 from bosdyn.api.graph_nav import graph_nav_pb2, graph_nav_service_pb2_grpc, map_pb2, nav_pb2
+from bosdyn.client.common import common_header_errors
 from bosdyn.client.exceptions import InternalServerError, InvalidRequestError, UnsetStatusError
 from bosdyn.client.graph_nav import (GraphNavClient, NoPathError, RobotNotLocalizedToRouteError,
                                      UnknownMapInformationError, UnrecognizedCommandError)
+from bosdyn.client.rpc_metrics import RpcMetrics
 from bosdyn.client.time_sync import TimeSyncEndpoint
 
 
@@ -146,6 +150,7 @@ def server(client, service):
     port = server.add_insecure_port('127.0.0.1:0')
     channel = grpc.insecure_channel('127.0.0.1:{}'.format(port))
     client.channel = channel
+    client.aio_channel_factory = lambda: grpc.aio.insecure_channel('127.0.0.1:{}'.format(port))
     server.start()
     yield server
     server.stop(0)
@@ -421,3 +426,96 @@ def test_download_edge_snapshot(client, service, server):
     service.download_edge_snapshot_status = graph_nav_pb2.DownloadEdgeSnapshotResponse.STATUS_SNAPSHOT_DOES_NOT_EXIST
     with pytest.raises(bosdyn.client.graph_nav.UnknownMapInformationError):
         make_call()
+
+
+def test_download_waypoint_snapshot_async(client, service, server):
+    # The chunks can be iterated as they arrive.
+    future = client.download_waypoint_snapshot_async(waypoint_snapshot_id="mywaypoint")
+    chunks = list(future)
+    assert len(chunks) == 1
+    assert future.done()
+    with pytest.raises(bosdyn.client.exceptions.Error):
+        future.result()
+
+    future = client.download_waypoint_snapshot_async(waypoint_snapshot_id="mywaypoint")
+    assert isinstance(future.result(), map_pb2.WaypointSnapshot)
+    assert future.exception() is None
+
+    service.download_wp_snapshot_status = graph_nav_pb2.DownloadWaypointSnapshotResponse.STATUS_SNAPSHOT_DOES_NOT_EXIST
+    future = client.download_waypoint_snapshot_async(waypoint_snapshot_id="mywaypoint")
+    with pytest.raises(bosdyn.client.graph_nav.UnknownMapInformationError):
+        future.result()
+    future = client.download_waypoint_snapshot_async(waypoint_snapshot_id="mywaypoint")
+    with pytest.raises(bosdyn.client.graph_nav.UnknownMapInformationError):
+        list(future)
+
+    service.common_header_code = header_pb2.CommonError.CODE_INTERNAL_SERVER_ERROR
+    future = client.download_edge_snapshot_async(edge_snapshot_id="myedge")
+    assert isinstance(future.exception(), InternalServerError)
+
+
+def test_aio(client, service, server):
+
+    async def feedback():
+        return await asyncio.gather(*[client.navigation_feedback_aio() for _ in range(50)])
+
+    responses = asyncio.run(feedback())
+    assert all(resp.status == service.nav_feedback_status for resp in responses)
+
+    # Server streaming, assembled by the value handler.
+    asyncio.run(client.download_waypoint_snapshot_aio(waypoint_snapshot_id="mywaypoint"))
+    service.download_wp_snapshot_status = graph_nav_pb2.DownloadWaypointSnapshotResponse.STATUS_SNAPSHOT_DOES_NOT_EXIST
+    with pytest.raises(bosdyn.client.graph_nav.UnknownMapInformationError):
+        asyncio.run(client.download_waypoint_snapshot_aio(waypoint_snapshot_id="mywaypoint"))
+
+    # Client streaming.
+    waypoint_snapshot = map_pb2.WaypointSnapshot(id='snapshot', version_id='x' * 1000)
+    client._data_chunk_size = 100
+    asyncio.run(client.upload_waypoint_snapshot_aio(waypoint_snapshot))
+
+    # Streamed responses are handled as they are received.
+    async def stream():
+        request = graph_nav_pb2.DownloadEdgeSnapshotRequest(edge_snapshot_id='myedge')
+        return [
+            resp async for resp in client.call_aio_streaming(client._aio_stub.DownloadEdgeSnapshot,
+                                                             request)
+        ]
+
+    responses = asyncio.run(stream())
+    assert len(responses) == 1
+    assert responses[0].status == graph_nav_pb2.DownloadEdgeSnapshotResponse.STATUS_OK
+
+    service.common_header_code = header_pb2.CommonError.CODE_INTERNAL_SERVER_ERROR
+    with pytest.raises(InternalServerError):
+        asyncio.run(client.navigation_feedback_aio())
+
+
+def test_streaming_rpc_metrics(client, service, server):
+    client.rpc_metrics = RpcMetrics()
+    future = client.download_waypoint_snapshot_async(waypoint_snapshot_id="mywaypoint")
+    future.result()
+
+    async def stream():
+        request = graph_nav_pb2.DownloadEdgeSnapshotRequest(edge_snapshot_id='myedge')
+        responses = client.call_aio_streaming(client._aio_stub.DownloadEdgeSnapshot, request,
+                                              error_from_response=common_header_errors)
+        return [resp async for resp in responses]
+
+    asyncio.run(stream())
+    service.common_header_code = header_pb2.CommonError.CODE_INTERNAL_SERVER_ERROR
+    with pytest.raises(InternalServerError):
+        asyncio.run(stream())
+
+    snapshot = client.rpc_metrics.snapshot()
+    waypoint_metrics = snapshot[('bosdyn.api.graph_nav.GraphNavService',
+                                 'DownloadWaypointSnapshot')]
+    assert waypoint_metrics.calls == 1
+    assert waypoint_metrics.errors == 0
+    assert waypoint_metrics.in_flight == 0
+    assert waypoint_metrics.request_bytes > 0
+    assert waypoint_metrics.response_bytes > 0
+    edge_metrics = snapshot[('bosdyn.api.graph_nav.GraphNavService', 'DownloadEdgeSnapshot')]
+    assert edge_metrics.calls == 2
+    assert edge_metrics.errors == 1
+    assert edge_metrics.in_flight == 0
+    assert edge_metrics.response_bytes > 0
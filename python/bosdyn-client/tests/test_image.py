@@ -5,6 +5,7 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Unit tests for the image client."""
+import asyncio
 import time
 
 import grpc
@@ -120,6 +121,20 @@ def test_list_sources_single_async():
     assert 2 == len(fut.result())
 
 
+def test_list_sources_aio():
+    image_source_a = image_protos.ImageSource()
+    image_source_b = image_protos.ImageSource()
+    client, service, server = _setup(image_sources=[image_source_a, image_source_b])
+    assert 2 == len(asyncio.run(client.list_image_sources_aio()))
+
+
+def test_list_sources_timeout_aio():
+    timeout = 0.1
+    client, service, server = _setup(rpc_delay=(2.0 * timeout))
+    with pytest.raises(TimedOutError):
+        asyncio.run(client.list_image_sources_aio(timeout=timeout))
+
+
 def test_get_image_sources_empty():
     client, service, server = _setup()
     res = client.get_image_from_sources(image_sources=[])
@@ -158,6 +173,23 @@ def test_get_image_source_async_ok():
     assert 1 == len(fut.result())
 
 
+def test_get_image_source_aio():
+    image_response = image_protos.ImageResponse(status=image_protos.ImageResponse.STATUS_OK)
+    client, service, server = _setup(expected_image_sources=['foo'],
+                                     image_responses=[image_response])
+
+    async def get_images():
+        return await asyncio.gather(
+            *[client.get_image_from_sources_aio(image_sources=['foo']) for _ in range(20)])
+
+    results = asyncio.run(get_images())
+    assert [1] * 20 == [len(res) for res in results]
+
+    service._image_responses = [image_protos.ImageResponse()]
+    with pytest.raises(bosdyn.client.exceptions.UnsetStatusError):
+        asyncio.run(client.get_image_from_sources_aio(image_sources=['foo']))
+
+
 def test_get_image_source_unknown_camera():
     image_response = image_protos.ImageResponse(
         status=image_protos.ImageResponse.STATUS_UNKNOWN_CAMERA)
@@ -0,0 +1,182 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Test code for bosdyn.client.parallel_download, using a local HTTP server."""
+
+import collections
+import io
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from bosdyn.api.data_buffer_pb2 import OperatorComment
+from bosdyn.bddf import DataWriter, ProtobufSeriesWriter
+from bosdyn.client.bddf_download import download_bddf_pieces
+from bosdyn.client.parallel_download import (MANIFEST_FILENAME, PIECE_EMPTY, DownloadError,
+                                             split_time_span)
+
+NSEC_PER_SEC = 1000000000
+
+# Messages are every 250 msec in [10 sec, 30 sec), except for [20 sec, 22 sec).
+MESSAGE_TIMES_NSEC = [
+    nsec for nsec in range(10 * NSEC_PER_SEC, 30 * NSEC_PER_SEC, NSEC_PER_SEC // 4)
+    if not 20 * NSEC_PER_SEC <= nsec < 22 * NSEC_PER_SEC
+]
+
+
+def _make_bddf(times_nsec):
+    outfile = io.BytesIO()
+    outfile.close = lambda: None  # Keep the data after the DataWriter closes the file.
+    with DataWriter(outfile) as data_writer:
+        writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+        for nsec in times_nsec:
+            writer.write(nsec, OperatorComment(message=str(nsec)))
+    return outfile.getvalue()
+
+
+class _BddfServer(ThreadingHTTPServer):
+    """Serves the messages in [from_sec, to_sec) as a bddf file, with injected failures.
+
+    If inclusive_end is set, the messages at to_sec are served too.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _BddfHandler)
+        self.lock = threading.Lock()
+        self.requests = collections.Counter()  # from_sec -> number of requests
+        self.failures = {}  # from_sec -> list of failures to inject ('error' or 'truncate')
+        self.headers_seen = []
+        self.inclusive_end = False
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}/v1/data-buffer/bddf/'.format(self.server_address[1])
+
+
+class _BddfHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        query = parse_qs(urlparse(self.path).query)
+        from_sec = int(query['from_sec'][0])
+        to_sec = int(query['to_sec'][0])
+        with self.server.lock:
+            self.server.requests[from_sec] += 1
+            self.server.headers_seen.append(self.headers['Authorization'])
+            failures = self.server.failures.get(from_sec)
+            failure = failures.pop(0) if failures else None
+        if failure == 'error':
+            self.send_error(503)
+            return
+        end_nsec = (to_sec + self.server.inclusive_end) * NSEC_PER_SEC
+        times_nsec = [
+            nsec for nsec in MESSAGE_TIMES_NSEC if from_sec * NSEC_PER_SEC <= nsec < end_nsec
+        ]
+        if not times_nsec:
+            self.send_response(204)
+            self.end_headers()
+            return
+        data = _make_bddf(times_nsec)
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if failure == 'truncate':
+            self.wfile.write(data[:len(data) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+@pytest.fixture
+def bddf_server():
+    server = _BddfServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _download(server, directory, **kwargs):
+    # The API takes whole seconds, so the message at 10 sec is included.
+    return download_bddf_pieces(server.url, {'Authorization': 'Bearer token'},
+                                10 * NSEC_PER_SEC + 500, 30 * NSEC_PER_SEC, directory, piece_sec=2,
+                                max_connections=3, retry_delay_sec=0.01, **kwargs)
+
+
+def _read_times(dataset):
+    with dataset:
+        return [message.timestamp_nsec for message in dataset.iter_messages()]
+
+
+def test_split_time_span():
+    assert split_time_span(0, 10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert split_time_span(3, 10, 4, align_nsec=2) == [(3, 6), (6, 10)]
+    assert split_time_span(0, 3, 1, align_nsec=2) == [(0, 2), (2, 3)]
+    with pytest.raises(ValueError):
+        split_time_span(5, 5, 1)
+
+
+def test_download_bddf_pieces(bddf_server, tmp_path):
+    """Test a parallel download with failures, stitched into a dataset."""
+    bddf_server.failures = {12: ['error', 'truncate'], 16: ['truncate']}
+    dataset = _download(bddf_server, str(tmp_path))
+    assert len(dataset.filenames) == 9  # The piece for [20, 22) has no data.
+    assert _read_times(dataset) == MESSAGE_TIMES_NSEC
+    assert bddf_server.requests[12] == 3
+    assert bddf_server.requests[16] == 2
+    assert bddf_server.requests[14] == 1
+    assert set(bddf_server.headers_seen) == {'Bearer token'}
+
+    with open(str(tmp_path / MANIFEST_FILENAME)) as infile:
+        manifest = json.load(infile)
+    assert [piece['attempts'] for piece in manifest['pieces']][:4] == [0, 2, 0, 1]
+    assert manifest['pieces'][5]['status'] == PIECE_EMPTY
+
+    # Resuming downloads only the missing piece.
+    os.unlink(dataset.filenames[2])
+    bddf_server.requests.clear()
+    dataset = _download(bddf_server, str(tmp_path))
+    assert dict(bddf_server.requests) == {14: 1}
+    assert _read_times(dataset) == MESSAGE_TIMES_NSEC
+
+
+def test_download_bddf_pieces_boundaries(bddf_server, tmp_path):
+    """Test that a message on the boundary of two pieces, returned for both, is read once."""
+    bddf_server.inclusive_end = True
+    dataset = _download(bddf_server, str(tmp_path))
+    num_blocks = sum(reader.num_data_blocks(0) for reader in dataset.data_readers)
+    assert num_blocks > len(MESSAGE_TIMES_NSEC)
+    assert dataset.num_messages(dataset.series[0]) == len(MESSAGE_TIMES_NSEC)
+    assert _read_times(dataset) == MESSAGE_TIMES_NSEC
+
+
+def test_download_bddf_pieces_resume_after_failure(bddf_server, tmp_path):
+    """Test that a download which fails can be resumed."""
+    bddf_server.failures = {24: ['error'] * 2}
+    with pytest.raises(DownloadError):
+        _download(bddf_server, str(tmp_path), max_retries=1)
+    assert bddf_server.requests[24] == 2
+    assert not os.path.exists(str(tmp_path / 'piece-00007.bddf'))
+
+    bddf_server.requests.clear()
+    dataset = _download(bddf_server, str(tmp_path), max_retries=1)
+    assert dict(bddf_server.requests) == {24: 1}
+    assert _read_times(dataset) == MESSAGE_TIMES_NSEC
+
+    # A different query does not reuse the manifest.
+    bddf_server.requests.clear()
+    dataset = _download(bddf_server, str(tmp_path), get_params={'channel': 'x'})
+    assert len(bddf_server.requests) == 10
+    dataset.close()
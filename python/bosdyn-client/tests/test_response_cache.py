@@ -0,0 +1,204 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the response_cache module."""
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+import bosdyn.api.image_pb2 as image_protos
+import bosdyn.api.image_service_pb2_grpc as image_service
+import bosdyn.client.image
+from bosdyn.api import header_pb2
+from bosdyn.client.exceptions import InternalServerError, TimedOutError
+from bosdyn.client.response_cache import ResponseCache
+
+from . import helpers
+
+
+class MockImageServicer(image_service.ImageServiceServicer):
+
+    def __init__(self):
+        super(MockImageServicer, self).__init__()
+        self.rpc_delay = 0
+        self.error_code = header_pb2.CommonError.CODE_OK
+        self.num_calls = 0
+        self.source_name = 'source'
+        self._lock = threading.Lock()
+
+    def ListImageSources(self, request, context):
+        with self._lock:
+            self.num_calls += 1
+        resp = image_protos.ListImageSourcesResponse()
+        helpers.add_common_header(resp, request, error_code=self.error_code)
+        resp.image_sources.add(name=self.source_name)
+        time.sleep(self.rpc_delay)
+        return resp
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def _setup():
+    client = bosdyn.client.image.ImageClient()
+    service = MockImageServicer()
+    server = helpers.setup_client_and_service(client, service,
+                                              image_service.add_ImageServiceServicer_to_server)
+    clock = FakeClock()
+    client.response_cache = ResponseCache(clock=clock)
+    return client, service, server, clock
+
+
+def _cache_response(cache, key, response, ttl):
+    future, is_owner = cache.begin(key)
+    assert is_owner
+    cache.finish(key, future, response, ttl)
+
+
+def test_ttl_and_size():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=2, clock=clock)
+    _cache_response(cache, ('A', b''), 'a', ttl=10)
+    _cache_response(cache, ('B', b''), 'b', ttl=20)
+    future, is_owner = cache.begin(('A', b''))
+    assert not is_owner
+    assert future.result() == 'a'
+
+    # B is the least recently used.
+    _cache_response(cache, ('C', b''), 'c', ttl=20)
+    assert len(cache) == 2
+    assert cache.begin(('B', b''))[1]
+    assert cache.hits == 1
+
+    clock.now = 15
+    assert cache.begin(('A', b''))[1]
+    assert not cache.begin(('C', b''))[1]
+
+
+def test_invalidate():
+    cache = ResponseCache()
+    _cache_response(cache, ('A', b'1'), 'a', ttl=10)
+    _cache_response(cache, ('A', b'2'), 'a', ttl=10)
+    _cache_response(cache, ('B', b''), 'b', ttl=10)
+    cache.invalidate('A')
+    assert len(cache) == 1
+    cache.invalidate()
+    assert len(cache) == 0
+
+    # A response in progress is still shared, but not cached after an invalidation.
+    future, is_owner = cache.begin(('A', b''))
+    cache.invalidate()
+    cache.finish(('A', b''), future, 'a', ttl=10)
+    assert future.result() == 'a'
+    assert len(cache) == 0
+
+
+def test_errors_not_cached():
+    cache = ResponseCache()
+    future, is_owner = cache.begin(('A', b''))
+    waiting, is_owner = cache.begin(('A', b''))
+    assert not is_owner
+    cache.abort(('A', b''), future, ValueError())
+    with pytest.raises(ValueError):
+        waiting.result()
+    assert cache.begin(('A', b''))[1]
+
+
+def test_client_calls():
+    client, service, server, clock = _setup()
+    sources = client.list_image_sources()
+    assert [source.name for source in sources] == ['source']
+    # The caller's result does not alias the cached response.
+    del sources[:]
+    assert [source.name for source in client.list_image_sources()] == ['source']
+    assert len(client.list_image_sources_async().result()) == 1
+    assert len(asyncio.run(client.list_image_sources_aio())) == 1
+    assert service.num_calls == 1
+
+    clock.now = 100
+    client.list_image_sources_async().result()
+    assert service.num_calls == 2
+    asyncio.run(client.list_image_sources_aio())
+    assert service.num_calls == 2
+
+    client.response_cache.invalidate('ListImageSources')
+    asyncio.run(client.list_image_sources_aio())
+    assert service.num_calls == 3
+
+    # Other rpcs are not cached.
+    client.response_cache.invalidate()
+    service.error_code = header_pb2.CommonError.CODE_INTERNAL_SERVER_ERROR
+    for _ in range(2):
+        with pytest.raises(InternalServerError):
+            client.list_image_sources()
+    assert service.num_calls == 5
+
+
+def test_single_flight():
+    client, service, server, clock = _setup()
+    service.rpc_delay = 0.2
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: client.list_image_sources(), range(8)))
+    assert all(len(sources) == 1 for sources in results)
+    assert service.num_calls == 1
+
+    client.response_cache.invalidate()
+    futures = [client.list_image_sources_async() for _ in range(8)]
+    assert all(len(future.result()) == 1 for future in futures)
+    assert service.num_calls == 2
+
+    # Errors of the shared rpc are raised by every call, and not cached.
+    client.response_cache.invalidate()
+    futures = [client.list_image_sources_async(timeout=0.05) for _ in range(4)]
+    for future in futures:
+        with pytest.raises(TimedOutError):
+            future.result()
+    assert service.num_calls == 3
+
+
+def test_shared_between_robots():
+    client, service, server, clock = _setup()
+    other_client, other_service, other_server, _ = _setup()
+    other_service.source_name = 'other source'
+    other_client.response_cache = client.response_cache
+    assert client.list_image_sources()[0].name == 'source'
+    assert other_client.list_image_sources()[0].name == 'other source'
+    assert client.list_image_sources()[0].name == 'source'
+    assert service.num_calls == 1
+    assert other_service.num_calls == 1
+
+    client.response_cache.invalidate('/bosdyn.api.ImageService/ListImageSources')
+    assert len(client.response_cache) == 0
+
+
+def test_waiting_call_timeout():
+    client, service, server, clock = _setup()
+    service.rpc_delay = 0.5
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        owner = executor.submit(client.list_image_sources)
+        while service.num_calls == 0:
+            time.sleep(0.01)
+        # The waiting calls time out on their own, and the rpc they share is not cancelled.
+        start = time.monotonic()
+        with pytest.raises(TimedOutError):
+            client.list_image_sources(timeout=0.05)
+        with pytest.raises(TimedOutError):
+            client.list_image_sources_async(timeout=0.05).result()
+        with pytest.raises(TimedOutError):
+            asyncio.run(client.list_image_sources_aio(timeout=0.05))
+        assert time.monotonic() - start < 0.4
+        assert len(owner.result()) == 1
+    assert len(client.list_image_sources(timeout=0.05)) == 1
+    assert service.num_calls == 1
@@ -0,0 +1,155 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the rpc_metrics module."""
+import asyncio
+import struct
+import time
+
+import pytest
+
+import bosdyn.api.image_pb2 as image_protos
+import bosdyn.api.image_service_pb2_grpc as image_service
+import bosdyn.client.image
+from bosdyn.api import header_pb2
+from bosdyn.client.exceptions import InternalServerError, TimedOutError
+from bosdyn.client.processors import AddRequestHeader
+from bosdyn.client.robot import Robot
+from bosdyn.client.rpc_metrics import DataBufferRpcMetricsExporter, RpcMetrics
+
+from . import helpers
+
+LIST_IMAGE_SOURCES = ('bosdyn.api.ImageService', 'ListImageSources')
+
+
+class MockImageServicer(image_service.ImageServiceServicer):
+
+    def __init__(self):
+        super(MockImageServicer, self).__init__()
+        self.rpc_delay = 0
+        self.error_code = header_pb2.CommonError.CODE_OK
+
+    def ListImageSources(self, request, context):
+        resp = image_protos.ListImageSourcesResponse()
+        helpers.add_common_header(resp, request, error_code=self.error_code)
+        resp.image_sources.add(name='source')
+        time.sleep(self.rpc_delay)
+        return resp
+
+
+def _setup():
+    client = bosdyn.client.image.ImageClient()
+    service = MockImageServicer()
+    server = helpers.setup_client_and_service(client, service,
+                                              image_service.add_ImageServiceServicer_to_server)
+    client.request_processors.append(AddRequestHeader(lambda: 'metrics'))
+    client.rpc_metrics = RpcMetrics()
+    return client, service, server
+
+
+def test_histogram():
+    metrics = RpcMetrics(latency_buckets=[0.1, 1.0])
+    for latency, error in [(0.05, None), (0.5, None), (0.6, ValueError()), (5.0, None)]:
+        rpc = metrics.rpc_started(b'/my.Service/Method')
+        rpc._start -= latency
+        rpc.finished(error)
+    in_flight = metrics.rpc_started('/my.Service/Method')
+
+    method_metrics = metrics.snapshot()[('my.Service', 'Method')]
+    assert method_metrics.calls == 4
+    assert method_metrics.errors == 1
+    assert method_metrics.in_flight == 1
+    assert method_metrics.latency_counts == (1, 2, 1)
+    assert method_metrics.latency_mean == pytest.approx(6.15 / 4, rel=0.01)
+    assert method_metrics.latency_quantile(0.25) == 0.1
+    assert method_metrics.latency_quantile(0.5) == 1.0
+    assert method_metrics.latency_quantile(1) == method_metrics.latency_max
+
+    metrics.reset()
+    method_metrics = metrics.snapshot()[('my.Service', 'Method')]
+    assert method_metrics.calls == 0
+    assert method_metrics.in_flight == 1
+    in_flight.finished()
+    assert metrics.snapshot()[('my.Service', 'Method')].in_flight == 0
+
+
+def test_client_calls():
+    client, service, server = _setup()
+    client.list_image_sources()
+    client.list_image_sources_async().result()
+    asyncio.run(client.list_image_sources_aio())
+
+    service.error_code = header_pb2.CommonError.CODE_INTERNAL_SERVER_ERROR
+    with pytest.raises(InternalServerError):
+        client.list_image_sources()
+    with pytest.raises(InternalServerError):
+        client.list_image_sources_async().result()
+
+    service.error_code = header_pb2.CommonError.CODE_OK
+    service.rpc_delay = 0.5
+    with pytest.raises(TimedOutError):
+        client.list_image_sources(timeout=0.1)
+
+    method_metrics = client.rpc_metrics.snapshot()[LIST_IMAGE_SOURCES]
+    assert method_metrics.calls == 6
+    assert method_metrics.errors == 3
+    assert method_metrics.in_flight == 0
+    assert method_metrics.request_bytes > 0
+    assert method_metrics.response_bytes > 0
+    assert sum(method_metrics.latency_counts) == 6
+
+
+def test_robot():
+    robot = Robot('metrics')
+    client, service, server = _setup()
+    client.rpc_metrics = None
+    robot.service_clients_by_name['image'] = client
+    assert robot.rpc_metrics_snapshot() == {}
+
+    metrics = robot.enable_rpc_metrics()
+    assert client.rpc_metrics is metrics
+    client.list_image_sources()
+    assert robot.rpc_metrics_snapshot()[LIST_IMAGE_SOURCES].calls == 1
+
+    robot.disable_rpc_metrics()
+    assert client.rpc_metrics is None
+    assert robot.rpc_metrics_snapshot() == {}
+
+
+class MockDataBufferClient(object):
+
+    def __init__(self):
+        self.schemas = []
+        self.ticks = []
+
+    def register_signal_schema(self, variables, schema_name, **kwargs):
+        self.schemas.append((variables, schema_name))
+        return len(self.schemas)
+
+    def add_signal_tick(self, data, schema_id, sequence_id=0, source='client', **kwargs):
+        self.ticks.append((data, schema_id, sequence_id, source))
+
+
+def test_data_buffer_export():
+    client, service, server = _setup()
+    data_buffer_client = MockDataBufferClient()
+    exporter = DataBufferRpcMetricsExporter(data_buffer_client, client.rpc_metrics)
+    assert exporter.export() == 0
+
+    client.list_image_sources()
+    assert exporter.export() == 1
+    client.list_image_sources()
+    assert exporter.export() == 1
+
+    assert len(data_buffer_client.schemas) == 1
+    variables, schema_name = data_buffer_client.schemas[0]
+    assert schema_name == 'rpc_metrics/bosdyn.api.ImageService/ListImageSources'
+    assert [var.name for var in variables] == [name for name, _ in exporter.VARIABLES]
+
+    assert [tick[1:] for tick in data_buffer_client.ticks] == [(1, 1, 'bosdyn-client'),
+                                                               (1, 2, 'bosdyn-client')]
+    values = struct.unpack('<QQqQQdddd', data_buffer_client.ticks[-1][0])
+    assert values[:3] == (2, 0, 0)
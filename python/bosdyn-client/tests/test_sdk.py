@@ -4,12 +4,25 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+import asyncio
 import importlib.resources
+import subprocess
+import sys
 import unittest
 
 import bosdyn.client
+import bosdyn.client.channel_pool
 import bosdyn.client.common
 import bosdyn.client.processors
+import bosdyn.client.sdk
+
+# Modules which create_standard_sdk() should not import: the default service clients which neither
+# the Sdk nor the Robot use themselves, and the command line.
+LAZY_MODULES = [
+    'bosdyn.client.autowalk', 'bosdyn.client.graph_nav', 'bosdyn.client.image',
+    'bosdyn.client.manipulation_api_client', 'bosdyn.client.network_compute_bridge_client',
+    'bosdyn.client.spot_check', 'bosdyn.client.command_line'
+]
 
 
 class ServiceClientMock(bosdyn.client.common.BaseClient):
@@ -101,6 +114,78 @@ Spam, Spam, Spam, Spam!
         client = robot.ensure_client(service_name,
                                      channel=robot.ensure_secure_channel('the-knights-of-ni'))
 
+    def test_channel_pool(self):
+        sdk = self._create_sdk()
+        robot = self._create_robot(sdk, 'test-robot')
+        robot.channel_pool_sizes['pooled'] = 3
+        channel = robot.ensure_secure_channel('pooled')
+        self.assertIsInstance(channel, bosdyn.client.channel_pool.ChannelPool)
+        self.assertEqual(3, len(channel))
+        self.assertNotIsInstance(robot.ensure_secure_channel('single'),
+                                 bosdyn.client.channel_pool.ChannelPool)
+        robot.shutdown()
+
+    def test_aio_channels(self):
+        sdk = self._create_sdk()
+        sdk.register_service_client(ServiceClientMock)
+        robot = self._create_robot(sdk, 'test-robot')
+        robot.authorities_by_name['mock'] = 'mock.spot.robot'
+        client = robot.ensure_client('mock')
+
+        # The authority was resolved by ensure_client(), not by a blocking directory sync in the
+        # event loop.
+        def sync_with_directory():
+            raise AssertionError('Synced with the directory in the event loop')
+
+        robot.sync_with_directory = sync_with_directory
+        del robot.authorities_by_name['mock']
+
+        async def use_and_shutdown(shutdown):
+            channel = client.aio_channel
+            self.assertIs(channel, robot.ensure_secure_channel_aio('mock.spot.robot'))
+            if shutdown:
+                await robot.shutdown_aio()
+            return channel
+
+        async def use_in_two_loops():
+            # A loop which is still running when the client is used from another one.
+            return await asyncio.get_running_loop().run_in_executor(
+                None, asyncio.run, use_and_shutdown(True)), await use_and_shutdown(False)
+
+        other_loop_channel, channel = asyncio.run(use_in_two_loops())
+        self.assertIsNot(other_loop_channel, channel)
+        # The channels of the other loop were closed there, those of this loop are kept.
+        self.assertEqual(1, len(robot._aio_channels_by_loop))
+        robot.shutdown()
+
+    def test_lazy_service_clients(self):
+        sdk = bosdyn.client.create_standard_sdk('sdk-test')
+        self.assertEqual(sdk.service_type_by_name['image'], 'bosdyn.api.ImageService')
+        for lazy_client in bosdyn.client.sdk._DEFAULT_SERVICE_CLIENTS:
+            client_class = lazy_client.load()
+            self.assertEqual(lazy_client.default_service_name, client_class.default_service_name)
+            self.assertEqual(lazy_client.service_type, client_class.service_type)
+
+        robot = sdk.create_robot('no-address')
+        client = robot.ensure_client('image', channel=robot.ensure_secure_channel('image'))
+        self.assertIsInstance(client, bosdyn.client.sdk.ImageClient)
+        self.assertIs(client, robot.ensure_client('image'))
+        robot.shutdown()
+
+    def test_import_time(self):
+        # Import in a new process, which reports the modules it imports with -X importtime.
+        process = subprocess.run([
+            sys.executable, '-X', 'importtime', '-c',
+            'import bosdyn.client; bosdyn.client.create_standard_sdk("sdk-test")'
+        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+        imported = set(
+            line.rsplit('|', 1)[-1].strip()
+            for line in process.stderr.splitlines()
+            if line.startswith('import time:'))
+        self.assertIn('bosdyn.client.sdk', imported)
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, imported)
+
     def test_load_robot_cert(self):
         sdk = bosdyn.client.Sdk()
         sdk.load_robot_cert()
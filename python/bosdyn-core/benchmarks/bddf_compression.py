@@ -0,0 +1,134 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Measure write/read throughput and compression ratio of bddf compression codecs.
+
+Example:
+    python bddf_compression.py --num-blocks 200 --json results.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bosdyn.api.robot_state_pb2 import RobotState
+from bosdyn.bddf import COMPRESSION_LZMA, COMPRESSION_ZLIB, DataReader, DataWriter
+
+# (codec, level) pairs to measure.  None means no compression.
+CODEC_LEVELS = [(None, None), (COMPRESSION_ZLIB, 1), (COMPRESSION_ZLIB, 6), (COMPRESSION_ZLIB, 9),
+                (COMPRESSION_LZMA, 0), (COMPRESSION_LZMA, 6)]
+
+
+def robot_state_payloads(num_blocks):
+    """Serialized RobotState messages with a realistic number of joints."""
+    rng = np.random.default_rng(0)
+    payloads = []
+    for idx in range(num_blocks):
+        state = RobotState()
+        for joint in range(12):
+            joint_state = state.kinematic_state.joint_states.add(name='joint_%d' % joint)
+            joint_state.position.value = float(rng.normal())
+            joint_state.velocity.value = float(rng.normal())
+            joint_state.load.value = float(rng.normal())
+        state.kinematic_state.acquisition_timestamp.FromNanoseconds(idx * 1000000)
+        payloads.append(state.SerializeToString())
+    return payloads
+
+
+def image_payloads(num_blocks, width=640, height=480):
+    """Smooth, noisy 8-bit grayscale images, similar in entropy to camera data."""
+    rng = np.random.default_rng(1)
+    base = np.add.outer(np.arange(height), np.arange(width)) % 256
+    return [((base + idx + rng.integers(0, 8, size=base.shape)) % 256).astype(np.uint8).tobytes()
+            for idx in range(num_blocks)]
+
+
+def point_cloud_payloads(num_blocks, num_points=20000):
+    """float32 xyz points on a noisy plane."""
+    rng = np.random.default_rng(2)
+    payloads = []
+    for _ in range(num_blocks):
+        points = rng.uniform(-5, 5, size=(num_points, 3)).astype(np.float32)
+        points[:, 2] = np.round(points[:, 2] * 0.01, 2)
+        payloads.append(points.tobytes())
+    return payloads
+
+
+def measure(payloads, codec, level, directory):
+    """Write payloads into a file with the given codec and read them back.
+
+    Returns: dict of results.
+    """
+    filename = os.path.join(directory, 'bench.bddf')
+    raw_bytes = sum(len(payload) for payload in payloads)
+
+    start = time.perf_counter()
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        series_index = data_writer.add_message_series('bench', {'channel': 'bench'},
+                                                      'application/octet-stream', 'bytes',
+                                                      compression=codec, compression_level=level)
+        for idx, payload in enumerate(payloads):
+            data_writer.write_data(series_index, idx, payload)
+    write_sec = time.perf_counter() - start
+    file_bytes = os.path.getsize(filename)
+
+    start = time.perf_counter()
+    with DataReader(filename=filename) as data_reader:
+        for idx in range(data_reader.num_data_blocks(0)):
+            data_reader.read(0, idx)
+    read_sec = time.perf_counter() - start
+    os.unlink(filename)
+
+    return {
+        'codec': codec or 'none',
+        'level': level,
+        'raw_bytes': raw_bytes,
+        'file_bytes': file_bytes,
+        'ratio': raw_bytes / file_bytes,
+        'write_mb_per_sec': raw_bytes / write_sec / 1e6,
+        'read_mb_per_sec': raw_bytes / read_sec / 1e6,
+    }
+
+
+def main():
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--num-blocks', type=int, default=100, help='blocks per payload kind')
+    parser.add_argument('--json', help='write results to this file as JSON')
+    options = parser.parse_args()
+
+    payload_kinds = {
+        'robot_state': robot_state_payloads(options.num_blocks * 10),
+        'image': image_payloads(options.num_blocks),
+        'point_cloud': point_cloud_payloads(options.num_blocks),
+    }
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        print('{:12} {:6} {:>5} {:>7} {:>10} {:>10}'.format('payload', 'codec', 'level', 'ratio',
+                                                            'write MB/s', 'read MB/s'))
+        for kind, payloads in payload_kinds.items():
+            for codec, level in CODEC_LEVELS:
+                result = measure(payloads, codec, level, directory)
+                result['payload'] = kind
+                results.append(result)
+                print('{:12} {:6} {:>5} {:>7.2f} {:>10.1f} {:>10.1f}'.format(
+                    kind, result['codec'], '-' if level is None else level, result['ratio'],
+                    result['write_mb_per_sec'], result['read_mb_per_sec']))
+
+    if options.json:
+        with open(options.json, 'w') as outfile:
+            json.dump(results, outfile, indent=2)
+    return True
+
+
+if __name__ == '__main__':
+    if not main():
+        sys.exit(1)
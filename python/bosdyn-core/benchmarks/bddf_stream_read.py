@@ -0,0 +1,134 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Measure StreamDataReader throughput for different readahead sizes and checksum modes.
+
+Data is streamed either from a file or through a pipe, as when reading an HTTP response.
+
+Example:
+    python bddf_stream_read.py --megabytes 200 --json results.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from bosdyn.bddf import (CHECKSUM_INLINE, CHECKSUM_SKIP, CHECKSUM_THREADED, DataWriter,
+                         StreamDataReader)
+
+READAHEAD_SIZES = [64 * 1024, 1024 * 1024, 8 * 1024 * 1024]
+CHECKSUM_MODES = [CHECKSUM_INLINE, CHECKSUM_THREADED, CHECKSUM_SKIP]
+
+
+def write_input(filename, megabytes):
+    """Write a file with a mix of small and large data blocks.
+
+    Returns: number of bytes in the file.
+    """
+    rng = np.random.default_rng(0)
+    small = rng.integers(0, 256, size=200, dtype=np.uint8).tobytes()
+    large = rng.integers(0, 256, size=256 * 1024, dtype=np.uint8).tobytes()
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        small_series = data_writer.add_message_series('bench', {'channel': 'small'},
+                                                      'application/octet-stream', 'bytes')
+        large_series = data_writer.add_message_series('bench', {'channel': 'large'},
+                                                      'application/octet-stream', 'bytes')
+        timestamp_nsec = 0
+        while outfile.tell() < megabytes * 1e6:
+            for _ in range(100):
+                timestamp_nsec += 1000
+                data_writer.write_data(small_series, timestamp_nsec, small)
+            data_writer.write_data(large_series, timestamp_nsec, large)
+    return os.path.getsize(filename)
+
+
+def _copy_to_pipe(filename, write_fd):
+    with open(filename, 'rb') as infile, os.fdopen(write_fd, 'wb') as outfile:
+        while True:
+            chunk = infile.read(64 * 1024)
+            if not chunk:
+                return
+            outfile.write(chunk)
+
+
+def measure(filename, source, readahead_bytes, checksum_mode):
+    """Read all blocks of the file through a StreamDataReader.
+
+    Returns: (seconds, number of blocks)
+    """
+    thread = None
+    if source == 'pipe':
+        read_fd, write_fd = os.pipe()
+        thread = threading.Thread(target=_copy_to_pipe, args=(filename, write_fd))
+        thread.start()
+        infile = os.fdopen(read_fd, 'rb', buffering=0)
+    else:
+        infile = open(filename, 'rb', buffering=0)
+
+    num_blocks = 0
+    start = time.perf_counter()
+    reader = StreamDataReader(infile, readahead_bytes=readahead_bytes, checksum_mode=checksum_mode)
+    try:
+        while True:
+            reader.read_next_block()
+            num_blocks += 1
+    except EOFError:
+        pass
+    elapsed = time.perf_counter() - start
+    reader.close()
+    if thread:
+        thread.join()
+    return elapsed, num_blocks
+
+
+def main():
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--megabytes', type=int, default=100, help='size of the input file')
+    parser.add_argument('--input', help='read this bddf file instead of a generated one')
+    parser.add_argument('--json', help='write results to this file as JSON')
+    options = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        filename = options.input
+        if not filename:
+            filename = os.path.join(directory, 'bench.bddf')
+            write_input(filename, options.megabytes)
+        file_bytes = os.path.getsize(filename)
+        print('{:6} {:>10} {:10} {:>8} {:>8}'.format('source', 'readahead', 'checksum', 'blocks',
+                                                     'MB/s'))
+        for source in ('file', 'pipe'):
+            for readahead_bytes in READAHEAD_SIZES:
+                for checksum_mode in CHECKSUM_MODES:
+                    elapsed, num_blocks = measure(filename, source, readahead_bytes, checksum_mode)
+                    result = {
+                        'source': source,
+                        'readahead_bytes': readahead_bytes,
+                        'checksum_mode': checksum_mode,
+                        'file_bytes': file_bytes,
+                        'num_blocks': num_blocks,
+                        'mb_per_sec': file_bytes / elapsed / 1e6,
+                    }
+                    results.append(result)
+                    print('{:6} {:>10} {:10} {:>8} {:>8.1f}'.format(source, readahead_bytes,
+                                                                    checksum_mode, num_blocks,
+                                                                    result['mb_per_sec']))
+
+    if options.json:
+        with open(options.json, 'w') as outfile:
+            json.dump(results, outfile, indent=2)
+    return True
+
+
+if __name__ == '__main__':
+    if not main():
+        sys.exit(1)
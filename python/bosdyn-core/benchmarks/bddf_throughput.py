@@ -0,0 +1,403 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Throughput benchmark suite for writing and reading bddf files.
+
+Synthetic files are generated for several scenarios (many series of small blocks, large blocks,
+ POD series, protobuf series), and each reader is measured on each of them: MB/s, blocks/s,
+ the latency of opening the file, and the peak RSS of the process.  Each measurement runs in a
+ fresh process, so the peak RSS of one does not hide that of another.
+
+Results are written as JSON with the commit and versions they were measured with, and can be
+ compared with a previous run to find regressions.
+
+Example:
+    python bddf_throughput.py --megabytes 50 --json new.json --compare old.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+import bosdyn.api.bddf_pb2 as bddf
+from bosdyn.api.robot_state_pb2 import RobotState
+from bosdyn.bddf import (DataReader, DataWriter, PodSeriesReader, PodSeriesWriter,
+                         ProtobufChannelReader, ProtobufReader, ProtobufSeriesWriter,
+                         StreamDataReader)
+
+RESULTS_VERSION = 1
+
+# Metrics compared with --compare, and whether higher values are better.
+COMPARED_METRICS = {
+    'mb_per_sec': True,
+    'blocks_per_sec': True,
+    'open_ms': False,
+    'peak_rss_mb': False,
+}
+
+
+def _write_small_blocks(data_writer, megabytes, rng):
+    num_series = 50
+    payload = rng.integers(0, 256, size=200, dtype=np.uint8).tobytes()
+    series = [
+        data_writer.add_message_series('bench', {'channel': 'small%d' % idx},
+                                       'application/octet-stream', 'bytes')
+        for idx in range(num_series)
+    ]
+    num_blocks = int(megabytes * 1e6 / len(payload))
+    for idx in range(num_blocks):
+        data_writer.write_data(series[idx % num_series], idx, payload)
+    return num_blocks * len(payload)
+
+
+def _write_large_blocks(data_writer, megabytes, rng):
+    num_series = 4
+    payload = rng.integers(0, 256, size=1024**2, dtype=np.uint8).tobytes()
+    series = [
+        data_writer.add_message_series('bench', {'channel': 'large%d' % idx},
+                                       'application/octet-stream', 'bytes')
+        for idx in range(num_series)
+    ]
+    num_blocks = max(1, int(megabytes * 1e6 / len(payload)))
+    for idx in range(num_blocks):
+        data_writer.write_data(series[idx % num_series], idx, payload)
+    return num_blocks * len(payload)
+
+
+def _write_pod(data_writer, megabytes, rng):
+    num_series = 20
+    writers = [
+        PodSeriesWriter(data_writer, 'bench/pod', {'varname': 'var%d' % idx}, bddf.TYPE_FLOAT64)
+        for idx in range(num_series)
+    ]
+    values = rng.normal(size=1000).tolist()
+    num_samples = int(megabytes * 1e6 / 8)
+    for idx in range(num_samples):
+        writers[idx % num_series].write(idx, values[idx % len(values)])
+    return num_samples * 8
+
+
+def _write_protobuf(data_writer, megabytes, rng):
+    writer = ProtobufSeriesWriter(data_writer, RobotState)
+    states = []
+    for idx in range(100):
+        state = RobotState()
+        for joint in range(12):
+            joint_state = state.kinematic_state.joint_states.add(name='joint_%d' % joint)
+            joint_state.position.value = float(rng.normal())
+            joint_state.velocity.value = float(rng.normal())
+            joint_state.load.value = float(rng.normal())
+        state.kinematic_state.acquisition_timestamp.FromNanoseconds(idx * 1000000)
+        states.append(state)
+    message_bytes = states[0].ByteSize()
+    num_blocks = int(megabytes * 1e6 / message_bytes)
+    for idx in range(num_blocks):
+        writer.write(idx, states[idx % len(states)])
+    return num_blocks * message_bytes
+
+
+# Functions writing the data of each scenario, returning the number of bytes of data written.
+SCENARIOS = {
+    'small_blocks': _write_small_blocks,
+    'large_blocks': _write_large_blocks,
+    'pod': _write_pod,
+    'protobuf': _write_protobuf,
+}
+
+
+def write_scenario(name, filename, megabytes):
+    """Write the synthetic file of a scenario, measuring the DataWriter.
+
+    Returns: dict of results.
+    """
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        data_bytes = SCENARIOS[name](data_writer, megabytes, rng)
+    elapsed = time.perf_counter() - start
+    with DataReader(filename=filename) as data_reader:
+        num_blocks = sum(
+            data_reader.num_data_blocks(series_index)
+            for series_index in range(len(data_reader.file_index.series_identifiers)))
+    return _result(elapsed, os.path.getsize(filename), num_blocks, data_bytes=data_bytes)
+
+
+def _result(elapsed, nbytes, num_blocks, **kwargs):
+    result = {
+        'seconds': elapsed,
+        'nbytes': nbytes,
+        'num_blocks': num_blocks,
+        'mb_per_sec': nbytes / elapsed / 1e6,
+        'blocks_per_sec': num_blocks / elapsed,
+    }
+    result.update(kwargs)
+    return result
+
+
+def _open(filename, **kwargs):
+    """Open the file and load the index of every series, returning (DataReader, open seconds)."""
+    start = time.perf_counter()
+    data_reader = DataReader(filename=filename, **kwargs)
+    for series_index in range(len(data_reader.file_index.series_identifiers)):
+        data_reader.series_block_arrays(series_index)
+    return data_reader, time.perf_counter() - start
+
+
+def bench_read(filename, **kwargs):
+    """Read every block of every series with DataReader.read()."""
+    data_reader, open_sec = _open(filename, **kwargs)
+    num_blocks = 0
+    nbytes = 0
+    start = time.perf_counter()
+    with data_reader:
+        for series_index in range(len(data_reader.file_index.series_identifiers)):
+            for index in range(data_reader.num_data_blocks(series_index)):
+                nbytes += len(data_reader.read(series_index, index)[2])
+                num_blocks += 1
+    return _result(time.perf_counter() - start, nbytes, num_blocks, open_ms=open_sec * 1e3)
+
+
+def bench_read_mmap(filename):
+    """Read every block of every series with a memory-mapped DataReader."""
+    return bench_read(filename, use_mmap=True)
+
+
+def bench_read_many(filename):
+    """Read every series with DataReader.read_many()."""
+    data_reader, open_sec = _open(filename)
+    num_blocks = 0
+    nbytes = 0
+    start = time.perf_counter()
+    with data_reader:
+        for series_index in range(len(data_reader.file_index.series_identifiers)):
+            blocks = data_reader.read_many(series_index,
+                                           range(data_reader.num_data_blocks(series_index)))
+            nbytes += sum(len(data) for _desc, _timestamp_nsec, data in blocks)
+            num_blocks += len(blocks)
+    return _result(time.perf_counter() - start, nbytes, num_blocks, open_ms=open_sec * 1e3)
+
+
+def bench_stream(filename):
+    """Read every block of the file in order with StreamDataReader."""
+    num_blocks = 0
+    nbytes = 0
+    start = time.perf_counter()
+    with open(filename, 'rb', buffering=0) as infile:
+        reader = StreamDataReader(infile)
+        open_sec = time.perf_counter() - start
+        try:
+            while True:
+                nbytes += len(reader.read_data_block()[2])
+                num_blocks += 1
+        except EOFError:
+            pass
+    return _result(time.perf_counter() - start, nbytes, num_blocks, open_ms=open_sec * 1e3)
+
+
+def bench_pod(filename):
+    """Read every POD series into NumPy arrays with PodSeriesReader.read_all()."""
+    data_reader, open_sec = _open(filename)
+    num_blocks = 0
+    nbytes = 0
+    start = time.perf_counter()
+    with data_reader:
+        for series_identifier in data_reader.file_index.series_identifiers:
+            reader = PodSeriesReader(data_reader, dict(series_identifier.spec))
+            _timestamps, _starts, samples = reader.read_all()
+            nbytes += samples.nbytes
+            num_blocks += reader.num_data_blocks
+    return _result(time.perf_counter() - start, nbytes, num_blocks, open_ms=open_sec * 1e3)
+
+
+def bench_protobuf(filename):
+    """Parse every message of the protobuf channel with ProtobufChannelReader."""
+    data_reader, open_sec = _open(filename)
+    num_blocks = 0
+    nbytes = 0
+    start = time.perf_counter()
+    with data_reader:
+        channel_reader = ProtobufChannelReader(ProtobufReader(data_reader), RobotState)
+        for index in range(channel_reader.num_messages):
+            _timestamp_nsec, message = channel_reader.get_message(index)
+            nbytes += message.ByteSize()
+            num_blocks += 1
+    return _result(time.perf_counter() - start, nbytes, num_blocks, open_ms=open_sec * 1e3)
+
+
+# Benchmarks run on every scenario, and on specific scenarios.
+BENCHMARKS = {
+    'read': (bench_read, None),
+    'read_mmap': (bench_read_mmap, None),
+    'read_many': (bench_read_many, None),
+    'stream': (bench_stream, None),
+    'pod_read_all': (bench_pod, ('pod',)),
+    'protobuf_messages': (bench_protobuf, ('protobuf',)),
+}
+
+
+def _peak_rss_mb():
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return max_rss / (1e6 if sys.platform == 'darwin' else 1e3)
+
+
+def _run_case(scenario, benchmark, filename, megabytes):
+    """Run one measurement (in a fresh process), returning the result with the peak RSS."""
+    if benchmark == 'write':
+        result = write_scenario(scenario, filename, megabytes)
+    else:
+        result = BENCHMARKS[benchmark][0](filename)
+    result['peak_rss_mb'] = _peak_rss_mb()
+    return result
+
+
+def run_case(scenario, benchmark, filename, megabytes, repeat, isolate):
+    """Run a measurement repeat times, returning the fastest result and the largest peak RSS."""
+    results = []
+    for _ in range(repeat):
+        if isolate:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                result = executor.submit(_run_case, scenario, benchmark, filename,
+                                         megabytes).result()
+        else:
+            result = _run_case(scenario, benchmark, filename, megabytes)
+            result['peak_rss_mb'] = None  # Not meaningful within a long-running process.
+        results.append(result)
+    best = min(results, key=lambda result: result['seconds'])
+    if isolate:
+        best['peak_rss_mb'] = max(result['peak_rss_mb'] for result in results)
+    best.update(scenario=scenario, benchmark=benchmark)
+    return best
+
+
+def metadata(options):
+    """Information about the environment of a run, to interpret a comparison of results."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        commit = commit.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import google.protobuf  # pylint: disable=import-outside-toplevel
+    return {
+        'version': RESULTS_VERSION,
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'protobuf': google.protobuf.__version__,
+        'megabytes': options.megabytes,
+        'repeat': options.repeat,
+        'isolate': not options.no_isolate,
+    }
+
+
+def compare(results, current_metadata, baseline, threshold):
+    """Print the change of each metric from a baseline run.
+
+    Returns: list of (scenario, benchmark, metric, change) of the metrics which regressed by
+              more than threshold (a fraction).
+    """
+    baseline_results = {
+        (result['scenario'], result['benchmark']): result for result in baseline['results']
+    }
+    regressions = []
+    print('\nChange from baseline (commit {}):'.format(baseline['metadata'].get('commit')))
+    for key in ('megabytes', 'cpu_count', 'python', 'numpy', 'protobuf'):
+        if baseline['metadata'].get(key) != current_metadata.get(key):
+            print('Warning: {} differs from the baseline ({} != {})'.format(
+                key, current_metadata.get(key), baseline['metadata'].get(key)))
+    print('{:14} {:18} {:>12} {:>12} {:>12}'.format('scenario', 'benchmark', 'MB/s', 'blocks/s',
+                                                    'open ms'))
+    for result in results:
+        key = (result['scenario'], result['benchmark'])
+        old = baseline_results.get(key)
+        if old is None:
+            continue
+        changes = {}
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if not result.get(metric) or not old.get(metric):
+                continue
+            change = result[metric] / old[metric] - 1
+            changes[metric] = change
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(key + (metric, change))
+        print('{:14} {:18} {:>12} {:>12} {:>12}'.format(
+            *key,
+            *('{:+.1%}'.format(changes[metric]) if metric in changes else '-'
+              for metric in ('mb_per_sec', 'blocks_per_sec', 'open_ms'))))
+    for scenario, benchmark, metric, change in regressions:
+        print('REGRESSION: {} {} {} {:+.1%}'.format(scenario, benchmark, metric, change))
+    return regressions
+
+
+def main():
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--megabytes', type=float, default=50,
+                        help='approximate size of the data of each scenario')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--benchmarks', nargs='+', choices=['write'] + list(BENCHMARKS),
+                        default=['write'] + list(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=3, help='keep the fastest of N runs')
+    parser.add_argument('--no-isolate', action='store_true',
+                        help='run in this process (faster, but no peak RSS)')
+    parser.add_argument('--json', help='write results to this file as JSON')
+    parser.add_argument('--compare', help='compare with results of a previous run (JSON file)')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='fractional change of a metric reported as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='exit with an error if any metric regressed')
+    options = parser.parse_args()
+
+    results = []
+    print('{:14} {:18} {:>10} {:>12} {:>10} {:>10}'.format('scenario', 'benchmark', 'MB/s',
+                                                           'blocks/s', 'open ms', 'RSS MB'))
+    with tempfile.TemporaryDirectory() as directory:
+        for scenario in options.scenarios:
+            filename = os.path.join(directory, scenario + '.bddf')
+            write_scenario(scenario, filename, options.megabytes)
+            for benchmark in options.benchmarks:
+                if benchmark != 'write':
+                    scenarios = BENCHMARKS[benchmark][1]
+                    if scenarios is not None and scenario not in scenarios:
+                        continue
+                result = run_case(scenario, benchmark, filename, options.megabytes, options.repeat,
+                                  not options.no_isolate)
+                results.append(result)
+                print('{:14} {:18} {:>10.1f} {:>12.0f} {:>10} {:>10}'.format(
+                    scenario, benchmark, result['mb_per_sec'], result['blocks_per_sec'],
+                    '-' if 'open_ms' not in result else '{:.2f}'.format(result['open_ms']), '-'
+                    if result['peak_rss_mb'] is None else '{:.0f}'.format(result['peak_rss_mb'])))
+
+    output = {'metadata': metadata(options), 'results': results}
+    if options.json:
+        with open(options.json, 'w') as outfile:
+            json.dump(output, outfile, indent=2)
+
+    if options.compare:
+        with open(options.compare) as infile:
+            baseline = json.load(infile)
+        regressions = compare(results, output['metadata'], baseline, options.threshold)
+        if regressions and options.fail_on_regression:
+            return False
+    return True
+
+
+if __name__ == '__main__':
+    if not main():
+        sys.exit(1)
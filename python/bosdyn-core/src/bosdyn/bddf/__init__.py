@@ -11,10 +11,20 @@
 # pylint: disable=unused-import
 from .common import (LOGGER, PROTOBUF_CONTENT_TYPE, AddSeriesError, ChecksumError, DataError,
                      DataFormatError, ParseError, SeriesNotUniqueError)
+# Block offsets and timestamps of a series, as NumPy arrays.
+from .block_index import SeriesBlockArrays
+# Functions for extracting fields of a protobuf channel into NumPy columns.
+from .columns import extract_columns, load_columns, load_or_extract_columns, save_columns
+# Names of the codecs which may be used to compress the data in a series.
+from .compression import COMPRESSION_CODECS, COMPRESSION_LZMA, COMPRESSION_ZLIB
 # Class for reading data from a file-like object which is seekable.
 from .data_reader import DataReader
+# Class for reading a collection of bddf files as a single time-ordered dataset.
+from .dataset import BddfDataset, DatasetMessage, DatasetSeries
 # Class for writing data to a file.
 from .data_writer import DataWriter
+# Index pairing logged GRPC requests and responses, with per-call latency.
+from .grpc_index import GrpcCall, GrpcCallIndex
 # Class for registering a series which stores GRPC request/response pairs.
 from .grpc_reader import GrpcReader
 # Class for registering a series which stores GRPC request/response pairs.
@@ -31,5 +41,8 @@ from .protobuf_channel_reader import ProtobufChannelReader
 from .protobuf_reader import ProtobufReader
 # Class which assists with writing POD data values into a series, within a DataWriter.
 from .protobuf_series_writer import ProtobufSeriesWriter
+# Functions for rebuilding the index of a truncated bddf file.
+from .salvage import SalvageResult, repair_file, salvage_index
 # A data reader which reads the file format from a stream, without seeking.
-from .stream_data_reader import StreamDataReader
+from .stream_data_reader import (CHECKSUM_INLINE, CHECKSUM_SKIP, CHECKSUM_THREADED,
+                                 StreamDataReader)
@@ -92,8 +92,12 @@ class BaseDataReader:  # pylint: disable=too-many-instance-attributes
     def __enter__(self):
         return self
 
+    def close(self):
+        """Close the input file."""
+        self._close()
+
     def _close(self):
-        if not self._file:
+        if not getattr(self, '_file', None):
             return
         self._file.close()
         self._file = None
@@ -102,10 +106,20 @@ class BaseDataReader:  # pylint: disable=too-many-instance-attributes
         self._close()
 
     def _read(self, nbytes):
-        assert nbytes
+        if not nbytes:
+            return b''  # Empty data blocks are valid.
         block = self._file.read(nbytes)
-        if not block:
-            raise EOFError("Unexpected end of bddf file")
+        if len(block) < nbytes:
+            # Streams may return short reads before the end of the data.
+            chunks = [block]
+            nread = len(block)
+            while nread < nbytes:
+                chunk = self._file.read(nbytes - nread)
+                if not chunk:
+                    raise EOFError("Unexpected end of bddf file")
+                chunks.append(chunk)
+                nread += len(chunk)
+            block = b''.join(chunks)
         return block
 
     def _read_header(self):
@@ -152,6 +166,14 @@ class BaseDataReader:  # pylint: disable=too-many-instance-attributes
                 descriptor_type_name, desc.WhichOneof("DescriptorType")))
         return getattr(desc, descriptor_type_name)
 
+    def _verify_checksum(self):
+        # pylint: disable=no-member
+        if (self._file_descriptor.checksum_type == bddf.FileFormatDescriptor.CHECKSUM_TYPE_SHA1 and
+                self._read_checksum is not None and self._checksum != self._read_checksum):
+            raise ChecksumError("File checksum 0x{} does not match computed value 0x{}".format(
+                ''.join('{:02X}'.format(x) for x in self._checksum),
+                ''.join('{:02X}'.format(x) for x in self._read_checksum)))
+
     def _read_block(self):
         (block_header,) = struct.unpack('<Q', self._read(8))
         block_size = block_header & BLOCK_HEADER_SIZE_MASK
@@ -161,12 +183,7 @@ class BaseDataReader:  # pylint: disable=too-many-instance-attributes
             self._read_checksum = self._computed_checksum()  # pylint: disable=assignment-from-none
             self._checksum = self._read(self._file_descriptor.checksum_num_bytes)
             self._eof = True
-            # pylint: disable=no-member
-            if (self._file_descriptor.checksum_type == bddf.FileFormatDescriptor.CHECKSUM_TYPE_SHA1
-                    and self._read_checksum is not None and self._checksum != self._read_checksum):
-                raise ChecksumError("File checksum 0x{} does not match computed value 0x{}".format(
-                    ''.join('{:02X}'.format(x) for x in self._checksum),
-                    ''.join('{:02X}'.format(x) for x in self._read_checksum)))
+            self._verify_checksum()
             raise EOFError("Normal end of bddf file")
         is_data_block = (block_type == DATA_BLOCK_TYPE)
         if not is_data_block:
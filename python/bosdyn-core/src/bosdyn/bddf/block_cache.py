@@ -0,0 +1,78 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Size-bounded LRU cache of decoded data blocks, used by DataReader."""
+
+import collections
+
+# Approximate memory used by a cache entry besides its data (descriptor, key, bookkeeping).
+ENTRY_OVERHEAD_BYTES = 256
+
+
+class BlockCache:
+    """Least-recently-used cache of decoded blocks, bounded by the total size of their data.
+
+    Values are (DataDescriptor, timestamp_nsec, data) tuples as returned by DataReader.read().
+    """
+
+    def __init__(self, max_bytes):
+        """
+        Args:
+         max_bytes:  maximum total size of the cached entries.  Blocks larger than this are
+                      not cached.
+        """
+        self._max_bytes = max_bytes
+        self._entries = collections.OrderedDict()  # key -> (value, nbytes)
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_bytes(self):
+        """The maximum total size of the cached entries."""
+        return self._max_bytes
+
+    @property
+    def nbytes(self):
+        """The current total size of the cached entries."""
+        return self._nbytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Return the cached value for key, marking it most recently used, or None."""
+        try:
+            value, _nbytes = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Add value to the cache, evicting least recently used entries to stay within max_bytes.
+        """
+        nbytes = len(value[2]) + ENTRY_OVERHEAD_BYTES
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._nbytes -= old[1]
+        if nbytes > self._max_bytes:
+            return
+        self._entries[key] = (value, nbytes)
+        self._nbytes += nbytes
+        while self._nbytes > self._max_bytes:
+            _key, (_value, evicted_nbytes) = self._entries.popitem(last=False)
+            self._nbytes -= evicted_nbytes
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        self._entries.clear()
+        self._nbytes = 0
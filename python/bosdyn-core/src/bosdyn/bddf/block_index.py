@@ -0,0 +1,110 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Array-based representation of the block index of a series in a bddf file."""
+
+import numpy as np
+
+import bosdyn.api.bddf_pb2 as bddf
+
+from .common import ParseError
+
+NSEC_PER_SEC = 1000000000
+
+
+class SeriesBlockArrays:
+    """File offsets and timestamps of the data blocks in a series, stored as NumPy arrays.
+
+    This carries the same information as a SeriesBlockIndex proto, but lookups do not require
+     iterating over protobuf messages.  Timestamps are expected to be non-decreasing within a
+     series (which is how DataWriter writes them), so lookups by time use binary search.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, series_index, descriptor_file_offset, file_offsets, timestamps_nsec,
+            additional_indexes=None, total_bytes=0):
+        """
+        Args:
+         series_index:            index of the series in the file.
+         descriptor_file_offset:  location of the SeriesDescriptor in the file.
+         file_offsets:            array-like of the file offset of each data block.
+         timestamps_nsec:         array-like of the timestamp (nsec) of each data block.
+         additional_indexes:      optional (num_blocks x num_additional_indexes) array-like.
+         total_bytes:             total number of bytes of data in the series.
+        """
+        self.series_index = series_index
+        self.descriptor_file_offset = descriptor_file_offset
+        self.file_offsets = np.asarray(file_offsets, dtype=np.uint64)
+        self.timestamps_nsec = np.asarray(timestamps_nsec, dtype=np.int64)
+        if self.file_offsets.shape != self.timestamps_nsec.shape:
+            raise ParseError("Series {} has {} file offsets but {} timestamps.".format(
+                series_index, len(self.file_offsets), len(self.timestamps_nsec)))
+        if additional_indexes is None:
+            additional_indexes = np.zeros((len(self.file_offsets), 0), dtype=np.int64)
+        self.additional_indexes = np.asarray(additional_indexes, dtype=np.int64)
+        if (self.additional_indexes.ndim != 2 or
+                len(self.additional_indexes) != len(self.file_offsets)):
+            raise ParseError("Series {} additional indexes have shape {}, expected ({}, N).".format(
+                series_index, self.additional_indexes.shape, len(self.file_offsets)))
+        self.total_bytes = total_bytes
+
+    def __len__(self):
+        return len(self.file_offsets)
+
+    @classmethod
+    def from_proto(cls, series_block_index):
+        """Create from a SeriesBlockIndex proto."""
+        entries = series_block_index.block_entries
+        num_blocks = len(entries)
+        file_offsets = np.fromiter((entry.file_offset for entry in entries), dtype=np.uint64,
+                                   count=num_blocks)
+        timestamps_nsec = np.fromiter(
+            (entry.timestamp.seconds * NSEC_PER_SEC + entry.timestamp.nanos for entry in entries),
+            dtype=np.int64, count=num_blocks)
+        num_additional = len(entries[0].additional_indexes) if num_blocks else 0
+        additional_indexes = np.empty((num_blocks, num_additional), dtype=np.int64)
+        if num_additional:
+            for idx, entry in enumerate(entries):
+                if len(entry.additional_indexes) != num_additional:
+                    raise ParseError("Series {} block {} has {} additional indexes, not {}.".format(
+                        series_block_index.series_index, idx, len(entry.additional_indexes),
+                        num_additional))
+                additional_indexes[idx] = entry.additional_indexes
+        return cls(series_block_index.series_index, series_block_index.descriptor_file_offset,
+                   file_offsets, timestamps_nsec, additional_indexes,
+                   series_block_index.total_bytes)
+
+    def to_proto(self):
+        """Return the equivalent SeriesBlockIndex proto."""
+        # pylint: disable=no-member
+        block_index = bddf.SeriesBlockIndex(series_index=self.series_index,
+                                            descriptor_file_offset=self.descriptor_file_offset,
+                                            total_bytes=self.total_bytes)
+        additional_indexes = self.additional_indexes.tolist()
+        for file_offset, timestamp_nsec, additional in zip(self.file_offsets.tolist(),
+                                                           self.timestamps_nsec.tolist(),
+                                                           additional_indexes):
+            entry = block_index.block_entries.add(file_offset=file_offset)
+            entry.timestamp.seconds, entry.timestamp.nanos = divmod(timestamp_nsec, NSEC_PER_SEC)
+            if additional:
+                entry.additional_indexes.extend(additional)
+        return block_index
+
+    def index_at_time(self, timestamp_nsec):
+        """Return the index of the first block with a timestamp at or after timestamp_nsec.
+
+        Returns len(self) if all blocks are earlier than timestamp_nsec.
+        """
+        return int(np.searchsorted(self.timestamps_nsec, timestamp_nsec, side='left'))
+
+    def index_range(self, start_nsec=None, end_nsec=None):
+        """Return (begin, end) indexes of blocks with start_nsec <= timestamp < end_nsec.
+
+        Either limit may be None, meaning the range is unbounded on that side.
+        """
+        begin = 0 if start_nsec is None else self.index_at_time(start_nsec)
+        end = len(self) if end_nsec is None else self.index_at_time(end_nsec)
+        return begin, max(begin, end)
@@ -32,6 +32,10 @@ class BlockWriter:
         self._write_block_header(DESCRIPTOR_BLOCK_TYPE, len(serialized))
         self._write(serialized)
 
+    def write_encoded_blocks(self, data):
+        """Write data which already holds complete blocks (e.g., copied from another file)."""
+        self._write(data)
+
     def write_data_block(self, desc_block, data):
         """Write a block of data to the file."""
         serialized_desc = desc_block.SerializeToString()
@@ -44,6 +48,16 @@ class BlockWriter:
         self._hasher.update(data)
         self._outfile.write(data)
 
+    def _write_unhashed(self, data):
+        self._outfile.write(data)
+
+    def _digest(self):
+        return self._hasher.digest()
+
+    def flush(self):
+        """Flush written data to the underlying file."""
+        self._outfile.flush()
+
     def close(self):
         """Close the file, if not already closed."""
         if self.closed:
@@ -76,12 +90,16 @@ class BlockWriter:
         """Write the end of the data file."""
         self._write_block_header(END_BLOCK_TYPE, 24)
         self._write(struct.pack('<Q', index_offset))
-        self._outfile.write(self._hasher.digest())
-        self._outfile.write(END_MAGIC)
+        self._write_unhashed(self._digest())
+        self._write_unhashed(END_MAGIC)
 
     def _write_block_header(self, block_type, block_len):
+        self._write(self._block_header(block_type, block_len))
+
+    @staticmethod
+    def _block_header(block_type, block_len):
         if block_len > BLOCK_HEADER_SIZE_MASK:
             raise DataFormatError('block size ({}) is too big (> {})'.format(
                 block_len, BLOCK_HEADER_SIZE_MASK))
         block_descriptor = block_type << 56 | block_len  # mark this as a desc block
-        self._write(struct.pack('<Q', block_descriptor))
+        return struct.pack('<Q', block_descriptor)
@@ -0,0 +1,277 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Extract fields of a protobuf channel into NumPy columns.
+
+A field path names a scalar field of the message with dot-separated field names, with an index
+ for repeated fields, e.g., 'kinematic_state.velocity_of_body_in_odom.linear.x' or
+ 'kinematic_state.joint_states[3].position'.
+Fields of type google.protobuf.Timestamp or Duration become int64 nanoseconds, and wrapper
+ messages such as google.protobuf.DoubleValue become the type of their value.
+Values missing from a message (an out-of-range index, or an unset wrapper) are NaN in floating
+ point columns, and the default value otherwise.
+
+Columns can be saved as .npy files in a directory, and loaded back memory-mapped, so repeated
+ analyses do not need to parse the protobuf messages again.
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+from google.protobuf.descriptor import FieldDescriptor
+
+from .protobuf_reader import ProtobufReader
+
+TIMESTAMP_COLUMN = 'timestamp_nsec'
+COLUMNS_MANIFEST = 'columns.json'
+
+_CPPTYPE_TO_DTYPE = {
+    FieldDescriptor.CPPTYPE_DOUBLE: np.dtype(np.float64),
+    FieldDescriptor.CPPTYPE_FLOAT: np.dtype(np.float32),
+    FieldDescriptor.CPPTYPE_INT32: np.dtype(np.int32),
+    FieldDescriptor.CPPTYPE_INT64: np.dtype(np.int64),
+    FieldDescriptor.CPPTYPE_UINT32: np.dtype(np.uint32),
+    FieldDescriptor.CPPTYPE_UINT64: np.dtype(np.uint64),
+    FieldDescriptor.CPPTYPE_BOOL: np.dtype(np.bool_),
+    FieldDescriptor.CPPTYPE_ENUM: np.dtype(np.int32),
+}
+
+_TIME_TYPES = ('google.protobuf.Timestamp', 'google.protobuf.Duration')
+
+_PATH_ELEMENT_RE = re.compile(r'^(\w+)(?:\[(\d+)\])?$')
+
+_MANIFEST_VERSION = 1
+
+
+def _is_repeated(field):
+    # FieldDescriptor.label is not available in newer versions of protobuf.
+    if hasattr(field, 'is_repeated'):
+        return field.is_repeated
+    return field.label == FieldDescriptor.LABEL_REPEATED
+
+
+class _Missing(Exception):
+    """A value is missing from a message."""
+
+
+def _parse_field_path(field_path):
+    elements = []
+    for element in field_path.split('.'):
+        match = _PATH_ELEMENT_RE.match(element)
+        if not match:
+            raise ValueError("Invalid element '{}' in field path '{}'".format(element, field_path))
+        name, index = match.groups()
+        elements.append((name, None if index is None else int(index)))
+    return elements
+
+
+class _FieldGetter:  # pylint: disable=too-few-public-methods
+    """Gets the value of a field path from messages of one protobuf type."""
+
+    def __init__(self, protobuf_type, field_path):
+        self.field_path = field_path
+        self._steps = []  # (field name, index or None, presence must be checked)
+        descriptor = protobuf_type.DESCRIPTOR
+        field = None
+        for name, index in _parse_field_path(field_path):
+            if descriptor is None:
+                raise ValueError("'{}' is not a message field in '{}'".format(
+                    self._steps[-1][0], field_path))
+            field = descriptor.fields_by_name.get(name)
+            if field is None:
+                raise ValueError("{} has no field '{}' (in '{}')".format(
+                    descriptor.full_name, name, field_path))
+            is_repeated = _is_repeated(field)
+            if is_repeated != (index is not None):
+                raise ValueError("Field '{}' {} in '{}'".format(
+                    name, 'needs an index' if is_repeated else 'cannot be indexed', field_path))
+            self._steps.append((name, index, False))
+            descriptor = None
+            if field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+                descriptor = field.message_type
+
+        self._convert = None
+        if descriptor is None:
+            self.dtype = _CPPTYPE_TO_DTYPE.get(field.cpp_type)
+            if self.dtype is None:
+                if field.cpp_type != FieldDescriptor.CPPTYPE_STRING:
+                    raise ValueError("Unsupported type of field '{}'".format(field_path))
+                self.dtype = np.dtype(np.str_ if field.type ==
+                                      FieldDescriptor.TYPE_STRING else np.bytes_)
+        elif descriptor.full_name in _TIME_TYPES:
+            self.dtype = np.dtype(np.int64)
+            self._convert = lambda message: message.seconds * 1000000000 + message.nanos
+        elif descriptor.full_name.startswith('google.protobuf.') and list(
+                descriptor.fields_by_name) == ['value']:
+            # Wrapper types such as DoubleValue: an unset wrapper is a missing value.
+            self.dtype = _CPPTYPE_TO_DTYPE.get(descriptor.fields_by_name['value'].cpp_type)
+            if self.dtype is None:
+                raise ValueError("Unsupported type of field '{}'".format(field_path))
+            name, index, _check = self._steps[-1]
+            self._steps[-1] = (name, index, index is None)
+            self._steps.append(('value', None, False))
+        else:
+            raise ValueError("Field path '{}' names a message, not a value".format(field_path))
+        self.missing_value = np.nan if self.dtype.kind == 'f' else self.dtype.type()
+
+    def get(self, message):
+        """Return the value of the field in message, or raise _Missing."""
+        value = message
+        for name, index, check_presence in self._steps:
+            if index is not None:
+                values = getattr(value, name)
+                if index >= len(values):
+                    raise _Missing()
+                value = values[index]
+            else:
+                if check_presence and not value.HasField(name):
+                    raise _Missing()
+                value = getattr(value, name)
+        if self._convert is not None:
+            value = self._convert(value)
+        return value
+
+
+def extract_columns(  # pylint: disable=too-many-arguments,too-many-locals
+        data_reader, protobuf_type, field_paths, channel_name=None, start_nsec=None, end_nsec=None):
+    """Decode the messages of a protobuf channel once, and extract fields into NumPy columns.
+
+    Args:
+     data_reader:    DataReader of the file.
+     protobuf_type:  protobuf class of the messages in the channel.
+     field_paths:    list of field paths (see module documentation).
+     channel_name:   name of the channel (default: the full name of protobuf_type).
+     start_nsec:     if set, only extract messages at or after this time.
+     end_nsec:       if set, only extract messages before this time.
+
+    Returns: {field path -> numpy array} with one value per message, plus TIMESTAMP_COLUMN
+              holding the int64 timestamp of each message.
+
+    Raises ValueError if a field path is not valid for protobuf_type.
+    """
+    getters = [_FieldGetter(protobuf_type, field_path) for field_path in field_paths]
+    series_index = ProtobufReader(data_reader).series_index(
+        channel_name or protobuf_type.DESCRIPTOR.full_name,
+        message_type=protobuf_type.DESCRIPTOR.full_name)
+    block_arrays = data_reader.series_block_arrays(series_index)
+    begin, end = block_arrays.index_range(start_nsec, end_nsec)
+
+    num_messages = end - begin
+    values = [[None] * num_messages for _ in getters]
+    message = protobuf_type()
+    for row, index_in_series in enumerate(range(begin, end)):
+        _desc, _timestamp_nsec, data = data_reader.read(series_index, index_in_series)
+        message.ParseFromString(data)
+        for getter, column in zip(getters, values):
+            try:
+                column[row] = getter.get(message)
+            except _Missing:
+                column[row] = getter.missing_value
+
+    columns = {TIMESTAMP_COLUMN: np.array(block_arrays.timestamps_nsec[begin:end], dtype=np.int64)}
+    for getter, column in zip(getters, values):
+        if getter.dtype.kind in 'SU':
+            columns[getter.field_path] = np.array(column, dtype=getter.dtype.type)
+        else:
+            columns[getter.field_path] = np.array(column, dtype=getter.dtype)
+    return columns
+
+
+def _column_filename(name, used):
+    base = re.sub(r'[^\w.-]', '_', name)
+    filename = base + '.npy'
+    suffix = 1
+    while filename in used:
+        filename = '{}_{}.npy'.format(base, suffix)
+        suffix += 1
+    used.add(filename)
+    return filename
+
+
+def save_columns(columns, directory, metadata=None):
+    """Save columns as .npy files in directory, with a manifest naming the file of each column.
+
+    Args:
+     columns:    {name -> numpy array}, e.g., from extract_columns().
+     directory:  directory in which to write the files (created if needed).
+     metadata:   optional JSON-serializable dict stored in the manifest.
+    """
+    os.makedirs(directory, exist_ok=True)
+    used = set()
+    filenames = {}
+    for name, column in columns.items():
+        filenames[name] = _column_filename(name, used)
+        np.save(os.path.join(directory, filenames[name]), column, allow_pickle=False)
+    manifest = {'version': _MANIFEST_VERSION, 'columns': filenames, 'metadata': metadata or {}}
+    tmp_path = os.path.join(directory, COLUMNS_MANIFEST + '.tmp')
+    with open(tmp_path, 'w') as outfile:
+        json.dump(manifest, outfile, indent=1)
+    os.replace(tmp_path, os.path.join(directory, COLUMNS_MANIFEST))
+
+
+def load_columns(directory, mmap_mode='r'):
+    """Load columns saved by save_columns().
+
+    Args:
+     directory:  directory holding the columns.
+     mmap_mode:  passed to numpy.load(); 'r' memory-maps the columns read-only, None reads them.
+
+    Returns: {name -> numpy array}, metadata dict
+
+    Raises FileNotFoundError if there are no saved columns in directory.
+    """
+    with open(os.path.join(directory, COLUMNS_MANIFEST)) as infile:
+        manifest = json.load(infile)
+    if manifest.get('version') != _MANIFEST_VERSION:
+        raise ValueError("Unsupported columns manifest version {}".format(manifest.get('version')))
+    columns = {
+        name: np.load(os.path.join(directory, filename), mmap_mode=mmap_mode, allow_pickle=False)
+        for name, filename in manifest['columns'].items()
+    }
+    return columns, manifest['metadata']
+
+
+def load_or_extract_columns(  # pylint: disable=too-many-arguments
+        data_reader, protobuf_type, field_paths, directory, channel_name=None, mmap_mode='r'):
+    """Load columns of a channel saved in directory, or extract and save them.
+
+    Saved columns are used only if they were extracted from the same file (same size,
+     modification time and checksum), for the same channel, and include all field_paths.
+
+    Args:
+     data_reader:    DataReader of the file.
+     protobuf_type:  protobuf class of the messages in the channel.
+     field_paths:    list of field paths (see module documentation).
+     directory:      directory holding the saved columns.
+     channel_name:   name of the channel (default: the full name of protobuf_type).
+     mmap_mode:      passed to numpy.load().
+
+    Returns: {field path -> numpy array}, plus TIMESTAMP_COLUMN
+    """
+    channel_name = channel_name or protobuf_type.DESCRIPTOR.full_name
+    file_size, mtime_nsec, checksum = data_reader.cache_key()
+    metadata = {
+        'file_size': file_size,
+        'mtime_nsec': mtime_nsec,
+        'checksum': checksum.hex(),
+        'channel_name': channel_name,
+        'protobuf_type': protobuf_type.DESCRIPTOR.full_name,
+    }
+    try:
+        columns, saved_metadata = load_columns(directory, mmap_mode)
+    except (OSError, ValueError, KeyError):
+        columns, saved_metadata = None, None
+    if (columns is not None and saved_metadata == metadata and
+            all(path in columns for path in field_paths)):
+        return {name: columns[name] for name in [TIMESTAMP_COLUMN] + list(field_paths)}
+
+    columns = extract_columns(data_reader, protobuf_type, field_paths, channel_name)
+    save_columns(columns, directory, metadata)
+    if mmap_mode is None:
+        return columns
+    return load_columns(directory, mmap_mode)[0]
@@ -0,0 +1,87 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Optional per-series compression of data blocks in bddf files.
+
+A compressed series names its codec in the SeriesDescriptor annotations, under the key
+ COMPRESSION_ANNOTATION.  Each data block of the series is compressed independently, so blocks
+ can still be read in any order.
+"""
+
+import lzma
+import zlib
+
+from .common import DataFormatError
+
+# SeriesDescriptor annotation key naming the codec used to compress the data blocks.
+COMPRESSION_ANNOTATION = 'bosdyn:compression'
+
+COMPRESSION_ZLIB = 'zlib'
+COMPRESSION_LZMA = 'lzma'
+
+
+def _zlib_compress(data, level):
+    return zlib.compress(data, -1 if level is None else level)
+
+
+def _lzma_compress(data, level):
+    return lzma.compress(data, format=lzma.FORMAT_XZ, preset=level)
+
+
+# codec name -> (compress(data, level), decompress(data))
+_CODECS = {
+    COMPRESSION_ZLIB: (_zlib_compress, zlib.decompress),
+    COMPRESSION_LZMA: (_lzma_compress, lzma.decompress),
+}
+
+COMPRESSION_CODECS = tuple(_CODECS)
+
+
+def check_codec(codec):
+    """Raise DataFormatError if codec is not a supported compression codec name."""
+    if codec not in _CODECS:
+        raise DataFormatError('Unsupported compression codec {!r} (expected one of {}).'.format(
+            codec, ', '.join(COMPRESSION_CODECS)))
+
+
+def compress(codec, data, level=None):
+    """Compress data (bytes-like) with the named codec.
+
+    Args:
+     codec:  name of the codec (one of COMPRESSION_CODECS).
+     data:   bytes-like data to compress.
+     level:  codec-specific compression level (zlib 0-9, lzma preset 0-9), or None for default.
+
+    Returns: compressed data (bytes)
+    """
+    check_codec(codec)
+    return _CODECS[codec][0](data, level)
+
+
+def decompress(codec, data):
+    """Decompress data (bytes-like) compressed with the named codec.
+
+    Returns: decompressed data (bytes)
+
+    Raises DataFormatError if the codec is unknown or the data cannot be decompressed.
+    """
+    check_codec(codec)
+    try:
+        return _CODECS[codec][1](data)
+    except (zlib.error, lzma.LZMAError) as err:
+        raise DataFormatError('Failed to decompress {} data: {}'.format(codec, err)) from err
+
+
+def series_compression(series_descriptor):
+    """Return the codec name used by the series, or None if its data is not compressed.
+
+    Raises DataFormatError if the series uses an unsupported codec.
+    """
+    codec = series_descriptor.annotations.get(COMPRESSION_ANNOTATION)
+    if codec is None:
+        return None
+    check_codec(codec)
+    return codec
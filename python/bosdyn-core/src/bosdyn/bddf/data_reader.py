@@ -5,11 +5,30 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Class for reading data from a file-like object which is seekable."""
+import mmap
 import os
 import struct
 
+import numpy as np
+
+import bosdyn.api.bddf_pb2 as bddf
+
 from .base_data_reader import BaseDataReader
-from .common import END_MAGIC, INDEX_OFFSET_OFFSET, MAGIC, ParseError
+from .block_cache import BlockCache
+from .block_index import SeriesBlockArrays
+from .common import (BLOCK_HEADER_SIZE_MASK, BLOCK_HEADER_TYPE_MASK, DATA_BLOCK_TYPE,
+                     DESCRIPTOR_BLOCK_TYPE, END_MAGIC, INDEX_OFFSET_OFFSET, LOGGER, MAGIC,
+                     ParseError)
+from .compression import decompress, series_compression
+from .index_cache import INDEX_CACHE_SUFFIX, IndexCache, file_cache_key
+from .salvage import salvage_index
+
+# read_many() reads requested blocks whose starts are within this many bytes in a single read.
+DEFAULT_COALESCE_BYTES = 16 * 1024
+# read_many() does not coalesce reads beyond this size.
+DEFAULT_MAX_READ_BYTES = 8 * 1024**2
+
+_DATA_BLOCK_HEADER_SIZE = 12  # Block header plus size of the DataDescriptor.
 
 
 class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attributes
@@ -18,18 +37,60 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
     Methods raise ParseError if there is a problem with the format of the file.
     """
 
-    def __init__(self, infile=None, filename=None):
+    def __init__(  # pylint: disable=too-many-arguments
+            self, infile=None, filename=None, use_mmap=False, index_cache=None, salvage=False,
+            block_cache_bytes=0):
         """
         At least one of the following arguments must be specified.
 
         Args:
          infile:      binary file-like object for reading (e.g., from open(fname, "rb")).
          filename:    path of input file, if applicable.
+         use_mmap:    if True, memory-map the file and return data from read() as memoryview
+                       slices into the mapping, rather than copying it into new bytes objects.
+                       The input file must be a real file with a fileno().
+         index_cache: path of a sidecar index cache file (see bosdyn.bddf.index_cache), or True
+                       to use the input file name plus INDEX_CACHE_SUFFIX.  A cache matching
+                       the file is loaded instead of parsing the index from the file.
+                       Otherwise the index is parsed, and the cache is (re)written.
+         salvage:     if True and the end of the file is missing or corrupt (e.g., the writer
+                       was not closed), rebuild the index by scanning the file
+                       (see bosdyn.bddf.salvage) rather than raising ParseError.
+                       The input file must be a named file.
+         block_cache_bytes: if non-zero, keep up to this many bytes of recently read blocks
+                       in an LRU cache, so reading them again does not touch the file.
+                       The DataDescriptor and data returned by read() are shared with the cache,
+                       so they must not be modified.
         """
+        self._mmap = None
+        self._view = None
         super(DataReader, self).__init__(infile, filename)
         self._series_index_to_descriptor = {}
         self._series_index_to_block_index = {}  # {series_index -> SeriesBlockIndex}
-        self._read_index()
+        self._series_index_to_block_arrays = {}  # {series_index -> SeriesBlockArrays}
+        self._series_index_to_compression = {}  # {series_index -> codec name or None}
+        self._block_cache = BlockCache(block_cache_bytes) if block_cache_bytes else None
+        if use_mmap:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap)
+        if salvage:
+            try:
+                self._read_index(self._index_cache_path(index_cache))
+            except (ParseError, EOFError) as err:
+                LOGGER.warning("Rebuilding index of %s: %s", self._input_filename(), err)
+                self._set_index_from_indexer(salvage_index(self._input_filename()).indexer)
+        else:
+            self._read_index(self._index_cache_path(index_cache))
+
+    @property
+    def is_mmapped(self):
+        """Returns True if the file is memory-mapped, and read() returns memoryview objects."""
+        return self._view is not None
+
+    @property
+    def block_cache(self):
+        """The BlockCache of recently read blocks, or None if caching is disabled."""
+        return self._block_cache
 
     def series_descriptor(self, series_index):
         """Return SeriesDescriptor for given series index, loading it if necessary."""
@@ -38,19 +99,28 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
         except KeyError:
             pass
 
-        series_block_index = self.series_block_index(series_index)
-        desc = self._read_desc_block_at("series_descriptor",
-                                        series_block_index.descriptor_file_offset)
+        descriptor_file_offset = self.series_block_arrays(series_index).descriptor_file_offset
+        desc = self._read_desc_block_at("series_descriptor", descriptor_file_offset)
         self._series_index_to_descriptor[series_index] = desc
         return desc
 
+    def series_compression(self, series_index):
+        """Return the name of the codec compressing data in the series, or None if uncompressed."""
+        try:
+            return self._series_index_to_compression[series_index]
+        except KeyError:
+            pass
+        codec = series_compression(self.series_descriptor(series_index))
+        self._series_index_to_compression[series_index] = codec
+        return codec
+
     def num_data_blocks(self, series_index):
         """Returns the number of data blocks for a given series in the file."""
-        return len(self.series_block_index(series_index).block_entries)
+        return len(self.series_block_arrays(series_index))
 
     def total_bytes(self, series_index):
         """Returns the total number of bytes for data in a given series in the file."""
-        return self.series_block_index(series_index).total_bytes
+        return self.series_block_arrays(series_index).total_bytes
 
     def read(self, series_index, index_in_series):
         """Retrieves a message and related information from the file.
@@ -59,14 +129,100 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
          series_index: int selecting from which series to read the message.
          index_in_series: The index number of the message within the channel.
 
-        Returns: DataTypeDescriptor for channel, timestamp_nsec (int), message-data (bytes)
+        Returns: DataTypeDescriptor for channel, timestamp_nsec (int), message-data (bytes, or
+                  a read-only memoryview into the file mapping if the reader uses mmap and
+                  the series is not compressed)
 
         Raises ParseError if there is a problem with the format of the file.
         """
-        series_block_index = self.series_block_index(series_index)
-        msg_idx = series_block_index.block_entries[index_in_series]
-        desc, data = self._read_data_block_at(msg_idx.file_offset)
-        return desc, msg_idx.timestamp.ToNanoseconds(), data
+        if self._block_cache is not None:
+            value = self._block_cache.get((series_index, index_in_series))
+            if value is not None:
+                return value
+        block_arrays = self.series_block_arrays(series_index)
+        desc, data = self._read_data_block_at(int(block_arrays.file_offsets[index_in_series]))
+        return self._decoded_block(series_index, index_in_series,
+                                   self.series_compression(series_index), desc,
+                                   int(block_arrays.timestamps_nsec[index_in_series]), data)
+
+    def read_many(self, series_index, indices, coalesce_bytes=DEFAULT_COALESCE_BYTES,
+                  max_read_bytes=DEFAULT_MAX_READ_BYTES):
+        """Retrieve several messages from a series, minimizing the number of reads of the file.
+
+        The blocks which are not cached are read in file order, and blocks which are close
+         together in the file are fetched with a single read.
+
+        Args:
+         series_index:    int selecting from which series to read the messages.
+         indices:         iterable of the indexes of the messages within the series.
+         coalesce_bytes:  blocks which start within this many bytes of the previous requested
+                           block are read together with it.
+         max_read_bytes:  limit on the size of a coalesced read (a single block may exceed it).
+
+        Returns: list of the values returned by read(), in the order of indices.
+
+        Raises ParseError if there is a problem with the format of the file.
+        """
+        block_arrays = self.series_block_arrays(series_index)
+        if not isinstance(indices, (np.ndarray, range)):
+            indices = list(indices)
+        indices = np.asarray(indices, dtype=np.int64)
+        indices = np.where(indices < 0, indices + len(block_arrays), indices)
+        if indices.size and (indices.min() < 0 or indices.max() >= len(block_arrays)):
+            raise IndexError("Index out of range for series {} with {} blocks".format(
+                series_index, len(block_arrays)))
+        values = {}
+        missing = np.unique(indices)
+        if self._block_cache is not None:
+            uncached = []
+            for index in missing.tolist():
+                value = self._block_cache.get((series_index, index))
+                if value is None:
+                    uncached.append(index)
+                else:
+                    values[index] = value
+            missing = np.array(uncached, dtype=np.int64)
+        offsets = block_arrays.file_offsets[missing].astype(np.int64)
+        order = np.argsort(offsets, kind='stable')
+        missing = missing[order]
+        offsets = offsets[order].tolist()
+        timestamps = block_arrays.timestamps_nsec[missing].tolist()
+        missing = missing.tolist()
+        codec = self.series_compression(series_index)
+
+        if self._view is not None:
+            for index, offset, timestamp_nsec in zip(missing, offsets, timestamps):
+                desc, data = self._read_data_block_at(offset)
+                values[index] = self._decoded_block(series_index, index, codec, desc,
+                                                    timestamp_nsec, data)
+            return [values[index] for index in indices.tolist()]
+
+        begin = 0
+        for end in range(1, len(offsets) + 1):
+            if (end == len(offsets) or offsets[end] - offsets[end - 1] > coalesce_bytes or
+                    offsets[end] - offsets[begin] > max_read_bytes):
+                self._read_block_group(series_index, codec, missing[begin:end], offsets[begin:end],
+                                       timestamps[begin:end], values)
+                begin = end
+        return [values[index] for index in indices.tolist()]
+
+    def index_at_time(self, series_index, timestamp_nsec):
+        """Return the index of the first block in the series at or after timestamp_nsec.
+
+        Returns num_data_blocks(series_index) if all blocks are earlier than timestamp_nsec.
+        """
+        return self.series_block_arrays(series_index).index_at_time(timestamp_nsec)
+
+    def read_range(self, series_index, start_nsec=None, end_nsec=None):
+        """Generate the messages in a series with start_nsec <= timestamp < end_nsec.
+
+        Either limit may be None, meaning the range is unbounded on that side.
+
+        Yields: the same values as read(), for each message in the time range, in order.
+        """
+        begin, end = self.series_block_arrays(series_index).index_range(start_nsec, end_nsec)
+        for index_in_series in range(begin, end):
+            yield self.read(series_index, index_in_series)
 
     def series_block_index(self, series_index):
         """Returns the SeriesBlockIndexes for the given series_index, loading it as needed."""
@@ -74,13 +230,75 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
             return self._series_index_to_block_index[series_index]
         except KeyError:
             pass
+        if series_index in self._series_index_to_block_arrays:
+            # Loaded from the index cache, so build the proto from the arrays.
+            block_index = self._series_index_to_block_arrays[series_index].to_proto()
+            self._series_index_to_block_index[series_index] = block_index
+            return block_index
         # Need to load the block index for this series.
         offset = self.file_index.series_block_index_offsets[series_index]
         block_index = self._read_desc_block_at('series_block_index', offset)
         self._series_index_to_block_index[series_index] = block_index
         return block_index
 
-    def _read_index(self):
+    def series_block_arrays(self, series_index):
+        """Returns the SeriesBlockArrays for the given series_index, building it as needed."""
+        try:
+            return self._series_index_to_block_arrays[series_index]
+        except KeyError:
+            pass
+        block_arrays = SeriesBlockArrays.from_proto(self.series_block_index(series_index))
+        self._series_index_to_block_arrays[series_index] = block_arrays
+        return block_arrays
+
+    def cache_key(self):
+        """Return a (file_size, mtime_nsec, checksum) key identifying the contents of the file.
+
+        This is used to check whether data derived from the file (e.g., an index cache) is stale.
+        """
+        return file_cache_key(self._file)
+
+    def _decoded_block(  # pylint: disable=too-many-arguments
+            self, series_index, index_in_series, codec, desc, timestamp_nsec, data):
+        """Decompress the data of a block as needed, and add the block to the cache."""
+        if codec:
+            data = decompress(codec, data)
+        value = (desc, timestamp_nsec, data)
+        if self._block_cache is not None:
+            self._block_cache.put((series_index, index_in_series), value)
+        return value
+
+    def _read_block_group(  # pylint: disable=too-many-arguments
+            self, series_index, codec, indices, offsets, timestamps, values):
+        """Read the data blocks at the given (increasing) offsets in the file with one read."""
+        start = offsets[0]
+        # Read the header of the last block for its size, then everything up to its end.
+        self._seek_to(offsets[-1])
+        (block_header,) = struct.unpack('<Q', self._read(8))
+        self._seek_to(start)
+        buffer = self._read(offsets[-1] - start + _DATA_BLOCK_HEADER_SIZE +
+                            (block_header & BLOCK_HEADER_SIZE_MASK))
+        for index, offset, timestamp_nsec in zip(indices, offsets, timestamps):
+            is_data, desc, data = _parse_block(buffer, offset - start)
+            if not is_data:
+                raise ParseError("Expected a data block at offset {}.".format(offset))
+            values[index] = self._decoded_block(series_index, index, codec, desc, timestamp_nsec,
+                                                data)
+
+    def _input_filename(self):
+        filename = self._filename or getattr(self._file, 'name', None)
+        if not isinstance(filename, str):
+            raise ValueError("This option requires a named input file")
+        return filename
+
+    def _index_cache_path(self, index_cache):
+        if not index_cache:
+            return None
+        if index_cache is not True:
+            return index_cache
+        return self._input_filename() + INDEX_CACHE_SUFFIX
+
+    def _read_index(self, index_cache_path=None):
         self._file.seek(-len(END_MAGIC), os.SEEK_END)
         end_magic = self._read(len(END_MAGIC))
         if end_magic != END_MAGIC:
@@ -89,20 +307,132 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
         self._index_offset, self._checksum = struct.unpack('<QQ', self._read(16))
         if self._index_offset < len(MAGIC):
             raise ParseError('Invalid offset to index: {})'.format(self._index_offset))
+
+        cache_key = None
+        if index_cache_path:
+            try:
+                cache_key = self.cache_key()
+            except (OSError, ValueError) as err:
+                LOGGER.warning("Not using bddf index cache %s: %s", index_cache_path, err)
+                index_cache_path = None
+        if index_cache_path:
+            index_cache = IndexCache.load(index_cache_path, cache_key)
+            if index_cache is not None:
+                self._set_index_from_cache(index_cache)
+                return
+
         self._file_index = self._read_desc_block_at("file_index", self._index_offset)
+        self._set_spec_index()
+        if index_cache_path:
+            self._write_index_cache(index_cache_path, cache_key)
+
+    def _set_spec_index(self):
         self._spec_index = [{
             key: value for key, value in desc.spec.items()
         } for desc in self._file_index.series_identifiers]
 
+    def _set_index_from_cache(self, index_cache):
+        self._file_index = index_cache.file_index
+        self._set_spec_index()
+        for series_index, (desc, block_arrays) in enumerate(
+                zip(index_cache.series_descriptors, index_cache.series_block_arrays)):
+            self._series_index_to_descriptor[series_index] = desc
+            self._series_index_to_block_arrays[series_index] = block_arrays
+
+    def _set_index_from_indexer(self, indexer):
+        self._file_index = indexer.file_index
+        self._set_spec_index()
+        for series_index in range(len(self._file_index.series_identifiers)):
+            self._series_index_to_descriptor[series_index] = indexer.series_descriptor(series_index)
+            self._series_index_to_block_arrays[series_index] = indexer.series_block_arrays(
+                series_index)
+
+    def _write_index_cache(self, path, cache_key):
+        num_series = len(self._file_index.series_identifiers)
+        index_cache = IndexCache(cache_key, self._file_index,
+                                 [self.series_descriptor(idx) for idx in range(num_series)],
+                                 [self.series_block_arrays(idx) for idx in range(num_series)])
+        try:
+            index_cache.write(path)
+        except OSError as err:
+            LOGGER.warning("Failed to write bddf index cache %s: %s", path, err)
+
+    def _close(self):
+        if getattr(self, '_block_cache', None) is not None:
+            self._block_cache.clear()
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Data returned by read() still references the mapping.
+                #  It will be unmapped when the last reference goes away.
+                pass
+            self._mmap = None
+        super(DataReader, self)._close()
+
     def _seek_to(self, location):
         if location < len(MAGIC):
             raise ParseError('Invalid offset for block: {})'.format(location))
         self._file.seek(location)
 
     def _read_data_block_at(self, location):
+        if self._view is not None:
+            is_data, desc, data = self._parse_block_at(location)
+            if not is_data:
+                raise ParseError("Expected a data block at offset {}.".format(location))
+            return desc, data
         self._seek_to(location)
         return self._read_data_block()
 
     def _read_desc_block_at(self, descriptor_type_name, location):
+        if self._view is not None:
+            is_data, desc, _data = self._parse_block_at(location)
+            if is_data:
+                raise ParseError("Expected a descriptor block at offset {}.".format(location))
+            if desc.WhichOneof("DescriptorType") != descriptor_type_name:
+                raise ParseError("Expected DescriptorType {} but got {}.".format(
+                    descriptor_type_name, desc.WhichOneof("DescriptorType")))
+            return getattr(desc, descriptor_type_name)
         self._seek_to(location)
         return self._read_desc_block(descriptor_type_name)
+
+    def _parse_block_at(self, location):
+        """Parse the data or descriptor block at the given offset directly from the mapping."""
+        if location < len(MAGIC):
+            raise ParseError('Invalid offset for block: {})'.format(location))
+        return _parse_block(self._view, location)
+
+
+def _parse_block(buffer, position):
+    """Parse the data or descriptor block at the given position in a bytes-like buffer.
+
+    Returns: is_data_block, DescriptorBlock or DataDescriptor, data (a slice of buffer) or None
+    """
+    if position + 8 > len(buffer):
+        raise EOFError("Unexpected end of bddf file")
+    (block_header,) = struct.unpack_from('<Q', buffer, position)
+    block_size = block_header & BLOCK_HEADER_SIZE_MASK
+    block_type = (block_header & BLOCK_HEADER_TYPE_MASK) >> 56
+    start = position + 8
+    if block_type == DESCRIPTOR_BLOCK_TYPE:
+        if start + block_size > len(buffer):
+            raise EOFError("Unexpected end of bddf file")
+        desc = bddf.DescriptorBlock()
+        desc.ParseFromString(buffer[start:start + block_size])
+        return False, desc, None
+    if block_type != DATA_BLOCK_TYPE:
+        raise ParseError("Expected block_type {} but got {}.".format(DATA_BLOCK_TYPE, block_type))
+    if start + 4 + block_size > len(buffer):
+        raise EOFError("Unexpected end of bddf file")
+    (desc_size,) = struct.unpack_from('<I', buffer, start)
+    if desc_size > block_size:
+        raise ParseError("Data block descriptor size {} > block size {}.".format(
+            desc_size, block_size))
+    start += 4
+    data_desc = bddf.DataDescriptor()
+    data_desc.ParseFromString(buffer[start:start + desc_size])
+    start += desc_size
+    return True, data_desc, buffer[start:start + block_size - desc_size]
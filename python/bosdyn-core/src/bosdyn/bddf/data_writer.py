@@ -9,7 +9,9 @@
 import bosdyn.api.bddf_pb2 as bddf
 
 from .block_writer import BlockWriter
+from .compression import COMPRESSION_ANNOTATION, check_codec, compress
 from .file_indexer import FileIndexer
+from .threaded_block_writer import DEFAULT_MAX_BUFFERED_BYTES, ThreadedBlockWriter
 
 
 class DataWriter:
@@ -17,17 +19,33 @@ class DataWriter:
 
     # pylint: disable=too-many-arguments
 
-    def __init__(self, outfile, annotations=None):
+    def __init__(self, outfile, annotations=None, threaded=False,
+                 max_buffered_bytes=DEFAULT_MAX_BUFFERED_BYTES, flush_interval_sec=None,
+                 fsync_interval_sec=None):
         """
         Args:
          outfile:       a file-like objet for writing binary data (e.g., from open(fname, 'wb')).
          annotations:   optional dict of key (string) -> value (string) pairs.
+         threaded:      if True, write to outfile from a background thread so that callers of
+                         write_data() do not wait on file I/O.  The file contents are the same.
+         max_buffered_bytes:  (threaded only) callers block while more than this many bytes
+                               are waiting to be written.
+         flush_interval_sec:  (threaded only) if set, flush outfile at most this long after
+                               data is written.
+         fsync_interval_sec:  (threaded only) if set, fsync outfile at most this long after
+                               data is written, and when the file is closed.
         """
-        self._writer = BlockWriter(outfile)
+        if threaded:
+            self._writer = ThreadedBlockWriter(outfile, max_buffered_bytes=max_buffered_bytes,
+                                               flush_interval_sec=flush_interval_sec,
+                                               fsync_interval_sec=fsync_interval_sec)
+        else:
+            self._writer = BlockWriter(outfile)
         self._indexer = FileIndexer()
         self._annotations = annotations
         self._writer.write_header(annotations)
         self._on_close = []
+        self._series_compression = {}  # {series_index -> (codec, level)}
 
     def __del__(self):
         self._close()
@@ -43,8 +61,20 @@ class DataWriter:
         """Get the FileIndex proto used which describes how to access data in the file."""
         return self._indexer.file_index
 
+    @property
+    def writer_stats(self):
+        """Return ThreadedWriterStats for a threaded writer, or None if not threaded."""
+        if isinstance(self._writer, ThreadedBlockWriter):
+            return self._writer.stats
+        return None
+
+    def flush(self):
+        """Flush all data written so far to outfile."""
+        self._writer.flush()
+
     def add_message_series(self, series_type, series_spec, content_type, type_name,
-                           is_metadata=False, annotations=None, additional_index_names=None):
+                           is_metadata=False, annotations=None, additional_index_names=None,
+                           compression=None, compression_level=None):
         """Add a new series for storing message data.  Message data is variable-sized binary data.
 
         Args:
@@ -59,6 +89,9 @@ class DataWriter:
                           associate with the message channel
          additional_index_names: names of additional timestamps to store with
                                         each message (list of string).
+         compression:   optional codec name (see bosdyn.bddf.compression) used to compress
+                          each data block in the series.
+         compression_level: optional codec-specific compression level.
 
         Returns series id (int).
         """
@@ -66,9 +99,11 @@ class DataWriter:
                                                   is_metadata=is_metadata)
         return self.add_series(series_type, series_spec, message_type=message_type,
                                annotations=annotations,
-                               additional_index_names=additional_index_names)
+                               additional_index_names=additional_index_names,
+                               compression=compression, compression_level=compression_level)
 
-    def add_pod_series(self, series_type, series_spec, type_enum, dimension=None, annotations=None):
+    def add_pod_series(self, series_type, series_spec, type_enum, dimension=None, annotations=None,
+                       compression=None, compression_level=None):
         """Add a new series for storing data POD data (float, double, int, etc....).
 
         Args:
@@ -79,14 +114,19 @@ class DataWriter:
                            [3] means vectors of size 3, [4, 4] is a 4x4 matrix, etc....
          annotations:   optional dict of key (string) -> value (string) pairs to
                             associate with the message channel
+         compression:   optional codec name (see bosdyn.bddf.compression) used to compress
+                          each data block in the series.
+         compression_level: optional codec-specific compression level.
 
         Returns series id (int).
         """
         pod_type = bddf.PodTypeDescriptor(pod_type=type_enum, dimension=dimension)
-        return self.add_series(series_type, series_spec, pod_type=pod_type, annotations=annotations)
+        return self.add_series(series_type, series_spec, pod_type=pod_type, annotations=annotations,
+                               compression=compression, compression_level=compression_level)
 
     def add_series(self, series_type, series_spec, message_type=None, pod_type=None,
-                   annotations=None, additional_index_names=None):
+                   annotations=None, additional_index_names=None, compression=None,
+                   compression_level=None):
         """Register a new series for messages.
 
         Args:
@@ -98,13 +138,25 @@ class DataWriter:
                             associate with the message channel
          additional_index_names: names of additional timestamps to store with
                                         each message (list of string).
+         compression:   optional codec name (see bosdyn.bddf.compression) used to compress
+                          each data block in the series.  The codec is recorded in the
+                          series annotations, and readers decompress the data transparently.
+         compression_level: optional codec-specific compression level.
 
         Returns series id (int).
 
-        Raises SeriesNotUniqueError if a series matching series_spec is already added.
+        Raises SeriesNotUniqueError if a series matching series_spec is already added,
+               DataFormatError if the compression codec is not supported.
         """
-        return self._indexer.add_series(series_type, series_spec, message_type, pod_type,
-                                        annotations, additional_index_names, self._writer)
+        if compression:
+            check_codec(compression)
+            annotations = dict(annotations or {})
+            annotations[COMPRESSION_ANNOTATION] = compression
+        series_index = self._indexer.add_series(series_type, series_spec, message_type, pod_type,
+                                                annotations, additional_index_names, self._writer)
+        if compression:
+            self._series_compression[series_index] = (compression, compression_level)
+        return series_index
 
     def write_data(self, series_index, timestamp_nsec, data, additional_indexes=None):
         """Store binary data into the file, under a previously-defined channel.
@@ -118,6 +170,9 @@ class DataWriter:
         Raises:
             DataFormatError if the data or additional_indexes are not valid for this series.
         """
+        compression = self._series_compression.get(series_index)
+        if compression:
+            data = compress(compression[0], data, compression[1])
         self._indexer.index_data_block(series_index, timestamp_nsec, self._writer.tell(), len(data),
                                        additional_indexes)
         data_descriptor = self._indexer.make_data_descriptor(series_index, timestamp_nsec,
@@ -131,7 +186,9 @@ class DataWriter:
     def _close(self):
         if self._writer.closed:
             return
-        for thunk in self._on_close:
-            thunk()
-        self._indexer.write_index(self._writer)
-        self._writer.close()
+        try:
+            for thunk in self._on_close:
+                thunk()
+            self._indexer.write_index(self._writer)
+        finally:
+            self._writer.close()
@@ -0,0 +1,353 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""A BddfDataset reads a collection of bddf files as a single time-ordered dataset."""
+
+import collections
+import functools
+import glob
+import heapq
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .data_reader import DataReader
+from .file_indexer import FileIndexer
+
+CHANNEL_KEY = 'bosdyn:channel'
+
+# Number of timestamps converted to Python ints at a time when merging series.
+_KEY_CHUNK_SIZE = 4096
+
+# A message read from a BddfDataset.
+#  timestamp_nsec:   timestamp of the message (int)
+#  identifier_hash:  hash of the SeriesIdentifier, which is the same in every file of the dataset
+#  descriptor:       DataDescriptor of the message
+#  data:             message data (bytes)
+DatasetMessage = collections.namedtuple('DatasetMessage',
+                                        ['timestamp_nsec', 'identifier_hash', 'descriptor', 'data'])
+
+
+class DatasetSeries:
+    """A series which is stored in one or more files of a BddfDataset."""
+
+    def __init__(self, identifier_hash, series_identifier, series_descriptor):
+        self.identifier_hash = identifier_hash
+        self.series_identifier = series_identifier
+        # SeriesDescriptor from the first file containing the series.
+        self.series_descriptor = series_descriptor
+        # List of (file_index, series_index) of the series in each file containing it.
+        self.locations = []
+
+    @property
+    def spec(self):
+        """Return the {key -> value} spec of the series."""
+        return dict(self.series_identifier.spec)
+
+
+def _block_keys(block_arrays, begin, end, file_index, identifier_hash):
+    """Generate (timestamp, file_index, series_index, index_in_series, identifier_hash).
+
+    Keys for blocks [begin, end) of the series are generated in time order.
+    """
+    series_index = block_arrays.series_index
+    for chunk_begin in range(begin, end, _KEY_CHUNK_SIZE):
+        chunk_end = min(end, chunk_begin + _KEY_CHUNK_SIZE)
+        timestamps = block_arrays.timestamps_nsec[chunk_begin:chunk_end].tolist()
+        for index_in_series, timestamp in enumerate(timestamps, chunk_begin):
+            yield timestamp, file_index, series_index, index_in_series, identifier_hash
+
+
+# Maximum number of DataReaders kept open by a worker process.
+_MAX_WORKER_READERS = 8
+
+# DataReaders opened by the current worker process, least recently used first,
+#  {(filename, use_mmap, file size, mtime) -> DataReader}.
+_WORKER_READERS = collections.OrderedDict()
+
+
+def _worker_reader(filename, use_mmap):
+    stat = os.stat(filename)
+    # A file rewritten at the same path has a new size or mtime, so it gets a new reader.
+    key = (filename, use_mmap, stat.st_size, stat.st_mtime_ns)
+    try:
+        _WORKER_READERS.move_to_end(key)
+        return _WORKER_READERS[key]
+    except KeyError:
+        pass
+    reader = DataReader(filename=filename, use_mmap=use_mmap)
+    _WORKER_READERS[key] = reader
+    while len(_WORKER_READERS) > _MAX_WORKER_READERS:
+        _key, evicted = _WORKER_READERS.popitem(last=False)
+        evicted.close()
+    return reader
+
+
+def _map_partition(partition, reader=None):
+    """Apply fn to the messages of one block range of a series in one file.
+
+    In a worker process, reader is None and the worker opens its own DataReader for the file.
+
+    Returns: (first timestamp, [(timestamp_nsec, result), ...]) or (first timestamp, reduced value)
+    """
+    (filename, use_mmap, series_index, begin, end, fn, protobuf_type, reduce_fn) = partition
+    if reader is None:
+        reader = _worker_reader(filename, use_mmap)
+    results = []
+    for index_in_series in range(begin, end):
+        _desc, timestamp_nsec, data = reader.read(series_index, index_in_series)
+        message = protobuf_type.FromString(data) if protobuf_type else data
+        results.append((timestamp_nsec, fn(timestamp_nsec, message)))
+    first_timestamp = results[0][0] if results else None
+    if reduce_fn is not None:
+        return first_timestamp, functools.reduce(reduce_fn, [result for _ts, result in results])
+    return first_timestamp, results
+
+
+class BddfDataset:
+    """Reads a collection of bddf files as a single dataset.
+
+    Series with the same SeriesIdentifier in different files are unified, using the
+     identifier hash stored in each file's FileIndex.  Messages can be iterated in time order across
+     all files and series, without loading all data into memory.
+    """
+
+    def __init__(self, paths, pattern='*.bddf', use_mmap=False, index_cache=None, time_ranges=None):
+        """
+        Args:
+         paths:        a directory of bddf files, or a list of bddf file names.
+         pattern:      glob pattern of files to read, when paths is a directory.
+         use_mmap:     passed to each DataReader.
+         index_cache:  passed to each DataReader (True to use a sidecar cache per file).
+         time_ranges:  optional list of (start_nsec, end_nsec) for each file name in paths.  Only
+                        the messages of a file at or after start_nsec and before end_nsec are part
+                        of the dataset (e.g., for the pieces of a download whose time spans
+                        overlap).  Either limit may be None.
+        """
+        if isinstance(paths, str):
+            if os.path.isdir(paths):
+                paths = sorted(glob.glob(os.path.join(paths, pattern)))
+            else:
+                paths = [paths]
+        self._filenames = list(paths)
+        if time_ranges is not None and len(time_ranges) != len(self._filenames):
+            raise ValueError("Expected {} time ranges, got {}".format(len(self._filenames),
+                                                                      len(time_ranges)))
+        self._time_ranges = time_ranges
+        self._use_mmap = use_mmap
+        self._readers = []
+        self._series = collections.OrderedDict()  # {identifier_hash -> DatasetSeries}
+        try:
+            for filename in self._filenames:
+                self._add_file(filename, use_mmap, index_cache)
+        except Exception:
+            self.close()
+            raise
+
+    def _add_file(self, filename, use_mmap, index_cache):
+        reader = DataReader(filename=filename, use_mmap=use_mmap, index_cache=index_cache)
+        file_index = len(self._readers)
+        self._readers.append(reader)
+        identifiers = reader.file_index.series_identifiers
+        hashes = reader.file_index.series_identifier_hashes
+        for series_index, series_identifier in enumerate(identifiers):
+            if series_index < len(hashes):
+                identifier_hash = hashes[series_index]
+            else:
+                identifier_hash = FileIndexer.series_identifier_to_hash(series_identifier)
+            try:
+                series = self._series[identifier_hash]
+            except KeyError:
+                series = DatasetSeries(identifier_hash, series_identifier,
+                                       reader.series_descriptor(series_index))
+                self._series[identifier_hash] = series
+            series.locations.append((file_index, series_index))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value_, tb_):
+        self.close()
+
+    def close(self):
+        """Close all files in the dataset."""
+        for reader in self._readers:
+            reader.close()
+        self._readers = []
+
+    @property
+    def filenames(self):
+        """Return the list of file names in the dataset."""
+        return self._filenames
+
+    @property
+    def data_readers(self):
+        """Return the DataReader of each file, in the same order as filenames."""
+        return self._readers
+
+    @property
+    def series(self):
+        """Return the list of DatasetSeries in the dataset."""
+        return list(self._series.values())
+
+    def get_series(self, series):
+        """Return the DatasetSeries selected by series.
+
+        Args:
+         series:  a DatasetSeries, an identifier hash (int), a series spec ({key -> value}),
+                   or a channel name (string) selecting the series with spec
+                   {'bosdyn:channel': name}.
+
+        Raises KeyError if no such series is in the dataset.
+        """
+        if isinstance(series, DatasetSeries):
+            return series
+        if isinstance(series, int):
+            return self._series[series]
+        spec = {CHANNEL_KEY: series} if isinstance(series, str) else dict(series)
+        for dataset_series in self._series.values():
+            if dataset_series.series_identifier.spec == spec:
+                return dataset_series
+        raise KeyError("No series with spec {} in the dataset".format(spec))
+
+    def num_messages(self, series):
+        """Return the total number of messages in the series, across all files."""
+        if self._time_ranges is None:
+            return sum(self._readers[file_index].num_data_blocks(series_index)
+                       for file_index, series_index in self.get_series(series).locations)
+        total = 0
+        for file_index, series_index in self.get_series(series).locations:
+            _block_arrays, begin, end = self._block_range(file_index, series_index, None, None)
+            total += end - begin
+        return total
+
+    def _block_range(self, file_index, series_index, start_nsec, end_nsec):
+        """Return (block arrays, begin, end) of the blocks of a series of a file in the range.
+
+        The range is limited to the time range of the file, if the dataset has time_ranges.
+        """
+        if self._time_ranges is not None:
+            file_start_nsec, file_end_nsec = self._time_ranges[file_index]
+            if file_start_nsec is not None:
+                start_nsec = file_start_nsec if start_nsec is None else max(
+                    start_nsec, file_start_nsec)
+            if file_end_nsec is not None:
+                end_nsec = file_end_nsec if end_nsec is None else min(end_nsec, file_end_nsec)
+        block_arrays = self._readers[file_index].series_block_arrays(series_index)
+        begin, end = block_arrays.index_range(start_nsec, end_nsec)
+        return block_arrays, begin, end
+
+    def _series_keys(self, dataset_series, start_nsec, end_nsec):
+        """Merge the block keys of the series from each file, in time order.
+
+        Only the block index arrays are used, so no data is read.
+        """
+        per_file = []
+        for file_index, series_index in dataset_series.locations:
+            block_arrays, begin, end = self._block_range(file_index, series_index, start_nsec,
+                                                         end_nsec)
+            per_file.append(
+                _block_keys(block_arrays, begin, end, file_index, dataset_series.identifier_hash))
+        return heapq.merge(*per_file)
+
+    def iter_series(self, series, start_nsec=None, end_nsec=None):
+        """Generate the messages of one series across all files, in time order.
+
+        Args:
+         series:      selects the series, as in get_series().
+         start_nsec:  if set, start at the first message at or after this time.
+         end_nsec:    if set, stop before the first message at or after this time.
+
+        Yields: DatasetMessage
+        """
+        return self.iter_messages([series], start_nsec, end_nsec)
+
+    def iter_messages(self, series=None, start_nsec=None, end_nsec=None):
+        """Generate the messages of several series across all files, in time order.
+
+        This is a k-way merge over the block indexes of each series in each file, so only the
+         messages being returned are read.
+
+        Args:
+         series:      list of series to include (each as in get_series()), or None for all.
+         start_nsec:  if set, start at the first message at or after this time.
+         end_nsec:    if set, stop before the first message at or after this time.
+
+        Yields: DatasetMessage
+        """
+        if series is None:
+            selected = self.series
+        else:
+            selected = [self.get_series(item) for item in series]
+        per_series = [
+            self._series_keys(dataset_series, start_nsec, end_nsec) for dataset_series in selected
+        ]
+        keys = heapq.merge(*per_series)
+        for timestamp_nsec, file_index, series_index, index_in_series, identifier_hash in keys:
+            desc, _timestamp, data = self._readers[file_index].read(series_index, index_in_series)
+            yield DatasetMessage(timestamp_nsec, identifier_hash, desc, data)
+
+    def map(  # pylint: disable=too-many-arguments,too-many-locals
+            self, series, fn, workers=None, protobuf_type=None, reduce_fn=None, start_nsec=None,
+            end_nsec=None, chunk_size=None):
+        """Apply fn to every message of a series in parallel, using a pool of processes.
+
+        The blocks of the series in each file are partitioned into ranges, and each range is
+         decoded and processed in a worker process which opens its own DataReader.
+        fn, reduce_fn and protobuf_type must be picklable (e.g., module-level functions).
+
+        Args:
+         series:         selects the series, as in get_series().
+         fn:             called as fn(timestamp_nsec, message) for each message, where message
+                          is a protobuf_type object, or the message data (bytes) if
+                          protobuf_type is None.
+         workers:        number of worker processes (default: number of CPUs).
+                          If 0, messages are processed in this process.
+         protobuf_type:  protobuf class used to deserialize each message, or None.
+         reduce_fn:      optional associative function reduce_fn(a, b) used to combine the
+                          results of fn, first within each worker and then across workers.
+         start_nsec:     if set, only process messages at or after this time.
+         end_nsec:       if set, only process messages before this time.
+         chunk_size:     number of messages per partition (default: about 4 per worker).
+
+        Returns: list of (timestamp_nsec, fn result) in timestamp order,
+                 or the reduced value if reduce_fn is set (None if there are no messages).
+        """
+        dataset_series = self.get_series(series)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        ranges = []
+        for file_index, series_index in dataset_series.locations:
+            _block_arrays, begin, end = self._block_range(file_index, series_index, start_nsec,
+                                                          end_nsec)
+            if end > begin:
+                ranges.append((file_index, series_index, begin, end))
+        total = sum(end - begin for _file, _series, begin, end in ranges)
+        if chunk_size is None:
+            chunk_size = max(1, math.ceil(total / (max(1, workers) * 4)))
+
+        partitions = []
+        for file_index, series_index, begin, end in ranges:
+            for chunk_begin in range(begin, end, chunk_size):
+                partitions.append(
+                    (self._filenames[file_index], self._use_mmap, series_index, chunk_begin,
+                     min(end, chunk_begin + chunk_size), fn, protobuf_type, reduce_fn))
+
+        if workers == 0:
+            # Read with the DataReaders of the dataset, rather than opening others.
+            readers = dict(zip(self._filenames, self._readers))
+            outputs = [_map_partition(partition, readers[partition[0]]) for partition in partitions]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                outputs = list(executor.map(_map_partition, partitions))
+
+        if reduce_fn is not None:
+            partials = sorted((output for output in outputs if output[0] is not None),
+                              key=lambda output: output[0])
+            if not partials:
+                return None
+            return functools.reduce(reduce_fn, [value for _ts, value in partials])
+        return list(heapq.merge(*[results for _ts, results in outputs], key=lambda item: item[0]))
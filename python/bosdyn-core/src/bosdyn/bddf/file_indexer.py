@@ -7,10 +7,14 @@
 """A FileIndexer is an object which keeps an index of series and blocks within series"""
 
 import struct
+from array import array
 from hashlib import sha1
 
+import numpy as np
+
 import bosdyn.api.bddf_pb2 as bddf
 
+from .block_index import NSEC_PER_SEC, SeriesBlockArrays
 from .common import AddSeriesError, DataFormatError, SeriesNotUniqueError
 
 
@@ -18,17 +22,47 @@ def _hasher_to_uint64(hasher):
     return struct.unpack('>Q', hasher.digest()[0:8])[0]
 
 
+class _SeriesBlockEntries:  # pylint: disable=too-few-public-methods
+    """Growable typed arrays holding the block index of a single series."""
+
+    def __init__(self, series_index, descriptor_file_offset, num_additional_indexes):
+        self.series_index = series_index
+        self.descriptor_file_offset = descriptor_file_offset
+        self.num_additional_indexes = num_additional_indexes
+        self.file_offsets = array('Q')
+        self.timestamps_nsec = array('q')
+        self.additional_indexes = array('q')  # Flattened, num_additional_indexes per block.
+        self.total_bytes = 0
+        # SeriesBlockIndex proto built from the entries, until the next entry is added.
+        self.block_index_proto = None
+
+    def to_block_arrays(self):
+        """Return a SeriesBlockArrays holding a copy of the current entries."""
+        return SeriesBlockArrays(
+            self.series_index, self.descriptor_file_offset,
+            np.array(self.file_offsets, dtype=np.uint64),
+            np.array(self.timestamps_nsec, dtype=np.int64),
+            np.array(self.additional_indexes, dtype=np.int64).reshape(len(self.file_offsets),
+                                                                      self.num_additional_indexes),
+            self.total_bytes)
+
+
 class FileIndexer:
     """An object which keeps an index of series and blocks within series.
 
     It can write a block index at the end of a data file.
+    Block entries are kept in compact typed arrays, and SeriesBlockIndex protos are only built
+     when they are requested or when the index is written.  A built proto is returned again until
+     another block of its series is indexed, when it is replaced by a new one; changes made to it
+     are not kept past that point.
     """
 
     def __init__(self):
         # DescriptorBlock proto for the FileIndex
         self._descriptor_index = bddf.DescriptorBlock()
         self._series_descriptors = []  # series_idx -> SeriesDescriptor
-        self._series_block_indexes = []  # series_index -> SeriesBlockIndex
+        self._series_block_entries = []  # series_index -> _SeriesBlockEntries
+        self._series_specs = set()  # frozenset of the spec items of each series
 
     @property
     def file_index(self):
@@ -42,8 +76,29 @@ class FileIndexer:
 
     @property
     def series_block_indexes(self):
-        """Returns the current list of SeriesBlockIndexes: series_index -> SeriesBlockIndex."""
-        return self._series_block_indexes
+        """Returns the current list of SeriesBlockIndexes: series_index -> SeriesBlockIndex.
+
+        The protos of the series with blocks indexed since the last call are rebuilt.
+        """
+        return [self.series_block_index(idx) for idx in range(len(self._series_block_entries))]
+
+    def series_block_index(self, series_index):
+        """Returns a SeriesBlockIndex proto of the current index of the given series.
+
+        The proto is built on the first call after a block of the series was indexed.
+        """
+        entries = self._series_block_entries[series_index]
+        if entries.block_index_proto is None:
+            entries.block_index_proto = entries.to_block_arrays().to_proto()
+        return entries.block_index_proto
+
+    def series_block_arrays(self, series_index):
+        """Returns a SeriesBlockArrays holding a copy of the current index of the given series."""
+        return self._series_block_entries[series_index].to_block_arrays()
+
+    def num_data_blocks(self, series_index):
+        """Returns the number of data blocks indexed so far for the given series."""
+        return len(self._series_block_entries[series_index].file_offsets)
 
     def series_descriptor(self, series_index):
         """Return SeriesDescriptor for given series index."""
@@ -72,9 +127,10 @@ class FileIndexer:
         self.file_index.series_identifiers.add().CopyFrom(series_descriptor.series_identifier)
         self.file_index.series_identifier_hashes.append(series_descriptor.identifier_hash)
         self._series_descriptors.append(series_descriptor)
-        self._series_block_indexes.append(
-            bddf.SeriesBlockIndex(series_index=series_descriptor.series_index,
-                                  descriptor_file_offset=series_block_file_offset))
+        self._series_specs.add(frozenset(series_descriptor.series_identifier.spec.items()))
+        self._series_block_entries.append(
+            _SeriesBlockEntries(series_descriptor.series_index, series_block_file_offset,
+                                len(series_descriptor.additional_index_names)))
 
     def add_series(  # pylint: disable=too-many-arguments
             self, series_type, series_spec, message_type, pod_type, annotations,
@@ -112,10 +168,9 @@ class FileIndexer:
         series_descriptor.identifier_hash = self.series_identifier_to_hash(series_identifier)
 
         # Ensure the series_spec is unique in the file.
-        for prev_series_identifier in self.file_index.series_identifiers:
-            if prev_series_identifier.spec == series_identifier.spec:
-                raise SeriesNotUniqueError(
-                    "Spec %s is not unique within the data file" % series_identifier.spec)
+        if frozenset(series_identifier.spec.items()) in self._series_specs:
+            raise SeriesNotUniqueError(
+                "Spec %s is not unique within the data file" % series_identifier.spec)
 
         if message_type:
             if pod_type:
@@ -138,20 +193,28 @@ class FileIndexer:
 
     def index_data_block(  # pylint: disable=too-many-arguments
             self, series_index, timestamp_nsec, file_offset, nbytes, additional_indexes):
-        """Add an entry to the data block index of the series identified by series_index."""
-        series_block_index = self._series_block_indexes[series_index]
-        block_entry = series_block_index.block_entries.add(file_offset=file_offset)
-        block_entry.timestamp.FromNanoseconds(timestamp_nsec)
-        series_block_index.total_bytes += nbytes
-        if additional_indexes:
-            for idx_val in additional_indexes:
-                block_entry.additional_indexes.append(idx_val)  # pylint: disable=no-member
+        """Add an entry to the data block index of the series identified by series_index.
+
+        Raises DataFormatError if the number of additional_indexes is wrong for this series.
+        """
+        entries = self._series_block_entries[series_index]
+        additional_indexes = additional_indexes or ()
+        if len(additional_indexes) != entries.num_additional_indexes:
+            raise DataFormatError('Series {} needs {} additional indexes, but {} provided.'.format(
+                series_index, entries.num_additional_indexes, len(additional_indexes)))
+        entries.file_offsets.append(file_offset)
+        entries.timestamps_nsec.append(timestamp_nsec)
+        entries.additional_indexes.extend(additional_indexes)
+        entries.total_bytes += nbytes
+        entries.block_index_proto = None
 
     def make_data_descriptor(self, series_index, timestamp_nsec, additional_indexes):
         """Return DataDescriptor for writing a data block, and add the block to the series index."""
         series_descriptor = self._series_descriptors[series_index]
         data_descriptor = bddf.DataDescriptor(series_index=series_index)
-        data_descriptor.timestamp.FromNanoseconds(timestamp_nsec)  # pylint: disable=no-member
+        # pylint: disable=no-member
+        data_descriptor.timestamp.seconds, data_descriptor.timestamp.nanos = divmod(
+            timestamp_nsec, NSEC_PER_SEC)
         additional_indexes = additional_indexes or []
         if len(additional_indexes) != len(series_descriptor.additional_index_names):
             raise DataFormatError('Series {} needs {} additional indexes, but {} provided.'.format(
@@ -165,7 +228,8 @@ class FileIndexer:
     def write_index(self, block_writer):
         """Write all the indexes of the data file, and the file end."""
         # Write all the block indexes
-        for block_index in self.series_block_indexes:
+        for series_index in range(len(self._series_block_entries)):
+            block_index = self.series_block_index(series_index)
             # Record the location of the block index.
             self.file_index.series_block_index_offsets.append(block_writer.tell())
             # Write the block index.
@@ -0,0 +1,377 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Index pairing the logged GRPC requests and responses in a bddf file.
+
+Every response is matched with its request through the common headers: the ResponseHeader
+ echoes the RequestHeader, so the (service, client_name, request_timestamp) of the two match.
+Only the headers are decoded.  They are located in the serialized messages by scanning the
+ protobuf wire format for the 'header' field (field number 1 in every bosdyn request and
+ response), so the rest of each message, and the echoed request in the ResponseHeader, are
+ skipped without being parsed.  Protobuf classes for the logged messages are not needed.
+
+The index holds one row per response, as NumPy arrays, so queries such as "the slowest 100
+ RobotCommand calls between t0 and t1" do not decode any messages.
+"""
+
+import collections
+import os
+
+import numpy as np
+from google.protobuf.message import DecodeError
+
+from bosdyn.api.header_pb2 import RequestHeader, ResponseHeader
+
+from .bosdyn import GrpcRequests, GrpcResponses
+from .common import LOGGER
+
+GRPC_INDEX_SUFFIX = '.grpcidx.npz'
+
+# Field number of the header in bosdyn request and response messages.
+HEADER_FIELD_NUMBER = 1
+# Field number of the echoed request in ResponseHeader, which is not decoded.
+_ECHOED_REQUEST_FIELD_NUMBER = 5
+
+_WIRETYPE_VARINT = 0
+_WIRETYPE_FIXED64 = 1
+_WIRETYPE_LENGTH_DELIMITED = 2
+_WIRETYPE_FIXED32 = 5
+
+_INDEX_VERSION = 1
+
+# Number of messages read at a time when building the index.
+_READ_BATCH_BLOCKS = 256
+
+# A GRPC call in a GrpcCallIndex.
+#  rpc_name is the response type name without 'Response', e.g. 'bosdyn.api.RobotCommand'.
+#  request_timestamp_nsec is measured with the client clock, and received_timestamp_nsec (0 if
+#   unset) and response_timestamp_nsec with the server clock.
+#  latency_nsec is response_timestamp_nsec - received_timestamp_nsec, or -1 if unknown.
+#  request_series_index and request_index are -1 if the request was not logged.
+GrpcCall = collections.namedtuple('GrpcCall', [
+    'service_name', 'rpc_name', 'client_name', 'request_timestamp_nsec', 'received_timestamp_nsec',
+    'response_timestamp_nsec', 'latency_nsec', 'error_code', 'request_series_index',
+    'request_index', 'response_series_index', 'response_index'
+])
+
+_COLUMNS = ('rpc_ids', 'client_ids', 'request_timestamps_nsec', 'received_timestamps_nsec',
+            'response_timestamps_nsec', 'latencies_nsec', 'error_codes', 'request_series_indexes',
+            'request_indexes', 'response_series_indexes', 'response_indexes')
+
+
+def _read_varint(buffer, pos):
+    result = 0
+    shift = 0
+    while True:
+        if pos >= len(buffer):
+            raise DecodeError("Truncated varint")
+        byte = buffer[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+        if shift >= 64:
+            raise DecodeError("Varint too long")
+
+
+def _iter_fields(buffer):
+    """Generate (field_number, start, end, value_start) for the top-level fields in buffer.
+
+    [start, end) is the encoding of the field including its tag, and value_start is the start
+     of the value of a length-delimited field.
+    """
+    pos = 0
+    while pos < len(buffer):
+        start = pos
+        tag, pos = _read_varint(buffer, pos)
+        wire_type = tag & 7
+        value_start = pos
+        if wire_type == _WIRETYPE_VARINT:
+            _value, pos = _read_varint(buffer, pos)
+        elif wire_type == _WIRETYPE_FIXED64:
+            pos += 8
+        elif wire_type == _WIRETYPE_LENGTH_DELIMITED:
+            length, value_start = _read_varint(buffer, pos)
+            pos = value_start + length
+        elif wire_type == _WIRETYPE_FIXED32:
+            pos += 4
+        else:
+            raise DecodeError("Unsupported wire type {}".format(wire_type))
+        if pos > len(buffer):
+            raise DecodeError("Truncated field")
+        yield tag >> 3, start, pos, value_start
+
+
+def _header_bytes(data):
+    """Return the serialized header of a request or response, or None if it has none."""
+    view = memoryview(data)
+    for field_number, _start, end, value_start in _iter_fields(view):
+        if field_number == HEADER_FIELD_NUMBER:
+            return view[value_start:end]
+    return None
+
+
+def _parse_request_header(data):
+    header_bytes = _header_bytes(data)
+    if header_bytes is None:
+        return None
+    return RequestHeader.FromString(header_bytes)
+
+
+def _parse_response_header(data):
+    header_bytes = _header_bytes(data)
+    if header_bytes is None:
+        return None
+    # Skip the echoed request, which may be as large as the request itself.
+    trimmed = b''.join(header_bytes[start:end]
+                       for field_number, start, end, _value_start in _iter_fields(header_bytes)
+                       if field_number != _ECHOED_REQUEST_FIELD_NUMBER)
+    return ResponseHeader.FromString(trimmed)
+
+
+def _timestamp_nsec(timestamp):
+    return timestamp.seconds * 1000000000 + timestamp.nanos
+
+
+def _rpc_name(message_type):
+    for suffix in ('Response', 'Request'):
+        if message_type.endswith(suffix):
+            return message_type[:-len(suffix)]
+    return message_type
+
+
+def _iter_block_data(data_reader, series_index, num_blocks):
+    """Generate (index, data) of the blocks of a series, reading a batch of blocks at a time.
+
+    Only one batch of messages is held in memory, rather than every message of the series.
+    """
+    for begin in range(0, num_blocks, _READ_BATCH_BLOCKS):
+        blocks = data_reader.read_many(series_index,
+                                       range(begin, min(num_blocks, begin + _READ_BATCH_BLOCKS)))
+        for index, (_desc, _nsec, data) in enumerate(blocks, begin):
+            yield index, data
+        # Release the batch before reading the next one.
+        del blocks, data
+
+
+class GrpcCallIndex:
+    """Pairs the GRPC requests and responses logged in a bddf file, with per-call latency.
+
+    Each call is a logged response, paired with its logged request if there is one.
+    The columns are NumPy arrays with one element per call, sorted by response timestamp:
+     rpc_ids, client_ids (indexes into rpc_names and client_names), request_timestamps_nsec,
+     received_timestamps_nsec, response_timestamps_nsec, latencies_nsec, error_codes,
+     request_series_indexes, request_indexes, response_series_indexes, response_indexes.
+    The latency is the time between the server receiving the request and sending the response,
+     both measured with the server clock.
+    """
+
+    def __init__(self, rpc_names, client_names, columns, cache_key=None):
+        """
+        Args:
+         rpc_names:     list of (service_name, rpc_name), indexed by rpc_ids.
+         client_names:  list of client names, indexed by client_ids.
+         columns:       {column name -> array-like}, see the class documentation.
+         cache_key:     optional (file_size, mtime_nsec, checksum) of the file that was indexed.
+        """
+        self.rpc_names = [tuple(name) for name in rpc_names]
+        self.client_names = list(client_names)
+        for name in _COLUMNS:
+            setattr(self, name, np.asarray(columns[name], dtype=np.int64))
+        self.cache_key = cache_key
+
+    def __len__(self):
+        return len(self.response_timestamps_nsec)
+
+    @classmethod
+    def build(cls, data_reader):  # pylint: disable=too-many-locals
+        """Build the index of the GRPC calls in a file, decoding only the message headers.
+
+        Args:
+         data_reader:  DataReader of the file.
+
+        Returns: GrpcCallIndex
+        """
+        requests = {}  # (service_name, client_name, request_timestamp_nsec) -> (series, index)
+        responses = []  # (series_index, index, service_name, message_type, ResponseHeader)
+        for series_index, series_identifier in enumerate(data_reader.file_index.series_identifiers):
+            series_type = series_identifier.series_type
+            if series_type not in (GrpcRequests.SERIES_TYPE, GrpcResponses.SERIES_TYPE):
+                continue
+            service_name = series_identifier.spec[GrpcRequests.SERVICE_NAME]
+            message_type = series_identifier.spec[GrpcRequests.MESSAGE_TYPE]
+            is_request = series_type == GrpcRequests.SERIES_TYPE
+            num_blocks = data_reader.num_data_blocks(series_index)
+            for index, data in _iter_block_data(data_reader, series_index, num_blocks):
+                try:
+                    if is_request:
+                        header = _parse_request_header(data)
+                    else:
+                        header = _parse_response_header(data)
+                except DecodeError as err:
+                    LOGGER.debug("Skipping %s %d with a bad header: %s", message_type, index, err)
+                    continue
+                if header is None:
+                    continue
+                if is_request:
+                    key = (service_name, header.client_name,
+                           _timestamp_nsec(header.request_timestamp))
+                    requests.setdefault(key, (series_index, index))
+                else:
+                    responses.append((series_index, index, service_name, message_type, header))
+
+        rpc_ids = {}
+        client_ids = {}
+        rows = []
+        for series_index, index, service_name, message_type, header in responses:
+            request_header = header.request_header
+            request_nsec = _timestamp_nsec(request_header.request_timestamp)
+            received_nsec = _timestamp_nsec(header.request_received_timestamp)
+            response_nsec = _timestamp_nsec(header.response_timestamp)
+            request_series_index, request_index = requests.get(
+                (service_name, request_header.client_name, request_nsec), (-1, -1))
+            rpc_id = rpc_ids.setdefault((service_name, _rpc_name(message_type)), len(rpc_ids))
+            client_id = client_ids.setdefault(request_header.client_name, len(client_ids))
+            latency_nsec = response_nsec - received_nsec if received_nsec else -1
+            rows.append(
+                (rpc_id, client_id, request_nsec, received_nsec, response_nsec, latency_nsec,
+                 header.error.code, request_series_index, request_index, series_index, index))
+        rows.sort(key=lambda row: row[4])
+        table = np.array(rows, dtype=np.int64).reshape(len(rows), len(_COLUMNS))
+        columns = {name: table[:, column] for column, name in enumerate(_COLUMNS)}
+        try:
+            cache_key = data_reader.cache_key()
+        except (AttributeError, OSError, ValueError):
+            cache_key = None
+        return cls(list(rpc_ids), list(client_ids), columns, cache_key)
+
+    @classmethod
+    def load_or_build(cls, data_reader, path=True):
+        """Load the index saved at path if it matches the file, or build and save it.
+
+        Args:
+         data_reader:  DataReader of the file.
+         path:         path of the saved index, or True to use the input file name plus
+                        GRPC_INDEX_SUFFIX.  If True and the reader has no file name (e.g., it
+                        was opened from a file object), the index is built without saving it.
+
+        Returns: GrpcCallIndex
+        """
+        if path is True:
+            if data_reader.filename is None:
+                return cls.build(data_reader)
+            path = data_reader.filename + GRPC_INDEX_SUFFIX
+        index = cls.load(path)
+        if index is not None and index.cache_key == data_reader.cache_key():
+            return index
+        index = cls.build(data_reader)
+        try:
+            index.save(path)
+        except OSError as err:
+            LOGGER.warning("Failed to write GRPC call index %s: %s", path, err)
+        return index
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by save(), returning None if it is missing or unreadable."""
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                if int(saved['version']) != _INDEX_VERSION:
+                    return None
+                cache_key = None
+                if saved['file_size'] >= 0:
+                    cache_key = (int(saved['file_size']), int(saved['mtime_nsec']),
+                                 saved['checksum'].tobytes())
+                rpc_names = saved['rpc_names'].reshape(-1, 2).tolist()
+                client_names = saved['client_names'].tolist()
+                columns = {name: saved[name] for name in _COLUMNS}
+                return cls(rpc_names, client_names, columns, cache_key)
+        except (OSError, ValueError, KeyError) as err:
+            if os.path.exists(path):
+                LOGGER.warning("Ignoring unreadable GRPC call index %s: %s", path, err)
+            return None
+
+    def save(self, path):
+        """Save the index to a NumPy .npz file at path."""
+        file_size, mtime_nsec, checksum = self.cache_key or (-1, -1, b'')
+        tmp_path = path + '.tmp.npz'
+        rpc_names = np.array(self.rpc_names, dtype=np.str_).reshape(-1, 2)
+        client_names = np.array(self.client_names, dtype=np.str_)
+        columns = {name: getattr(self, name) for name in _COLUMNS}
+        np.savez(tmp_path, version=_INDEX_VERSION, file_size=file_size, mtime_nsec=mtime_nsec,
+                 checksum=np.frombuffer(checksum, dtype=np.uint8), rpc_names=rpc_names,
+                 client_names=client_names, **columns)
+        os.replace(tmp_path, path)
+
+    def select(self, rpc_name=None, service_name=None, start_nsec=None, end_nsec=None):
+        """Return the positions of the calls matching the given conditions, in time order.
+
+        Args:
+         rpc_name:      if set, only calls of this RPC.  It may be the full name of the request or
+                         response type, or the name without the 'Request'/'Response' suffix,
+                         with or without the package (e.g., 'RobotCommand').
+         service_name:  if set, only calls to this service.
+         start_nsec:    if set, only calls with a response at or after this time.
+         end_nsec:      if set, only calls with a response before this time.
+
+        Returns: NumPy array of positions in the columns.
+        """
+        timestamps = self.response_timestamps_nsec
+        begin = 0 if start_nsec is None else int(np.searchsorted(timestamps, start_nsec, 'left'))
+        end = len(timestamps) if end_nsec is None else int(
+            np.searchsorted(timestamps, end_nsec, 'left'))
+        positions = np.arange(begin, max(begin, end))
+        if rpc_name is None and service_name is None:
+            return positions
+        rpc_name = None if rpc_name is None else _rpc_name(rpc_name)
+        rpc_ids = [
+            rpc_id for rpc_id, (service, name) in enumerate(self.rpc_names)
+            if (service_name is None or service == service_name) and
+            (rpc_name is None or rpc_name in (name, name.rsplit('.', 1)[-1]))
+        ]
+        return positions[np.isin(self.rpc_ids[positions], rpc_ids)]
+
+    def calls(self, positions=None, **kwargs):
+        """Return a list of GrpcCall for the given positions, or for the calls matching kwargs.
+
+        kwargs are the conditions of select().
+        """
+        if positions is None:
+            positions = self.select(**kwargs)
+        return [self.call(position) for position in positions]
+
+    def call(self, position):
+        """Return the GrpcCall at the given position in the columns."""
+        service_name, rpc_name = self.rpc_names[self.rpc_ids[position]]
+        return GrpcCall(service_name, rpc_name, self.client_names[self.client_ids[position]],
+                        *(int(getattr(self, name)[position]) for name in _COLUMNS[2:]))
+
+    def slowest(self, count, **kwargs):
+        """Return the count calls with the highest latency, slowest first.
+
+        kwargs are the conditions of select(), e.g. slowest(100, rpc_name='RobotCommand',
+         start_nsec=t0, end_nsec=t1).
+
+        Returns: list of GrpcCall
+        """
+        positions = self.select(**kwargs)
+        positions = positions[self.latencies_nsec[positions] >= 0]
+        if count < len(positions):
+            latencies = self.latencies_nsec[positions]
+            positions = positions[np.argpartition(-latencies, count)[:count]]
+        order = np.argsort(-self.latencies_nsec[positions], kind='stable')
+        return self.calls(positions[order])
+
+    def latency_percentiles(self, percentiles=(50, 90, 99), **kwargs):
+        """Return {percentile -> latency_nsec} of the calls matching the conditions of select()."""
+        positions = self.select(**kwargs)
+        latencies = self.latencies_nsec[positions]
+        latencies = latencies[latencies >= 0]
+        if latencies.size == 0:
+            return {percentile: None for percentile in percentiles}
+        values = np.percentile(latencies, percentiles)
+        return {percentile: float(value) for percentile, value in zip(percentiles, values)}
@@ -0,0 +1,156 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Persistent sidecar cache of the decoded index of a bddf file.
+
+The cache stores the FileIndex, the SeriesDescriptors, and the block offset/timestamp arrays of
+ every series in a compact binary file next to the bddf file.  It is memory-mapped when loaded,
+ so the arrays are not copied or parsed.  The cache is keyed by the size, modification time and
+ checksum of the bddf file, and is ignored if any of those do not match.
+
+Layout (little-endian):
+  header:       magic, version, file_size, mtime_nsec, checksum, num_series, file_index_nbytes
+  series table: num_series x (descriptor_file_offset, total_bytes, num_blocks,
+                              num_additional_indexes, descriptor_nbytes, arrays_offset)
+  FileIndex proto, then each SeriesDescriptor proto
+  for each series, 8-byte aligned: file offsets (uint64), timestamps (int64),
+                                   additional indexes (int64, num_blocks x num_additional_indexes)
+"""
+
+import mmap
+import os
+import struct
+
+import numpy as np
+from google.protobuf.message import DecodeError
+
+import bosdyn.api.bddf_pb2 as bddf
+
+from .block_index import SeriesBlockArrays
+from .common import END_MAGIC, LOGGER, SHA1_DIGEST_NBYTES
+
+INDEX_CACHE_SUFFIX = '.idxcache'
+
+_MAGIC = b'BDIX'
+_VERSION = 1
+_HEADER = struct.Struct('<4sIQq{}sII'.format(SHA1_DIGEST_NBYTES))
+_SERIES_RECORD = struct.Struct('<QQQIIQ')
+
+
+def _align8(offset):
+    return (offset + 7) & ~7
+
+
+def file_cache_key(infile):
+    """Return the (file_size, mtime_nsec, checksum) key of an open bddf file.
+
+    The checksum is the one stored at the end of the file, so this does not read the whole file.
+    """
+    stat = os.fstat(infile.fileno())
+    infile.seek(-(SHA1_DIGEST_NBYTES + len(END_MAGIC)), os.SEEK_END)
+    checksum = infile.read(SHA1_DIGEST_NBYTES)
+    return stat.st_size, stat.st_mtime_ns, checksum
+
+
+class IndexCache:
+    """The decoded index of a bddf file, which can be saved to and loaded from a sidecar file."""
+
+    def __init__(self, key, file_index, series_descriptors, series_block_arrays):
+        """
+        Args:
+         key:                  (file_size, mtime_nsec, checksum) of the bddf file.
+         file_index:           FileIndex proto of the bddf file.
+         series_descriptors:   list of SeriesDescriptor protos, by series index.
+         series_block_arrays:  list of SeriesBlockArrays, by series index.
+        """
+        self.key = key
+        self.file_index = file_index
+        self.series_descriptors = series_descriptors
+        self.series_block_arrays = series_block_arrays
+
+    @classmethod
+    def load(cls, path, key):
+        """Load the cache at path, returning None if it is missing or does not match key."""
+        try:
+            with open(path, 'rb') as infile:
+                cache_map = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            return cls._parse(cache_map, key)
+        except (DecodeError, struct.error, ValueError) as err:
+            LOGGER.warning('Ignoring corrupt bddf index cache %s: %s', path, err)
+            return None
+
+    @classmethod
+    def _parse(cls, cache_map, key):  # pylint: disable=too-many-locals
+        (magic, version, file_size, mtime_nsec, checksum, num_series,
+         file_index_nbytes) = _HEADER.unpack_from(cache_map, 0)
+        if magic != _MAGIC or version != _VERSION or (file_size, mtime_nsec, checksum) != key:
+            return None
+        offset = _HEADER.size
+        records = []
+        for _ in range(num_series):
+            records.append(_SERIES_RECORD.unpack_from(cache_map, offset))
+            offset += _SERIES_RECORD.size
+        file_index = bddf.FileIndex.FromString(cache_map[offset:offset + file_index_nbytes])
+        offset += file_index_nbytes
+
+        series_descriptors = []
+        series_block_arrays = []
+        for series_index, record in enumerate(records):
+            (descriptor_file_offset, total_bytes, num_blocks, num_additional, descriptor_nbytes,
+             arrays_offset) = record
+            series_descriptors.append(
+                bddf.SeriesDescriptor.FromString(cache_map[offset:offset + descriptor_nbytes]))
+            offset += descriptor_nbytes
+            file_offsets = np.frombuffer(cache_map, dtype='<u8', count=num_blocks,
+                                         offset=arrays_offset)
+            timestamps_nsec = np.frombuffer(cache_map, dtype='<i8', count=num_blocks,
+                                            offset=arrays_offset + 8 * num_blocks)
+            additional_indexes = np.frombuffer(cache_map, dtype='<i8',
+                                               count=num_blocks * num_additional,
+                                               offset=arrays_offset + 16 * num_blocks).reshape(
+                                                   num_blocks, num_additional)
+            series_block_arrays.append(
+                SeriesBlockArrays(series_index, descriptor_file_offset, file_offsets,
+                                  timestamps_nsec, additional_indexes, total_bytes))
+        return cls(key, file_index, series_descriptors, series_block_arrays)
+
+    def write(self, path):
+        """Write the cache to path, replacing any existing file atomically."""
+        file_index_bytes = self.file_index.SerializeToString()
+        descriptor_bytes = [desc.SerializeToString() for desc in self.series_descriptors]
+        offset = (_HEADER.size + _SERIES_RECORD.size * len(self.series_descriptors) +
+                  len(file_index_bytes) + sum(len(desc) for desc in descriptor_bytes))
+        arrays_offsets = []
+        for block_arrays in self.series_block_arrays:
+            offset = _align8(offset)
+            arrays_offsets.append(offset)
+            offset += 8 * (2 * len(block_arrays) + block_arrays.additional_indexes.size)
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as outfile:
+            file_size, mtime_nsec, checksum = self.key
+            outfile.write(
+                _HEADER.pack(_MAGIC, _VERSION, file_size, mtime_nsec, checksum,
+                             len(self.series_descriptors), len(file_index_bytes)))
+            for block_arrays, desc, arrays_offset in zip(self.series_block_arrays, descriptor_bytes,
+                                                         arrays_offsets):
+                outfile.write(
+                    _SERIES_RECORD.pack(block_arrays.descriptor_file_offset,
+                                        block_arrays.total_bytes,
+                                        len(block_arrays), block_arrays.additional_indexes.shape[1],
+                                        len(desc), arrays_offset))
+            outfile.write(file_index_bytes)
+            for desc in descriptor_bytes:
+                outfile.write(desc)
+            for block_arrays, arrays_offset in zip(self.series_block_arrays, arrays_offsets):
+                outfile.write(b'\0' * (arrays_offset - outfile.tell()))
+                outfile.write(block_arrays.file_offsets.astype('<u8').tobytes())
+                outfile.write(block_arrays.timestamps_nsec.astype('<i8').tobytes())
+                outfile.write(block_arrays.additional_indexes.astype('<i8').tobytes())
+        os.replace(tmp_path, path)
@@ -5,8 +5,7 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """A class for reading a series of POD data from a DataFile."""
-import struct
-from itertools import product
+import numpy as np
 
 from .common import POD_TYPE_TO_NUM_BYTES, POD_TYPE_TO_STRUCT, ParseError
 
@@ -31,6 +30,8 @@ class PodSeriesReader:
             self._num_values_per_sample *= dim
         pod_type = self._pod_type.pod_type
         self._bytes_per_sample = POD_TYPE_TO_NUM_BYTES[pod_type] * self._num_values_per_sample
+        self._dtype = np.dtype('<' + POD_TYPE_TO_STRUCT[pod_type])
+        self._sample_shape = tuple(self._pod_type.dimension)
         self._num_data_blocks = None
 
     @property
@@ -50,34 +51,75 @@ class PodSeriesReader:
             self._num_data_blocks = self._data_reader.num_data_blocks(self._series_index)
         return self._num_data_blocks
 
+    @property
+    def dtype(self):
+        """Return the NumPy dtype of the values in the series."""
+        return self._dtype
+
     def read_samples(self, index_in_series):
         """Return the POD data values from the data block of the given index.
 
         Returns: timestamp_nsec (int), POD data values (array of (array ... (of POD values)))
         """
+        timestamp_nsec, samples = self.read_array(index_in_series)
+        return timestamp_nsec, samples.tolist()
+
+    def read_array(self, index_in_series):
+        """Return the POD data values from the data block of the given index, as a NumPy array.
+
+        The array is a read-only view of the data returned by the DataReader.
+
+        Returns: timestamp_nsec (int), array of shape (num_samples,) + dimension
+        """
         _desc, timestamp_nsec, data = self._data_reader.read(self._series_index, index_in_series)
+        self._check_block_size(index_in_series, data)
+        samples = np.frombuffer(data, dtype=self._dtype)
+        return timestamp_nsec, samples.reshape((-1,) + self._sample_shape)
+
+    def read_blocks(self, block_indices):
+        """Read the POD data values from several data blocks into a single NumPy array.
+
+        Args:
+         block_indices:  iterable of the indexes of the blocks to read (e.g., a range).
+
+        Returns: block_timestamps_nsec (int64 array, one per block),
+                 block_starts (int64 array, index of the first sample of each block in samples),
+                 samples (array of shape (num_samples,) + dimension)
+        """
+        block_indices = list(block_indices)
+        block_timestamps_nsec = np.empty(len(block_indices), dtype=np.int64)
+        blocks = []
+        for idx, index_in_series in enumerate(block_indices):
+            _desc, timestamp_nsec, data = self._data_reader.read(self._series_index,
+                                                                 index_in_series)
+            self._check_block_size(index_in_series, data)
+            block_timestamps_nsec[idx] = timestamp_nsec
+            blocks.append(data)
+
+        block_nbytes = np.fromiter((len(data) for data in blocks), dtype=np.int64,
+                                   count=len(blocks))
+        block_starts = np.zeros(len(blocks), dtype=np.int64)
+        np.cumsum(block_nbytes[:-1] // self._bytes_per_sample, out=block_starts[1:])
+
+        samples = np.empty(int(block_nbytes.sum()) // self._dtype.itemsize, dtype=self._dtype)
+        samples_bytes = samples.view(np.uint8)
+        offset = 0
+        for data in blocks:
+            samples_bytes[offset:offset + len(data)] = np.frombuffer(data, dtype=np.uint8)
+            offset += len(data)
+        return block_timestamps_nsec, block_starts, samples.reshape((-1,) + self._sample_shape)
+
+    def read_all(self):
+        """Read the POD data values from all data blocks in the series.
+
+        Returns: the same values as read_blocks().
+        """
+        return self.read_blocks(range(self.num_data_blocks))
+
+    def _check_block_size(self, index_in_series, data):
         num_samples = len(data) // self._bytes_per_sample
         expected_size = num_samples * self._bytes_per_sample
         if len(data) != expected_size:
             raise ParseError('{} idx={} expect {} elements but got {})'.format(
                 self._series_descriptor.series_identifier, index_in_series, expected_size,
                 len(data)))
-
-        num_values = num_samples * self._num_values_per_sample
-        format_str = '<{}{}'.format(num_values, POD_TYPE_TO_STRUCT[self._pod_type.pod_type])
-        pod_data = list(struct.unpack(format_str, data))
-
-        def _split(vals, dims):
-            if not dims:
-                return vals
-            els_per_sample = product(dims)
-            assert els_per_sample
-            next_dims = dims[1:]
-            return [
-                _split(vals[i:i + els_per_sample], next_dims)
-                for i in range(0, len(vals), els_per_sample)
-            ]
-
-        split_data = _split(pod_data, self._pod_type.dimension)
-
-        return timestamp_nsec, split_data
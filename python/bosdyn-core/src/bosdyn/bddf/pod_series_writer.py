@@ -16,16 +16,16 @@ class PodSeriesWriter:  # pylint: disable=too-many-instance-attributes
 
     def __init__(  # pylint: disable=too-many-arguments
             self, data_writer, series_type, series_spec, pod_type, dimensions=None,
-            annotations=None, data_block_size=2048):
+            annotations=None, data_block_size=2048, compression=None, compression_level=None):
         self._data_writer = data_writer
         self._series_type = series_type
         self._series_spec = series_spec
         self._pod_type = pod_type
         self._dimensions = dimensions or []
-        self._series_index = self._data_writer.add_pod_series(self.series_type, self.series_spec,
-                                                              type_enum=self._pod_type,
-                                                              dimension=self._dimensions,
-                                                              annotations=annotations)
+        self._series_index = self._data_writer.add_pod_series(
+            self.series_type, self.series_spec, type_enum=self._pod_type,
+            dimension=self._dimensions, annotations=annotations, compression=compression,
+            compression_level=compression_level)
 
         self._data_block_size = data_block_size
         self._num_values_per_sample = 1
@@ -0,0 +1,113 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Rebuild the index of a bddf file which was truncated or not closed.
+
+A bddf file which is missing its end (e.g., because the writer was not closed, or a download was
+ interrupted) cannot be opened by a DataReader, which reads the index from the end of the file.
+The data blocks before the truncation are still valid, so the index can be rebuilt with a single
+ sequential pass over the file, and either used in memory or written to a repaired file.
+"""
+
+from google.protobuf.message import DecodeError
+
+from .block_writer import BlockWriter
+from .common import LOGGER, DataError
+from .stream_data_reader import StreamDataReader
+
+# Readahead buffer used when scanning, large enough that the scan runs at sequential disk speed.
+SALVAGE_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Chunk size used when copying the salvaged blocks into a repaired file.
+_COPY_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class SalvageResult:  # pylint: disable=too-few-public-methods
+    """The index rebuilt by salvage_index()."""
+
+    def __init__(self, file_descriptor, indexer, end_offset, num_data_blocks, complete):
+        # FileFormatDescriptor from the start of the file.
+        self.file_descriptor = file_descriptor
+        # FileIndexer holding the series descriptors and block indexes found in the file.
+        self.indexer = indexer
+        # Offset just past the last complete data or series descriptor block.
+        self.end_offset = end_offset
+        # Number of complete data blocks found.
+        self.num_data_blocks = num_data_blocks
+        # True if the end of the file was found intact.
+        self.complete = complete
+
+    @property
+    def file_index(self):
+        """Return the rebuilt FileIndex proto (without block index offsets)."""
+        return self.indexer.file_index
+
+
+def salvage_index(filename, buffer_size=SALVAGE_BUFFER_SIZE):
+    """Scan a possibly truncated bddf file and rebuild its index.
+
+    Blocks are read in one sequential pass until the end of the file, or until the first block
+     which is truncated or cannot be parsed.  Series descriptors and data blocks before that point
+     are indexed.
+
+    Args:
+     filename:     path of the bddf file.
+     buffer_size:  size of the readahead buffer used for the scan.
+
+    Returns: SalvageResult
+
+    Raises ParseError or DataFormatError if the start of the file is not a valid bddf header.
+    """
+    with open(filename, 'rb', buffering=0) as infile:
+        reader = StreamDataReader(infile, readahead_bytes=buffer_size)
+        end_offset = reader.tell()
+        num_data_blocks = 0
+        complete = False
+        while True:
+            try:
+                is_data, desc, _data = reader.read_next_block()
+            except EOFError:
+                complete = reader.eof and reader.checksum is not None
+                break
+            except (DataError, DecodeError) as err:
+                LOGGER.warning("Stopped salvaging %s at offset %d: %s", filename, end_offset, err)
+                break
+            if is_data:
+                num_data_blocks += 1
+                end_offset = reader.tell()
+            elif desc.WhichOneof("DescriptorType") in ('file_descriptor', 'series_descriptor'):
+                end_offset = reader.tell()
+        return SalvageResult(reader.file_descriptor, reader.file_indexer, end_offset,
+                             num_data_blocks, complete)
+
+
+def repair_file(filename, out_filename, buffer_size=SALVAGE_BUFFER_SIZE):
+    """Write a readable copy of a possibly truncated bddf file.
+
+    The salvaged blocks are copied unchanged, followed by a rebuilt index and file end.
+
+    Args:
+     filename:      path of the (truncated) bddf file.
+     out_filename:  path of the repaired file to write.  Must not be the same as filename.
+     buffer_size:   size of the readahead buffer used for the scan.
+
+    Returns: SalvageResult for the input file.
+    """
+    result = salvage_index(filename, buffer_size)
+    with open(filename, 'rb') as infile:
+        block_writer = BlockWriter(open(out_filename, 'wb'))
+        try:
+            remaining = result.end_offset
+            while remaining > 0:
+                chunk = infile.read(min(remaining, _COPY_CHUNK_SIZE))
+                if not chunk:
+                    raise EOFError("Unexpected end of bddf file")
+                block_writer.write_encoded_blocks(chunk)
+                remaining -= len(chunk)
+            result.indexer.write_index(block_writer)
+        finally:
+            block_writer.close()
+    return result
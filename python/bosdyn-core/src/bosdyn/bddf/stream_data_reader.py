@@ -5,42 +5,250 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Data reader which reads the file format from a stream, without seeking."""
+import queue
+import struct
+import threading
 from hashlib import sha1
 
+import bosdyn.api.bddf_pb2 as bddf
+
 from .base_data_reader import BaseDataReader
-from .common import ParseError
+from .common import (BLOCK_HEADER_SIZE_MASK, BLOCK_HEADER_TYPE_MASK, DATA_BLOCK_TYPE,
+                     DESCRIPTOR_BLOCK_TYPE, END_BLOCK_TYPE, ParseError)
+from .compression import decompress, series_compression
 from .file_indexer import FileIndexer
 
+# Number of bytes read from the stream at a time.
+DEFAULT_READAHEAD_BYTES = 1024 * 1024
+
+# Ways of computing the checksum of the stream, which is verified at the end of the stream.
+CHECKSUM_INLINE = 'inline'  # Compute the checksum as data is read.
+CHECKSUM_THREADED = 'threaded'  # Compute the checksum on a background thread.
+CHECKSUM_SKIP = 'skip'  # Do not compute or verify the checksum.
+CHECKSUM_MODES = (CHECKSUM_INLINE, CHECKSUM_THREADED, CHECKSUM_SKIP)
+
+# Maximum number of chunks waiting to be hashed by the background thread.
+_MAX_QUEUED_HASH_CHUNKS = 8
+
+
+class _ThreadedHasher:
+    """Computes a SHA1 digest of data on a background thread."""
 
-class StreamDataReader(BaseDataReader):
-    """Data reader which reads the file format from a stream, without seeking."""
+    def __init__(self):
+        self._hasher = sha1()
+        self._queue = queue.Queue(_MAX_QUEUED_HASH_CHUNKS)
+        self._thread = threading.Thread(target=self._run, name='bddf-checksum', daemon=True)
+        self._thread.start()
 
-    def __init__(self, outfile):
+    def _run(self):
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            self._hasher.update(data)
+
+    def update(self, data):
+        """Queue data to be hashed.  The data must not be modified afterwards."""
+        self._queue.put(data)
+
+    def close(self):
+        """Stop the background thread, after hashing all queued data."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def digest(self):
+        """Return the digest of all data, waiting for queued data to be hashed."""
+        self.close()
+        return self._hasher.digest()
+
+
+class StreamDataReader(BaseDataReader):  # pylint: disable=too-many-instance-attributes
+    """Data reader which reads the file format from a stream, without seeking.
+
+    Data is read from the stream in large chunks into a readahead buffer, and blocks are parsed
+     from that buffer, so the stream does not need to support seek() or tell().
+    """
+
+    def __init__(self, outfile, readahead_bytes=DEFAULT_READAHEAD_BYTES,
+                 checksum_mode=CHECKSUM_INLINE):
         """
         Args:
-         outfile:      binary file-like object for reading (e.g., from open(fname, "rb")).
+         outfile:          binary file-like object for reading (e.g., from open(fname, "rb")).
+         readahead_bytes:  number of bytes to read from the stream at a time.
+         checksum_mode:    how the checksum at the end of the stream is computed and verified
+                            (one of CHECKSUM_MODES).
         """
-        self._hasher = sha1()  # This computes a checksum
+        self._hasher = None
+        if checksum_mode not in CHECKSUM_MODES:
+            raise ValueError("Unknown checksum_mode {!r} (expected one of {})".format(
+                checksum_mode, ', '.join(CHECKSUM_MODES)))
+        # This computes a checksum
+        if checksum_mode == CHECKSUM_INLINE:
+            self._hasher = sha1()
+        elif checksum_mode == CHECKSUM_THREADED:
+            self._hasher = _ThreadedHasher()
+        self._readahead_bytes = max(1, readahead_bytes)
+        self._buffer = bytearray()
+        self._pos = 0  # Position in the buffer of the next byte to parse.
+        self._end = 0  # Number of valid bytes in the buffer.
+        self._hash_pos = 0  # Position in the buffer of the next byte to add to the checksum.
+        self._buffer_start = self._initial_offset(outfile)  # Stream offset of the buffer start.
         super(StreamDataReader, self).__init__(outfile)
         self._indexer = FileIndexer()
         self._series_index_to_block_index = {}  # {series_index -> SeriesBlockIndex}
 
+    @staticmethod
+    def _initial_offset(infile):
+        try:
+            return infile.tell()
+        except (AttributeError, OSError):
+            return 0
+
+    def _fill(self, nbytes):
+        """Ensure at least nbytes unparsed bytes are in the buffer.
+
+        Raises EOFError if the stream ends first.
+        """
+        if self._end - self._pos >= nbytes:
+            return
+        self._update_checksum()
+        if self._pos:
+            # Move the unparsed bytes to the start of the buffer.
+            remaining = self._end - self._pos
+            if isinstance(self._hasher, _ThreadedHasher):
+                # The hashing thread may still be reading the old buffer, so replace it.
+                buffer = bytearray(max(len(self._buffer), nbytes))
+                buffer[:remaining] = self._buffer[self._pos:self._end]
+                self._buffer = buffer
+            else:
+                self._buffer[:remaining] = self._buffer[self._pos:self._end]
+            self._buffer_start += self._pos
+            self._pos = self._hash_pos = 0
+            self._end = remaining
+        while self._end < nbytes:
+            if self._end == len(self._buffer):
+                # Grow the buffer as data arrives, so a corrupt block size does not allocate
+                #  more memory than the stream holds.
+                grow = max(self._readahead_bytes, min(len(self._buffer), nbytes - self._end))
+                self._buffer.extend(bytes(grow))
+            nread = self._read_into_buffer()
+            if not nread:
+                raise EOFError("Unexpected end of bddf file")
+            self._end += nread
+
+    def _read_into_buffer(self):
+        """Read the bytes available from the stream into the free space of the buffer.
+
+        A buffered stream's readinto()/read() wait until the whole free space is filled, which
+         may never happen on a live pipe or socket, so readinto1()/read1() are used when present.
+        """
+        with memoryview(self._buffer) as view, view[self._end:] as free:
+            readinto = (getattr(self._file, 'readinto1', None) or
+                        getattr(self._file, 'readinto', None))
+            if readinto is not None:
+                return readinto(free) or 0
+            read = getattr(self._file, 'read1', None) or self._file.read
+            data = read(len(free))
+            free[:len(data)] = data
+            return len(data)
+
+    def _update_checksum(self):
+        """Add the bytes parsed since the last update to the checksum."""
+        if self._hasher is not None and self._hash_pos < self._pos:
+            # Not released here, since a _ThreadedHasher may hold on to the view.
+            self._hasher.update(memoryview(self._buffer)[self._hash_pos:self._pos])
+        self._hash_pos = self._pos
+
     def _read(self, nbytes):
-        block = BaseDataReader._read(self, nbytes)
-        self._hasher.update(block)
-        return block
+        if not nbytes:
+            return b''
+        self._fill(nbytes)
+        start = self._pos
+        self._pos += nbytes
+        with memoryview(self._buffer) as view, view[start:self._pos] as block:
+            return bytes(block)
+
+    def _read_block(self):
+        self._fill(8)
+        (block_header,) = struct.unpack_from('<Q', self._buffer, self._pos)
+        self._pos += 8
+        block_size = block_header & BLOCK_HEADER_SIZE_MASK
+        block_type = (block_header & BLOCK_HEADER_TYPE_MASK) >> 56
+        if block_type == END_BLOCK_TYPE:
+            return self._read_end_block()
+        if block_type == DESCRIPTOR_BLOCK_TYPE:
+            self._fill(block_size)
+            desc = bddf.DescriptorBlock()
+            self._parse_proto(desc, block_size)
+            return False, desc, None
+        if block_type != DATA_BLOCK_TYPE:
+            raise ParseError("Expected block_type {} but got {}.".format(
+                DESCRIPTOR_BLOCK_TYPE, block_type))
+        self._fill(4 + block_size)
+        (desc_size,) = struct.unpack_from('<I', self._buffer, self._pos)
+        self._pos += 4
+        if desc_size > block_size:
+            raise ParseError("Data block descriptor size {} > block size {}.".format(
+                desc_size, block_size))
+        data_desc = bddf.DataDescriptor()
+        self._parse_proto(data_desc, desc_size)
+        return True, data_desc, self._read(block_size - desc_size)
+
+    def _parse_proto(self, proto, nbytes):
+        with memoryview(self._buffer) as view, view[self._pos:self._pos + nbytes] as block:
+            proto.ParseFromString(block)
+        self._pos += nbytes
+
+    def _read_end_block(self):
+        # The checksum covers everything up to the index offset, but not the checksum itself.
+        self._fill(8)
+        self._index_offset = struct.unpack_from('<Q', self._buffer, self._pos)[0]
+        self._pos += 8
+        self._update_checksum()
+        self._read_checksum = self._computed_checksum()
+        self._checksum = self._read(self._file_descriptor.checksum_num_bytes)
+        self._hash_pos = self._pos
+        self._eof = True
+        self._verify_checksum()
+        raise EOFError("Normal end of bddf file")
+
+    def _close(self):
+        if isinstance(self._hasher, _ThreadedHasher):
+            self._hasher.close()
+        super(StreamDataReader, self)._close()
 
     @property
     def read_checksum(self):
         """64-bit checksum read from the end of the file, or None if not yet read."""
         return self._read_checksum
 
+    @property
+    def file_indexer(self):
+        """Return the FileIndexer holding the index built from the blocks read so far."""
+        return self._indexer
+
+    @property
+    def checksum_mode(self):
+        """Return how the checksum of the stream is computed (one of CHECKSUM_MODES)."""
+        if self._hasher is None:
+            return CHECKSUM_SKIP
+        if isinstance(self._hasher, _ThreadedHasher):
+            return CHECKSUM_THREADED
+        return CHECKSUM_INLINE
+
+    def tell(self):
+        """Return the offset in the stream of the next block to be read."""
+        return self._buffer_start + self._pos
+
     @property
     def stream_file_index(self):
         """Return the file index as parsed from the stream."""
         return self._indexer.file_index
 
     def _computed_checksum(self):
+        if self._hasher is None:
+            return None
         return self._hasher.digest()
 
     def series_descriptor(self, series_index):
@@ -53,6 +261,8 @@ class StreamDataReader(BaseDataReader):
     def read_data_block(self):
         """Read and return next data block.
 
+        Data from compressed series is decompressed.
+
         Returns: DataDescriptor, SeriesDescriptor, data (bytes)
 
         Raises ParseError if there is a problem with the format of the file,
@@ -62,18 +272,24 @@ class StreamDataReader(BaseDataReader):
             is_data, desc, data = self.read_next_block()
             if not is_data:
                 continue
-            return desc, self.series_descriptor(desc.series_index), data
+            series_descriptor = self.series_descriptor(desc.series_index)
+            codec = series_compression(series_descriptor)
+            if codec:
+                data = decompress(codec, data)
+            return desc, series_descriptor, data
 
     def read_next_block(self):
         """Read and return next block.
 
+        Data is returned as stored in the file, without decompression.
+
         Returns: True, DataDescriptor, data (bytes)   for data block
         Returns: False, DescriptorBlock, None         for descriptor block
 
         Raises ParseError if there is a problem with the format of the file,
                EOFError if the end of the file is reached.
         """
-        file_offset = self._file.tell()
+        file_offset = self.tell()
         try:
             is_data, desc, data = self._read_block()
         except EOFError as err:
@@ -81,7 +297,7 @@ class StreamDataReader(BaseDataReader):
             raise err
         if is_data:
             self._indexer.index_data_block(desc.series_index, desc.timestamp.ToNanoseconds(),
-                                           len(data), file_offset, desc.additional_indexes)
+                                           file_offset, len(data), desc.additional_indexes)
         else:
             desc_type = desc.WhichOneof("DescriptorType")
             if desc_type == 'file_index':
@@ -101,12 +317,21 @@ class StreamDataReader(BaseDataReader):
 
     @property
     def series_block_indexes(self):
-        """Returns the current list of SeriesBlockIndexes: series_index -> SeriesBlockIndex."""
+        """Returns the current list of SeriesBlockIndexes: series_index -> SeriesBlockIndex.
+
+        The protos are built from the blocks read so far, and replaced by new ones once more
+         blocks of their series are read, so changes made to them are not kept.  Prefer
+         series_block_arrays(), which does not build protos.
+        """
         return self._indexer.series_block_indexes
 
     def series_block_index(self, series_index):
-        """Returns the SeriesBlockIndexes for the given series_index."""
-        return self._indexer.series_block_indexes[series_index]
+        """Returns the SeriesBlockIndex for the given series_index, as series_block_indexes."""
+        return self._indexer.series_block_index(series_index)
+
+    def series_block_arrays(self, series_index):
+        """Returns the SeriesBlockArrays of the blocks read so far for the given series_index."""
+        return self._indexer.series_block_arrays(series_index)
 
     @property
     def eof(self):
@@ -0,0 +1,223 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""ThreadedBlockWriter writes bddf data structures to a file from a background thread."""
+
+import collections
+import copy
+import os
+import struct
+import threading
+import time
+
+from .block_writer import BlockWriter
+from .common import DATA_BLOCK_TYPE, DESCRIPTOR_BLOCK_TYPE, DataError
+
+DEFAULT_MAX_BUFFERED_BYTES = 16 * 1024 * 1024
+
+
+class ThreadedWriterStats:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """Statistics about the data written by a ThreadedBlockWriter."""
+
+    def __init__(self):
+        self.bytes_queued = 0  # Total bytes handed to the writer.
+        self.bytes_written = 0  # Total bytes written to the file.
+        self.num_writes = 0  # Number of (coalesced) write() calls on the file.
+        self.num_flushes = 0  # Number of flush() calls on the file.
+        self.num_fsyncs = 0  # Number of fsync() calls on the file.
+        self.max_buffered_bytes = 0  # High-water mark of bytes waiting to be written.
+        self.num_producer_waits = 0  # Number of times a producer blocked on a full buffer.
+        self.producer_wait_sec = 0.0  # Total time producers spent blocked on a full buffer.
+
+    def __repr__(self):
+        return 'ThreadedWriterStats({})'.format(', '.join(
+            '{}={}'.format(key, value) for key, value in vars(self).items()))
+
+
+class ThreadedBlockWriter(BlockWriter):  # pylint: disable=too-many-instance-attributes
+    """Writes data structures in the data file, with file I/O done on a background thread.
+
+    Serialized blocks are queued in a bounded buffer, one entry per block, and a dedicated thread
+     checksums them and writes them to the file, coalescing all queued data into a single write()
+     call.  Data which is not bytes (e.g., a bytearray the caller may reuse) is copied when queued.
+    Callers block when more than max_buffered_bytes are waiting to be written.
+    The bytes written are identical to those written by a BlockWriter.
+    """
+
+    def __init__(self, outfile, max_buffered_bytes=DEFAULT_MAX_BUFFERED_BYTES,
+                 flush_interval_sec=None, fsync_interval_sec=None):
+        """
+        Args:
+         outfile:             a file-like object for writing binary data.
+         max_buffered_bytes:  maximum number of bytes waiting to be written before callers block.
+         flush_interval_sec:  if set, flush the file at most this long after data is written.
+         fsync_interval_sec:  if set, fsync the file at most this long after data is written,
+                               and when the file is closed.
+        """
+        super(ThreadedBlockWriter, self).__init__(outfile)
+        self._offset = outfile.tell()
+        self._max_buffered_bytes = max_buffered_bytes
+        self._flush_interval_sec = flush_interval_sec
+        self._fsync_interval_sec = fsync_interval_sec
+        self._cv = threading.Condition()
+        self._queue = collections.deque()  # (tuple of data pieces, is_hashed)
+        self._buffered_bytes = 0  # Bytes queued or being written, but not yet written.
+        self._stopping = False
+        self._error = None
+        self._stats = ThreadedWriterStats()
+        self._thread = threading.Thread(target=self._run, name='bddf-writer', daemon=True)
+        self._thread.start()
+
+    @property
+    def stats(self):
+        """Return a snapshot of the ThreadedWriterStats for this writer."""
+        with self._cv:
+            return copy.copy(self._stats)
+
+    def tell(self):
+        """Return location from start of file."""
+        return self._offset
+
+    def write_descriptor_block(self, block):
+        """Write a DescriptorBlock to the file."""
+        serialized = block.SerializeToString()
+        self._enqueue((self._block_header(DESCRIPTOR_BLOCK_TYPE, len(serialized)), serialized),
+                      True)
+
+    def write_data_block(self, desc_block, data):
+        """Write a block of data to the file."""
+        serialized_desc = desc_block.SerializeToString()
+        block_len = len(data) + len(serialized_desc)
+        prefix = b''.join((self._block_header(DATA_BLOCK_TYPE, block_len),
+                           struct.pack('<I', len(serialized_desc)), serialized_desc))
+        self._enqueue((prefix, data), True)
+
+    def _write(self, data):
+        self._enqueue((data,), True)
+
+    def _write_unhashed(self, data):
+        self._enqueue((data,), False)
+
+    def _digest(self):
+        # The checksum is computed on the writer thread, so wait for queued data first.
+        self._wait_until_written()
+        return self._hasher.digest()
+
+    def flush(self):
+        """Wait for all queued data to be written, and flush it to the underlying file."""
+        self._wait_until_written()
+        self._outfile.flush()
+
+    def close(self):
+        """Write any queued data and close the file, if not already closed."""
+        if self.closed:
+            return
+        with self._cv:
+            self._stopping = True
+            self._cv.notify_all()
+        self._thread.join()
+        if self._error is None:
+            self._outfile.flush()
+            if self._fsync_interval_sec is not None:
+                os.fsync(self._outfile.fileno())
+        super(ThreadedBlockWriter, self).close()
+        self._check_error()
+
+    def _check_error(self):
+        if self._error is not None:
+            raise DataError("Background bddf write failed: {}".format(self._error))
+
+    def _enqueue(self, pieces, is_hashed):
+        # The caller may change a bytearray or memoryview after this returns, so copy it.
+        pieces = tuple(piece if isinstance(piece, bytes) else bytes(piece) for piece in pieces)
+        nbytes = sum(len(piece) for piece in pieces)
+        with self._cv:
+            self._check_error()
+            if self._buffered_bytes and self._buffered_bytes + nbytes > self._max_buffered_bytes:
+                start = time.monotonic()
+                self._stats.num_producer_waits += 1
+                while (self._buffered_bytes and self._error is None and
+                       self._buffered_bytes + nbytes > self._max_buffered_bytes):
+                    self._cv.wait()
+                self._stats.producer_wait_sec += time.monotonic() - start
+                self._check_error()
+            self._queue.append((pieces, is_hashed))
+            self._buffered_bytes += nbytes
+            self._offset += nbytes
+            self._stats.bytes_queued += nbytes
+            self._stats.max_buffered_bytes = max(self._stats.max_buffered_bytes,
+                                                 self._buffered_bytes)
+            self._cv.notify_all()
+
+    def _wait_until_written(self):
+        with self._cv:
+            while self._buffered_bytes and self._error is None:
+                self._cv.wait()
+            self._check_error()
+
+    def _next_sync_timeout(self, last_write, last_flush, last_fsync):
+        """Return seconds until a pending flush/fsync is due, or None if none is pending."""
+        deadlines = []
+        if self._flush_interval_sec is not None and last_write > last_flush:
+            deadlines.append(last_flush + self._flush_interval_sec)
+        if self._fsync_interval_sec is not None and last_write > last_fsync:
+            deadlines.append(last_fsync + self._fsync_interval_sec)
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def _run(self):
+        last_write = last_flush = last_fsync = time.monotonic()
+        while True:
+            with self._cv:
+                while not self._queue and not self._stopping:
+                    timeout = self._next_sync_timeout(last_write, last_flush, last_fsync)
+                    if timeout == 0.0:
+                        break
+                    self._cv.wait(timeout)
+                if not self._queue and self._stopping:
+                    return
+                items = list(self._queue)
+                self._queue.clear()
+
+            nbytes = 0
+            try:
+                if items:
+                    for pieces, is_hashed in items:
+                        if is_hashed:
+                            for piece in pieces:
+                                self._hasher.update(piece)
+                    chunk = b''.join(piece for pieces, _is_hashed in items for piece in pieces)
+                    nbytes = len(chunk)
+                    self._outfile.write(chunk)
+                    last_write = time.monotonic()
+                now = time.monotonic()
+                do_flush = (self._flush_interval_sec is not None and
+                            now - last_flush >= self._flush_interval_sec)
+                do_fsync = (self._fsync_interval_sec is not None and
+                            now - last_fsync >= self._fsync_interval_sec)
+                if do_flush or do_fsync:
+                    self._outfile.flush()
+                    last_flush = now
+                if do_fsync:
+                    os.fsync(self._outfile.fileno())
+                    last_fsync = now
+            except Exception as err:  # pylint: disable=broad-except
+                with self._cv:
+                    self._error = err
+                    self._cv.notify_all()
+                return
+
+            with self._cv:
+                self._buffered_bytes -= nbytes
+                if items:
+                    self._stats.bytes_written += nbytes
+                    self._stats.num_writes += 1
+                if do_flush or do_fsync:
+                    self._stats.num_flushes += 1
+                if do_fsync:
+                    self._stats.num_fsyncs += 1
+                self._cv.notify_all()
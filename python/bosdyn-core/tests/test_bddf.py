@@ -7,17 +7,32 @@
 """Test code for bosdyn.bddf"""
 
 import os
+import shutil
 import tempfile
+import threading
 
+import numpy as np
 import pytest
 from google.protobuf.timestamp_pb2 import Timestamp
 
 import bosdyn.api.bddf_pb2 as bddf
+import bosdyn.api.robot_command_pb2 as robot_command_pb2
 import bosdyn.api.robot_id_pb2 as robot_id
+import bosdyn.bddf.dataset as dataset_module
+import bosdyn.bddf.grpc_index as grpc_index_module
 from bosdyn.api.data_buffer_pb2 import OperatorComment
-from bosdyn.bddf import (DataReader, DataWriter, GrpcReader, GrpcServiceWriter, PodSeriesReader,
-                         PodSeriesWriter, ProtobufChannelReader, ProtobufReader,
-                         ProtobufSeriesWriter, StreamDataReader)
+from bosdyn.api.robot_state_pb2 import RobotState
+from bosdyn.bddf import (COMPRESSION_LZMA, COMPRESSION_ZLIB, BddfDataset, ChecksumError, DataError,
+                         DataFormatError, DataReader, DataWriter, GrpcReader, GrpcServiceWriter,
+                         ParseError, PodSeriesReader, PodSeriesWriter, ProtobufChannelReader,
+                         ProtobufReader, ProtobufSeriesWriter, SeriesNotUniqueError,
+                         StreamDataReader)
+from bosdyn.bddf.columns import (TIMESTAMP_COLUMN, extract_columns, load_columns,
+                                 load_or_extract_columns)
+from bosdyn.bddf.grpc_index import GRPC_INDEX_SUFFIX, GrpcCallIndex
+from bosdyn.bddf.index_cache import INDEX_CACHE_SUFFIX, IndexCache, file_cache_key
+from bosdyn.bddf.salvage import repair_file, salvage_index
+from bosdyn.bddf.stream_data_reader import CHECKSUM_INLINE, CHECKSUM_SKIP, CHECKSUM_THREADED
 from bosdyn.util import now_nsec, now_timestamp, nsec_to_timestamp, timestamp_to_nsec
 
 
@@ -197,3 +212,917 @@ def test_grpc_read_write():
         nsec, msg = proto_reader.get_message(0)
         assert msg == response
         assert nsec_to_timestamp(nsec) == msg.header.response_timestamp
+
+
+def test_grpc_call_index(monkeypatch):  # pylint: disable=too-many-locals
+    """Test pairing logged GRPC requests and responses, and querying the calls by latency."""
+    filename = os.path.join(gettempdir(), 'test_grpc_index.bddf')
+    index_path = filename + GRPC_INDEX_SUFFIX
+    if os.path.exists(index_path):
+        os.unlink(index_path)
+    start_nsec = now_nsec()
+    latencies = {}
+
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        command_log = GrpcServiceWriter(data_writer, 'robot-command')
+        id_log = GrpcServiceWriter(data_writer, 'robot-id')
+        for idx in range(30):
+            request_nsec = start_nsec + idx * 1000000
+            latency_nsec = (idx * 7919) % 100 * 1000
+            request = robot_command_pb2.RobotCommandRequest()
+            request.header.request_timestamp.CopyFrom(nsec_to_timestamp(request_nsec))
+            request.header.client_name = 'client-%d' % (idx % 2)
+            request.lease.resource = 'body' * 100
+            response = robot_command_pb2.RobotCommandResponse(robot_command_id=idx)
+            response.header.request_header.CopyFrom(request.header)
+            response.header.request_received_timestamp.CopyFrom(
+                nsec_to_timestamp(request_nsec + 10))
+            response.header.response_timestamp.CopyFrom(
+                nsec_to_timestamp(request_nsec + 10 + latency_nsec))
+            response.header.request.Pack(request)
+            if idx != 5:  # A response whose request was not logged.
+                command_log.log_request(request)
+            command_log.log_response(response)
+            latencies[idx] = latency_nsec
+
+            request = robot_id.RobotIdRequest()
+            request.header.request_timestamp.CopyFrom(nsec_to_timestamp(request_nsec))
+            request.header.client_name = 'client-0'
+            response = robot_id.RobotIdResponse()
+            response.header.request_header.CopyFrom(request.header)
+            response.header.request_received_timestamp.CopyFrom(
+                nsec_to_timestamp(request_nsec + 10))
+            response.header.response_timestamp.CopyFrom(nsec_to_timestamp(request_nsec + 10**6))
+            id_log.log_request(request)
+            id_log.log_response(response)
+
+    with DataReader(filename=filename) as data_reader:
+        index = GrpcCallIndex.load_or_build(data_reader)
+        assert len(index) == 60
+        assert os.path.exists(index_path)
+        calls = index.calls(rpc_name='RobotCommand')
+        assert len(calls) == 30
+        assert {call.client_name for call in calls} == {'client-0', 'client-1'}
+        assert calls[3].rpc_name == 'bosdyn.api.RobotCommand'
+        assert calls[3].latency_nsec == latencies[3]
+        assert calls[5].request_index == -1
+        _desc, request_nsec, request_data = data_reader.read(calls[6].request_series_index,
+                                                             calls[6].request_index)
+        assert request_nsec == calls[6].request_timestamp_nsec
+        assert robot_command_pb2.RobotCommandRequest.FromString(
+            request_data).header.client_name == 'client-0'
+        _desc, _nsec, response_data = data_reader.read(calls[6].response_series_index,
+                                                       calls[6].response_index)
+        assert robot_command_pb2.RobotCommandResponse.FromString(
+            response_data).robot_command_id == 6
+
+        assert len(index.calls(service_name='robot-id')) == 30
+        assert len(index.calls(rpc_name='bosdyn.api.RobotIdRequest')) == 30
+
+        window_start = start_nsec + 10 * 1000000
+        window_end = start_nsec + 20 * 1000000
+        slowest = index.slowest(3, rpc_name='RobotCommand', start_nsec=window_start,
+                                end_nsec=window_end)
+        expected = sorted(range(10, 20), key=lambda idx: -latencies[idx])[:3]
+        assert [call.latency_nsec for call in slowest] == [latencies[idx] for idx in expected]
+        assert all(window_start <= call.response_timestamp_nsec < window_end for call in slowest)
+        assert index.latency_percentiles((50,), service_name='robot-id') == {50: 10**6 - 10.0}
+
+    with DataReader(filename=filename) as data_reader:
+        loaded = GrpcCallIndex.load(index_path)
+        assert loaded.cache_key == data_reader.cache_key()
+        assert loaded.calls() == GrpcCallIndex.build(data_reader).calls()
+        # Messages are read a batch at a time, including a partial last batch.
+        monkeypatch.setattr(grpc_index_module, '_READ_BATCH_BLOCKS', 7)
+        assert loaded.calls() == GrpcCallIndex.build(data_reader).calls()
+
+    # A reader opened from a file object has no file name to save the index next to.
+    os.unlink(index_path)
+    with open(filename, 'rb') as infile, DataReader(infile) as data_reader:
+        assert len(GrpcCallIndex.load_or_build(data_reader)) == 60
+        assert not os.path.exists(index_path)
+
+    os.unlink(filename)
+
+
+def test_mmap_read():
+    """Test reading a file through a memory-mapped DataReader."""
+    filename = os.path.join(gettempdir(), 'test_mmap.bdf')
+    series_spec = {'channel': 'channel_a'}
+    timestamp_nsec = now_nsec()
+    operator_message = OperatorComment(message="mmap test", timestamp=now_timestamp())
+    pod_spec = {'varname': 'test_var'}
+
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        series_index = data_writer.add_message_series('bosdyn/test/1', series_spec, 'text/plain',
+                                                      'test_type')
+        for idx in range(5):
+            data_writer.write_data(series_index, timestamp_nsec + idx, b'data %d' % idx)
+        proto_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+        proto_writer.write(timestamp_to_nsec(operator_message.timestamp), operator_message)
+        pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', pod_spec, bddf.TYPE_FLOAT32)
+        for val in range(10, 20):
+            pod_writer.write(timestamp_nsec, val)
+
+    with DataReader(filename=filename, use_mmap=True) as data_reader:
+        assert data_reader.is_mmapped
+        series_index = data_reader.series_spec_to_index(series_spec)
+        assert data_reader.num_data_blocks(series_index) == 5
+        for idx in range(5):
+            desc, timestamp_, data_ = data_reader.read(series_index, idx)
+            assert isinstance(data_, memoryview)
+            assert data_ == b'data %d' % idx
+            assert timestamp_ == timestamp_nsec + idx
+            assert desc.series_index == series_index
+
+        proto_reader = ProtobufReader(data_reader)
+        timestamp_, protobuf = ProtobufChannelReader(proto_reader, OperatorComment).get_message(0)
+        assert protobuf == operator_message
+
+        _timestamp, samples = PodSeriesReader(data_reader, pod_spec).read_samples(0)
+        assert samples == [float(val) for val in range(10, 20)]
+        # Keep a view alive past close(); the mapping is released when the view is dropped.
+        _desc, _timestamp, data_ = data_reader.read(series_index, 0)
+    assert bytes(data_) == b'data 0'
+    del data_
+
+    os.unlink(filename)
+
+
+def test_read_range():
+    """Test looking up and reading blocks of a series by timestamp."""
+    filename = os.path.join(gettempdir(), 'test_range.bdf')
+    series_spec = {'channel': 'channel_a'}
+    start_nsec = now_nsec()
+    num_blocks = 100
+
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        series_index = data_writer.add_message_series('bosdyn/test/1', series_spec, 'text/plain',
+                                                      'test_type', additional_index_names=['i'])
+        for idx in range(num_blocks):
+            data_writer.write_data(series_index, start_nsec + idx * 1000, b'%d' % idx, [idx])
+
+    with DataReader(filename=filename) as data_reader:
+        series_index = data_reader.series_spec_to_index(series_spec)
+        block_arrays = data_reader.series_block_arrays(series_index)
+        assert len(block_arrays) == num_blocks
+        assert block_arrays.additional_indexes[:, 0].tolist() == list(range(num_blocks))
+        assert block_arrays.to_proto() == data_reader.series_block_index(series_index)
+
+        assert data_reader.index_at_time(series_index, 0) == 0
+        assert data_reader.index_at_time(series_index, start_nsec + 10000) == 10
+        assert data_reader.index_at_time(series_index, start_nsec + 10001) == 11
+        assert data_reader.index_at_time(series_index, start_nsec + 10**9) == num_blocks
+
+        blocks = list(data_reader.read_range(series_index, start_nsec + 9500, start_nsec + 20000))
+        assert [data for _desc, _ts, data in blocks] == [b'%d' % idx for idx in range(10, 20)]
+        assert [ts for _desc, ts, _data in blocks] == [start_nsec + i * 1000 for i in range(10, 20)]
+        assert len(list(data_reader.read_range(series_index, start_nsec + 10**9))) == 0
+        assert len(list(data_reader.read_range(series_index, end_nsec=start_nsec))) == 0
+        assert len(list(data_reader.read_range(series_index))) == num_blocks
+
+    os.unlink(filename)
+
+
+class _CountingFile:
+    """Wraps a file, counting calls to read()."""
+
+    def __init__(self, infile):
+        self._file = infile
+        self.num_reads = 0
+
+    def read(self, nbytes=-1):
+        self.num_reads += 1
+        return self._file.read(nbytes)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_block_cache_read_many(use_mmap):
+    """Test the LRU block cache and batched reads of DataReader."""
+    filename = os.path.join(gettempdir(), 'test_read_many.bdf')
+    start_nsec = now_nsec()
+    num_blocks = 50
+
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        series_a = data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'}, 'text/plain',
+                                                  'test_type')
+        series_b = data_writer.add_message_series('bosdyn/test/1', {'channel': 'b'}, 'text/plain',
+                                                  'test_type', compression=COMPRESSION_ZLIB)
+        for idx in range(num_blocks):
+            data_writer.write_data(series_a, start_nsec + idx, b'a%d' % idx * 10)
+            data_writer.write_data(series_b, start_nsec + idx, b'b%d' % idx * 100)
+
+    indices = [7, 3, 40, 3, 4, 5, -1]
+    with open(filename, 'rb') as raw_file, DataReader(_CountingFile(raw_file), filename=filename,
+                                                      use_mmap=use_mmap) as data_reader:
+        infile = data_reader._file  # pylint: disable=protected-access
+        assert data_reader.block_cache is None
+        for series_index, prefix, repeat in ((series_a, b'a', 10), (series_b, b'b', 100)):
+            expected = [data_reader.read(series_index, idx) for idx in indices]
+            num_reads = infile.num_reads
+            values = data_reader.read_many(series_index, indices)
+            assert [(ts, bytes(data)) for _desc, ts, data in values
+                   ] == [(ts, bytes(data)) for _desc, ts, data in expected]
+            assert values[-1][2] == b'%s%d' % (prefix, num_blocks - 1) * repeat
+            if not use_mmap:
+                # Each block takes 3 reads through read(), but read_many() coalesces them.
+                assert infile.num_reads - num_reads == 2
+                num_reads = infile.num_reads
+                data_reader.read_many(series_index, indices, coalesce_bytes=0)
+                assert infile.num_reads - num_reads == 12
+        with pytest.raises(IndexError):
+            data_reader.read_many(series_a, [num_blocks])
+
+    with DataReader(filename=filename, use_mmap=use_mmap, block_cache_bytes=2000) as data_reader:
+        cache = data_reader.block_cache
+        first = data_reader.read(series_a, 0)
+        assert data_reader.read(series_a, 0) is first
+        assert (cache.hits, cache.misses) == (1, 1)
+        values = data_reader.read_many(series_a, range(5))
+        assert values[0] is first
+        assert (cache.hits, cache.misses) == (2, 5)
+        assert len(cache) == 5
+        # Older blocks are evicted to stay within the size limit.
+        data_reader.read_many(series_b, range(10))
+        assert cache.nbytes <= cache.max_bytes
+        assert (series_b, 9) in cache
+        assert (series_a, 0) not in cache
+
+    os.unlink(filename)
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_pod_arrays(use_mmap):
+    """Test reading multi-dimensional POD data as NumPy arrays."""
+    filename = os.path.join(gettempdir(), 'test_pod_arrays.bdf')
+    pod_spec = {'varname': 'matrix_var'}
+    timestamp_nsec = now_nsec()
+    samples_per_block = [3, 1, 4]
+    values = np.arange(sum(samples_per_block) * 6, dtype=np.float64).reshape(-1, 2, 3)
+
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        series_index = data_writer.add_pod_series('bosdyn/test/pod', pod_spec, bddf.TYPE_FLOAT64,
+                                                  dimension=[2, 3])
+        start = 0
+        for block_idx, num_samples in enumerate(samples_per_block):
+            data_writer.write_data(series_index, timestamp_nsec + block_idx,
+                                   values[start:start + num_samples].tobytes())
+            start += num_samples
+
+    with DataReader(filename=filename, use_mmap=use_mmap) as data_reader:
+        pod_reader = PodSeriesReader(data_reader, pod_spec)
+        assert pod_reader.dtype == np.float64
+        assert pod_reader.num_data_blocks == 3
+
+        timestamp_, samples = pod_reader.read_samples(0)
+        assert timestamp_ == timestamp_nsec
+        assert samples == values[:3].tolist()
+
+        timestamp_, array = pod_reader.read_array(2)
+        assert timestamp_ == timestamp_nsec + 2
+        assert array.shape == (4, 2, 3)
+        np.testing.assert_array_equal(array, values[4:])
+
+        block_timestamps, block_starts, array = pod_reader.read_all()
+        assert block_timestamps.tolist() == [timestamp_nsec + i for i in range(3)]
+        assert block_starts.tolist() == [0, 3, 4]
+        np.testing.assert_array_equal(array, values)
+
+        block_timestamps, block_starts, array = pod_reader.read_blocks(range(1, 3))
+        assert block_timestamps.tolist() == [timestamp_nsec + 1, timestamp_nsec + 2]
+        assert block_starts.tolist() == [0, 1]
+        np.testing.assert_array_equal(array, values[3:])
+
+        _timestamps, block_starts, array = pod_reader.read_blocks([])
+        assert array.shape == (0, 2, 3)
+        del array
+
+    os.unlink(filename)
+
+
+def test_writer_index():
+    """Test the block index kept by the DataWriter, and its checks on series and blocks."""
+    filename = os.path.join(gettempdir(), 'test_writer_index.bdf')
+    start_nsec = now_nsec()
+
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        series_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'},
+                                                      'text/plain', 'test_type',
+                                                      additional_index_names=['i'])
+        with pytest.raises(SeriesNotUniqueError):
+            data_writer.add_message_series('bosdyn/test/2', {'channel': 'a'}, 'text/plain',
+                                           'test_type')
+        data_writer.add_message_series('bosdyn/test/1', {'channel': 'b'}, 'text/plain', 'test_type')
+        with pytest.raises(DataFormatError):
+            data_writer.write_data(series_index, start_nsec, b'data')
+        for idx in range(10):
+            data_writer.write_data(series_index, start_nsec + idx, b'data', [-idx])
+
+    with open(filename, 'rb') as infile, StreamDataReader(infile) as stream_reader:
+        with pytest.raises(EOFError):
+            while True:
+                stream_reader.read_data_block()
+        stream_arrays = stream_reader.series_block_arrays(0)
+
+    with DataReader(filename=filename) as data_reader:
+        block_arrays = data_reader.series_block_arrays(0)
+        assert len(block_arrays) == 10
+        assert block_arrays.total_bytes == 40
+        assert block_arrays.timestamps_nsec.tolist() == [start_nsec + i for i in range(10)]
+        assert block_arrays.additional_indexes[:, 0].tolist() == [-i for i in range(10)]
+        assert data_reader.num_data_blocks(1) == 0
+        assert stream_arrays.file_offsets.tolist() == block_arrays.file_offsets.tolist()
+        assert stream_arrays.total_bytes == block_arrays.total_bytes
+
+    os.unlink(filename)
+
+
+def _write_test_blocks(data_writer):
+    """Write a mix of message, protobuf and POD data for comparing writers."""
+    series_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'}, 'text/plain',
+                                                  'test_type', additional_index_names=['i'])
+    proto_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+    pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', {'varname': 'v'},
+                                 bddf.TYPE_FLOAT32, data_block_size=64)
+    for idx in range(500):
+        timestamp_nsec = 1600000000000000000 + idx * 1000
+        data_writer.write_data(series_index, timestamp_nsec, b'x' * (idx % 300), [idx])
+        proto_writer.write(
+            timestamp_nsec,
+            OperatorComment(message='msg %d' % idx, timestamp=nsec_to_timestamp(timestamp_nsec)))
+        pod_writer.write(timestamp_nsec, float(idx))
+
+
+def test_threaded_writer():
+    """Test that the threaded DataWriter writes the same file as the synchronous one."""
+    sync_filename = os.path.join(gettempdir(), 'test_sync_writer.bdf')
+    threaded_filename = os.path.join(gettempdir(), 'test_threaded_writer.bdf')
+
+    with open(sync_filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        assert data_writer.writer_stats is None
+        _write_test_blocks(data_writer)
+
+    with open(threaded_filename, 'wb') as outfile:
+        data_writer = DataWriter(outfile, threaded=True, max_buffered_bytes=1024,
+                                 flush_interval_sec=0.001, fsync_interval_sec=0.01)
+        with data_writer:
+            _write_test_blocks(data_writer)
+            data_writer.flush()
+            stats = data_writer.writer_stats
+            assert stats.bytes_written == stats.bytes_queued
+            assert stats.max_buffered_bytes <= 1024
+            assert stats.num_writes > 0
+        assert data_writer.writer_stats.bytes_written == os.path.getsize(threaded_filename)
+
+    with open(sync_filename, 'rb') as sync_file, open(threaded_filename, 'rb') as threaded_file:
+        assert sync_file.read() == threaded_file.read()
+
+    with DataReader(filename=threaded_filename) as data_reader:
+        assert data_reader.num_data_blocks(0) == 500
+
+    os.unlink(sync_filename)
+    os.unlink(threaded_filename)
+
+
+def test_threaded_writer_copies_data():
+    """Test that data changed by the caller after write_data() is written as it was passed."""
+    filename = os.path.join(gettempdir(), 'test_threaded_writer_copies.bdf')
+    with open(filename, 'wb') as outfile:
+        with DataWriter(outfile, threaded=True) as data_writer:
+            series_index = data_writer.add_message_series('bosdyn/test/1', {}, 'text/plain',
+                                                          'test_type')
+            data = bytearray(4)
+            for idx in range(100):
+                data[:] = bytes([idx]) * 4
+                data_writer.write_data(series_index, idx, data)
+                data_writer.write_data(series_index, idx, memoryview(data))
+
+    with DataReader(filename=filename) as data_reader:
+        written = [data_reader.read(0, idx)[2] for idx in range(200)]
+    assert written == [bytes([idx // 2]) * 4 for idx in range(200)]
+    os.unlink(filename)
+
+
+class _FailingFile:
+    """Writable file which fails once more than max_bytes have been written to it."""
+
+    def __init__(self, max_bytes):
+        self._nbytes = 0
+        self._max_bytes = max_bytes
+        self.closed = False
+
+    def tell(self):
+        return self._nbytes
+
+    def write(self, data):
+        self._nbytes += len(data)
+        if self._nbytes > self._max_bytes:
+            raise OSError('No space left on device')
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_threaded_writer_error_closes():
+    """Test that the file is closed when the background writer failed."""
+    outfile = _FailingFile(max_bytes=1000)
+    data_writer = DataWriter(outfile, threaded=True)
+    series_index = data_writer.add_message_series('bosdyn/test/1', {}, 'text/plain', 'test_type')
+    with pytest.raises(DataError):
+        for idx in range(1000):
+            data_writer.write_data(series_index, idx, b'x' * 100)
+            data_writer.flush()
+    with pytest.raises(DataError):
+        with data_writer:
+            pass
+    assert outfile.closed
+    # Nothing is left to fail when the writer is garbage collected.
+    del data_writer
+
+
+class _TrickleStream:
+    """Non-seekable stream which returns at most max_bytes from each read."""
+
+    def __init__(self, data, max_bytes):
+        self._data = data
+        self._offset = 0
+        self._max_bytes = max_bytes
+
+    def read(self, nbytes):
+        nbytes = min(nbytes, self._max_bytes)
+        data = self._data[self._offset:self._offset + nbytes]
+        self._offset += len(data)
+        return data
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize('checksum_mode', [CHECKSUM_INLINE, CHECKSUM_THREADED, CHECKSUM_SKIP])
+def test_stream_reader_readahead(checksum_mode):
+    """Test reading a stream through readahead buffers of different sizes."""
+    filename = os.path.join(gettempdir(), 'test_stream_readahead.bdf')
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        _write_test_blocks(data_writer)
+    with open(filename, 'rb') as infile:
+        file_data = infile.read()
+    with DataReader(filename=filename) as data_reader:
+        expected = [data_reader.read(0, idx)[2] for idx in range(data_reader.num_data_blocks(0))]
+        file_offsets = data_reader.series_block_arrays(0).file_offsets.tolist()
+    os.unlink(filename)
+
+    for readahead_bytes, max_read in ((100, 7), (4096, 1000), (1024 * 1024, len(file_data))):
+        stream_reader = StreamDataReader(_TrickleStream(file_data,
+                                                        max_read), readahead_bytes=readahead_bytes,
+                                         checksum_mode=checksum_mode)
+        assert stream_reader.checksum_mode == checksum_mode
+        data = []
+        with pytest.raises(EOFError):
+            while True:
+                desc, _series_desc, block_data = stream_reader.read_data_block()
+                if desc.series_index == 0:
+                    data.append(block_data)
+        assert data == expected
+        assert stream_reader.series_block_arrays(0).file_offsets.tolist() == file_offsets
+        if checksum_mode == CHECKSUM_SKIP:
+            assert stream_reader.read_checksum is None
+        else:
+            assert stream_reader.checksum == stream_reader.read_checksum
+        stream_reader.close()
+
+    # Corrupt the data of the last block of series 0.
+    corrupted = bytearray(file_data)
+    corrupted[int(file_offsets[-1]) + 30] ^= 0xFF
+    stream_reader = StreamDataReader(_TrickleStream(bytes(corrupted), 1000),
+                                     checksum_mode=checksum_mode)
+    if checksum_mode == CHECKSUM_SKIP:
+        with pytest.raises(EOFError):
+            while True:
+                stream_reader.read_data_block()
+    else:
+        with pytest.raises(ChecksumError):
+            while True:
+                stream_reader.read_data_block()
+    stream_reader.close()
+
+    # A truncated stream raises EOFError.
+    stream_reader = StreamDataReader(_TrickleStream(file_data[:int(file_offsets[10]) + 5], 1000),
+                                     checksum_mode=checksum_mode)
+    for _ in range(10):
+        stream_reader.read_next_block()
+    # The index proto is built once, and rebuilt after more blocks of the series are read.
+    block_index = stream_reader.series_block_index(0)
+    assert stream_reader.series_block_indexes[0] is block_index
+    with pytest.raises(EOFError):
+        while True:
+            stream_reader.read_next_block()
+    assert stream_reader.checksum is None
+    assert len(stream_reader.series_block_index(0).block_entries) == 10
+    assert len(block_index.block_entries) < 10
+    stream_reader.close()
+
+
+def test_stream_reader_pipe():
+    """Test reading the blocks available from a live pipe, before the rest of the stream arrives."""
+    filename = os.path.join(gettempdir(), 'test_stream_pipe.bdf')
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        _write_test_blocks(data_writer)
+    with DataReader(filename=filename) as data_reader:
+        block_end = int(data_reader.series_block_arrays(0).file_offsets[2]) + 100
+    with open(filename, 'rb') as infile:
+        file_data = infile.read()
+    os.unlink(filename)
+
+    read_fd, write_fd = os.pipe()
+    result = {}
+
+    def _read():
+        with open(read_fd, 'rb') as infile:
+            stream_reader = StreamDataReader(infile)
+            result['blocks'] = [stream_reader.read_data_block()[2] for _ in range(3)]
+
+    # Less than the readahead of the stream is written, and the pipe stays open.
+    os.write(write_fd, file_data[:block_end])
+    thread = threading.Thread(target=_read, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    finished = not thread.is_alive()
+    os.close(write_fd)
+    thread.join()
+    assert finished
+    assert len(result['blocks']) == 3
+
+
+def test_salvage():
+    """Test rebuilding the index of a truncated file."""
+    filename = os.path.join(gettempdir(), 'test_salvage.bdf')
+    truncated_filename = os.path.join(gettempdir(), 'test_salvage_truncated.bdf')
+    repaired_filename = os.path.join(gettempdir(), 'test_salvage_repaired.bdf')
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        _write_test_blocks(data_writer)
+
+    result = salvage_index(filename)
+    assert result.complete
+    with DataReader(filename=filename) as data_reader:
+        for series_index in range(3):
+            assert (result.indexer.series_block_arrays(series_index).file_offsets.tolist() ==
+                    data_reader.series_block_arrays(series_index).file_offsets.tolist())
+        offsets = data_reader.series_block_arrays(0).file_offsets.tolist()
+
+    # Cut the file in the middle of the 300th data block of series 0.
+    with open(filename, 'rb') as infile:
+        data = infile.read(int(offsets[300]) + 20)
+    with open(truncated_filename, 'wb') as outfile:
+        outfile.write(data)
+    with pytest.raises(ParseError):
+        DataReader(filename=truncated_filename)
+
+    result = repair_file(truncated_filename, repaired_filename)
+    assert not result.complete
+    assert result.end_offset <= offsets[300]
+    with DataReader(filename=repaired_filename) as repaired_reader, \
+         DataReader(filename=truncated_filename, salvage=True) as salvaged_reader:
+        for reader in (repaired_reader, salvaged_reader):
+            assert reader.num_data_blocks(0) == 300
+            assert reader.read(0, 299)[2] == b'x' * 299
+            assert reader.num_data_blocks(2) > 0
+            comment = ProtobufReader(reader).get_message(1, OperatorComment, 0)[2]
+            assert comment.message == 'msg 0'
+
+    # The repaired file can be checksummed and read as a stream.
+    with open(repaired_filename, 'rb') as infile, StreamDataReader(infile) as stream_reader:
+        with pytest.raises(EOFError):
+            while True:
+                stream_reader.read_data_block()
+        assert stream_reader.checksum == stream_reader.read_checksum
+
+    os.unlink(filename)
+    os.unlink(truncated_filename)
+    os.unlink(repaired_filename)
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_compression(use_mmap):
+    """Test writing and reading series with compressed data blocks."""
+    filename = os.path.join(gettempdir(), 'test_compression.bdf')
+    series_spec = {'channel': 'compressed'}
+    pod_spec = {'varname': 'compressed_var'}
+    timestamp_nsec = now_nsec()
+    msg_data = b'This is some very compressible data. ' * 100
+    operator_message = OperatorComment(message="compressed " * 50, timestamp=now_timestamp())
+
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        with pytest.raises(DataFormatError):
+            data_writer.add_message_series('bosdyn/test/1', {'channel': 'bad'}, 'text/plain',
+                                           'test_type', compression='bogus')
+        series_index = data_writer.add_message_series('bosdyn/test/1', series_spec, 'text/plain',
+                                                      'test_type', annotations={'a': 'b'},
+                                                      compression=COMPRESSION_ZLIB,
+                                                      compression_level=9)
+        data_writer.write_data(series_index, timestamp_nsec, msg_data)
+        proto_writer = ProtobufSeriesWriter(data_writer, OperatorComment,
+                                            compression=COMPRESSION_LZMA)
+        proto_writer.write(timestamp_to_nsec(operator_message.timestamp), operator_message)
+        pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', pod_spec, bddf.TYPE_FLOAT32,
+                                     compression=COMPRESSION_ZLIB)
+        for val in range(10, 20):
+            pod_writer.write(timestamp_nsec, val)
+
+    with DataReader(filename=filename, use_mmap=use_mmap) as data_reader:
+        series_index = data_reader.series_spec_to_index(series_spec)
+        assert data_reader.series_compression(series_index) == COMPRESSION_ZLIB
+        assert data_reader.series_descriptor(series_index).annotations['a'] == 'b'
+        assert data_reader.total_bytes(series_index) < len(msg_data)
+        _desc, timestamp_, data_ = data_reader.read(series_index, 0)
+        assert timestamp_ == timestamp_nsec
+        assert data_ == msg_data
+
+        proto_reader = ProtobufReader(data_reader)
+        _timestamp, protobuf = ProtobufChannelReader(proto_reader, OperatorComment).get_message(0)
+        assert protobuf == operator_message
+
+        _timestamp, samples = PodSeriesReader(data_reader, pod_spec).read_samples(0)
+        assert samples == [float(val) for val in range(10, 20)]
+
+    with open(filename, 'rb') as infile, StreamDataReader(infile) as stream_reader:
+        _desc, _sdesc, data_ = stream_reader.read_data_block()
+        assert data_ == msg_data
+        _desc, _sdesc, data_ = stream_reader.read_data_block()
+        assert OperatorComment.FromString(data_) == operator_message
+
+    os.unlink(filename)
+
+
+def test_index_cache():
+    """Test opening a DataReader with a sidecar index cache."""
+    filename = os.path.join(gettempdir(), 'test_index_cache.bdf')
+    cache_filename = filename + INDEX_CACHE_SUFFIX
+    if os.path.exists(cache_filename):
+        os.unlink(cache_filename)
+    start_nsec = now_nsec()
+
+    def _write(num_blocks):
+        with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+            series_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'},
+                                                          'text/plain', 'test_type',
+                                                          additional_index_names=['i'])
+            data_writer.add_message_series('bosdyn/test/1', {'channel': 'empty'}, 'text/plain',
+                                           'test_type')
+            for idx in range(num_blocks):
+                data_writer.write_data(series_index, start_nsec + idx, b'%d' % idx, [idx])
+
+    _write(10)
+    with DataReader(filename=filename) as data_reader:
+        expected_index = data_reader.series_block_index(0)
+        expected_descriptor = data_reader.series_descriptor(0)
+
+    # The first open writes the cache, the second one loads it.
+    for _ in range(2):
+        with DataReader(filename=filename, index_cache=True) as data_reader:
+            assert os.path.exists(cache_filename)
+            assert data_reader.series_descriptor(0) == expected_descriptor
+            assert data_reader.series_block_index(0) == expected_index
+            assert data_reader.num_data_blocks(1) == 0
+            assert data_reader.index_at_time(0, start_nsec + 5) == 5
+            assert data_reader.read(0, 9)[1:] == (start_nsec + 9, b'9')
+    with open(filename, 'rb') as infile:
+        assert IndexCache.load(cache_filename, file_cache_key(infile)) is not None
+
+    # A rewritten file does not match the cache, so the cache is rebuilt.
+    _write(20)
+    with open(filename, 'rb') as infile:
+        assert IndexCache.load(cache_filename, file_cache_key(infile)) is None
+    with DataReader(filename=filename, index_cache=cache_filename) as data_reader:
+        assert data_reader.num_data_blocks(0) == 20
+    with DataReader(filename=filename, index_cache=cache_filename) as data_reader:
+        assert data_reader.num_data_blocks(0) == 20
+        assert data_reader.read(0, 19)[2] == b'19'
+        file_index_bytes = data_reader.file_index.SerializeToString()
+
+    # A cache whose protobufs do not parse is ignored.
+    with open(cache_filename, 'r+b') as cache_file:
+        cache_data = cache_file.read()
+        cache_file.seek(cache_data.index(file_index_bytes))
+        cache_file.write(b'\xff' * len(file_index_bytes))
+    with open(filename, 'rb') as infile:
+        assert IndexCache.load(cache_filename, file_cache_key(infile)) is None
+    with DataReader(filename=filename, index_cache=cache_filename) as data_reader:
+        assert data_reader.read(0, 19)[2] == b'19'
+
+    os.unlink(cache_filename)
+    os.unlink(filename)
+
+
+def test_dataset():
+    """Test reading several bddf files as a single time-ordered dataset."""
+    directory = tempfile.mkdtemp(dir=gettempdir())
+    start_nsec = now_nsec()
+    # (file number, channel, timestamps offsets) of messages to write.
+    file_contents = [
+        [('a', range(0, 100, 10)), ('b', range(5, 50, 10))],
+        [('a', range(100, 200, 10))],
+        [('b', range(55, 150, 10)), ('c', range(0, 300, 100))],
+    ]
+    expected = []
+    for file_num, contents in enumerate(file_contents):
+        with open(os.path.join(directory, 'part%d.bddf' % file_num), 'wb') as outfile, \
+             DataWriter(outfile) as data_writer:
+            for channel, offsets in contents:
+                writer = ProtobufSeriesWriter(data_writer, OperatorComment, channel_name=channel)
+                for offset in offsets:
+                    message = OperatorComment(message='%s%d' % (channel, offset))
+                    writer.write(start_nsec + offset, message)
+                    expected.append((start_nsec + offset, channel, message))
+    expected.sort(key=lambda item: item[0])
+
+    with BddfDataset(directory) as dataset:
+        assert len(dataset.filenames) == 3
+        assert sorted(series.spec['bosdyn:channel'] for series in dataset.series) == ['a', 'b', 'c']
+        assert len(dataset.get_series('b').locations) == 2
+        assert dataset.num_messages('a') == 20
+        with pytest.raises(KeyError):
+            dataset.get_series('bogus')
+
+        messages = list(dataset.iter_messages())
+        assert [msg.timestamp_nsec for msg in messages] == [item[0] for item in expected]
+        assert sorted(OperatorComment.FromString(msg.data).message for msg in messages) == sorted(
+            item[2].message for item in expected)
+
+        channel_b = dataset.get_series('b')
+        messages = list(dataset.iter_series(channel_b.identifier_hash, start_nsec + 40))
+        assert [OperatorComment.FromString(msg.data).message for msg in messages
+               ] == ['b45'] + ['b%d' % offset for offset in range(55, 150, 10)]
+        assert all(msg.identifier_hash == channel_b.identifier_hash for msg in messages)
+
+        messages = list(
+            dataset.iter_messages(['a', {
+                'bosdyn:channel': 'c'
+            }], start_nsec + 90, start_nsec + 110))
+        assert [OperatorComment.FromString(msg.data).message for msg in messages
+               ] == ['a90', 'a100', 'c100']
+        filenames = dataset.filenames
+
+    # Only the messages in the time range of each file are part of the dataset.
+    time_ranges = [(None, start_nsec + 50), (start_nsec + 150, None), (None, None)]
+    with BddfDataset(filenames, time_ranges=time_ranges) as dataset:
+        expected_a = [
+            'a%d' % offset for offset in list(range(0, 50, 10)) + list(range(150, 200, 10))
+        ]
+        assert dataset.num_messages('a') == len(expected_a)
+        assert [OperatorComment.FromString(msg.data).message for msg in dataset.iter_series('a')
+               ] == expected_a
+        results = dataset.map('a', _comment_length, workers=0, protobuf_type=OperatorComment)
+        assert [timestamp_nsec - start_nsec for timestamp_nsec, _length in results
+               ] == [int(message[1:]) for message in expected_a]
+    with pytest.raises(ValueError):
+        BddfDataset(filenames, time_ranges=time_ranges[:2])
+
+    shutil.rmtree(directory)
+
+
+def _comment_length(_timestamp_nsec, message):
+    return len(message.message)
+
+
+def _data_length(_timestamp_nsec, data):
+    return len(data)
+
+
+def _add(value_a, value_b):
+    return value_a + value_b
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_dataset_map(workers):
+    """Test processing the messages of a dataset series in parallel."""
+    directory = tempfile.mkdtemp(dir=gettempdir())
+    start_nsec = now_nsec()
+    expected = []
+    for file_num in range(3):
+        with open(os.path.join(directory, 'part%d.bddf' % file_num), 'wb') as outfile, \
+             DataWriter(outfile) as data_writer:
+            writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+            for idx in range(file_num, 60, 3):
+                message = OperatorComment(message='x' * idx)
+                writer.write(start_nsec + idx, message)
+                expected.append((start_nsec + idx, idx))
+    expected.sort()
+
+    with BddfDataset(directory) as dataset:
+        channel = OperatorComment.DESCRIPTOR.full_name
+        results = dataset.map(channel, _comment_length, workers=workers,
+                              protobuf_type=OperatorComment, chunk_size=7)
+        assert results == expected
+        total = dataset.map(channel, _comment_length, workers=workers,
+                            protobuf_type=OperatorComment, reduce_fn=_add)
+        assert total == sum(range(60))
+        results = dataset.map(channel, _data_length, workers=workers, start_nsec=start_nsec + 10,
+                              end_nsec=start_nsec + 20)
+        assert [timestamp for timestamp, _length in results
+               ] == [start_nsec + idx for idx in range(10, 20)]
+        assert dataset.map(channel, _comment_length, workers=workers, reduce_fn=_add,
+                           start_nsec=start_nsec + 1000) is None
+    # Mapping in this process uses the readers of the dataset, not those of worker processes.
+    assert not dataset_module._WORKER_READERS
+
+    shutil.rmtree(directory)
+
+
+def test_dataset_worker_readers():
+    """Test the DataReaders kept open by a worker process of BddfDataset.map()."""
+    directory = tempfile.mkdtemp(dir=gettempdir())
+    filenames = [os.path.join(directory, 'part%d.bddf' % idx) for idx in range(10)]
+
+    def _write(filename, message):
+        with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+            writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+            writer.write(1, OperatorComment(message=message))
+
+    for filename in filenames:
+        _write(filename, 'a')
+    readers = [dataset_module._worker_reader(filename, False) for filename in filenames]
+    assert len(dataset_module._WORKER_READERS) == dataset_module._MAX_WORKER_READERS
+    assert readers[0]._file is None
+    assert readers[-1]._file is not None
+    assert dataset_module._worker_reader(filenames[-1], False) is readers[-1]
+
+    # A file rewritten at the same path is read again.
+    _write(filenames[-1], 'a longer message')
+    reader = dataset_module._worker_reader(filenames[-1], False)
+    assert reader is not readers[-1]
+    assert OperatorComment.FromString(reader.read(0, 0)[2]).message == 'a longer message'
+
+    for reader in dataset_module._WORKER_READERS.values():
+        reader.close()
+    dataset_module._WORKER_READERS.clear()
+    shutil.rmtree(directory)
+
+
+def test_columns():
+    """Test extracting protobuf fields into NumPy columns, and saving them."""
+    filename = os.path.join(gettempdir(), 'test_columns.bdf')
+    directory = tempfile.mkdtemp(dir=gettempdir())
+    start_nsec = now_nsec()
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        writer = ProtobufSeriesWriter(data_writer, RobotState)
+        for idx in range(20):
+            state = RobotState()
+            kinematic_state = state.kinematic_state
+            kinematic_state.velocity_of_body_in_odom.linear.x = idx * 0.5
+            kinematic_state.acquisition_timestamp.FromNanoseconds(start_nsec + idx * 7)
+            for joint in range(idx % 3):
+                joint_state = kinematic_state.joint_states.add(name='j%d' % joint)
+                joint_state.position.value = idx + joint / 10
+            writer.write(start_nsec + idx, state)
+
+    field_paths = [
+        'kinematic_state.velocity_of_body_in_odom.linear.x',
+        'kinematic_state.acquisition_timestamp',
+        'kinematic_state.joint_states[1].position',
+        'kinematic_state.joint_states[0].name',
+    ]
+    with pytest.raises(ValueError):
+        with DataReader(filename=filename) as data_reader:
+            extract_columns(data_reader, RobotState, ['kinematic_state.joint_states.name'])
+
+    with DataReader(filename=filename) as data_reader:
+        columns = extract_columns(data_reader, RobotState, field_paths)
+        assert columns[TIMESTAMP_COLUMN].tolist() == [start_nsec + idx for idx in range(20)]
+        linear_x = columns['kinematic_state.velocity_of_body_in_odom.linear.x']
+        assert linear_x.dtype == np.float64
+        assert linear_x.tolist() == [idx * 0.5 for idx in range(20)]
+        assert columns['kinematic_state.acquisition_timestamp'].tolist() == [
+            start_nsec + idx * 7 for idx in range(20)
+        ]
+        position = columns['kinematic_state.joint_states[1].position']
+        assert np.isnan(position[:2]).all()
+        assert position[2] == 2.1
+        assert columns['kinematic_state.joint_states[0].name'].tolist()[:3] == ['', 'j0', 'j0']
+
+        subset = extract_columns(data_reader, RobotState, field_paths[:1],
+                                 start_nsec=start_nsec + 5, end_nsec=start_nsec + 8)
+        assert subset[field_paths[0]].tolist() == [2.5, 3.0, 3.5]
+
+        loaded = load_or_extract_columns(data_reader, RobotState, field_paths, directory)
+        assert isinstance(loaded[field_paths[0]], np.memmap)
+        for name, column in columns.items():
+            np.testing.assert_array_equal(loaded[name], column)
+
+        # The saved columns are used, without parsing messages, if they match the file.
+        manifest_path = os.path.join(directory, 'columns.json')
+        manifest_mtime = os.stat(manifest_path).st_mtime_ns
+        loaded = load_or_extract_columns(data_reader, RobotState, field_paths[1:], directory)
+        assert sorted(loaded) == sorted([TIMESTAMP_COLUMN] + field_paths[1:])
+        assert os.stat(manifest_path).st_mtime_ns == manifest_mtime
+        saved, metadata = load_columns(directory)
+        assert metadata['protobuf_type'] == 'bosdyn.api.RobotState'
+        assert len(saved) == 5
+
+    os.unlink(filename)
+    shutil.rmtree(directory)